@@ -11,9 +11,22 @@ Clase GestorEstudiantes que encapsula todas las operaciones CRUD
 para la tabla Estudiantes en SQL Server
 """
 
+import time
+
+# Antes de los demás imports: el tiempo de arranque incluye pyodbc y los módulos del proyecto
+INICIO_PROCESO = time.perf_counter()
+
 import pyodbc
 import json
 import sys
+from contextlib import nullcontext
+
+from configuracion import (cargar_configuracion, construir_connection_string, crear_pool,
+                           crear_reintentos, reportar_arranque)
+from modelos import Estudiante, crear_lote_estudiantes
+from presentacion import Columna, Paginador
+from reintentos import ejecutar_con_reintentos
+from unidad_trabajo import UnidadTrabajo
 
 
 class GestorEstudiantes:
@@ -22,194 +35,297 @@ class GestorEstudiantes:
     Implementa encapsulamiento de la conexión y operaciones de base de datos.
     
     Atributos:
-        conexion: Conexión activa a SQL Server
+        pool: Pool de conexiones compartido del que se toma una conexión por operación
+        politica_reintentos: Reintentos con espera exponencial ante fallas transitorias
+        interruptor: Interruptor de circuito que corta las operaciones si el servidor no responde
         connection_string: Cadena de conexión formada desde config.json
+        transaccion_filas_maximas: Filas tras las cuales una unidad de trabajo confirma sola
+        transaccion_ms_maximos: Milisegundos tras los cuales una unidad de trabajo confirma sola
     """
     
+    # Filas por página del servidor al leer la tabla completa (leer_estudiantes_columnar)
+    TAMANO_LOTE_FETCH = 500
+    
     def __init__(self):
         """
         Inicializa la conexión desde el archivo config.json
         Carga las credenciales de SQL Server y establece la conexión
         """
         try:
-            with open('config.json', 'r') as archivo_config:
-                config = json.load(archivo_config)
+            config = cargar_configuracion()
+            self.connection_string = construir_connection_string(config)
             
-            name_server = config['name_server']
-            database = config['database']
-            username = config['username']
-            password = config['password']
-            controlador_odbc = config['controlador_odbc']
+            # Crear el pool sin bloquear: las conexiones se abren en segundo plano
+            self.pool = crear_pool(config)
             
-            # Construir cadena de conexión
-            self.connection_string = f'DRIVER={controlador_odbc};SERVER={name_server};DATABASE={database};UID={username};PWD={password}'
+            # Reintentos con backoff para lecturas e interruptor de circuito
+            self.politica_reintentos, self.interruptor = crear_reintentos(config)
             
-            # Establecer conexión
-            self.conexion = pyodbc.connect(self.connection_string)
-            print("\n✓ Conexión exitosa a SQL Server")
+            # Umbrales de confirmación automática de las unidades de trabajo (None = sin límite)
+            self.transaccion_filas_maximas = config.get('transaccion_filas_maximas')
+            self.transaccion_ms_maximos = config.get('transaccion_ms_maximos')
+            print("\n✓ Configuración cargada - conectando a SQL Server en segundo plano")
             
         except FileNotFoundError:
             print("✗ Error: No se encontró el archivo config.json")
             sys.exit(1)
-        except pyodbc.DatabaseError as e:
-            print(f"✗ Error de conexión a SQL Server: {e}")
+        except json.JSONDecodeError:
+            print("✗ Error: config.json tiene formato inválido")
+            sys.exit(1)
+        except KeyError as e:
+            print(f"✗ Error: Falta la clave {e} en config.json")
             sys.exit(1)
         except Exception as e:
             print(f"✗ Error inesperado: {e}")
             sys.exit(1)
     
+    # ==================== UNIDAD DE TRABAJO ====================
+    def unidad_trabajo(self, filas_maximas=None, milisegundos_maximos=None):
+        """
+        Devuelve una unidad de trabajo que agrupa varias operaciones en una
+        sola transacción (un solo commit al salir del bloque):
+        
+            with gestor.unidad_trabajo() as unidad:
+                gestor.insertar(1, 'Ana', 'Pérez', 'ana@ejemplo.com', '0991', unidad=unidad)
+                with unidad.punto_guardado('correo'):
+                    gestor.actualizar_email(1, 'ana.p@ejemplo.com', unidad=unidad)
+        
+        Sin umbrales se usan transaccion_filas_maximas y transaccion_ms_maximos de config.json.
+        """
+        if filas_maximas is None:
+            filas_maximas = self.transaccion_filas_maximas
+        if milisegundos_maximos is None:
+            milisegundos_maximos = self.transaccion_ms_maximos
+        return UnidadTrabajo(self.pool, filas_maximas, milisegundos_maximos)
+    
+    def _en_unidad(self, unidad):
+        """
+        Usa la unidad de trabajo recibida o, si no hay, una propia para la operación.
+        """
+        return nullcontext(unidad) if unidad is not None else self.unidad_trabajo()
+    
     # ==================== OPERACIÓN C (CREATE) ====================
+    def insertar(self, id_estudiante, nombre, apellido, email, telefono, unidad=None):
+        """
+        Inserta un estudiante con parámetros para evitar inyecciones SQL.
+        Dentro de una unidad de trabajo se confirma con ella; si no, de inmediato.
+        Devuelve las filas afectadas.
+        """
+        # Consulta SQL parametrizada para evitar inyecciones
+        SQL_STATEMENT = """INSERT INTO Estudiantes
+        (IDEstudiante, NombreEstudiante, ApellidoEstudiante, Email, Telefono)
+        VALUES (?, ?, ?, ?, ?)"""
+        
+        with self._en_unidad(unidad) as unidad:
+            return unidad.ejecutar(SQL_STATEMENT, (id_estudiante, nombre, apellido, email, telefono))
+    
     def insertar_estudiante(self):
         """
         Inserta un nuevo registro de estudiante en la tabla Estudiantes.
         Solicita los datos al usuario y utiliza parámetros para evitar inyecciones SQL.
         """
         try:
-            with self.conexion.cursor() as micursor:
-                
-                # Consulta SQL parametrizada para evitar inyecciones
-                SQL_STATEMENT = """INSERT INTO Estudiantes
-                (IDEstudiante, NombreEstudiante, ApellidoEstudiante, Email, Telefono)
-                VALUES (?, ?, ?, ?, ?)"""
-                
-                # Solicitar datos al usuario
-                print("\n--- CREAR NUEVO REGISTRO ---")
-                l_IDEstudiante = int(input("Ingrese ID del Estudiante: "))
-                l_NombreEstudiante = input("Ingrese Nombre del Estudiante: ")
-                l_ApellidoEstudiante = input("Ingrese Apellido del Estudiante: ")
-                l_Email = input("Ingrese Email del Estudiante: ")
-                l_Telefono = input("Ingrese Teléfono del Estudiante: ")
-                
-                # Ejecutar inserción
-                micursor.execute(SQL_STATEMENT, 
-                                (l_IDEstudiante, l_NombreEstudiante, 
-                                 l_ApellidoEstudiante, l_Email, l_Telefono))
-                
-                self.conexion.commit()
-                print("✓ Registro insertado exitosamente")
+            # Solicitar datos al usuario
+            print("\n--- CREAR NUEVO REGISTRO ---")
+            l_IDEstudiante = int(input("Ingrese ID del Estudiante: "))
+            l_NombreEstudiante = input("Ingrese Nombre del Estudiante: ")
+            l_ApellidoEstudiante = input("Ingrese Apellido del Estudiante: ")
+            l_Email = input("Ingrese Email del Estudiante: ")
+            l_Telefono = input("Ingrese Teléfono del Estudiante: ")
+            
+            # Ejecutar inserción
+            self.insertar(l_IDEstudiante, l_NombreEstudiante, l_ApellidoEstudiante, l_Email, l_Telefono)
+            print("✓ Registro insertado exitosamente")
                 
         except ValueError:
             print("✗ Error: Ingrese valores válidos (ID debe ser número)")
-            self.conexion.rollback()
         except pyodbc.IntegrityError as e:
             print(f"✗ Error de integridad: El ID ya existe o datos inválidos")
-            self.conexion.rollback()
         except Exception as e:
             print(f"✗ Error al insertar registro: {e}")
-            self.conexion.rollback()
+    
+    def insertar_varios_estudiantes(self):
+        """
+        Inserta varios estudiantes en una sola transacción. Cada registro va en
+        su propio punto de guardado: si uno falla (por ejemplo por ID repetido)
+        solo se revierte ese registro y los demás se confirman juntos al final.
+        """
+        try:
+            print("\n--- CREAR VARIOS REGISTROS (UNA TRANSACCIÓN) ---")
+            print("Deje el ID en blanco para terminar")
+            
+            with self.unidad_trabajo() as unidad:
+                numero = 0
+                while True:
+                    entrada = input(f"\nRegistro {numero + 1} - Ingrese ID del Estudiante: ").strip()
+                    if not entrada:
+                        break
+                    try:
+                        datos = (int(entrada), input("Ingrese Nombre del Estudiante: "),
+                                 input("Ingrese Apellido del Estudiante: "),
+                                 input("Ingrese Email del Estudiante: "),
+                                 input("Ingrese Teléfono del Estudiante: "))
+                    except ValueError:
+                        print("✗ Error: El ID debe ser un número (registro omitido)")
+                        continue
+                    
+                    numero += 1
+                    try:
+                        with unidad.punto_guardado(f"registro_{numero}"):
+                            self.insertar(*datos, unidad=unidad)
+                    except pyodbc.IntegrityError:
+                        print(f"✗ Registro {numero} revertido: el ID ya existe o datos inválidos")
+            
+            stats = unidad.estadisticas()
+            print(f"\n✓ {stats['filas']} registro(s) insertado(s) con {stats['confirmaciones']} confirmación(es)")
+            
+        except Exception as e:
+            print(f"✗ Error al insertar registros (no se guardó lo pendiente): {e}")
     
     # ==================== OPERACIÓN R (READ) ====================
+    def iterar_estudiantes(self, tamano_pagina):
+        """
+        Generador que recorre la tabla Estudiantes página por página con
+        paginación keyset sobre IDEstudiante. Cada página se lee completa y la
+        conexión vuelve al pool antes de entregar sus registros, por lo que solo
+        se piden al servidor las páginas que se consumen. Cada página es una
+        lectura pura y se reintenta ante fallas transitorias, desde el último ID.
+        """
+        # Consulta SQL parametrizada
+        SQL_QUERY = """
+        SELECT TOP (?) IDEstudiante, NombreEstudiante, ApellidoEstudiante, Email, Telefono
+        FROM Estudiantes
+        WHERE IDEstudiante > ?
+        ORDER BY IDEstudiante
+        """
+        
+        def leer_pagina(ultimo_id):
+            with self.pool.conexion() as conexion, conexion.cursor() as micursor:
+                micursor.execute(SQL_QUERY, (tamano_pagina, ultimo_id))
+                return micursor.fetchall()
+        
+        # Menor valor de INT: los IDs los ingresa el usuario y pueden ser 0 o negativos
+        ultimo_id = -2147483648
+        while True:
+            pagina = ejecutar_con_reintentos(lambda: leer_pagina(ultimo_id),
+                                             self.politica_reintentos, self.interruptor)
+            yield from pagina
+            if len(pagina) < tamano_pagina:
+                return
+            ultimo_id = pagina[-1][0]
+    
+    def leer_estudiantes_columnar(self):
+        """
+        Lee todos los registros de la tabla Estudiantes en un lote columnar
+        (una lista por columna y nombres repetidos guardados una sola vez).
+        Para quien necesite el resultado completo en memoria; el listado en
+        pantalla no lo usa porque lee por páginas.
+        """
+        lote = crear_lote_estudiantes().extender(self.iterar_estudiantes(self.TAMANO_LOTE_FETCH))
+        lote.compactar()
+        return lote
+    
     def consultar_estudiantes(self):
         """
-        Consulta y muestra todos los registros de la tabla Estudiantes.
-        Formatea la salida en columnas para mejor legibilidad.
+        Consulta y muestra los registros de la tabla Estudiantes, una escritura
+        por página. En una terminal solo se piden al servidor las páginas que se
+        visitan; redirigida, se escribe todo por bloques.
         """
         try:
-            with self.conexion.cursor() as micursor:
-                
-                # Consulta SQL
-                SQL_QUERY = """
-                SELECT IDEstudiante, NombreEstudiante, ApellidoEstudiante, Email, Telefono
-                FROM Estudiantes
-                ORDER BY IDEstudiante
-                """
-                
-                micursor.execute(SQL_QUERY)
-                records = micursor.fetchall()
-                
-                if not records:
-                    print("✗ No hay registros en la tabla Estudiantes")
-                    return
-                
-                # Mostrar encabezados
-                print("\n--- LISTADO DE ESTUDIANTES ---")
-                print(f"{'ID':<5} {'Nombre':<15} {'Apellido':<15} {'Email':<25} {'Teléfono':<12}")
-                print("-" * 75)
-                
-                # Mostrar registros
-                for registro in records:
-                    print(f"{registro.IDEstudiante:<5} {registro.NombreEstudiante:<15} "
-                          f"{registro.ApellidoEstudiante:<15} {registro.Email:<25} {registro.Telefono:<12}")
-                
-                print(f"\nTotal de registros: {len(records)}\n")
+            pos = Estudiante.POS
+            paginador = Paginador([
+                Columna('ID', pos.id_estudiante, 5),
+                Columna('Nombre', pos.nombre, 15),
+                Columna('Apellido', pos.apellido, 15),
+                Columna('Email', pos.email, 25),
+                Columna('Teléfono', pos.telefono, 12),
+            ], titulo="--- LISTADO DE ESTUDIANTES ---")
+            
+            # Una página del servidor por página en pantalla
+            total = paginador.ejecutar(Estudiante.desde_filas(self.iterar_estudiantes(paginador.tamano_pagina)))
+            
+            if total == 0:
+                print("✗ No hay registros en la tabla Estudiantes")
+                return
+            
+            if paginador.completo:
+                print(f"\nTotal de registros: {total}\n")
                 
         except Exception as e:
             print(f"✗ Error al consultar registros: {e}")
     
     # ==================== OPERACIÓN U (UPDATE) ====================
+    def actualizar_email(self, id_estudiante, email, unidad=None):
+        """
+        Cambia el email de un estudiante. Devuelve las filas afectadas (0 si no existe).
+        """
+        # Consulta SQL parametrizada
+        SQL_STATEMENT = """UPDATE Estudiantes
+        SET Email = ?
+        WHERE IDEstudiante = ?"""
+        
+        with self._en_unidad(unidad) as unidad:
+            return unidad.ejecutar(SQL_STATEMENT, (email, id_estudiante))
+    
     def actualizar_estudiante(self):
         """
         Actualiza el email de un estudiante existente.
         Solicita el ID del estudiante y el nuevo email.
         """
         try:
-            with self.conexion.cursor() as micursor:
-                
-                # Consulta SQL parametrizada
-                SQL_STATEMENT = """UPDATE Estudiantes
-                SET Email = ?
-                WHERE IDEstudiante = ?"""
-                
-                print("\n--- ACTUALIZAR REGISTRO ---")
-                l_IDEstudiante = int(input("Ingrese ID del Estudiante a actualizar: "))
-                l_Email = input("Ingrese el nuevo Email del Estudiante: ")
-                
-                # Ejecutar actualización
-                micursor.execute(SQL_STATEMENT, (l_Email, l_IDEstudiante))
-                
-                self.conexion.commit()
-                
-                if micursor.rowcount > 0:
-                    print("✓ Registro actualizado exitosamente")
-                else:
-                    print("✗ No se encontró un estudiante con ese ID")
+            print("\n--- ACTUALIZAR REGISTRO ---")
+            l_IDEstudiante = int(input("Ingrese ID del Estudiante a actualizar: "))
+            l_Email = input("Ingrese el nuevo Email del Estudiante: ")
+            
+            # Ejecutar actualización
+            if self.actualizar_email(l_IDEstudiante, l_Email) > 0:
+                print("✓ Registro actualizado exitosamente")
+            else:
+                print("✗ No se encontró un estudiante con ese ID")
                     
         except ValueError:
             print("✗ Error: El ID debe ser un número")
-            self.conexion.rollback()
         except Exception as e:
             print(f"✗ Error al actualizar registro: {e}")
-            self.conexion.rollback()
     
     # ==================== OPERACIÓN D (DELETE) ====================
+    def eliminar(self, id_estudiante, unidad=None):
+        """
+        Elimina un estudiante. Devuelve las filas afectadas (0 si no existe).
+        """
+        # Consulta SQL parametrizada
+        SQL_STATEMENT = """DELETE FROM Estudiantes
+        WHERE IDEstudiante = ?"""
+        
+        with self._en_unidad(unidad) as unidad:
+            return unidad.ejecutar(SQL_STATEMENT, (id_estudiante,))
+    
     def eliminar_estudiante(self):
         """
         Elimina un registro de estudiante de la tabla Estudiantes.
         Solicita confirmación del usuario antes de eliminar.
         """
         try:
-            with self.conexion.cursor() as micursor:
-                
-                # Consulta SQL parametrizada
-                SQL_STATEMENT = """DELETE FROM Estudiantes
-                WHERE IDEstudiante = ?"""
-                
-                print("\n--- ELIMINAR REGISTRO ---")
-                l_IDEstudiante = int(input("Ingrese ID del Estudiante a eliminar: "))
-                
-                # Confirmar eliminación
-                confirmacion = input(f"¿Está seguro que desea eliminar al estudiante con ID {l_IDEstudiante}? (s/n): ")
-                
-                if confirmacion.lower() != 's':
-                    print("Operación cancelada")
-                    return
-                
-                # Ejecutar eliminación
-                micursor.execute(SQL_STATEMENT, (l_IDEstudiante,))
-                
-                self.conexion.commit()
-                
-                if micursor.rowcount > 0:
-                    print("✓ Registro eliminado exitosamente")
-                else:
-                    print("✗ No se encontró un estudiante con ese ID")
+            print("\n--- ELIMINAR REGISTRO ---")
+            l_IDEstudiante = int(input("Ingrese ID del Estudiante a eliminar: "))
+            
+            # Confirmar eliminación
+            confirmacion = input(f"¿Está seguro que desea eliminar al estudiante con ID {l_IDEstudiante}? (s/n): ")
+            
+            if confirmacion.lower() != 's':
+                print("Operación cancelada")
+                return
+            
+            # Ejecutar eliminación
+            if self.eliminar(l_IDEstudiante) > 0:
+                print("✓ Registro eliminado exitosamente")
+            else:
+                print("✗ No se encontró un estudiante con ese ID")
                     
         except ValueError:
             print("✗ Error: El ID debe ser un número")
-            self.conexion.rollback()
         except Exception as e:
             print(f"✗ Error al eliminar registro: {e}")
-            self.conexion.rollback()
     
     # ==================== MENÚ CRUD ====================
     def ejecutar_menu(self):
@@ -218,9 +334,10 @@ class GestorEstudiantes:
         """
         while True:
             self._mostrar_opciones_crud()
+            reportar_arranque(INICIO_PROCESO)
             
             try:
-                opcion = int(input("Seleccione una opción (1-5): "))
+                opcion = int(input("Seleccione una opción (1-6): "))
                 
                 if opcion == 1:
                     self.insertar_estudiante()
@@ -231,11 +348,13 @@ class GestorEstudiantes:
                 elif opcion == 4:
                     self.eliminar_estudiante()
                 elif opcion == 5:
+                    self.insertar_varios_estudiantes()
+                elif opcion == 6:
                     self.cerrar_conexion()
                     print("Saliendo del programa...\n")
                     break
                 else:
-                    print("✗ Opción no válida. Ingrese un número entre 1 y 5")
+                    print("✗ Opción no válida. Ingrese un número entre 1 y 6")
                     
             except ValueError:
                 print("✗ Error: Ingrese un número válido")
@@ -259,15 +378,23 @@ class GestorEstudiantes:
         print("\t2. Consultar registros")
         print("\t3. Actualizar registro")
         print("\t4. Eliminar registro")
-        print("\t5. Salir")
+        print("\t5. Crear varios registros (una transacción)")
+        print("\t6. Salir")
         print("=" * 50)
     
+    def estadisticas_pool(self):
+        """
+        Devuelve las estadísticas del pool de conexiones
+        (préstamos, esperas, desalojos y conexiones abiertas).
+        """
+        return self.pool.estadisticas()
+    
     def cerrar_conexion(self):
         """
-        Cierra la conexión con SQL Server.
+        Cierra las conexiones del pool con SQL Server.
         """
         try:
-            self.conexion.close()
+            self.pool.cerrar()
             print("✓ Conexión cerrada correctamente")
         except Exception as e:
             print(f"✗ Error al cerrar conexión: {e}")
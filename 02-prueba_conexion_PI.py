@@ -1,11 +1,45 @@
 """
 SCRIPT DE PRUEBA DE CONEXIÓN A CatequesisDB
 Verifica que el usuario pythonconsultor tiene acceso correcto
+
+Con --benchmark mide repetidamente el tiempo de conexión en frío, el préstamo
+de una conexión del pool, el ping (SELECT 1) y la latencia de los Store
+Procedures, e informa mínimo, media, p95, p99 y jitter. Con --slo termina con
+código 2 si se supera algún límite, para usarlo como sonda de salud.
+
+Uso:
+    python 02-prueba_conexion_PI.py
+    python 02-prueba_conexion_PI.py --benchmark --iteraciones 100
+    python 02-prueba_conexion_PI.py --benchmark --continuo --intervalo 1 --slo ping:p95=5 --slo conexion_fria:p99=300
 """
 
+import argparse
 import pyodbc
 import json
+import re
 import sys
+import time
+from datetime import datetime
+
+from configuracion import cargar_configuracion, construir_connection_string
+from pool_conexiones import PoolConexiones
+
+
+# Store Procedures de solo lectura medidos en el benchmark: nombre -> (sentencia, parámetros)
+PROCEDIMIENTOS_BENCHMARK = {
+    'sp_EstadisticasAlumnos': ("EXEC sp_EstadisticasAlumnos", ()),
+    'sp_ObtenerAlumnoPorID': ("EXEC sp_ObtenerAlumnoPorID @IdAlumno = ?", (1,)),
+    'sp_ObtenerAlumnosPaginado': ("EXEC sp_ObtenerAlumnosPaginado @UltimoId = ?, @Tamano = ?", (0, 100)),
+}
+
+ESTADISTICOS = ('min', 'media', 'p50', 'p95', 'p99', 'max', 'jitter')
+
+PATRON_SLO = re.compile(r'^(\w+):(' + '|'.join(ESTADISTICOS) + r')=(\d+(?:\.\d+)?)$')
+
+# Códigos de salida del modo benchmark
+SALIDA_CORRECTA = 0
+SALIDA_ERROR = 1
+SALIDA_SLO_VIOLADO = 2
 
 
 def probar_conexion():
@@ -13,9 +47,8 @@ def probar_conexion():
     Prueba la conexión a SQL Server con las credenciales en config.json
     """
     try:
-        # Cargar configuración
-        with open('config.json', 'r') as archivo_config:
-            config = json.load(archivo_config)
+        # Cargar configuración (config.json + variables de entorno DB_*)
+        config = cargar_configuracion()
         
         print("=" * 70)
         print("PRUEBA DE CONEXIÓN A SQL SERVER")
@@ -29,14 +62,15 @@ def probar_conexion():
         print(f"   Driver ODBC: {config['controlador_odbc']}")
         
         # Construir cadena de conexión
-        connection_string = f"DRIVER={config['controlador_odbc']};SERVER={config['name_server']};DATABASE={config['database']};UID={config['username']};PWD={config['password']}"
+        connection_string = construir_connection_string(config)
         
         print(f"\n⏳ Intentando conectar...")
         
         # Intentar conexión
+        inicio = time.perf_counter()
         conexion = pyodbc.connect(connection_string)
         
-        print("✅ ¡Conexión exitosa!")
+        print(f"✅ ¡Conexión exitosa! ({(time.perf_counter() - inicio) * 1000:.1f} ms)")
         
         # Prueba 1: Obtener versión de SQL Server
         print("\n" + "-" * 70)
@@ -148,6 +182,208 @@ def probar_conexion():
         return False
 
 
+# ==================== BENCHMARK Y MONITOREO ====================
+def resumir_latencias(muestras):
+    """
+    Resume una lista de latencias en segundos: mínimo, media, p50, p95, p99,
+    máximo y jitter (variación media entre muestras consecutivas), en milisegundos.
+    """
+    if not muestras:
+        return None
+    ordenadas = sorted(muestras)
+    cantidad = len(ordenadas)
+
+    def percentil(p):
+        # Rango más cercano: el menor valor que deja al menos p% de las muestras a su izquierda
+        return ordenadas[max(0, min(cantidad - 1, -(-p * cantidad // 100) - 1))]
+
+    variaciones = [abs(actual - anterior) for anterior, actual in zip(muestras, muestras[1:])]
+    resumen = {
+        'min': ordenadas[0],
+        'media': sum(ordenadas) / cantidad,
+        'p50': percentil(50),
+        'p95': percentil(95),
+        'p99': percentil(99),
+        'max': ordenadas[-1],
+        'jitter': sum(variaciones) / len(variaciones) if variaciones else 0.0,
+    }
+    resumen = {clave: valor * 1000 for clave, valor in resumen.items()}
+    resumen['n'] = cantidad
+    return resumen
+
+
+def interpretar_slo(texto):
+    """
+    Interpreta un límite 'medicion:estadistico=ms', por ejemplo 'ping:p95=5'.
+    """
+    coincidencia = PATRON_SLO.match(texto.strip())
+    if not coincidencia:
+        raise argparse.ArgumentTypeError(
+            f"SLO inválido '{texto}': use medicion:estadistico=ms ({', '.join(ESTADISTICOS)})")
+    return coincidencia.group(1), coincidencia.group(2), float(coincidencia.group(3))
+
+
+def _ejecutar_y_leer(conexion, sentencia, parametros):
+    micursor = conexion.cursor()
+    try:
+        micursor.execute(sentencia, parametros)
+        while True:
+            if micursor.description is not None:
+                micursor.fetchall()
+            if not micursor.nextset():
+                break
+    finally:
+        micursor.close()
+
+
+def medir_ronda(connection_string, pool, procedimientos, iteraciones, intervalo=0.0):
+    """
+    Ejecuta una ronda de iteraciones y devuelve (muestras, errores) por medición:
+    conexion_fria (pyodbc.connect nuevo), conexion_pool (préstamo del pool),
+    ping (SELECT 1 en la conexión reutilizada) y cada Store Procedure.
+    """
+    nombres = ['conexion_fria', 'conexion_pool', 'ping'] + list(procedimientos)
+    muestras = {nombre: [] for nombre in nombres}
+    errores = dict.fromkeys(nombres, 0)
+
+    for iteracion in range(iteraciones):
+        if iteracion > 0 and intervalo > 0:
+            time.sleep(intervalo)
+
+        # Conexión en frío: handshake TCP, TLS y login completos
+        try:
+            inicio = time.perf_counter()
+            conexion = pyodbc.connect(connection_string)
+            muestras['conexion_fria'].append(time.perf_counter() - inicio)
+            conexion.close()
+        except pyodbc.Error:
+            errores['conexion_fria'] += 1
+
+        # Conexión reutilizada: préstamo del pool
+        try:
+            inicio = time.perf_counter()
+            conexion = pool.obtener()
+            muestras['conexion_pool'].append(time.perf_counter() - inicio)
+        except Exception:
+            errores['conexion_pool'] += 1
+            continue
+
+        descartar = False
+        try:
+            for nombre, sentencia, parametros in [('ping', "SELECT 1", ())] + [
+                    (nombre,) + PROCEDIMIENTOS_BENCHMARK[nombre] for nombre in procedimientos]:
+                try:
+                    inicio = time.perf_counter()
+                    _ejecutar_y_leer(conexion, sentencia, parametros)
+                    muestras[nombre].append(time.perf_counter() - inicio)
+                except pyodbc.Error:
+                    errores[nombre] += 1
+            conexion.commit()
+        except pyodbc.Error:
+            descartar = True
+        finally:
+            pool.devolver(conexion, descartar=descartar)
+
+    return muestras, errores
+
+
+def verificar_slo(resumenes, errores, limites):
+    """
+    Devuelve la lista de límites superados y de mediciones que fallaron.
+    """
+    violaciones = [f"{nombre}: {cantidad} error(es)" for nombre, cantidad in errores.items() if cantidad]
+    for medicion, estadistico, limite in limites:
+        resumen = resumenes.get(medicion)
+        if resumen is None:
+            violaciones.append(f"{medicion}: sin muestras")
+        elif resumen[estadistico] > limite:
+            violaciones.append(f"{medicion} {estadistico} = {resumen[estadistico]:.2f} ms > {limite:g} ms")
+    return violaciones
+
+
+def mostrar_resumen_latencias(resumenes, errores):
+    """
+    Imprime la tabla de latencias (ms) por medición.
+    """
+    print(f"{'Medición':<28} {'n':>5} {'Err':>4} {'Mín':>8} {'Media':>8} {'p95':>8} {'p99':>8} {'Máx':>8} {'Jitter':>8}")
+    print("-" * 95)
+    for nombre, resumen in resumenes.items():
+        if resumen is None:
+            print(f"{nombre:<28} {0:>5} {errores[nombre]:>4} {'-':>8} {'-':>8} {'-':>8} {'-':>8} {'-':>8} {'-':>8}")
+            continue
+        print(f"{nombre:<28} {resumen['n']:>5} {errores[nombre]:>4} {resumen['min']:>8.2f} {resumen['media']:>8.2f} "
+              f"{resumen['p95']:>8.2f} {resumen['p99']:>8.2f} {resumen['max']:>8.2f} {resumen['jitter']:>8.2f}")
+
+
+def ejecutar_benchmark(iteraciones=50, intervalo=0.0, continuo=False, procedimientos=None, limites=()):
+    """
+    Mide las latencias durante una ronda de iteraciones, o ronda tras ronda con
+    continuo=True, y devuelve el código de salida: 0 si todo está dentro de los
+    límites, 1 si no se pudo medir y 2 si se superó algún SLO.
+    """
+    procedimientos = list(PROCEDIMIENTOS_BENCHMARK) if procedimientos is None else procedimientos
+    try:
+        config = cargar_configuracion()
+        connection_string = construir_connection_string(config)
+    except (FileNotFoundError, json.JSONDecodeError, KeyError) as e:
+        print(f"\n❌ Error de configuración: {e}")
+        return SALIDA_ERROR
+
+    # Sin el pooling del administrador ODBC, cada connect en frío es un login real
+    pyodbc.pooling = False
+    pool = PoolConexiones(connection_string, tamano_minimo=1, tamano_maximo=1, abrir_minimo=False)
+
+    print("=" * 95)
+    print(f"BENCHMARK DE LATENCIA - {config['name_server']}/{config['database']}")
+    print(f"{iteraciones} iteraciones por ronda, intervalo {intervalo:g} s" + (", modo continuo" if continuo else ""))
+    print("=" * 95)
+
+    try:
+        while True:
+            muestras, errores = medir_ronda(connection_string, pool, procedimientos, iteraciones, intervalo)
+            resumenes = {nombre: resumir_latencias(valores) for nombre, valores in muestras.items()}
+
+            print(f"\n⏱ {datetime.now().isoformat(timespec='seconds')} (latencias en ms)\n")
+            mostrar_resumen_latencias(resumenes, errores)
+
+            if all(resumen is None for resumen in resumenes.values()):
+                print("\n❌ No se pudo medir ninguna operación: SQL Server no responde")
+                return SALIDA_ERROR
+
+            violaciones = verificar_slo(resumenes, errores, limites)
+            if violaciones:
+                for violacion in violaciones:
+                    print(f"✗ SLO: {violacion}")
+                return SALIDA_SLO_VIOLADO
+            if limites:
+                print("\n✓ Todas las latencias dentro del SLO")
+
+            if not continuo:
+                return SALIDA_CORRECTA
+            if intervalo > 0:
+                time.sleep(intervalo)
+    except KeyboardInterrupt:
+        print("\n✓ Monitoreo detenido por el usuario")
+        return SALIDA_CORRECTA
+    finally:
+        pool.cerrar()
+
+
 if __name__ == "__main__":
-    exito = probar_conexion()
-    sys.exit(0 if exito else 1)
+    parser = argparse.ArgumentParser(description="Prueba de conexión y benchmark de latencia de CatequesisDB")
+    parser.add_argument('--benchmark', action='store_true', help="Medir latencias en lugar de la prueba de conexión")
+    parser.add_argument('--iteraciones', type=int, default=50, help="Iteraciones por ronda (por defecto 50)")
+    parser.add_argument('--intervalo', type=float, default=0.0, help="Segundos entre iteraciones y entre rondas")
+    parser.add_argument('--continuo', action='store_true', help="Repetir rondas hasta Ctrl+C o hasta superar un SLO")
+    parser.add_argument('--procedimientos', nargs='*', choices=list(PROCEDIMIENTOS_BENCHMARK),
+                        help="Store Procedures a medir (por defecto todos)")
+    parser.add_argument('--slo', type=interpretar_slo, action='append', default=[], metavar='MEDICION:ESTADISTICO=MS',
+                        help="Límite de latencia, p. ej. ping:p95=5 o sp_EstadisticasAlumnos:p99=50 (repetible)")
+    argumentos = parser.parse_args()
+
+    if not argumentos.benchmark:
+        exito = probar_conexion()
+        sys.exit(0 if exito else 1)
+
+    sys.exit(ejecutar_benchmark(max(1, argumentos.iteraciones), argumentos.intervalo, argumentos.continuo,
+                                argumentos.procedimientos, argumentos.slo))
@@ -2,10 +2,89 @@
 -- STORE PROCEDURES PARA LA TABLA ALUMNO
 -- Base de Datos: CatequesisDB
 -- Estructura: id_alumno, nombre, apellido, fecha_nacimiento, lugar_nacimiento, 
---             direccion, telefono_alumno, info_escolar, info_salud
+--             direccion, telefono_alumno, info_escolar, info_salud, version_fila
 -- =====================================================
 
+-- 0. COLUMNA DE VERSIÓN PARA CONCURRENCIA OPTIMISTA
+-- Cambia automáticamente con cada INSERT/UPDATE de la fila
+-- =====================================================
+IF COL_LENGTH('dbo.Alumno', 'version_fila') IS NULL
+BEGIN
+    ALTER TABLE dbo.Alumno ADD version_fila ROWVERSION;
+    PRINT 'Columna version_fila agregada a dbo.Alumno';
+END
+GO
+
+-- 0.1 TABLA DE CLAVES DE IDEMPOTENCIA
+-- Permite reintentar sp_InsertarAlumno sin duplicar el alumno
+-- =====================================================
+IF OBJECT_ID('dbo.ClaveIdempotencia', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.ClaveIdempotencia
+    (
+        clave UNIQUEIDENTIFIER NOT NULL PRIMARY KEY,
+        id_alumno INT NOT NULL,
+        creada DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME()
+    );
+    PRINT 'Tabla ClaveIdempotencia creada';
+END
+GO
+
+-- 0.2 TABLA DE ALUMNOS ELIMINADOS (LÁPIDAS) PARA LA RÉPLICA LOCAL
+-- Cada eliminación deja el id_alumno con una versión tomada del mismo
+-- contador que version_fila, para que sp_ObtenerCambiosAlumnos pueda
+-- informar altas, cambios y bajas con una sola marca de agua
+-- =====================================================
+IF OBJECT_ID('dbo.AlumnoEliminado', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.AlumnoEliminado
+    (
+        id_alumno INT NOT NULL PRIMARY KEY,
+        eliminado DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME(),
+        version_fila ROWVERSION
+    );
+    CREATE INDEX IX_AlumnoEliminado_version_fila ON dbo.AlumnoEliminado (version_fila);
+    PRINT 'Tabla AlumnoEliminado creada';
+END
+GO
+
+-- Índice para recorrer los cambios en orden de versión sin leer la tabla completa
+IF NOT EXISTS (SELECT *
+FROM sys.indexes
+WHERE object_id = OBJECT_ID('dbo.Alumno') AND name = 'IX_Alumno_version_fila')
+    CREATE INDEX IX_Alumno_version_fila ON dbo.Alumno (version_fila);
+GO
+
+IF OBJECT_ID('dbo.trg_Alumno_Lapidas', 'TR') IS NOT NULL
+    DROP TRIGGER dbo.trg_Alumno_Lapidas;
+GO
+
+CREATE TRIGGER dbo.trg_Alumno_Lapidas
+ON dbo.Alumno
+AFTER DELETE
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF NOT EXISTS (SELECT 1
+    FROM deleted)
+        RETURN;
+
+    -- Un ID reutilizado tras un reseed vuelve a eliminarse: se renueva su versión
+    MERGE dbo.AlumnoEliminado AS destino
+    USING (SELECT id_alumno
+    FROM deleted) AS origen
+    ON destino.id_alumno = origen.id_alumno
+    WHEN MATCHED THEN
+        UPDATE SET eliminado = SYSUTCDATETIME()
+    WHEN NOT MATCHED THEN
+        INSERT (id_alumno) VALUES (origen.id_alumno);
+END
+GO
+
 -- 1. SP PARA INSERTAR ALUMNO
+-- Con @ClaveIdempotencia, repetir la llamada devuelve el mismo id_alumno
+-- en lugar de insertar otra vez
 -- =====================================================
 IF EXISTS (SELECT *
 FROM sys.objects
@@ -21,22 +100,49 @@ CREATE PROCEDURE dbo.sp_InsertarAlumno
     @Direccion NVARCHAR(255) = NULL,
     @TelefonoAlumno NVARCHAR(20) = NULL,
     @InfoEscolar NVARCHAR(255) = NULL,
-    @InfoSalud NVARCHAR(500) = NULL
+    @InfoSalud NVARCHAR(500) = NULL,
+    @ClaveIdempotencia UNIQUEIDENTIFIER = NULL
 AS
 BEGIN
     SET NOCOUNT ON;
+    SET XACT_ABORT ON;
+
+    DECLARE @IdAlumno INT;
 
     BEGIN TRY
-        INSERT INTO dbo.Alumno
-        (nombre, apellido, fecha_nacimiento, lugar_nacimiento, direccion,
-        telefono_alumno, info_escolar, info_salud)
-    VALUES
-        (@Nombre, @Apellido, @FechaNacimiento, @LugarNacimiento, @Direccion,
-            @TelefonoAlumno, @InfoEscolar, @InfoSalud);
-        
-        SELECT 'SUCCESS' AS Mensaje, SCOPE_IDENTITY() AS id_alumno;
+        BEGIN TRANSACTION;
+
+        IF @ClaveIdempotencia IS NOT NULL
+        BEGIN
+            -- UPDLOCK + HOLDLOCK: dos reintentos simultáneos con la misma clave se serializan
+            SELECT @IdAlumno = id_alumno
+            FROM dbo.ClaveIdempotencia WITH (UPDLOCK, HOLDLOCK)
+            WHERE clave = @ClaveIdempotencia;
+        END
+
+        IF @IdAlumno IS NULL
+        BEGIN
+            INSERT INTO dbo.Alumno
+                (nombre, apellido, fecha_nacimiento, lugar_nacimiento, direccion,
+                telefono_alumno, info_escolar, info_salud)
+            VALUES
+                (@Nombre, @Apellido, @FechaNacimiento, @LugarNacimiento, @Direccion,
+                @TelefonoAlumno, @InfoEscolar, @InfoSalud);
+
+            SET @IdAlumno = SCOPE_IDENTITY();
+
+            IF @ClaveIdempotencia IS NOT NULL
+                INSERT INTO dbo.ClaveIdempotencia (clave, id_alumno)
+                VALUES (@ClaveIdempotencia, @IdAlumno);
+        END
+
+        COMMIT TRANSACTION;
+
+        SELECT 'SUCCESS' AS Mensaje, @IdAlumno AS id_alumno;
     END TRY
     BEGIN CATCH
+        IF @@TRANCOUNT > 0
+            ROLLBACK TRANSACTION;
         SELECT 'ERROR' AS Mensaje, ERROR_MESSAGE() AS DetalleError;
     END CATCH
 END
@@ -93,7 +199,8 @@ BEGIN
         direccion,
         telefono_alumno,
         info_escolar,
-        info_salud
+        info_salud,
+        version_fila
     FROM dbo.Alumno
     WHERE id_alumno = @IdAlumno;
 END
@@ -107,6 +214,9 @@ WHERE type = 'P' AND name = 'sp_ActualizarAlumno')
     DROP PROCEDURE dbo.sp_ActualizarAlumno;
 GO
 
+-- Existencia y concurrencia se verifican en la misma sentencia UPDATE.
+-- Si se envía @VersionEsperada y la fila cambió desde entonces, devuelve CONFLICT.
+-- En caso de éxito devuelve un segundo conjunto con la imagen ANTES y DESPUES.
 CREATE PROCEDURE dbo.sp_ActualizarAlumno
     @IdAlumno INT,
     @Nombre NVARCHAR(100) = NULL,
@@ -116,11 +226,33 @@ CREATE PROCEDURE dbo.sp_ActualizarAlumno
     @Direccion NVARCHAR(255) = NULL,
     @TelefonoAlumno NVARCHAR(20) = NULL,
     @InfoEscolar NVARCHAR(255) = NULL,
-    @InfoSalud NVARCHAR(500) = NULL
+    @InfoSalud NVARCHAR(500) = NULL,
+    @VersionEsperada BINARY(8) = NULL
 AS
 BEGIN
     SET NOCOUNT ON;
 
+    DECLARE @Cambio TABLE (
+        antes_nombre NVARCHAR(100),
+        antes_apellido NVARCHAR(100),
+        antes_fecha_nacimiento DATE,
+        antes_lugar_nacimiento NVARCHAR(100),
+        antes_direccion NVARCHAR(255),
+        antes_telefono_alumno NVARCHAR(20),
+        antes_info_escolar NVARCHAR(255),
+        antes_info_salud NVARCHAR(500),
+        antes_version_fila BINARY(8),
+        nombre NVARCHAR(100),
+        apellido NVARCHAR(100),
+        fecha_nacimiento DATE,
+        lugar_nacimiento NVARCHAR(100),
+        direccion NVARCHAR(255),
+        telefono_alumno NVARCHAR(20),
+        info_escolar NVARCHAR(255),
+        info_salud NVARCHAR(500),
+        version_fila BINARY(8)
+    );
+
     BEGIN TRY
         UPDATE dbo.Alumno
         SET 
@@ -132,10 +264,35 @@ BEGIN
             telefono_alumno = ISNULL(@TelefonoAlumno, telefono_alumno),
             info_escolar = ISNULL(@InfoEscolar, info_escolar),
             info_salud = ISNULL(@InfoSalud, info_salud)
-        WHERE id_alumno = @IdAlumno;
+        OUTPUT
+            deleted.nombre, deleted.apellido, deleted.fecha_nacimiento, deleted.lugar_nacimiento,
+            deleted.direccion, deleted.telefono_alumno, deleted.info_escolar, deleted.info_salud,
+            deleted.version_fila,
+            inserted.nombre, inserted.apellido, inserted.fecha_nacimiento, inserted.lugar_nacimiento,
+            inserted.direccion, inserted.telefono_alumno, inserted.info_escolar, inserted.info_salud,
+            inserted.version_fila
+        INTO @Cambio
+        WHERE id_alumno = @IdAlumno
+            AND (@VersionEsperada IS NULL OR version_fila = @VersionEsperada);
         
         IF @@ROWCOUNT > 0
+        BEGIN
             SELECT 'SUCCESS' AS Mensaje, 'Alumno actualizado correctamente' AS Detalle;
+
+                    SELECT 'ANTES' AS Imagen, @IdAlumno AS id_alumno, antes_nombre, antes_apellido,
+                    antes_fecha_nacimiento, antes_lugar_nacimiento, antes_direccion,
+                    antes_telefono_alumno, antes_info_escolar, antes_info_salud, antes_version_fila
+                FROM @Cambio
+            UNION ALL
+                SELECT 'DESPUES', @IdAlumno, nombre, apellido, fecha_nacimiento, lugar_nacimiento,
+                    direccion, telefono_alumno, info_escolar, info_salud, version_fila
+                FROM @Cambio;
+        END
+        -- Solo en el caso de fallo se distingue entre conflicto e inexistencia
+        ELSE IF EXISTS (SELECT 1
+        FROM dbo.Alumno
+        WHERE id_alumno = @IdAlumno)
+            SELECT 'CONFLICT' AS Mensaje, 'El alumno fue modificado por otro usuario' AS Detalle;
         ELSE
             SELECT 'ERROR' AS Mensaje, 'No se encontró alumno con ese ID' AS Detalle;
     END TRY
@@ -153,26 +310,52 @@ WHERE type = 'P' AND name = 'sp_EliminarAlumno')
     DROP PROCEDURE dbo.sp_EliminarAlumno;
 GO
 
+-- Elimina con una sola sentencia DELETE que verifica existencia y versión.
+-- En caso de éxito devuelve un segundo conjunto con la imagen ANTES de la fila.
 CREATE PROCEDURE dbo.sp_EliminarAlumno
-    @IdAlumno INT
+    @IdAlumno INT,
+    @VersionEsperada BINARY(8) = NULL
 AS
 BEGIN
     SET NOCOUNT ON;
 
+    DECLARE @Eliminado TABLE (
+        id_alumno INT,
+        nombre NVARCHAR(100),
+        apellido NVARCHAR(100),
+        fecha_nacimiento DATE,
+        lugar_nacimiento NVARCHAR(100),
+        direccion NVARCHAR(255),
+        telefono_alumno NVARCHAR(20),
+        info_escolar NVARCHAR(255),
+        info_salud NVARCHAR(500),
+        version_fila BINARY(8)
+    );
+
     BEGIN TRY
-        -- Verificar si el alumno existe
-        IF NOT EXISTS (SELECT 1
-    FROM dbo.Alumno
-    WHERE id_alumno = @IdAlumno)
-        BEGIN
-        SELECT 'ERROR' AS Mensaje, 'No se encontró alumno con ese ID' AS Detalle;
-        RETURN;
-    END
-        
         DELETE FROM dbo.Alumno
-        WHERE id_alumno = @IdAlumno;
+        OUTPUT
+            deleted.id_alumno, deleted.nombre, deleted.apellido, deleted.fecha_nacimiento,
+            deleted.lugar_nacimiento, deleted.direccion, deleted.telefono_alumno,
+            deleted.info_escolar, deleted.info_salud, deleted.version_fila
+        INTO @Eliminado
+        WHERE id_alumno = @IdAlumno
+            AND (@VersionEsperada IS NULL OR version_fila = @VersionEsperada);
         
-        SELECT 'SUCCESS' AS Mensaje, 'Alumno eliminado correctamente' AS Detalle;
+        IF @@ROWCOUNT > 0
+        BEGIN
+            SELECT 'SUCCESS' AS Mensaje, 'Alumno eliminado correctamente' AS Detalle;
+
+            SELECT 'ANTES' AS Imagen, id_alumno, nombre, apellido, fecha_nacimiento, lugar_nacimiento,
+                direccion, telefono_alumno, info_escolar, info_salud, version_fila
+            FROM @Eliminado;
+        END
+        ELSE IF EXISTS (SELECT 1
+        FROM dbo.Alumno
+        WHERE id_alumno = @IdAlumno)
+            SELECT 'CONFLICT' AS Mensaje, 'El alumno fue modificado por otro usuario' AS Detalle;
+        ELSE
+            SELECT 'ERROR' AS Mensaje, 'No se encontró alumno con ese ID' AS Detalle;
     END TRY
     BEGIN CATCH
         SELECT 'ERROR' AS Mensaje, ERROR_MESSAGE() AS DetalleError;
@@ -219,11 +402,180 @@ WHERE type = 'P' AND name = 'sp_EstadisticasAlumnos')
     DROP PROCEDURE dbo.sp_EstadisticasAlumnos;
 GO
 
+-- Lee las tablas resumen mantenidas por trg_Alumno_Estadisticas
+-- (ver 03-estadisticas_alumno.sql): costo constante sin importar el tamaño de la tabla.
+-- Los contadores globales se suman sobre los 16 fragmentos de dbo.AlumnoResumen;
+-- sin fragmentos (resumen no calculado) no devuelve filas
 CREATE PROCEDURE dbo.sp_EstadisticasAlumnos
 AS
 BEGIN
     SET NOCOUNT ON;
 
+    SELECT
+        r.total_alumnos AS TotalAlumnos,
+        r.anios_diferentes AS AniosNacimientoDiferentes,
+        (SELECT TOP 1
+            fecha_nacimiento
+        FROM dbo.AlumnoResumenFecha
+        ORDER BY fecha_nacimiento) AS AlumnoMasViejo,
+        (SELECT TOP 1
+            fecha_nacimiento
+        FROM dbo.AlumnoResumenFecha
+        ORDER BY fecha_nacimiento DESC) AS AlumnoMasJoven,
+        r.lugares_diferentes AS LugaresNacimientoDiferentes,
+        r.con_telefono AS AlumnosConTelefono,
+        r.con_info_escolar AS AlumnosConInfoEscolar,
+        r.con_info_salud AS AlumnosConInfoSalud
+    FROM (
+        SELECT
+            SUM(total_alumnos) AS total_alumnos,
+            SUM(anios_diferentes) AS anios_diferentes,
+            SUM(lugares_diferentes) AS lugares_diferentes,
+            SUM(con_telefono) AS con_telefono,
+            SUM(con_info_escolar) AS con_info_escolar,
+            SUM(con_info_salud) AS con_info_salud
+        FROM dbo.AlumnoResumen
+        HAVING COUNT(*) > 0
+    ) r;
+END
+GO
+
+-- 8. SP PARA CONSULTAR ALUMNOS POR PÁGINAS (KEYSET)
+-- Busca por índice sobre id_alumno > @UltimoId en lugar de leer la tabla completa
+-- =====================================================
+IF EXISTS (SELECT *
+FROM sys.objects
+WHERE type = 'P' AND name = 'sp_ObtenerAlumnosPaginado')
+    DROP PROCEDURE dbo.sp_ObtenerAlumnosPaginado;
+GO
+
+CREATE PROCEDURE dbo.sp_ObtenerAlumnosPaginado
+    @UltimoId INT = 0,
+    @Tamano INT = 500
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    SELECT TOP (@Tamano)
+        id_alumno,
+        nombre,
+        apellido,
+        fecha_nacimiento,
+        lugar_nacimiento,
+        direccion,
+        telefono_alumno,
+        info_escolar,
+        info_salud
+    FROM dbo.Alumno
+    WHERE id_alumno > @UltimoId
+    ORDER BY id_alumno;
+END
+GO
+
+-- 9. TIPO TABLA Y SP PARA INSERTAR ALUMNOS EN LOTE
+-- Recibe un parámetro con valores de tabla (TVP) y devuelve los id_alumno
+-- generados junto al número de fila de origen mediante OUTPUT
+-- =====================================================
+IF EXISTS (SELECT *
+FROM sys.objects
+WHERE type = 'P' AND name = 'sp_InsertarAlumnosLote')
+    DROP PROCEDURE dbo.sp_InsertarAlumnosLote;
+GO
+
+IF EXISTS (SELECT *
+FROM sys.types
+WHERE is_table_type = 1 AND name = 'TipoAlumnoLote')
+    DROP TYPE dbo.TipoAlumnoLote;
+GO
+
+CREATE TYPE dbo.TipoAlumnoLote AS TABLE
+(
+    fila INT NOT NULL PRIMARY KEY,
+    nombre NVARCHAR(100) NOT NULL,
+    apellido NVARCHAR(100) NOT NULL,
+    fecha_nacimiento DATE NULL,
+    lugar_nacimiento NVARCHAR(100) NULL,
+    direccion NVARCHAR(255) NULL,
+    telefono_alumno NVARCHAR(20) NULL,
+    info_escolar NVARCHAR(255) NULL,
+    info_salud NVARCHAR(500) NULL
+);
+GO
+
+CREATE PROCEDURE dbo.sp_InsertarAlumnosLote
+    @Alumnos dbo.TipoAlumnoLote READONLY
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    -- dbo.Alumno tiene triggers, por lo que OUTPUT debe ir a una variable de tabla
+    DECLARE @Generados TABLE (fila INT, id_alumno INT);
+
+    -- MERGE con condición falsa permite usar columnas de origen (fila) en OUTPUT
+    MERGE dbo.Alumno AS destino
+    USING @Alumnos AS origen
+    ON 1 = 0
+    WHEN NOT MATCHED THEN
+        INSERT (nombre, apellido, fecha_nacimiento, lugar_nacimiento, direccion,
+        telefono_alumno, info_escolar, info_salud)
+        VALUES (origen.nombre, origen.apellido, origen.fecha_nacimiento, origen.lugar_nacimiento,
+            origen.direccion, origen.telefono_alumno, origen.info_escolar, origen.info_salud)
+    OUTPUT origen.fila, inserted.id_alumno INTO @Generados;
+
+    SELECT fila, id_alumno
+    FROM @Generados
+    ORDER BY fila;
+END
+GO
+
+-- 10. SP PARA CONSULTAR VARIOS ALUMNOS POR SUS IDs
+-- Recibe la lista de IDs como arreglo JSON, por ejemplo '[1, 5, 42]'
+-- Devuelve las mismas columnas que sp_ObtenerAlumnoPorID
+-- =====================================================
+IF EXISTS (SELECT *
+FROM sys.objects
+WHERE type = 'P' AND name = 'sp_ObtenerAlumnosPorIDs')
+    DROP PROCEDURE dbo.sp_ObtenerAlumnosPorIDs;
+GO
+
+CREATE PROCEDURE dbo.sp_ObtenerAlumnosPorIDs
+    @Ids NVARCHAR(MAX)
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    SELECT
+        a.id_alumno,
+        a.nombre,
+        a.apellido,
+        a.fecha_nacimiento,
+        a.lugar_nacimiento,
+        a.direccion,
+        a.telefono_alumno,
+        a.info_escolar,
+        a.info_salud,
+        a.version_fila
+    FROM dbo.Alumno a
+        INNER JOIN (SELECT DISTINCT id
+        FROM OPENJSON(@Ids) WITH (id INT '$')) ids ON a.id_alumno = ids.id
+    ORDER BY a.id_alumno;
+END
+GO
+
+-- 11. SP PARA CALCULAR ESTADÍSTICAS RECORRIENDO LA TABLA COMPLETA
+-- Usado para verificar las tablas resumen
+-- =====================================================
+IF EXISTS (SELECT *
+FROM sys.objects
+WHERE type = 'P' AND name = 'sp_EstadisticasAlumnosCompleto')
+    DROP PROCEDURE dbo.sp_EstadisticasAlumnosCompleto;
+GO
+
+CREATE PROCEDURE dbo.sp_EstadisticasAlumnosCompleto
+AS
+BEGIN
+    SET NOCOUNT ON;
+
     SELECT
         COUNT(*) AS TotalAlumnos,
         COUNT(DISTINCT YEAR(fecha_nacimiento)) AS AniosNacimientoDiferentes,
@@ -237,6 +589,222 @@ BEGIN
 END
 GO
 
+-- 12. TIPO TABLA Y SP PARA ACTUALIZAR ALUMNOS EN LOTE
+-- Cada fila del TVP es una actualización parcial: las columnas en NULL no
+-- cambian (igual que sp_ActualizarAlumno). Devuelve el resultado de cada fila:
+-- SUCCESS, NOT_FOUND o CONFLICT (version_esperada distinta a la actual)
+-- =====================================================
+IF EXISTS (SELECT *
+FROM sys.objects
+WHERE type = 'P' AND name = 'sp_ActualizarAlumnosLote')
+    DROP PROCEDURE dbo.sp_ActualizarAlumnosLote;
+GO
+
+IF EXISTS (SELECT *
+FROM sys.types
+WHERE is_table_type = 1 AND name = 'TipoAlumnoActualizacion')
+    DROP TYPE dbo.TipoAlumnoActualizacion;
+GO
+
+CREATE TYPE dbo.TipoAlumnoActualizacion AS TABLE
+(
+    fila INT NOT NULL PRIMARY KEY,
+    id_alumno INT NOT NULL UNIQUE,
+    nombre NVARCHAR(100) NULL,
+    apellido NVARCHAR(100) NULL,
+    fecha_nacimiento DATE NULL,
+    lugar_nacimiento NVARCHAR(100) NULL,
+    direccion NVARCHAR(255) NULL,
+    telefono_alumno NVARCHAR(20) NULL,
+    info_escolar NVARCHAR(255) NULL,
+    info_salud NVARCHAR(500) NULL,
+    version_esperada BINARY(8) NULL
+);
+GO
+
+CREATE PROCEDURE dbo.sp_ActualizarAlumnosLote
+    @Cambios dbo.TipoAlumnoActualizacion READONLY
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SET XACT_ABORT ON;
+
+    -- dbo.Alumno tiene triggers, por lo que OUTPUT debe ir a una variable de tabla
+    DECLARE @Actualizados TABLE (
+        id_alumno INT PRIMARY KEY,
+        nombre NVARCHAR(100),
+        apellido NVARCHAR(100),
+        version_fila BINARY(8)
+    );
+
+    BEGIN TRANSACTION;
+
+    UPDATE a
+    SET
+        nombre = ISNULL(c.nombre, a.nombre),
+        apellido = ISNULL(c.apellido, a.apellido),
+        fecha_nacimiento = ISNULL(c.fecha_nacimiento, a.fecha_nacimiento),
+        lugar_nacimiento = ISNULL(c.lugar_nacimiento, a.lugar_nacimiento),
+        direccion = ISNULL(c.direccion, a.direccion),
+        telefono_alumno = ISNULL(c.telefono_alumno, a.telefono_alumno),
+        info_escolar = ISNULL(c.info_escolar, a.info_escolar),
+        info_salud = ISNULL(c.info_salud, a.info_salud)
+    OUTPUT inserted.id_alumno, inserted.nombre, inserted.apellido, inserted.version_fila
+    INTO @Actualizados
+    FROM dbo.Alumno a
+        INNER JOIN @Cambios c ON a.id_alumno = c.id_alumno
+    WHERE c.version_esperada IS NULL OR a.version_fila = c.version_esperada;
+
+    -- Las filas no actualizadas se clasifican dentro de la misma transacción
+    SELECT
+        c.fila,
+        c.id_alumno,
+        CASE
+            WHEN u.id_alumno IS NOT NULL THEN 'SUCCESS'
+            WHEN a.id_alumno IS NULL THEN 'NOT_FOUND'
+            ELSE 'CONFLICT'
+        END AS Resultado,
+        u.nombre,
+        u.apellido,
+        u.version_fila
+    FROM @Cambios c
+        LEFT JOIN @Actualizados u ON u.id_alumno = c.id_alumno
+        LEFT JOIN dbo.Alumno a ON a.id_alumno = c.id_alumno AND u.id_alumno IS NULL
+    ORDER BY c.fila;
+
+    COMMIT TRANSACTION;
+END
+GO
+
+-- 13. SP PARA PURGAR ALUMNOS POR BLOQUES
+-- Elimina como máximo @Tamano alumnos por llamada (TOP (N) en orden de
+-- id_alumno), con una transacción corta por bloque para no escalar a un
+-- bloqueo de tabla. Criterios combinables: lista JSON de IDs, rango de IDs y
+-- rango de años de nacimiento. @DespuesDeId permite continuar desde el último
+-- ID eliminado sin volver a recorrer el inicio de la tabla.
+-- =====================================================
+IF EXISTS (SELECT *
+FROM sys.objects
+WHERE type = 'P' AND name = 'sp_PurgarAlumnosLote')
+    DROP PROCEDURE dbo.sp_PurgarAlumnosLote;
+GO
+
+CREATE PROCEDURE dbo.sp_PurgarAlumnosLote
+    @Tamano INT = 1000,
+    @DespuesDeId INT = 0,
+    @Ids NVARCHAR(MAX) = NULL,
+    @IdDesde INT = NULL,
+    @IdHasta INT = NULL,
+    @AnioDesde INT = NULL,
+    @AnioHasta INT = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SET XACT_ABORT ON;
+
+    -- Menos de 5000 filas por sentencia evita la escalada de bloqueos
+    IF @Tamano < 1 OR @Tamano > 4000
+        SET @Tamano = 1000;
+
+    -- dbo.Alumno tiene triggers, por lo que OUTPUT debe ir a una variable de tabla
+    DECLARE @Eliminados TABLE (id_alumno INT PRIMARY KEY);
+    DECLARE @ListaIds TABLE (id INT PRIMARY KEY);
+
+    IF @Ids IS NOT NULL
+        INSERT INTO @ListaIds (id)
+        SELECT DISTINCT id
+        FROM OPENJSON(@Ids) WITH (id INT '$')
+        WHERE id IS NOT NULL;
+
+    BEGIN TRANSACTION;
+
+    WITH objetivo AS (
+        SELECT TOP (@Tamano) id_alumno
+        FROM dbo.Alumno
+        WHERE id_alumno > @DespuesDeId
+            AND (@Ids IS NULL OR id_alumno IN (SELECT id FROM @ListaIds))
+            AND (@IdDesde IS NULL OR id_alumno >= @IdDesde)
+            AND (@IdHasta IS NULL OR id_alumno <= @IdHasta)
+            AND (@AnioDesde IS NULL OR fecha_nacimiento >= DATEFROMPARTS(@AnioDesde, 1, 1))
+            AND (@AnioHasta IS NULL OR fecha_nacimiento < DATEFROMPARTS(@AnioHasta + 1, 1, 1))
+        ORDER BY id_alumno
+    )
+    DELETE FROM objetivo
+    OUTPUT deleted.id_alumno INTO @Eliminados;
+
+    COMMIT TRANSACTION;
+
+    SELECT COUNT(*) AS Eliminados, MAX(id_alumno) AS UltimoId
+    FROM @Eliminados;
+END
+GO
+
+-- 14. SP PARA OBTENER LOS CAMBIOS DESDE UNA MARCA DE AGUA
+-- Devuelve los alumnos con version_fila posterior a @DesdeVersion y los IDs
+-- eliminados desde entonces (dbo.AlumnoEliminado). El límite superior es
+-- MIN_ACTIVE_ROWVERSION(): las versiones de transacciones aún abiertas no se
+-- entregan, así que ningún cambio queda detrás de la nueva marca. Con más de
+-- @Tamano cambios la marca avanza solo hasta el último alumno entregado.
+-- Conjuntos de resultados: (NuevaVersion, HayMas), alumnos, IDs eliminados.
+-- =====================================================
+IF EXISTS (SELECT *
+FROM sys.objects
+WHERE type = 'P' AND name = 'sp_ObtenerCambiosAlumnos')
+    DROP PROCEDURE dbo.sp_ObtenerCambiosAlumnos;
+GO
+
+CREATE PROCEDURE dbo.sp_ObtenerCambiosAlumnos
+    @DesdeVersion BINARY(8) = 0x0000000000000000,
+    @Tamano INT = 5000
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF @Tamano < 1 OR @Tamano > 50000
+        SET @Tamano = 5000;
+
+    -- Límite exclusivo: la versión más baja que todavía puede confirmarse
+    DECLARE @Hasta BINARY(8) = MIN_ACTIVE_ROWVERSION();
+    DECLARE @HayMas BIT = 0;
+    DECLARE @Cambios TABLE (id_alumno INT PRIMARY KEY, version_fila BINARY(8) NOT NULL);
+
+    INSERT INTO @Cambios (id_alumno, version_fila)
+    SELECT TOP (@Tamano) id_alumno, version_fila
+    FROM dbo.Alumno
+    WHERE version_fila > @DesdeVersion
+        AND version_fila < @Hasta
+    ORDER BY version_fila;
+
+    IF @@ROWCOUNT = @Tamano
+    BEGIN
+        SET @HayMas = 1;
+        SELECT @Hasta = CAST(CAST(MAX(version_fila) AS BIGINT) + 1 AS BINARY(8))
+        FROM @Cambios;
+    END
+
+    SELECT CAST(CAST(@Hasta AS BIGINT) - 1 AS BINARY(8)) AS NuevaVersion, @HayMas AS HayMas;
+
+    SELECT
+        a.id_alumno,
+        a.nombre,
+        a.apellido,
+        a.fecha_nacimiento,
+        a.lugar_nacimiento,
+        a.direccion,
+        a.telefono_alumno,
+        a.info_escolar,
+        a.info_salud,
+        a.version_fila
+    FROM dbo.Alumno a
+        INNER JOIN @Cambios c ON c.id_alumno = a.id_alumno;
+
+    SELECT id_alumno
+    FROM dbo.AlumnoEliminado
+    WHERE version_fila > @DesdeVersion
+        AND version_fila < @Hasta;
+END
+GO
+
 -- =====================================================
 -- VERIFICAR QUE LOS STORE PROCEDURES FUERON CREADOS
 -- =====================================================
@@ -259,7 +827,7 @@ PRINT ''
 PRINT '=== USO DE LOS STORE PROCEDURES ==='
 PRINT ''
 PRINT '1. sp_InsertarAlumno'
-PRINT '   EXEC sp_InsertarAlumno @Nombre, @Apellido, @FechaNacimiento, @LugarNacimiento, @Direccion, @TelefonoAlumno, @InfoEscolar, @InfoSalud'
+PRINT '   EXEC sp_InsertarAlumno @Nombre, @Apellido, @FechaNacimiento, @LugarNacimiento, @Direccion, @TelefonoAlumno, @InfoEscolar, @InfoSalud, @ClaveIdempotencia'
 PRINT ''
 PRINT '2. sp_ObtenerAlumnos'
 PRINT '   EXEC sp_ObtenerAlumnos'
@@ -268,13 +836,34 @@ PRINT '3. sp_ObtenerAlumnoPorID'
 PRINT '   EXEC sp_ObtenerAlumnoPorID @IdAlumno'
 PRINT ''
 PRINT '4. sp_ActualizarAlumno'
-PRINT '   EXEC sp_ActualizarAlumno @IdAlumno, @Nombre, @Apellido, @FechaNacimiento, @LugarNacimiento, @Direccion, @TelefonoAlumno, @InfoEscolar, @InfoSalud'
+PRINT '   EXEC sp_ActualizarAlumno @IdAlumno, @Nombre, @Apellido, @FechaNacimiento, @LugarNacimiento, @Direccion, @TelefonoAlumno, @InfoEscolar, @InfoSalud, @VersionEsperada'
 PRINT ''
 PRINT '5. sp_EliminarAlumno'
-PRINT '   EXEC sp_EliminarAlumno @IdAlumno'
+PRINT '   EXEC sp_EliminarAlumno @IdAlumno, @VersionEsperada'
 PRINT ''
 PRINT '6. sp_BuscarAlumnosPorNombre'
 PRINT '   EXEC sp_BuscarAlumnosPorNombre @NombreBusqueda'
 PRINT ''
 PRINT '7. sp_EstadisticasAlumnos'
 PRINT '   EXEC sp_EstadisticasAlumnos'
+PRINT ''
+PRINT '8. sp_ObtenerAlumnosPaginado'
+PRINT '   EXEC sp_ObtenerAlumnosPaginado @UltimoId, @Tamano'
+PRINT ''
+PRINT '9. sp_InsertarAlumnosLote'
+PRINT '   EXEC sp_InsertarAlumnosLote @Alumnos (dbo.TipoAlumnoLote)'
+PRINT ''
+PRINT '10. sp_ObtenerAlumnosPorIDs'
+PRINT '   EXEC sp_ObtenerAlumnosPorIDs @Ids (arreglo JSON)'
+PRINT ''
+PRINT '11. sp_EstadisticasAlumnosCompleto'
+PRINT '   EXEC sp_EstadisticasAlumnosCompleto'
+PRINT ''
+PRINT '12. sp_ActualizarAlumnosLote'
+PRINT '   EXEC sp_ActualizarAlumnosLote @Cambios (dbo.TipoAlumnoActualizacion)'
+PRINT ''
+PRINT '13. sp_PurgarAlumnosLote'
+PRINT '   EXEC sp_PurgarAlumnosLote @Tamano, @DespuesDeId, @Ids, @IdDesde, @IdHasta, @AnioDesde, @AnioHasta'
+PRINT ''
+PRINT '14. sp_ObtenerCambiosAlumnos'
+PRINT '   EXEC sp_ObtenerCambiosAlumnos @DesdeVersion, @Tamano'
@@ -0,0 +1,298 @@
+-- =====================================================
+-- ESTADÍSTICAS INCREMENTALES DE LA TABLA ALUMNO
+-- Base de Datos: CatequesisDB
+-- Tablas resumen mantenidas por trigger para que sp_EstadisticasAlumnos
+-- no recorra la tabla completa en cada llamada
+-- Ejecutar después de 02-store_procedures_alumno.sql
+-- =====================================================
+
+-- 1. TABLAS RESUMEN
+-- =====================================================
+
+-- El trigger se vuelve a crear en la sección 3 con las tablas nuevas
+IF OBJECT_ID('dbo.trg_Alumno_Estadisticas', 'TR') IS NOT NULL
+    DROP TRIGGER dbo.trg_Alumno_Estadisticas;
+GO
+
+-- Versión anterior con una sola fila (id = 1): se reemplaza, sus datos se recalculan
+IF OBJECT_ID('dbo.AlumnoResumen', 'U') IS NOT NULL
+    AND COL_LENGTH('dbo.AlumnoResumen', 'fragmento') IS NULL
+    DROP TABLE dbo.AlumnoResumen;
+GO
+
+-- Contadores globales repartidos en 16 fragmentos. Con una sola fila, cada
+-- INSERT, UPDATE o DELETE de dbo.Alumno la bloquea hasta el COMMIT y las
+-- cargas en paralelo quedan en fila detrás de ella. Cada sesión suma sus
+-- diferencias en el fragmento @@SPID % 16 y sp_EstadisticasAlumnos suma los
+-- 16 fragmentos al leer (16 filas: el costo sigue siendo constante)
+IF OBJECT_ID('dbo.AlumnoResumen', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.AlumnoResumen
+    (
+        fragmento TINYINT NOT NULL PRIMARY KEY CHECK (fragmento < 16),
+        total_alumnos INT NOT NULL DEFAULT 0,
+        anios_diferentes INT NOT NULL DEFAULT 0,
+        lugares_diferentes INT NOT NULL DEFAULT 0,
+        con_telefono INT NOT NULL DEFAULT 0,
+        con_info_escolar INT NOT NULL DEFAULT 0,
+        con_info_salud INT NOT NULL DEFAULT 0
+    );
+    PRINT 'Tabla AlumnoResumen creada';
+END
+GO
+
+-- Alumnos por año de nacimiento
+IF OBJECT_ID('dbo.AlumnoResumenAnio', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.AlumnoResumenAnio
+    (
+        anio INT NOT NULL PRIMARY KEY,
+        cantidad INT NOT NULL
+    );
+    PRINT 'Tabla AlumnoResumenAnio creada';
+END
+GO
+
+-- Alumnos por lugar de nacimiento
+IF OBJECT_ID('dbo.AlumnoResumenLugar', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.AlumnoResumenLugar
+    (
+        lugar_nacimiento NVARCHAR(100) NOT NULL PRIMARY KEY,
+        cantidad INT NOT NULL
+    );
+    PRINT 'Tabla AlumnoResumenLugar creada';
+END
+GO
+
+-- Alumnos por fecha de nacimiento (MIN/MAX por búsqueda en la clave primaria)
+IF OBJECT_ID('dbo.AlumnoResumenFecha', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.AlumnoResumenFecha
+    (
+        fecha_nacimiento DATE NOT NULL PRIMARY KEY,
+        cantidad INT NOT NULL
+    );
+    PRINT 'Tabla AlumnoResumenFecha creada';
+END
+GO
+
+-- 2. SP PARA RECALCULAR LAS TABLAS RESUMEN DESDE CERO
+-- Se usa para la carga inicial y para corregir diferencias detectadas
+-- =====================================================
+IF EXISTS (SELECT *
+FROM sys.objects
+WHERE type = 'P' AND name = 'sp_RecalcularEstadisticasAlumnos')
+    DROP PROCEDURE dbo.sp_RecalcularEstadisticasAlumnos;
+GO
+
+CREATE PROCEDURE dbo.sp_RecalcularEstadisticasAlumnos
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SET XACT_ABORT ON;
+
+    BEGIN TRY
+        BEGIN TRANSACTION;
+
+        -- Bloquear la tabla para que ningún cambio quede fuera del recálculo
+        DECLARE @Bloqueo INT = (SELECT COUNT(*)
+    FROM dbo.Alumno WITH (TABLOCKX, HOLDLOCK));
+
+        DELETE FROM dbo.AlumnoResumenAnio;
+        DELETE FROM dbo.AlumnoResumenLugar;
+        DELETE FROM dbo.AlumnoResumenFecha;
+        DELETE FROM dbo.AlumnoResumen;
+
+        INSERT INTO dbo.AlumnoResumenAnio
+        (anio, cantidad)
+    SELECT YEAR(fecha_nacimiento), COUNT(*)
+    FROM dbo.Alumno
+    WHERE fecha_nacimiento IS NOT NULL
+    GROUP BY YEAR(fecha_nacimiento);
+
+        INSERT INTO dbo.AlumnoResumenLugar
+        (lugar_nacimiento, cantidad)
+    SELECT lugar_nacimiento, COUNT(*)
+    FROM dbo.Alumno
+    WHERE lugar_nacimiento IS NOT NULL
+    GROUP BY lugar_nacimiento;
+
+        INSERT INTO dbo.AlumnoResumenFecha
+        (fecha_nacimiento, cantidad)
+    SELECT fecha_nacimiento, COUNT(*)
+    FROM dbo.Alumno
+    WHERE fecha_nacimiento IS NOT NULL
+    GROUP BY fecha_nacimiento;
+
+        -- Los totales quedan en el fragmento 0 y los otros 15 empiezan en cero
+        INSERT INTO dbo.AlumnoResumen
+        (fragmento, total_alumnos, anios_diferentes, lugares_diferentes,
+        con_telefono, con_info_escolar, con_info_salud)
+    SELECT
+        0,
+        COUNT(*),
+        (SELECT COUNT(*)
+        FROM dbo.AlumnoResumenAnio),
+        (SELECT COUNT(*)
+        FROM dbo.AlumnoResumenLugar),
+        COUNT(telefono_alumno),
+        COUNT(info_escolar),
+        COUNT(info_salud)
+    FROM dbo.Alumno;
+
+        INSERT INTO dbo.AlumnoResumen
+        (fragmento)
+    SELECT TOP (15)
+        ROW_NUMBER() OVER (ORDER BY object_id)
+    FROM sys.all_objects;
+
+        COMMIT TRANSACTION;
+
+        SELECT 'SUCCESS' AS Mensaje, 'Estadísticas recalculadas correctamente' AS Detalle;
+    END TRY
+    BEGIN CATCH
+        IF @@TRANCOUNT > 0
+            ROLLBACK TRANSACTION;
+        SELECT 'ERROR' AS Mensaje, ERROR_MESSAGE() AS DetalleError;
+    END CATCH
+END
+GO
+
+-- 3. TRIGGER QUE MANTIENE LAS TABLAS RESUMEN
+-- Aplica solo la diferencia entre inserted y deleted de cada sentencia
+-- =====================================================
+IF OBJECT_ID('dbo.trg_Alumno_Estadisticas', 'TR') IS NOT NULL
+    DROP TRIGGER dbo.trg_Alumno_Estadisticas;
+GO
+
+CREATE TRIGGER dbo.trg_Alumno_Estadisticas
+ON dbo.Alumno
+AFTER INSERT, UPDATE, DELETE
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF NOT EXISTS (SELECT 1
+        FROM inserted) AND NOT EXISTS (SELECT 1
+        FROM deleted)
+        RETURN;
+
+    DECLARE @Acciones TABLE (accion NVARCHAR(10));
+    DECLARE @AniosNuevos INT;
+    DECLARE @LugaresNuevos INT;
+
+    -- HOLDLOCK (SERIALIZABLE) en cada MERGE: bloquea el rango de la clave
+    -- buscada hasta el fin de la transacción. Sin él, dos sesiones que agregan
+    -- el mismo año, lugar o fecha nuevos toman ambas WHEN NOT MATCHED, la
+    -- segunda INSERT viola la PK y se revierte el INSERT del alumno
+    -- Contadores por año: una fila que llega a cero se elimina
+    MERGE dbo.AlumnoResumenAnio WITH (HOLDLOCK) AS destino
+    USING (
+        SELECT anio, SUM(delta) AS delta
+    FROM (
+                            SELECT YEAR(fecha_nacimiento) AS anio, 1 AS delta
+            FROM inserted
+            WHERE fecha_nacimiento IS NOT NULL
+        UNION ALL
+            SELECT YEAR(fecha_nacimiento), -1
+            FROM deleted
+            WHERE fecha_nacimiento IS NOT NULL
+        ) cambios
+    GROUP BY anio
+    HAVING SUM(delta) <> 0
+    ) AS origen
+    ON destino.anio = origen.anio
+    WHEN MATCHED AND destino.cantidad + origen.delta = 0 THEN DELETE
+    WHEN MATCHED THEN UPDATE SET cantidad = destino.cantidad + origen.delta
+    WHEN NOT MATCHED THEN INSERT (anio, cantidad) VALUES (origen.anio, origen.delta)
+    OUTPUT $action INTO @Acciones;
+
+    SELECT @AniosNuevos = ISNULL(SUM(CASE accion WHEN 'INSERT' THEN 1 WHEN 'DELETE' THEN -1 ELSE 0 END), 0)
+    FROM @Acciones;
+    DELETE FROM @Acciones;
+
+    -- Contadores por lugar de nacimiento
+    MERGE dbo.AlumnoResumenLugar WITH (HOLDLOCK) AS destino
+    USING (
+        SELECT lugar_nacimiento, SUM(delta) AS delta
+    FROM (
+                            SELECT lugar_nacimiento, 1 AS delta
+            FROM inserted
+            WHERE lugar_nacimiento IS NOT NULL
+        UNION ALL
+            SELECT lugar_nacimiento, -1
+            FROM deleted
+            WHERE lugar_nacimiento IS NOT NULL
+        ) cambios
+    GROUP BY lugar_nacimiento
+    HAVING SUM(delta) <> 0
+    ) AS origen
+    ON destino.lugar_nacimiento = origen.lugar_nacimiento
+    WHEN MATCHED AND destino.cantidad + origen.delta = 0 THEN DELETE
+    WHEN MATCHED THEN UPDATE SET cantidad = destino.cantidad + origen.delta
+    WHEN NOT MATCHED THEN INSERT (lugar_nacimiento, cantidad) VALUES (origen.lugar_nacimiento, origen.delta)
+    OUTPUT $action INTO @Acciones;
+
+    SELECT @LugaresNuevos = ISNULL(SUM(CASE accion WHEN 'INSERT' THEN 1 WHEN 'DELETE' THEN -1 ELSE 0 END), 0)
+    FROM @Acciones;
+
+    -- Contadores por fecha exacta (para alumno más viejo y más joven)
+    MERGE dbo.AlumnoResumenFecha WITH (HOLDLOCK) AS destino
+    USING (
+        SELECT fecha_nacimiento, SUM(delta) AS delta
+    FROM (
+                            SELECT fecha_nacimiento, 1 AS delta
+            FROM inserted
+            WHERE fecha_nacimiento IS NOT NULL
+        UNION ALL
+            SELECT fecha_nacimiento, -1
+            FROM deleted
+            WHERE fecha_nacimiento IS NOT NULL
+        ) cambios
+    GROUP BY fecha_nacimiento
+    HAVING SUM(delta) <> 0
+    ) AS origen
+    ON destino.fecha_nacimiento = origen.fecha_nacimiento
+    WHEN MATCHED AND destino.cantidad + origen.delta = 0 THEN DELETE
+    WHEN MATCHED THEN UPDATE SET cantidad = destino.cantidad + origen.delta
+    WHEN NOT MATCHED THEN INSERT (fecha_nacimiento, cantidad) VALUES (origen.fecha_nacimiento, origen.delta);
+
+    -- Contadores globales en el fragmento de esta sesión: sesiones distintas
+    -- no esperan por la misma fila (anios_diferentes y lugares_diferentes
+    -- también son sumas de diferencias, por lo que se reparten igual)
+    UPDATE dbo.AlumnoResumen
+    SET
+        total_alumnos = total_alumnos
+            + (SELECT COUNT(*)
+        FROM inserted) - (SELECT COUNT(*)
+        FROM deleted),
+        con_telefono = con_telefono
+            + (SELECT COUNT(telefono_alumno)
+        FROM inserted) - (SELECT COUNT(telefono_alumno)
+        FROM deleted),
+        con_info_escolar = con_info_escolar
+            + (SELECT COUNT(info_escolar)
+        FROM inserted) - (SELECT COUNT(info_escolar)
+        FROM deleted),
+        con_info_salud = con_info_salud
+            + (SELECT COUNT(info_salud)
+        FROM inserted) - (SELECT COUNT(info_salud)
+        FROM deleted),
+        anios_diferentes = anios_diferentes + @AniosNuevos,
+        lugares_diferentes = lugares_diferentes + @LugaresNuevos
+    WHERE fragmento = @@SPID % 16;
+END
+GO
+
+-- 4. CARGA INICIAL DE LAS TABLAS RESUMEN
+-- =====================================================
+EXEC dbo.sp_RecalcularEstadisticasAlumnos;
+GO
+
+PRINT '=== ESTADÍSTICAS INCREMENTALES CONFIGURADAS ==='
+PRINT ''
+PRINT 'sp_EstadisticasAlumnos lee ahora dbo.AlumnoResumen (costo constante).'
+PRINT 'Para verificar contra un recálculo completo use la opción de verificación del menú'
+PRINT 'o compare EXEC sp_EstadisticasAlumnos con EXEC sp_EstadisticasAlumnosCompleto.'
+PRINT 'Para corregir diferencias: EXEC sp_RecalcularEstadisticasAlumnos'
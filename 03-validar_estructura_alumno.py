@@ -1,135 +1,266 @@
 """
 SCRIPT PARA VALIDAR LA ESTRUCTURA DE LA TABLA ALUMNO
 Verifica los campos reales en CatequesisDB
+
+Por defecto valida dbo.Alumno; con --tablas valida una lista y con --todas
+todas las tablas de la base. Cada categoría de metadatos (columnas,
+restricciones, índices y cantidad de registros) se obtiene con una sola
+consulta para todas las tablas, y las consultas se ejecutan en paralelo
+sobre un pool pequeño de conexiones.
+
+Uso:
+    python 03-validar_estructura_alumno.py
+    python 03-validar_estructura_alumno.py --tablas dbo.Alumno dbo.Estudiantes
+    python 03-validar_estructura_alumno.py --todas --resumen --hilos 4
+
+Termina con código 0 si todas las tablas pedidas existen y con 1 si falta
+alguna o la validación falló.
 """
 
-import pyodbc
+import argparse
 import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pyodbc
+
+from configuracion import cargar_configuracion, construir_connection_string
+from pool_conexiones import PoolConexiones
+
+
+# Tablas de usuario a validar: todas (? = NULL) o las del arreglo JSON de nombres
+FILTRO_TABLAS = """
+WITH objetivo AS (
+    SELECT t.object_id
+    FROM sys.tables t
+    WHERE t.is_ms_shipped = 0
+        AND (? IS NULL OR t.object_id IN (SELECT OBJECT_ID(value) FROM OPENJSON(?)))
+)
+"""
+
+CONSULTA_TABLAS = FILTRO_TABLAS + """
+SELECT t.object_id, SCHEMA_NAME(t.schema_id), t.name
+FROM sys.tables t
+    JOIN objetivo o ON o.object_id = t.object_id
+ORDER BY SCHEMA_NAME(t.schema_id), t.name
+"""
+
+CONSULTA_COLUMNAS = FILTRO_TABLAS + """
+SELECT
+    c.object_id,
+    c.name,
+    ty.name,
+    CASE WHEN c.max_length = -1 THEN -1
+         WHEN ty.name IN ('nchar', 'nvarchar') THEN c.max_length / 2
+         WHEN ty.name IN ('char', 'varchar', 'binary', 'varbinary') THEN c.max_length
+    END,
+    c.is_nullable,
+    c.is_identity,
+    dc.definition
+FROM sys.columns c
+    JOIN objetivo o ON o.object_id = c.object_id
+    JOIN sys.types ty ON ty.user_type_id = c.user_type_id
+    LEFT JOIN sys.default_constraints dc ON dc.object_id = c.default_object_id
+ORDER BY c.object_id, c.column_id
+"""
+
+CONSULTA_RESTRICCIONES = FILTRO_TABLAS + """
+SELECT kc.parent_object_id, kc.name, c.name
+FROM sys.key_constraints kc
+    JOIN objetivo o ON o.object_id = kc.parent_object_id
+    JOIN sys.index_columns ic ON ic.object_id = kc.parent_object_id AND ic.index_id = kc.unique_index_id
+    JOIN sys.columns c ON c.object_id = ic.object_id AND c.column_id = ic.column_id
+UNION ALL
+SELECT fk.parent_object_id, fk.name, c.name
+FROM sys.foreign_keys fk
+    JOIN objetivo o ON o.object_id = fk.parent_object_id
+    JOIN sys.foreign_key_columns fkc ON fkc.constraint_object_id = fk.object_id
+    JOIN sys.columns c ON c.object_id = fkc.parent_object_id AND c.column_id = fkc.parent_column_id
+ORDER BY 1, 2
+"""
+
+# STRING_AGG agrupa las columnas de todos los índices en una pasada (SQL Server 2017+)
+CONSULTA_INDICES = FILTRO_TABLAS + """
+SELECT
+    i.object_id,
+    i.name,
+    STRING_AGG(c.name, ', ') WITHIN GROUP (ORDER BY ic.key_ordinal, ic.index_column_id),
+    CASE WHEN i.is_primary_key = 1 THEN 'Primary Key'
+         WHEN i.is_unique = 1 THEN 'Unique'
+         ELSE 'Index' END
+FROM sys.indexes i
+    JOIN objetivo o ON o.object_id = i.object_id
+    JOIN sys.index_columns ic ON ic.object_id = i.object_id AND ic.index_id = i.index_id
+    JOIN sys.columns c ON c.object_id = ic.object_id AND c.column_id = ic.column_id
+WHERE i.index_id > 0
+GROUP BY i.object_id, i.index_id, i.name, i.is_primary_key, i.is_unique
+ORDER BY i.object_id, i.index_id
+"""
+
+# Cantidad de registros sin recorrer las tablas: montón (0) o índice clustered (1)
+CONSULTA_CONTEOS = FILTRO_TABLAS + """
+SELECT ps.object_id, SUM(ps.row_count)
+FROM sys.dm_db_partition_stats ps
+    JOIN objetivo o ON o.object_id = ps.object_id
+WHERE ps.index_id IN (0, 1)
+GROUP BY ps.object_id
+"""
+
+# sys.dm_db_partition_stats requiere VIEW DATABASE STATE; sys.partitions no
+CONSULTA_CONTEOS_RESPALDO = FILTRO_TABLAS + """
+SELECT p.object_id, SUM(p.rows)
+FROM sys.partitions p
+    JOIN objetivo o ON o.object_id = p.object_id
+WHERE p.index_id IN (0, 1)
+GROUP BY p.object_id
+"""
+
+TABLAS_DEFECTO = ['dbo.Alumno']
 
 
-def validar_estructura_tabla():
+def _nombre_completo(tabla):
     """
-    Obtiene la estructura real de la tabla Alumno
+    Agrega el esquema dbo si el nombre no lo indica: 'Alumno' -> 'dbo.Alumno'.
     """
+    return tabla if '.' in tabla else f"dbo.{tabla}"
+
+
+def _consultar(pool, consulta, filtro):
+    with pool.conexion() as conexion, conexion.cursor() as micursor:
+        micursor.execute(consulta, (filtro, filtro))
+        return micursor.fetchall()
+
+
+def _consultar_conteos(pool, filtro):
     try:
-        # Cargar configuración
-        with open('config.json', 'r') as archivo_config:
-            config = json.load(archivo_config)
-        
-        # Construir cadena de conexión
-        connection_string = f"DRIVER={config['controlador_odbc']};SERVER={config['name_server']};DATABASE={config['database']};UID={config['username']};PWD={config['password']}"
-        
-        conexion = pyodbc.connect(connection_string)
-        cursor = conexion.cursor()
-        
-        print("=" * 80)
-        print("VALIDACIÓN DE ESTRUCTURA - TABLA ALUMNO")
-        print("=" * 80)
-        
-        # Obtener información de columnas
-        query = """
-        SELECT 
-            COLUMN_NAME,
-            DATA_TYPE,
-            CHARACTER_MAXIMUM_LENGTH,
-            IS_NULLABLE,
-            COLUMNPROPERTY(OBJECT_ID('dbo.Alumno'), COLUMN_NAME, 'IsIdentity') AS IsIdentity,
-            COLUMN_DEFAULT
-        FROM INFORMATION_SCHEMA.COLUMNS
-        WHERE TABLE_NAME = 'Alumno' AND TABLE_SCHEMA = 'dbo'
-        ORDER BY ORDINAL_POSITION
-        """
-        
-        cursor.execute(query)
-        columnas = cursor.fetchall()
-        
-        if not columnas:
-            print("\n✗ La tabla Alumno no existe o no tiene columnas")
-            return False
-        
-        print("\n📋 ESTRUCTURA DE LA TABLA ALUMNO:\n")
-        print(f"{'Columna':<20} {'Tipo':<20} {'Tamaño':<10} {'Nullable':<10} {'Identity':<10} {'Default':<20}")
-        print("-" * 100)
-        
-        for col in columnas:
-            columna_nombre = col[0]
-            tipo_dato = col[1]
-            tamaño = str(col[2]) if col[2] else "N/A"
-            es_nullable = "SI" if col[3] == "YES" else "NO"
-            es_identity = "SI" if col[4] == 1 else "NO"
-            default = col[5] if col[5] else "N/A"
-            
-            print(f"{columna_nombre:<20} {tipo_dato:<20} {tamaño:<10} {es_nullable:<10} {es_identity:<10} {default:<20}")
-        
-        # Obtener restricciones
-        print("\n" + "-" * 80)
-        print("🔑 RESTRICCIONES Y CLAVES:\n")
-        
-        pk_query = """
-        SELECT CONSTRAINT_NAME, COLUMN_NAME
-        FROM INFORMATION_SCHEMA.KEY_COLUMN_USAGE
-        WHERE TABLE_NAME = 'Alumno' AND TABLE_SCHEMA = 'dbo'
-        """
-        
-        cursor.execute(pk_query)
-        restricciones = cursor.fetchall()
-        
-        if restricciones:
-            for constraint in restricciones:
-                print(f"✓ {constraint[0]}: {constraint[1]}")
-        else:
-            print("Sin restricciones definidas")
-        
-        # Obtener índices
-        print("\n" + "-" * 80)
-        print("📑 ÍNDICES:\n")
-        
-        index_query = """
-        SELECT 
-            i.name AS IndexName,
-            STUFF((SELECT ', ' + c.name
-                   FROM sys.index_columns ic
-                   JOIN sys.columns c ON ic.object_id = c.object_id AND ic.column_id = c.column_id
-                   WHERE ic.object_id = i.object_id AND ic.index_id = i.index_id
-                   FOR XML PATH('')), 1, 2, '') AS Columnas,
-            CASE WHEN i.is_primary_key = 1 THEN 'Primary Key'
-                 WHEN i.is_unique = 1 THEN 'Unique'
-                 ELSE 'Index' END AS Tipo
-        FROM sys.indexes i
-        WHERE i.object_id = OBJECT_ID('dbo.Alumno')
-        AND i.index_id > 0
-        """
-        
-        cursor.execute(index_query)
-        indices = cursor.fetchall()
-        
-        if indices:
-            for idx in indices:
-                print(f"✓ {idx[0]}: {idx[2]} en columnas ({idx[1]})")
-        else:
-            print("Sin índices definidos")
-        
-        # Obtener cantidad de registros
-        print("\n" + "-" * 80)
-        print("📊 INFORMACIÓN ADICIONAL:\n")
-        
-        cursor.execute("SELECT COUNT(*) FROM dbo.Alumno")
-        count = cursor.fetchone()[0]
-        print(f"Total de registros: {count}")
-        
-        # Obtener primeros registros como ejemplo
+        return _consultar(pool, CONSULTA_CONTEOS, filtro)
+    except pyodbc.ProgrammingError:
+        # Sin permiso VIEW DATABASE STATE: mismo dato desde sys.partitions
+        return _consultar(pool, CONSULTA_CONTEOS_RESPALDO, filtro)
+
+
+def _agrupar_por_tabla(filas):
+    """
+    Agrupa las filas de una consulta de catálogo por object_id (primera columna).
+    """
+    grupos = {}
+    for fila in filas:
+        grupos.setdefault(fila[0], []).append(tuple(fila[1:]))
+    return grupos
+
+
+def _leer_ejemplos(pool, esquema, tabla, cantidad):
+    """
+    Devuelve (columnas, filas) con los primeros registros de la tabla.
+    Los nombres vienen del catálogo y se delimitan con corchetes.
+    """
+    nombre = f"[{esquema.replace(']', ']]')}].[{tabla.replace(']', ']]')}]"
+    with pool.conexion() as conexion, conexion.cursor() as micursor:
+        micursor.execute(f"SELECT TOP (?) * FROM {nombre}", (cantidad,))
+        filas = micursor.fetchall()
+        return [desc[0] for desc in micursor.description], filas
+
+
+def leer_estructura(pool, tablas=None, hilos=4, ejemplos=3):
+    """
+    Lee la estructura de las tablas indicadas (None = todas las tablas de usuario).
+    Las cinco consultas de catálogo y la lectura de ejemplos de cada tabla se
+    ejecutan en paralelo, cada una con su propia conexión del pool.
+    Devuelve la lista de tablas: diccionarios con esquema, nombre, columnas,
+    restricciones, indices, registros y ejemplos.
+    """
+    filtro = json.dumps([_nombre_completo(tabla) for tabla in tablas]) if tablas else None
+
+    with ThreadPoolExecutor(max_workers=hilos) as ejecutor:
+        futuro_tablas = ejecutor.submit(_consultar, pool, CONSULTA_TABLAS, filtro)
+        futuro_columnas = ejecutor.submit(_consultar, pool, CONSULTA_COLUMNAS, filtro)
+        futuro_restricciones = ejecutor.submit(_consultar, pool, CONSULTA_RESTRICCIONES, filtro)
+        futuro_indices = ejecutor.submit(_consultar, pool, CONSULTA_INDICES, filtro)
+        futuro_conteos = ejecutor.submit(_consultar_conteos, pool, filtro)
+
+        encontradas = futuro_tablas.result()
+        futuros_ejemplos = {}
+        if ejemplos > 0:
+            futuros_ejemplos = {
+                object_id: ejecutor.submit(_leer_ejemplos, pool, esquema, nombre, ejemplos)
+                for object_id, esquema, nombre in encontradas}
+
+        columnas = _agrupar_por_tabla(futuro_columnas.result())
+        restricciones = _agrupar_por_tabla(futuro_restricciones.result())
+        indices = _agrupar_por_tabla(futuro_indices.result())
+        conteos = {object_id: int(total or 0) for object_id, total in futuro_conteos.result()}
+
+        return [{
+            'esquema': esquema,
+            'nombre': nombre,
+            'columnas': columnas.get(object_id, []),
+            'restricciones': restricciones.get(object_id, []),
+            'indices': indices.get(object_id, []),
+            'registros': conteos.get(object_id, 0),
+            'ejemplos': futuros_ejemplos[object_id].result() if object_id in futuros_ejemplos else None,
+        } for object_id, esquema, nombre in encontradas]
+
+
+def mostrar_tabla(tabla):
+    """
+    Muestra columnas, restricciones, índices, cantidad de registros y ejemplos de una tabla.
+    """
+    nombre = f"{tabla['esquema']}.{tabla['nombre']}"
+
+    print("=" * 80)
+    print(f"VALIDACIÓN DE ESTRUCTURA - TABLA {nombre.upper()}")
+    print("=" * 80)
+
+    print(f"\n📋 ESTRUCTURA DE LA TABLA {tabla['nombre'].upper()}:\n")
+    print(f"{'Columna':<20} {'Tipo':<20} {'Tamaño':<10} {'Nullable':<10} {'Identity':<10} {'Default':<20}")
+    print("-" * 100)
+
+    for col in tabla['columnas']:
+        columna_nombre = col[0]
+        tipo_dato = col[1]
+        tamaño = str(col[2]) if col[2] else "N/A"
+        es_nullable = "SI" if col[3] else "NO"
+        es_identity = "SI" if col[4] else "NO"
+        default = col[5] if col[5] else "N/A"
+
+        print(f"{columna_nombre:<20} {tipo_dato:<20} {tamaño:<10} {es_nullable:<10} {es_identity:<10} {default:<20}")
+
+    # Restricciones
+    print("\n" + "-" * 80)
+    print("🔑 RESTRICCIONES Y CLAVES:\n")
+
+    if tabla['restricciones']:
+        for constraint in tabla['restricciones']:
+            print(f"✓ {constraint[0]}: {constraint[1]}")
+    else:
+        print("Sin restricciones definidas")
+
+    # Índices
+    print("\n" + "-" * 80)
+    print("📑 ÍNDICES:\n")
+
+    if tabla['indices']:
+        for idx in tabla['indices']:
+            print(f"✓ {idx[0]}: {idx[2]} en columnas ({idx[1]})")
+    else:
+        print("Sin índices definidos")
+
+    print("\n" + "-" * 80)
+    print("📊 INFORMACIÓN ADICIONAL:\n")
+    print(f"Total de registros: {tabla['registros']}")
+
+    if tabla['ejemplos'] is not None:
         print("\n" + "-" * 80)
         print("📝 EJEMPLO DE REGISTROS:\n")
-        
-        cursor.execute("SELECT TOP 3 * FROM dbo.Alumno")
-        ejemplos = cursor.fetchall()
-        
+
+        encabezados, ejemplos = tabla['ejemplos']
         if ejemplos:
             # Mostrar encabezados
-            for desc in cursor.description:
-                print(f"  {desc[0]}", end=" | ")
+            for encabezado in encabezados:
+                print(f"  {encabezado}", end=" | ")
             print("\n" + "-" * 100)
-            
+
             # Mostrar datos
             for row in ejemplos:
                 for value in row:
@@ -137,24 +268,74 @@ def validar_estructura_tabla():
                 print()
         else:
             print("No hay registros para mostrar")
-        
-        print("\n" + "=" * 80)
-        print("✅ VALIDACIÓN COMPLETADA")
+    print()
+
+
+def validar_estructura_tabla(tablas=None, todas=False, hilos=4, ejemplos=3, resumen=False):
+    """
+    Obtiene la estructura real de las tablas indicadas (por defecto dbo.Alumno,
+    o la lista validar_tablas de config.json). Con todas=True valida todas las
+    tablas de la base. Devuelve True si todas las tablas pedidas existen.
+    """
+    try:
+        # Cargar configuración (config.json + variables de entorno DB_*)
+        config = cargar_configuracion()
+        if not todas:
+            tablas = tablas or config.get('validar_tablas') or TABLAS_DEFECTO
+
+        # Pool pequeño: una conexión por consulta en paralelo
+        pool = PoolConexiones(construir_connection_string(config), tamano_minimo=1, tamano_maximo=hilos)
+        inicio = time.perf_counter()
+        try:
+            estructura = leer_estructura(pool, None if todas else tablas, hilos=hilos,
+                                         ejemplos=0 if resumen else ejemplos)
+        finally:
+            pool.cerrar()
+        segundos = time.perf_counter() - inicio
+
+        if not resumen:
+            for tabla in estructura:
+                mostrar_tabla(tabla)
+
+        encontradas = {f"{tabla['esquema']}.{tabla['nombre']}".lower() for tabla in estructura}
+        faltantes = [] if todas else [tabla for tabla in tablas
+                                      if _nombre_completo(tabla).lower() not in encontradas]
+        for tabla in faltantes:
+            print(f"\n✗ La tabla {_nombre_completo(tabla)} no existe o no tiene columnas")
+
+        if not estructura:
+            return False
+
         print("=" * 80)
-        
+        print("✅ VALIDACIÓN COMPLETADA" if not faltantes else "⚠ VALIDACIÓN COMPLETADA CON TABLAS FALTANTES")
+        print("=" * 80)
+
         # Mostrar resumen
         print("\n📌 RESUMEN:")
-        print(f"   Tabla: dbo.Alumno")
-        print(f"   Columnas: {len(columnas)}")
-        print(f"   Registros: {count}")
-        
-        conexion.close()
-        return True
-        
+        print(f"   {'Tabla':<40} {'Columnas':>8} {'Índices':>8} {'Registros':>12}")
+        for tabla in estructura:
+            nombre = f"{tabla['esquema']}.{tabla['nombre']}"
+            print(f"   {nombre:<40} {len(tabla['columnas']):>8} {len(tabla['indices']):>8} {tabla['registros']:>12}")
+        print(f"\n   Tablas validadas: {len(estructura)} en {segundos:.2f} s ({hilos} conexiones en paralelo)")
+
+        return not faltantes
+
     except Exception as e:
         print(f"\n❌ Error: {e}")
         return False
 
 
 if __name__ == "__main__":
-    validar_estructura_tabla()
+    parser = argparse.ArgumentParser(description="Validación de la estructura de tablas de CatequesisDB")
+    parser.add_argument('--tablas', nargs='+', metavar='TABLA',
+                        help="Tablas a validar, p. ej. dbo.Alumno (por defecto validar_tablas de config.json o dbo.Alumno)")
+    parser.add_argument('--todas', action='store_true', help="Validar todas las tablas de la base")
+    parser.add_argument('--hilos', type=int, default=4, help="Conexiones y consultas en paralelo (por defecto 4)")
+    parser.add_argument('--ejemplos', type=int, default=3, help="Registros de ejemplo por tabla (0 = ninguno)")
+    parser.add_argument('--resumen', action='store_true', help="Mostrar solo el resumen por tabla")
+    argumentos = parser.parse_args()
+
+    ok = validar_estructura_tabla(argumentos.tablas, todas=argumentos.todas, hilos=max(1, argumentos.hilos),
+                                  ejemplos=argumentos.ejemplos, resumen=argumentos.resumen)
+    # Código de salida distinto de cero si falta alguna tabla o no se pudo validar (útil en CI)
+    sys.exit(0 if ok else 1)
@@ -11,11 +11,41 @@ Clase GestorAlumnosConSP que encapsula todas las operaciones CRUD
 utilizando Store Procedures en SQL Server - Base de datos CatequesisDB
 """
 
-import pyodbc
+import time
+
+# Antes de los demás imports: el tiempo de arranque incluye pyodbc y los módulos del proyecto
+INICIO_PROCESO = time.perf_counter()
+
 import json
 import sys
+import threading
+import uuid
+from contextlib import contextmanager
 from datetime import datetime
 
+import pyodbc
+
+from cache_alumnos import CacheLRU
+from cargador_lotes import CargadorPorLotes
+from carga_masiva import (ActualizadorMasivoAlumnos, CargadorMasivoAlumnos, TAMANO_LOTE_DEFECTO,
+                          leer_registros, mostrar_resumen)
+from configuracion import (cargar_configuracion, construir_connection_string,
+                           construir_connection_string_lectura, crear_pool, crear_reintentos,
+                           reportar_arranque)
+from exportacion import (TAMANO_LOTE_EXPORTACION, TAMANO_PAGINA_EXPORTACION, agrupar_en_lotes,
+                         exportar_lotes, mostrar_resumen_exportacion)
+from huella_esquema import ARCHIVO_HUELLA_DEFECTO, HuellaEsquema
+from indice_trigramas import MARCA_INICIAL, IndiceTrigramas, normalizar_texto
+from modelos import Alumno, crear_lote_alumnos
+from metricas import ConexionInstrumentada, RegistroMetricas, medir_operacion
+from perfil_servidor import ConexionPerfilada, PerfiladorServidor
+from presentacion import Columna, Paginador
+from pool_conexiones import ErrorPoolAgotado
+from purga_alumnos import PurgadorAlumnos, TAMANO_LOTE_PURGA, mostrar_resumen_purga
+from registro_sentencias import RegistroSentencias
+from reintentos import con_reintentos, ejecutar_con_reintentos, es_error_conexion, es_error_transitorio
+from replica_local import TAMANO_LOTE_REPLICA, ReplicaLocal, mostrar_resumen_sincronizacion, pedir_cambios
+
 
 class GestorAlumnosConSP:
     """
@@ -23,367 +53,1281 @@ class GestorAlumnosConSP:
     Implementa encapsulamiento de la conexión y operaciones de base de datos.
     
     Atributos:
-        conexion: Conexión activa a SQL Server
+        pool: Pool de conexiones compartido del que se toma una conexión por operación
+        pool_lectura: Pool de solo lectura (ApplicationIntent=ReadOnly) para listados,
+                      consultas por ID, búsquedas y estadísticas (None si no hay réplica)
+        lectura_ventana: Segundos tras una escritura en que las lecturas van al principal
+        politica_reintentos: Reintentos con espera exponencial ante fallas transitorias
+        interruptor: Interruptor de circuito que corta las operaciones si el servidor no responde
+        metricas: Registro de latencias, round trips y filas por procedimiento y método
+        perfilador: Perfil de lecturas y CPU en el servidor y log de consultas lentas
+        cache_alumnos: Caché LRU/TTL de registros leídos con sp_ObtenerAlumnoPorID
+        indice_nombres: Índice de trigramas sobre nombre y apellido para las búsquedas
+        replica: Réplica local en SQLite para las lecturas (None si está deshabilitada)
+        forzar_servidor: Si es True todas las lecturas van a SQL Server aunque haya réplica
+        esquema: Huella del esquema con los metadatos de los que salen los mapas de posición
+        pos_listado, pos_alumno, pos_busqueda, pos_estadisticas: Posición de cada columna
+            en los resultados de los Store Procedures de lectura
         connection_string: Cadena de conexión formada desde config.json
     """
     
+    # Registros por página al listar y por cada fetchmany
+    TAMANO_PAGINA = 500
+    TAMANO_LOTE_FETCH = 100
+    
+    # IDs enviados por llamada a sp_ObtenerAlumnosPorIDs
+    TAMANO_BLOQUE_IDS = 1000
+    
     def __init__(self):
         """
         Inicializa la conexión desde el archivo config.json
         Carga las credenciales de SQL Server y establece la conexión
         """
         try:
-            with open('config.json', 'r') as archivo_config:
-                config = json.load(archivo_config)
+            config = cargar_configuracion()
+            self.connection_string = construir_connection_string(config)
+            
+            # Métricas de latencia (deshabilitadas por defecto: las conexiones no se envuelven)
+            self.metricas = RegistroMetricas(habilitado=config.get('metricas_habilitadas', False))
+            self.metricas_archivo = config.get('metricas_archivo')
+            
+            # Perfil del servidor con SET STATISTICS IO/TIME (deshabilitado por defecto)
+            self.perfilador = PerfiladorServidor(
+                habilitado=config.get('perfil_habilitado', False),
+                archivo_lentas=config.get('perfil_archivo', 'consultas_lentas.jsonl'),
+                umbral_ms=config.get('perfil_umbral_ms', 100.0),
+                umbral_lecturas=config.get('perfil_umbral_lecturas'))
+            
+            envoltorio = None
+            if self.metricas.habilitado or self.perfilador.habilitado:
+                envoltorio = self._envolver_conexion
+            
+            # Store Procedures llamados con {CALL} y cursores reutilizados por conexión
+            self.sentencias = RegistroSentencias(habilitado=config.get('sentencias_preparadas', True))
             
-            name_server = config['name_server']
-            database = config['database']
-            username = config['username']
-            password = config['password']
-            controlador_odbc = config['controlador_odbc']
+            # Crear el pool sin bloquear: las conexiones se abren en segundo plano
+            self.pool = crear_pool(config, envoltorio=envoltorio, **self.sentencias.opciones_pool())
             
-            # Construir cadena de conexión
-            self.connection_string = f'DRIVER={controlador_odbc};SERVER={name_server};DATABASE={database};UID={username};PWD={password}'
+            # Réplica de solo lectura en el servidor (deshabilitada si no se configura):
+            # las lecturas van a ella salvo durante la ventana posterior a una escritura
+            self.pool_lectura = None
+            connection_string_lectura = construir_connection_string_lectura(config)
+            if connection_string_lectura:
+                self.pool_lectura = crear_pool(config, connection_string_lectura, envoltorio=envoltorio,
+                                               **self.sentencias.opciones_pool())
+            self.lectura_ventana = config.get('lectura_ventana_escritura', 5.0)
+            self.lectura_suspension = config.get('lectura_suspension', 30.0)
+            self._ultima_escritura = float('-inf')
+            self._lectura_suspendida_hasta = 0.0
+            self._candado_lecturas = threading.Lock()
+            self._lecturas = {'replica': 0, 'principal': 0, 'tras_escritura': 0, 'fallos_replica': 0}
             
-            # Establecer conexión
-            self.conexion = pyodbc.connect(self.connection_string)
-            print("\n✓ Conexión exitosa a SQL Server - CatequesisDB")
+            # Reintentos con backoff para lecturas e interruptor de circuito para todas las operaciones
+            self.politica_reintentos, self.interruptor = crear_reintentos(config)
+            
+            # Caché de alumnos consultados por ID
+            self.cache_alumnos = CacheLRU(
+                capacidad=config.get('cache_capacidad', 1000),
+                ttl=config.get('cache_ttl', 60.0))
+            
+            # Consultas por ID agrupadas: los pedidos que llegan dentro de la ventana
+            # se resuelven con una sola llamada a sp_ObtenerAlumnosPorIDs
+            self.cargador_alumnos = CargadorPorLotes(
+                self._cargar_alumnos,
+                ventana=config.get('lotes_ventana_ms', 2.0) / 1000.0,
+                tamano_maximo=self.TAMANO_BLOQUE_IDS)
+            
+            # Índice de trigramas para búsquedas por nombre (se construye en la primera búsqueda)
+            self.indice_nombres = IndiceTrigramas()
+            self.indice_vigencia = config.get('indice_vigencia', 600.0)
+            self._indice_construido_en = 0.0
+            
+            # Presentación paginada (por defecto, páginas del alto de la terminal)
+            self.presentacion_tamano_pagina = config.get('presentacion_tamano_pagina')
+            self.presentacion_ancho_automatico = config.get('presentacion_ancho_automatico', True)
+            
+            # Mapas de posición desde la huella guardada; la verificación contra el
+            # servidor (una consulta a sys.objects) corre en segundo plano y su
+            # resultado se informa desde el menú, no desde el hilo
+            self.esquema = HuellaEsquema(config.get('huella_archivo', ARCHIVO_HUELLA_DEFECTO))
+            self._actualizar_posiciones()
+            self._verificacion_esquema = self.esquema.verificar_en_segundo_plano(self.pool)
+            
+            # Réplica local en SQLite (deshabilitada si no se indica replica_archivo)
+            self.replica = None
+            self.forzar_servidor = False
+            if config.get('replica_archivo'):
+                self.replica = ReplicaLocal(
+                    config['replica_archivo'], self.pool,
+                    vigencia=config.get('replica_vigencia', 30.0),
+                    tamano_lote=config.get('replica_tamano_lote', TAMANO_LOTE_REPLICA),
+                    politica_reintentos=self.politica_reintentos, interruptor=self.interruptor,
+                    sentencias=self.sentencias)
+            print("\n✓ Configuración cargada - conectando a SQL Server (CatequesisDB) en segundo plano")
             
         except FileNotFoundError:
             print("✗ Error: No se encontró el archivo config.json")
             sys.exit(1)
-        except pyodbc.DatabaseError as e:
-            print(f"✗ Error de conexión a SQL Server: {e}")
+        except json.JSONDecodeError:
+            print("✗ Error: config.json tiene formato inválido")
+            sys.exit(1)
+        except KeyError as e:
+            print(f"✗ Error: Falta la clave {e} en config.json")
             sys.exit(1)
         except Exception as e:
             print(f"✗ Error inesperado: {e}")
             sys.exit(1)
     
+    def _envolver_conexion(self, conexion):
+        """
+        Envuelve la conexión prestada por el pool con el perfil del servidor y las métricas.
+        El perfil va por dentro para que las métricas vean la sentencia sin el prefijo SET.
+        """
+        if self.perfilador.habilitado:
+            conexion = ConexionPerfilada(conexion, self.perfilador)
+        if self.metricas.habilitado:
+            conexion = ConexionInstrumentada(conexion, self.metricas)
+        return conexion
+    
+    def _actualizar_posiciones(self):
+        """
+        Arma los mapas de posición de columnas con los metadatos de la huella del esquema.
+        """
+        self.pos_listado = self.esquema.posiciones('sp_ObtenerAlumnosPaginado')
+        self.pos_alumno = self.esquema.posiciones('sp_ObtenerAlumnoPorID')
+        self.pos_busqueda = self.esquema.posiciones('sp_ObtenerAlumnosPorIDs')
+        self.pos_estadisticas = self.esquema.posiciones('sp_EstadisticasAlumnos')
+    
+    def _revisar_esquema(self):
+        """
+        Se llama desde el menú antes de mostrarlo. Cuando la verificación en segundo
+        plano terminó, informa su resultado una sola vez: así los avisos no se
+        imprimen en medio de un input(). Solo hay trabajo si la huella cambió o falló.
+        """
+        hilo = self._verificacion_esquema
+        if hilo is None or hilo.is_alive():
+            return
+        self._verificacion_esquema = None
+        
+        if self.esquema.estado == 'error':
+            print(f"\nℹ No se pudo verificar el esquema ({self.esquema.error}); se usan los metadatos guardados")
+        elif self.esquema.estado == 'actualizada':
+            self._actualizar_posiciones()
+            for problema in self.esquema.problemas:
+                print(f"\n✗ Esquema: {problema} (ejecute 03-validar_estructura_alumno.py)")
+    
+    def _leer_de_replica(self, forzar_servidor=False):
+        """
+        Indica si la lectura puede responderse desde la réplica local.
+        """
+        return self.replica is not None and not (forzar_servidor or self.forzar_servidor)
+    
+    def _registrar_escritura(self):
+        """
+        Tras una escritura propia la réplica local se sincroniza en la siguiente
+        lectura y, durante lectura_ventana segundos, las lecturas van al servidor
+        principal para leer lo recién escrito aunque la réplica de lectura atrase.
+        """
+        self._ultima_escritura = time.monotonic()
+        if self.replica is not None:
+            self.replica.marcar_desactualizada()
+    
+    # ==================== RUTEO DE LECTURAS ====================
+    def _pool_para_lectura(self):
+        """
+        Elige el pool de una lectura: el de solo lectura salvo que no exista, que
+        haya una escritura reciente o que esté suspendido por un fallo de conexión.
+        """
+        ahora = time.monotonic()
+        with self._candado_lecturas:
+            if self.pool_lectura is None:
+                self._lecturas['principal'] += 1
+                return self.pool
+            if ahora - self._ultima_escritura < self.lectura_ventana:
+                self._lecturas['tras_escritura'] += 1
+                return self.pool
+            if ahora < self._lectura_suspendida_hasta:
+                self._lecturas['principal'] += 1
+                return self.pool
+            self._lecturas['replica'] += 1
+            return self.pool_lectura
+    
+    @contextmanager
+    def _conexion_lectura(self):
+        """
+        Conexión para un Store Procedure de lectura. Si la réplica de lectura no
+        responde, se suspende lectura_suspension segundos: el reintento de la
+        operación ya va al servidor principal.
+        """
+        pool = self._pool_para_lectura()
+        try:
+            with pool.conexion() as conexion:
+                yield conexion
+        except (pyodbc.Error, ErrorPoolAgotado) as e:
+            if pool is self.pool_lectura and (isinstance(e, ErrorPoolAgotado) or es_error_conexion(e)):
+                with self._candado_lecturas:
+                    self._lecturas['fallos_replica'] += 1
+                    self._lectura_suspendida_hasta = time.monotonic() + self.lectura_suspension
+                print(f"\n✗ Réplica de lectura no disponible, se lee del principal por "
+                      f"{self.lectura_suspension:.0f} s: {e}")
+            raise
+    
     # ==================== OPERACIÓN C (CREATE) ====================
+    @medir_operacion
+    def insertar(self, nombre, apellido, fecha_nacimiento=None, lugar_nacimiento=None,
+                 direccion=None, telefono_alumno=None, info_escolar=None, info_salud=None,
+                 clave_idempotencia=None):
+        """
+        Ejecuta sp_InsertarAlumno y devuelve su fila de resultado
+        ('SUCCESS', id_alumno) o ('ERROR', detalle).
+        La llamada lleva una clave de idempotencia (generada si no se indica),
+        por lo que se reintenta ante fallas transitorias sin duplicar al alumno.
+        """
+        clave_idempotencia = clave_idempotencia or str(uuid.uuid4())
+        
+        def ejecutar():
+            with self.pool.conexion() as conexion:
+                micursor = self.sentencias.ejecutar(conexion, 'sp_InsertarAlumno',
+                    (nombre, apellido, fecha_nacimiento, lugar_nacimiento, 
+                     direccion, telefono_alumno, info_escolar, info_salud, clave_idempotencia))
+                
+                return micursor.fetchone()
+        
+        resultado = ejecutar_con_reintentos(ejecutar, self.politica_reintentos, self.interruptor)
+        
+        if resultado and resultado[0] == 'SUCCESS':
+            self._registrar_escritura()
+            # Descartar cualquier entrada previa con el mismo ID (p. ej. tras un reseed)
+            self.cache_alumnos.invalidar(int(resultado[1]))
+            if self.indice_nombres.construido:
+                self.indice_nombres.agregar(int(resultado[1]), nombre, apellido)
+        return resultado
+    
     def insertar_alumno(self):
         """
         Inserta un nuevo alumno utilizando sp_InsertarAlumno.
         Solicita los datos al usuario a través de inputs.
         """
         try:
-            with self.conexion.cursor() as micursor:
-                
-                print("\n--- CREAR NUEVO ALUMNO ---")
-                
-                # Solicitar datos obligatorios
-                nombre = input("Ingrese Nombre del Alumno: ").strip()
-                apellido = input("Ingrese Apellido del Alumno: ").strip()
-                
-                # Validación básica
-                if not nombre or not apellido:
-                    print("✗ Error: Nombre y Apellido son obligatorios")
+            print("\n--- CREAR NUEVO ALUMNO ---")
+            
+            # Solicitar datos obligatorios
+            nombre = input("Ingrese Nombre del Alumno: ").strip()
+            apellido = input("Ingrese Apellido del Alumno: ").strip()
+            
+            # Validación básica
+            if not nombre or not apellido:
+                print("✗ Error: Nombre y Apellido son obligatorios")
+                return
+            
+            # Solicitar datos opcionales
+            fecha_nacimiento_str = input("Ingrese Fecha de Nacimiento (YYYY-MM-DD) o dejar en blanco: ").strip()
+            fecha_nacimiento = None
+            if fecha_nacimiento_str:
+                try:
+                    fecha_nacimiento = datetime.strptime(fecha_nacimiento_str, '%Y-%m-%d').date()
+                except ValueError:
+                    print("✗ Error: Formato de fecha inválido. Use YYYY-MM-DD")
                     return
-                
-                # Solicitar datos opcionales
-                fecha_nacimiento_str = input("Ingrese Fecha de Nacimiento (YYYY-MM-DD) o dejar en blanco: ").strip()
-                fecha_nacimiento = None
-                if fecha_nacimiento_str:
-                    try:
-                        fecha_nacimiento = datetime.strptime(fecha_nacimiento_str, '%Y-%m-%d').date()
-                    except ValueError:
-                        print("✗ Error: Formato de fecha inválido. Use YYYY-MM-DD")
-                        return
-                
-                lugar_nacimiento = input("Ingrese Lugar de Nacimiento o dejar en blanco: ").strip() or None
-                direccion = input("Ingrese Dirección o dejar en blanco: ").strip() or None
-                telefono_alumno = input("Ingrese Teléfono o dejar en blanco: ").strip() or None
-                info_escolar = input("Ingrese Información Escolar o dejar en blanco: ").strip() or None
-                info_salud = input("Ingrese Información de Salud o dejar en blanco: ").strip() or None
-                
-                # Ejecutar Store Procedure
-                SQL = """
-                EXEC sp_InsertarAlumno 
-                    @Nombre = ?,
-                    @Apellido = ?,
-                    @FechaNacimiento = ?,
-                    @LugarNacimiento = ?,
-                    @Direccion = ?,
-                    @TelefonoAlumno = ?,
-                    @InfoEscolar = ?,
-                    @InfoSalud = ?
-                """
-                
-                micursor.execute(SQL, 
-                    (nombre, apellido, fecha_nacimiento, lugar_nacimiento, 
-                     direccion, telefono_alumno, info_escolar, info_salud))
-                
-                resultado = micursor.fetchone()
-                
-                if resultado and resultado[0] == 'SUCCESS':
-                    print(f"✓ Alumno registrado exitosamente con ID: {resultado[1]}")
-                else:
-                    print(f"✗ Error: {resultado[1] if resultado else 'Error desconocido'}")
-                
+            
+            lugar_nacimiento = input("Ingrese Lugar de Nacimiento o dejar en blanco: ").strip() or None
+            direccion = input("Ingrese Dirección o dejar en blanco: ").strip() or None
+            telefono_alumno = input("Ingrese Teléfono o dejar en blanco: ").strip() or None
+            info_escolar = input("Ingrese Información Escolar o dejar en blanco: ").strip() or None
+            info_salud = input("Ingrese Información de Salud o dejar en blanco: ").strip() or None
+            
+            # Ejecutar Store Procedure
+            resultado = self.insertar(nombre, apellido, fecha_nacimiento, lugar_nacimiento,
+                                      direccion, telefono_alumno, info_escolar, info_salud)
+            
+            if resultado and resultado[0] == 'SUCCESS':
+                print(f"✓ Alumno registrado exitosamente con ID: {resultado[1]}")
+            else:
+                print(f"✗ Error: {resultado[1] if resultado else 'Error desconocido'}")
+            
         except Exception as e:
             print(f"✗ Error al insertar alumno: {e}")
     
     # ==================== OPERACIÓN R (READ) ====================
-    def consultar_alumnos(self):
+    def iterar_alumnos(self, tamano_pagina=None, tamano_lote=None, desde_id=0):
         """
-        Consulta todos los alumnos utilizando sp_ObtenerAlumnos.
-        Formatea la salida en columnas para mejor legibilidad.
+        Generador que recorre todos los alumnos página por página
+        utilizando sp_ObtenerAlumnosPaginado (paginación keyset sobre id_alumno).
+        
+        Cada página se lee con fetchmany, por lo que la memoria usada es
+        constante y el primer registro llega sin esperar a la tabla completa.
+        
+        Args:
+            tamano_pagina: Registros pedidos al servidor por llamada
+            tamano_lote: Registros traídos por cada fetchmany dentro de la página
+            desde_id: Solo se recorren los alumnos con id_alumno mayor a este valor
         """
-        try:
-            with self.conexion.cursor() as micursor:
-                
-                # Ejecutar Store Procedure
-                micursor.execute("EXEC sp_ObtenerAlumnos")
-                registros = micursor.fetchall()
-                
-                if not registros:
-                    print("\n✗ No hay alumnos registrados en la base de datos")
-                    return
-                
-                # Mostrar encabezados
-                print("\n--- LISTADO DE ALUMNOS ---")
-                print(f"{'ID':<5} {'Nombre':<15} {'Apellido':<15} {'F. Nac.':<12} {'Teléfono':<15} {'Lugar':<20}")
-                print("-" * 100)
-                
-                # Mostrar registros
-                for registro in registros:
-                    id_alumno = registro[0]
-                    nombre = registro[1]
-                    apellido = registro[2]
-                    fecha_nac = str(registro[3]) if registro[3] else "N/A"
-                    telefono = registro[6] if registro[6] else "N/A"
-                    lugar = registro[4] if registro[4] else "N/A"
+        tamano_pagina = tamano_pagina or self.TAMANO_PAGINA
+        tamano_lote = tamano_lote or min(tamano_pagina, self.TAMANO_LOTE_FETCH)
+        ultimo_id = desde_id
+        intento = 0
+        
+        while True:
+            leidos = 0
+            self.interruptor.permitir()
+            try:
+                with self._conexion_lectura() as conexion:
+                    micursor = self.sentencias.ejecutar(conexion, 'sp_ObtenerAlumnosPaginado',
+                                                        (ultimo_id, tamano_pagina))
                     
-                    print(f"{id_alumno:<5} {nombre:<15} {apellido:<15} {fecha_nac:<12} {telefono:<15} {lugar:<20}")
-                
-                print(f"\nTotal de alumnos: {len(registros)}\n")
+                    while True:
+                        lote = micursor.fetchmany(tamano_lote)
+                        if not lote:
+                            break
+                        for registro in lote:
+                            yield registro
+                        leidos += len(lote)
+                        ultimo_id = lote[-1][self.pos_listado.id_alumno]
+            except pyodbc.Error as e:
+                # Con keyset la página se retoma desde el último ID entregado, sin duplicados
+                if not es_error_transitorio(e):
+                    self.interruptor.registrar_exito()
+                    raise
+                self.interruptor.registrar_fallo()
+                if intento >= self.politica_reintentos.intentos:
+                    raise
+                self.interruptor.registrar_reintento()
+                time.sleep(self.politica_reintentos.espera(intento))
+                intento += 1
+                continue
+            except BaseException:
+                self.interruptor.liberar_prueba()
+                raise
+            
+            self.interruptor.registrar_exito()
+            intento = 0
+            
+            # Una página incompleta indica que no quedan más registros
+            if leidos < tamano_pagina:
+                return
+    
+    def iterar_alumnos_por_paginas(self, tamano_pagina):
+        """
+        Igual que iterar_alumnos, pero cada página se lee completa (fetchall)
+        antes de entregar sus registros: la conexión vuelve al pool mientras
+        el usuario mira la página en pantalla.
+        """
+        def leer_pagina(ultimo_id):
+            with self._conexion_lectura() as conexion:
+                return self.sentencias.ejecutar(conexion, 'sp_ObtenerAlumnosPaginado',
+                                                (ultimo_id, tamano_pagina)).fetchall()
+        
+        ultimo_id = 0
+        while True:
+            pagina = ejecutar_con_reintentos(lambda: leer_pagina(ultimo_id),
+                                             self.politica_reintentos, self.interruptor)
+            yield from pagina
+            if len(pagina) < tamano_pagina:
+                return
+            ultimo_id = pagina[-1][self.pos_listado.id_alumno]
+    
+    def _crear_paginador(self, columnas, titulo):
+        """
+        Paginador con la configuración de presentación del gestor.
+        """
+        return Paginador(columnas, titulo=titulo, tamano_pagina=self.presentacion_tamano_pagina,
+                         ancho_automatico=self.presentacion_ancho_automatico)
+    
+    @medir_operacion
+    def listar_alumnos(self, paginador, forzar_servidor=False):
+        """
+        Muestra todos los alumnos con el paginador utilizando sp_ObtenerAlumnosPaginado
+        (o la réplica local si está habilitada) y devuelve cuántos se leyeron.
+        En una terminal solo pide al servidor las páginas que se visitan;
+        redirigida, escribe todo por bloques. Los errores se propagan.
+        """
+        # Una página del servidor por página en pantalla. Las páginas que el
+        # paginador guarda para volver atrás son de Alumno y no de filas
+        if self._leer_de_replica(forzar_servidor):
+            registros = Alumno.desde_filas(self.replica.iterar(paginador.tamano_pagina))
+        elif paginador.interactivo:
+            registros = Alumno.desde_filas(self.iterar_alumnos_por_paginas(paginador.tamano_pagina),
+                                           self.pos_listado)
+        else:
+            registros = Alumno.desde_filas(self.iterar_alumnos(), self.pos_listado)
+        
+        return paginador.ejecutar(registros)
+    
+    def consultar_alumnos(self, forzar_servidor=False):
+        """
+        Muestra el listado de alumnos (ver listar_alumnos) y el total al terminar.
+        """
+        try:
+            pos = Alumno.POS
+            paginador = self._crear_paginador([
+                Columna('ID', pos.id_alumno, 5),
+                Columna('Nombre', pos.nombre, 15),
+                Columna('Apellido', pos.apellido, 15),
+                Columna('F. Nac.', pos.fecha_nacimiento, 12),
+                Columna('Teléfono', pos.telefono_alumno, 15),
+                Columna('Lugar', pos.lugar_nacimiento, 20),
+            ], "--- LISTADO DE ALUMNOS ---")
+            
+            total = self.listar_alumnos(paginador, forzar_servidor)
+            
+            if total == 0:
+                print("\n✗ No hay alumnos registrados en la base de datos")
+                return
+            
+            if paginador.completo:
+                print(f"\nTotal de alumnos: {total}\n")
                 
         except Exception as e:
             print(f"✗ Error al consultar alumnos: {e}")
     
+    @medir_operacion
+    def obtener_alumno(self, id_alumno, forzar_servidor=False):
+        """
+        Devuelve el Alumno con ese ID o None si no existe.
+        Con réplica local se lee de ella; si no, a través de la caché: solo
+        consulta al servidor cuando el alumno no está en caché o su entrada expiró,
+        junto con los demás pedidos concurrentes (ver _cargar_alumnos).
+        """
+        if self._leer_de_replica(forzar_servidor):
+            registro = self.replica.obtener(id_alumno)
+            return Alumno(*registro) if registro is not None else None
+        return self._obtener_alumno_servidor(id_alumno)
+    
+    @medir_operacion
+    def leer_alumnos_columnar(self, forzar_servidor=False):
+        """
+        Lee todos los alumnos en un LoteColumnar: una lista por columna, id_alumno
+        en un array y los valores repetidos (nombres, fechas, lugares) internados.
+        Para quien necesite el resultado completo en memoria; recorrer el lote
+        devuelve Alumno. Los listados en pantalla no lo usan porque leen por páginas.
+        """
+        lote = crear_lote_alumnos()
+        if self._leer_de_replica(forzar_servidor):
+            lote.extender(self.replica.iterar())
+        else:
+            lote.extender(self.iterar_alumnos(), self.pos_listado)
+        lote.compactar()
+        return lote
+    
+    def _obtener_alumno_servidor(self, id_alumno):
+        registro = self.cache_alumnos.obtener(id_alumno)
+        if registro is not None:
+            return registro
+        return self.cargador_alumnos.obtener(id_alumno)
+    
+    @con_reintentos()
+    def obtener_alumno_principal(self, id_alumno):
+        """
+        Lee el alumno con sp_ObtenerAlumnoPorID en el servidor principal, sin
+        caché ni réplica de lectura (que pueden estar atrasadas): su version_fila
+        sirve como versión esperada de la escritura siguiente. Devuelve el Alumno
+        (que también queda en caché) o None si no existe.
+        """
+        with self.pool.conexion() as conexion:
+            fila = self.sentencias.ejecutar(conexion, 'sp_ObtenerAlumnoPorID', (id_alumno,)).fetchone()
+        
+        if fila is None:
+            self.cache_alumnos.invalidar(id_alumno)
+            return None
+        alumno = Alumno.desde_fila(fila, self.pos_alumno)
+        self.cache_alumnos.guardar(id_alumno, alumno)
+        return alumno
+    
+    @con_reintentos()
+    def _cargar_alumnos(self, ids):
+        """
+        Función de lote del cargador: un solo ID se consulta con sp_ObtenerAlumnoPorID
+        y varios con sp_ObtenerAlumnosPorIDs, cada uno con su mapa de posiciones.
+        Guarda en caché los alumnos encontrados y devuelve {id_alumno: Alumno}.
+        """
+        with self._conexion_lectura() as conexion:
+            if len(ids) == 1:
+                micursor = self.sentencias.ejecutar(conexion, 'sp_ObtenerAlumnoPorID', (ids[0],))
+                posiciones = self.pos_alumno
+            else:
+                micursor = self.sentencias.ejecutar(conexion, 'sp_ObtenerAlumnosPorIDs', (json.dumps(ids),))
+                posiciones = self.pos_busqueda
+            registros = micursor.fetchall()
+        
+        encontrados = {}
+        for alumno in Alumno.desde_filas(registros, posiciones):
+            encontrados[alumno.id_alumno] = alumno
+            self.cache_alumnos.guardar(alumno.id_alumno, alumno)
+        return encontrados
+    
+    @medir_operacion
+    def obtener_alumnos(self, ids, forzar_servidor=False):
+        """
+        Devuelve los Alumno indicados en el orden pedido, sin
+        repetidos ni los que no existen. Los que no están en caché se piden
+        juntos al cargador por lotes: N IDs cuestan un round trip por cada
+        TAMANO_BLOQUE_IDS y no N llamadas a sp_ObtenerAlumnoPorID.
+        """
+        ids = list(dict.fromkeys(ids))
+        if self._leer_de_replica(forzar_servidor):
+            encontrados = {}
+            for id_alumno in ids:
+                registro = self.replica.obtener(id_alumno)
+                encontrados[id_alumno] = Alumno(*registro) if registro is not None else None
+        else:
+            encontrados = {}
+            faltantes = []
+            for id_alumno in ids:
+                registro = self.cache_alumnos.obtener(id_alumno)
+                if registro is None:
+                    faltantes.append(id_alumno)
+                else:
+                    encontrados[id_alumno] = registro
+            if faltantes:
+                encontrados.update(self.cargador_alumnos.obtener_varios(faltantes))
+        
+        return [encontrados[id_alumno] for id_alumno in ids if encontrados.get(id_alumno) is not None]
+    
     def consultar_alumno_por_id(self):
         """
-        Consulta un alumno específico por ID utilizando sp_ObtenerAlumnoPorID.
+        Consulta uno o varios alumnos por ID (separados por coma). Todos los IDs
+        se resuelven en una sola llamada al servidor.
         """
         try:
-            with self.conexion.cursor() as micursor:
-                
-                try:
-                    id_alumno = int(input("\nIngrese ID del Alumno: "))
-                except ValueError:
-                    print("✗ Error: El ID debe ser un número")
-                    return
-                
-                # Ejecutar Store Procedure
-                micursor.execute("EXEC sp_ObtenerAlumnoPorID @IdAlumno = ?", (id_alumno,))
-                registro = micursor.fetchone()
-                
-                if not registro:
+            try:
+                ids = [int(valor) for valor in input("\nIngrese ID del Alumno (o varios separados por coma): ").split(',')
+                       if valor.strip()]
+            except ValueError:
+                print("✗ Error: El ID debe ser un número")
+                return
+            
+            if not ids:
+                print("✗ Error: Debe ingresar al menos un ID")
+                return
+            
+            registros = self.obtener_alumnos(ids)
+            
+            encontrados = {alumno.id_alumno for alumno in registros}
+            for id_alumno in dict.fromkeys(ids):
+                if id_alumno not in encontrados:
                     print(f"✗ No se encontró alumno con ID {id_alumno}")
-                    return
-                
-                # Mostrar datos del alumno
-                print(f"\n--- DATOS DEL ALUMNO ---")
-                print(f"ID:                    {registro[0]}")
-                print(f"Nombre:                {registro[1]}")
-                print(f"Apellido:              {registro[2]}")
-                print(f"Fecha de Nacimiento:   {registro[3] if registro[3] else 'N/A'}")
-                print(f"Lugar de Nacimiento:   {registro[4] if registro[4] else 'N/A'}")
-                print(f"Dirección:             {registro[5] if registro[5] else 'N/A'}")
-                print(f"Teléfono:              {registro[6] if registro[6] else 'N/A'}")
-                print(f"Información Escolar:   {registro[7] if registro[7] else 'N/A'}")
-                print(f"Información de Salud:  {registro[8] if registro[8] else 'N/A'}")
-                print()
+            
+            for registro in registros:
+                self._mostrar_alumno(registro)
                 
         except Exception as e:
             print(f"✗ Error al consultar alumno: {e}")
     
+    def _mostrar_alumno(self, alumno):
+        """
+        Muestra todos los datos de un alumno.
+        """
+        # Mostrar datos del alumno
+        print(f"\n--- DATOS DEL ALUMNO ---")
+        print(f"ID:                    {alumno.id_alumno}")
+        print(f"Nombre:                {alumno.nombre}")
+        print(f"Apellido:              {alumno.apellido}")
+        print(f"Fecha de Nacimiento:   {alumno.fecha_nacimiento or 'N/A'}")
+        print(f"Lugar de Nacimiento:   {alumno.lugar_nacimiento or 'N/A'}")
+        print(f"Dirección:             {alumno.direccion or 'N/A'}")
+        print(f"Teléfono:              {alumno.telefono_alumno or 'N/A'}")
+        print(f"Información Escolar:   {alumno.info_escolar or 'N/A'}")
+        print(f"Información de Salud:  {alumno.info_salud or 'N/A'}")
+        print()
+    
+    def _cambios_alumnos(self, marca):
+        """
+        Generador de bloques (nueva_marca, alumnos, ids_eliminados) de
+        sp_ObtenerCambiosAlumnos desde la marca de agua hasta la versión actual.
+        Se lee del servidor principal: una réplica atrasada no debe adelantar la marca.
+        """
+        while True:
+            nueva_marca, hay_mas, alumnos, eliminados = ejecutar_con_reintentos(
+                lambda: pedir_cambios(self.pool, self.sentencias, marca, TAMANO_LOTE_REPLICA),
+                self.politica_reintentos, self.interruptor)
+            yield nueva_marca, alumnos, eliminados
+            marca = nueva_marca
+            if not hay_mas:
+                return
+    
+    def _asegurar_indice_nombres(self):
+        """
+        Construye el índice de trigramas la primera vez (o al vencer su vigencia)
+        y, en las demás llamadas, aplica las altas, cambios y bajas posteriores a
+        su marca de agua, incluidos los hechos por otros usuarios.
+        """
+        vencido = time.monotonic() - self._indice_construido_en >= self.indice_vigencia
+        
+        if not self.indice_nombres.construido or vencido:
+            self.indice_nombres.reconstruir(self._cambios_alumnos(MARCA_INICIAL))
+            self._indice_construido_en = time.monotonic()
+            return
+        
+        for nueva_marca, alumnos, eliminados in self._cambios_alumnos(self.indice_nombres.marca):
+            self.indice_nombres.aplicar_cambios(nueva_marca, alumnos, eliminados)
+    
+    @medir_operacion
+    def buscar_alumnos(self, termino, forzar_servidor=False):
+        """
+        Busca alumnos cuyo nombre o apellido contengan el término, sin distinguir
+        mayúsculas ni tildes. Con réplica local la búsqueda es local; si no, los
+        IDs candidatos se resuelven en el índice de trigramas y esas filas se
+        piden con obtener_alumnos (caché y cargador por lotes).
+        Devuelve los Alumno ordenados por nombre y apellido.
+        """
+        if self._leer_de_replica(forzar_servidor):
+            return list(Alumno.desde_filas(self.replica.buscar(termino)))
+        
+        self._asegurar_indice_nombres()
+        ids = self.indice_nombres.buscar(termino)
+        if not ids:
+            return []
+        
+        registros = self.obtener_alumnos(ids, forzar_servidor=True)
+        
+        # Los IDs que ya no existen en el servidor se retiran del índice y los
+        # alumnos renombrados después del último refresco se reindexan y descartan
+        encontrados = {alumno.id_alumno for alumno in registros}
+        for id_alumno in set(ids) - encontrados:
+            self.indice_nombres.eliminar(id_alumno)
+        
+        termino_normalizado = normalizar_texto(termino)
+        vigentes = []
+        for alumno in registros:
+            if (termino_normalizado in normalizar_texto(alumno.nombre)
+                    or termino_normalizado in normalizar_texto(alumno.apellido)):
+                vigentes.append(alumno)
+            else:
+                self.indice_nombres.agregar(alumno.id_alumno, alumno.nombre, alumno.apellido)
+        registros = vigentes
+        
+        registros.sort(key=lambda alumno: (normalizar_texto(alumno.nombre), normalizar_texto(alumno.apellido)))
+        return registros
+    
     def buscar_alumnos_por_nombre(self):
         """
-        Busca alumnos por nombre utilizando sp_BuscarAlumnosPorNombre.
+        Busca alumnos por nombre o apellido utilizando el índice de trigramas
+        y sp_ObtenerAlumnosPorIDs.
         """
         try:
-            with self.conexion.cursor() as micursor:
-                
-                nombre_busqueda = input("\nIngrese nombre o apellido a buscar: ").strip()
-                
-                if not nombre_busqueda:
-                    print("✗ Error: Debe ingresar un término de búsqueda")
-                    return
-                
-                # Ejecutar Store Procedure
-                micursor.execute("EXEC sp_BuscarAlumnosPorNombre @NombreBusqueda = ?", (nombre_busqueda,))
-                registros = micursor.fetchall()
-                
-                if not registros:
-                    print(f"\n✗ No se encontraron alumnos con '{nombre_busqueda}'")
-                    return
-                
-                # Mostrar resultados
-                print(f"\n--- RESULTADOS DE BÚSQUEDA: '{nombre_busqueda}' ---")
-                print(f"{'ID':<5} {'Nombre':<15} {'Apellido':<15} {'F. Nac.':<12} {'Teléfono':<15}")
-                print("-" * 70)
-                
-                for registro in registros:
-                    id_alumno = registro[0]
-                    nombre = registro[1]
-                    apellido = registro[2]
-                    fecha_nac = str(registro[3]) if registro[3] else "N/A"
-                    telefono = registro[6] if registro[6] else "N/A"
-                    
-                    print(f"{id_alumno:<5} {nombre:<15} {apellido:<15} {fecha_nac:<12} {telefono:<15}")
-                
-                print(f"\nTotal encontrado: {len(registros)}\n")
+            nombre_busqueda = input("\nIngrese nombre o apellido a buscar: ").strip()
+            
+            if not nombre_busqueda:
+                print("✗ Error: Debe ingresar un término de búsqueda")
+                return
+            
+            registros = self.buscar_alumnos(nombre_busqueda)
+            
+            if not registros:
+                print(f"\n✗ No se encontraron alumnos con '{nombre_busqueda}'")
+                return
+            
+            # Mostrar resultados
+            pos = Alumno.POS
+            paginador = self._crear_paginador([
+                Columna('ID', pos.id_alumno, 5),
+                Columna('Nombre', pos.nombre, 15),
+                Columna('Apellido', pos.apellido, 15),
+                Columna('F. Nac.', pos.fecha_nacimiento, 12),
+                Columna('Teléfono', pos.telefono_alumno, 15),
+            ], f"--- RESULTADOS DE BÚSQUEDA: '{nombre_busqueda}' ---")
+            paginador.ejecutar(registros)
+            
+            print(f"\nTotal encontrado: {len(registros)}\n")
                 
         except Exception as e:
             print(f"✗ Error al buscar alumnos: {e}")
     
     # ==================== OPERACIÓN U (UPDATE) ====================
+    @staticmethod
+    def _leer_imagenes(micursor):
+        """
+        Lee el segundo conjunto de resultados de sp_ActualizarAlumno / sp_EliminarAlumno
+        y devuelve un diccionario {'ANTES': fila, 'DESPUES': fila} con las imágenes
+        de la fila (sin la columna Imagen).
+        """
+        imagenes = {}
+        if micursor.nextset():
+            for fila in micursor.fetchall():
+                imagenes[fila[0]] = tuple(fila[1:])
+        return imagenes
+    
+    @medir_operacion
+    @con_reintentos(idempotente=False)
+    def actualizar(self, id_alumno, nombre=None, apellido=None, fecha_nacimiento=None,
+                   lugar_nacimiento=None, direccion=None, telefono_alumno=None,
+                   info_escolar=None, info_salud=None, version_esperada=None):
+        """
+        Ejecuta sp_ActualizarAlumno en un solo round trip. Los campos en None no cambian.
+        Devuelve (resultado, imagenes): resultado es ('SUCCESS' | 'CONFLICT' | 'ERROR', detalle)
+        e imagenes el diccionario {'ANTES': fila, 'DESPUES': fila} cuando hubo éxito.
+        Refresca la caché y el índice de nombres con la imagen nueva.
+        """
+        imagenes = {}
+        try:
+            with self.pool.conexion() as conexion:
+                micursor = self.sentencias.ejecutar(conexion, 'sp_ActualizarAlumno',
+                    (id_alumno, nombre, apellido, fecha_nacimiento, lugar_nacimiento,
+                     direccion, telefono_alumno, info_escolar, info_salud, version_esperada))
+                
+                resultado = micursor.fetchone()
+                if resultado and resultado[0] == 'SUCCESS':
+                    imagenes = self._leer_imagenes(micursor)
+        finally:
+            # Sin imagen nueva, la entrada en caché ya no es confiable
+            if 'DESPUES' not in imagenes:
+                self.cache_alumnos.invalidar(id_alumno)
+        
+        despues = imagenes.get('DESPUES')
+        if despues is not None:
+            self._registrar_escritura()
+            # Refrescar caché e índice con la imagen devuelta por el servidor
+            self.cache_alumnos.guardar(id_alumno, Alumno(*despues))
+            if self.indice_nombres.construido:
+                self.indice_nombres.agregar(id_alumno, despues[1], despues[2])
+        
+        return resultado, imagenes
+    
+    @medir_operacion
+    def actualizar_alumnos_lote(self, cambios, tamano_lote=None):
+        """
+        Aplica actualizaciones parciales en lote con sp_ActualizarAlumnosLote:
+        un round trip y una transacción por cada tamano_lote cambios.
+        Cada cambio es un diccionario con id_alumno, las columnas a modificar
+        y opcionalmente version_esperada; las filas se numeran desde 1.
+        Devuelve el resumen de ActualizadorMasivoAlumnos.actualizar con el
+        resultado de cada fila (SUCCESS, NOT_FOUND o CONFLICT).
+        """
+        return self._aplicar_actualizaciones(enumerate(cambios, start=1), tamano_lote)
+    
+    def _aplicar_actualizaciones(self, cambios_numerados, tamano_lote=None):
+        """
+        Ejecuta la actualización en lote sobre pares (numero_fila, cambio)
+        y mantiene la caché y el índice de nombres con los resultados.
+        """
+        actualizador = ActualizadorMasivoAlumnos(self.pool, tamano_lote=tamano_lote or TAMANO_LOTE_DEFECTO,
+                                                 sentencias=self.sentencias)
+        resultado = actualizador.actualizar(cambios_numerados)
+        self._registrar_escritura()
+        
+        for _, id_alumno, estado, nombre, apellido, _ in resultado['resultados']:
+            self.cache_alumnos.invalidar(id_alumno)
+            if estado == 'SUCCESS' and self.indice_nombres.construido:
+                self.indice_nombres.agregar(id_alumno, nombre, apellido)
+            elif estado == 'NOT_FOUND':
+                self.indice_nombres.eliminar(id_alumno)
+        
+        return resultado
+    
     def actualizar_alumno(self):
         """
         Actualiza los datos de un alumno utilizando sp_ActualizarAlumno.
+        Antes de pedir los datos se lee el alumno en el servidor principal y su
+        version_fila se envía como versión esperada: si otro usuario lo modifica
+        mientras tanto, sp_ActualizarAlumno responde CONFLICT.
         """
         try:
-            with self.conexion.cursor() as micursor:
-                
-                print("\n--- ACTUALIZAR ALUMNO ---")
-                
+            print("\n--- ACTUALIZAR ALUMNO ---")
+            
+            try:
+                id_alumno = int(input("Ingrese ID del Alumno a actualizar: "))
+            except ValueError:
+                print("✗ Error: El ID debe ser un número")
+                return
+            
+            alumno = self.obtener_alumno_principal(id_alumno)
+            if alumno is None:
+                print(f"✗ No se encontró alumno con ID {id_alumno}")
+                return
+            
+            print(f"\nAlumno encontrado: {alumno.nombre} {alumno.apellido}")
+            print("\nIngrese los datos a actualizar (dejar en blanco para no cambiar):")
+            
+            # Solicitar datos
+            nombre = input("Nuevo Nombre: ").strip() or None
+            apellido = input("Nuevo Apellido: ").strip() or None
+            
+            fecha_nac_str = input("Nueva Fecha de Nacimiento (YYYY-MM-DD): ").strip()
+            fecha_nac = None
+            if fecha_nac_str:
                 try:
-                    id_alumno = int(input("Ingrese ID del Alumno a actualizar: "))
+                    fecha_nac = datetime.strptime(fecha_nac_str, '%Y-%m-%d').date()
                 except ValueError:
-                    print("✗ Error: El ID debe ser un número")
-                    return
-                
-                # Verificar si el alumno existe
-                micursor.execute("EXEC sp_ObtenerAlumnoPorID @IdAlumno = ?", (id_alumno,))
-                alumno = micursor.fetchone()
-                
-                if not alumno:
-                    print(f"✗ No se encontró alumno con ID {id_alumno}")
+                    print("✗ Error: Formato de fecha inválido")
                     return
-                
-                print(f"\nAlumno encontrado: {alumno[1]} {alumno[2]}")
-                print("\nIngrese los datos a actualizar (dejar en blanco para no cambiar):")
-                
-                # Solicitar datos
-                nombre = input("Nuevo Nombre: ").strip() or None
-                apellido = input("Nuevo Apellido: ").strip() or None
-                
-                fecha_nac_str = input("Nueva Fecha de Nacimiento (YYYY-MM-DD): ").strip()
-                fecha_nac = None
-                if fecha_nac_str:
-                    try:
-                        fecha_nac = datetime.strptime(fecha_nac_str, '%Y-%m-%d').date()
-                    except ValueError:
-                        print("✗ Error: Formato de fecha inválido")
-                        return
-                
-                lugar = input("Nuevo Lugar de Nacimiento: ").strip() or None
-                direccion = input("Nueva Dirección: ").strip() or None
-                telefono = input("Nuevo Teléfono: ").strip() or None
-                info_escolar = input("Nueva Información Escolar: ").strip() or None
-                info_salud = input("Nueva Información de Salud: ").strip() or None
-                
-                # Ejecutar Store Procedure
-                SQL = """
-                EXEC sp_ActualizarAlumno
-                    @IdAlumno = ?,
-                    @Nombre = ?,
-                    @Apellido = ?,
-                    @FechaNacimiento = ?,
-                    @LugarNacimiento = ?,
-                    @Direccion = ?,
-                    @TelefonoAlumno = ?,
-                    @InfoEscolar = ?,
-                    @InfoSalud = ?
-                """
-                
-                micursor.execute(SQL, 
-                    (id_alumno, nombre, apellido, fecha_nac, lugar,
-                     direccion, telefono, info_escolar, info_salud))
-                
-                resultado = micursor.fetchone()
-                
-                if resultado and resultado[0] == 'SUCCESS':
-                    print(f"✓ {resultado[1]}")
-                else:
-                    print(f"✗ Error: {resultado[1] if resultado else 'Error desconocido'}")
+            
+            lugar = input("Nuevo Lugar de Nacimiento: ").strip() or None
+            direccion = input("Nueva Dirección: ").strip() or None
+            telefono = input("Nuevo Teléfono: ").strip() or None
+            info_escolar = input("Nueva Información Escolar: ").strip() or None
+            info_salud = input("Nueva Información de Salud: ").strip() or None
+            
+            # Ejecutar Store Procedure
+            resultado, _ = self.actualizar(
+                id_alumno, nombre, apellido, fecha_nac, lugar, direccion,
+                telefono, info_escolar, info_salud, version_esperada=alumno.version_fila)
+            
+            if resultado and resultado[0] == 'SUCCESS':
+                print(f"✓ {resultado[1]}")
+            elif resultado and resultado[0] == 'CONFLICT':
+                print(f"✗ Conflicto de concurrencia: {resultado[1]}. Consulte de nuevo el alumno e intente otra vez")
+            else:
+                print(f"✗ Error: {resultado[1] if resultado else 'Error desconocido'}")
                     
         except Exception as e:
             print(f"✗ Error al actualizar alumno: {e}")
     
     # ==================== OPERACIÓN D (DELETE) ====================
-    def eliminar_alumno(self):
+    @medir_operacion
+    @con_reintentos(idempotente=False)
+    def eliminar(self, id_alumno, version_esperada=None):
         """
-        Elimina un alumno utilizando sp_EliminarAlumno.
-        Solicita confirmación del usuario.
+        Ejecuta sp_EliminarAlumno en un solo round trip.
+        Devuelve (resultado, imagenes) igual que actualizar(); la imagen 'ANTES'
+        contiene la fila eliminada.
         """
+        imagenes = {}
         try:
-            with self.conexion.cursor() as micursor:
-                
-                print("\n--- ELIMINAR ALUMNO ---")
-                
-                try:
-                    id_alumno = int(input("Ingrese ID del Alumno a eliminar: "))
-                except ValueError:
-                    print("✗ Error: El ID debe ser un número")
-                    return
-                
-                # Verificar si el alumno existe
-                micursor.execute("EXEC sp_ObtenerAlumnoPorID @IdAlumno = ?", (id_alumno,))
-                alumno = micursor.fetchone()
-                
-                if not alumno:
-                    print(f"✗ No se encontró alumno con ID {id_alumno}")
-                    return
-                
-                # Confirmar eliminación
-                confirmacion = input(f"¿Está seguro que desea eliminar a {alumno[1]} {alumno[2]}? (s/n): ").lower()
-                
-                if confirmacion != 's':
-                    print("Operación cancelada")
-                    return
-                
-                # Ejecutar Store Procedure
-                micursor.execute("EXEC sp_EliminarAlumno @IdAlumno = ?", (id_alumno,))
+            with self.pool.conexion() as conexion:
+                micursor = self.sentencias.ejecutar(conexion, 'sp_EliminarAlumno',
+                                                    (id_alumno, version_esperada))
                 resultado = micursor.fetchone()
-                
                 if resultado and resultado[0] == 'SUCCESS':
-                    print(f"✓ {resultado[1]}")
-                else:
-                    print(f"✗ Error: {resultado[1] if resultado else 'Error desconocido'}")
+                    imagenes = self._leer_imagenes(micursor)
+        finally:
+            self.cache_alumnos.invalidar(id_alumno)
+        
+        if resultado and resultado[0] == 'SUCCESS':
+            self.indice_nombres.eliminar(id_alumno)
+            self._registrar_escritura()
+        return resultado, imagenes
+    
+    def eliminar_alumno(self):
+        """
+        Elimina un alumno utilizando sp_EliminarAlumno.
+        Lee el alumno en el servidor principal, solicita confirmación del usuario
+        y envía su version_fila como versión esperada: si otro usuario lo
+        modifica mientras tanto, sp_EliminarAlumno responde CONFLICT.
+        """
+        try:
+            print("\n--- ELIMINAR ALUMNO ---")
+            
+            try:
+                id_alumno = int(input("Ingrese ID del Alumno a eliminar: "))
+            except ValueError:
+                print("✗ Error: El ID debe ser un número")
+                return
+            
+            alumno = self.obtener_alumno_principal(id_alumno)
+            if alumno is None:
+                print(f"✗ No se encontró alumno con ID {id_alumno}")
+                return
+            
+            print(f"\nAlumno encontrado: {alumno.nombre} {alumno.apellido}")
+            
+            # Confirmar eliminación
+            confirmacion = input(f"¿Está seguro que desea eliminar a {alumno.nombre} {alumno.apellido}? (s/n): ").lower()
+            
+            if confirmacion != 's':
+                print("Operación cancelada")
+                return
+            
+            # Ejecutar Store Procedure
+            resultado, _ = self.eliminar(id_alumno, version_esperada=alumno.version_fila)
+            
+            if resultado and resultado[0] == 'SUCCESS':
+                print(f"✓ {resultado[1]}")
+            elif resultado and resultado[0] == 'CONFLICT':
+                print(f"✗ Conflicto de concurrencia: {resultado[1]}. Consulte de nuevo el alumno e intente otra vez")
+            else:
+                print(f"✗ Error: {resultado[1] if resultado else 'Error desconocido'}")
                     
         except Exception as e:
             print(f"✗ Error al eliminar alumno: {e}")
     
     # ==================== ESTADÍSTICAS ====================
+    @medir_operacion
+    def obtener_estadisticas(self, forzar_servidor=False):
+        """
+        Devuelve la fila de sp_EstadisticasAlumnos (o calculada en la réplica
+        local si está habilitada) o None si no hay datos.
+        """
+        if self._leer_de_replica(forzar_servidor):
+            return self.replica.estadisticas_alumnos()
+        return self._obtener_estadisticas_servidor()
+    
+    @con_reintentos()
+    def _obtener_estadisticas_servidor(self):
+        with self._conexion_lectura() as conexion:
+            return self.sentencias.ejecutar(conexion, 'sp_EstadisticasAlumnos').fetchone()
+    
     def mostrar_estadisticas(self):
         """
         Muestra estadísticas de la tabla Alumno utilizando sp_EstadisticasAlumnos.
         """
         try:
-            with self.conexion.cursor() as micursor:
-                
-                # Ejecutar Store Procedure
-                micursor.execute("EXEC sp_EstadisticasAlumnos")
-                stats = micursor.fetchone()
-                
-                if not stats:
-                    print("\n✗ No hay datos para mostrar")
-                    return
+            # Ejecutar Store Procedure
+            stats = self.obtener_estadisticas()
+            
+            if not stats:
+                print("\n✗ No hay datos para mostrar")
+                return
+            
+            # Mostrar estadísticas
+            print("\n--- ESTADÍSTICAS DE ALUMNOS ---")
+            pos = self.pos_estadisticas
+            print(f"Total de Alumnos:                  {stats[pos.TotalAlumnos]}")
+            print(f"Años de Nacimiento Diferentes:     {stats[pos.AniosNacimientoDiferentes]}")
+            print(f"Alumno más Viejo:                  {stats[pos.AlumnoMasViejo] or 'N/A'}")
+            print(f"Alumno más Joven:                  {stats[pos.AlumnoMasJoven] or 'N/A'}")
+            print(f"Lugares de Nacimiento Diferentes:  {stats[pos.LugaresNacimientoDiferentes]}")
+            print(f"Alumnos con Teléfono:              {stats[pos.AlumnosConTelefono]}")
+            print(f"Alumnos con Información Escolar:   {stats[pos.AlumnosConInfoEscolar]}")
+            print(f"Alumnos con Información de Salud:  {stats[pos.AlumnosConInfoSalud]}\n")
+            
+        except Exception as e:
+            print(f"✗ Error al obtener estadísticas: {e}")
+    
+    def verificar_estadisticas(self):
+        """
+        Compara las estadísticas incrementales (sp_EstadisticasAlumnos) con un
+        recálculo completo (sp_EstadisticasAlumnosCompleto) y muestra las diferencias.
+        Si hay diferencias ofrece reconstruir las tablas resumen.
+        """
+        etiquetas = (
+            "Total de Alumnos", "Años de Nacimiento Diferentes", "Alumno más Viejo",
+            "Alumno más Joven", "Lugares de Nacimiento Diferentes", "Alumnos con Teléfono",
+            "Alumnos con Información Escolar", "Alumnos con Información de Salud",
+        )
+        
+        try:
+            with self.pool.conexion() as conexion:
+                incrementales = self.sentencias.ejecutar(conexion, 'sp_EstadisticasAlumnos').fetchone()
+                completas = self.sentencias.ejecutar(conexion, 'sp_EstadisticasAlumnosCompleto').fetchone()
+            
+            if not incrementales:
+                print("\n✗ La tabla AlumnoResumen está vacía: ejecute 03-estadisticas_alumno.sql")
+                return
+            
+            print("\n--- VERIFICACIÓN DE ESTADÍSTICAS INCREMENTALES ---")
+            print(f"{'Métrica':<35} {'Resumen':<12} {'Recalculado':<12} {'Estado':<6}")
+            print("-" * 70)
+            
+            diferencias = 0
+            for etiqueta, valor_resumen, valor_completo in zip(etiquetas, incrementales, completas):
+                coincide = valor_resumen == valor_completo
+                diferencias += 0 if coincide else 1
+                print(f"{etiqueta:<35} {str(valor_resumen):<12} {str(valor_completo):<12} {'✓' if coincide else '✗':<6}")
+            
+            if diferencias == 0:
+                print("\n✓ Las estadísticas incrementales coinciden con el recálculo completo\n")
+                return
+            
+            print(f"\n✗ Se encontraron {diferencias} diferencia(s)")
+            if input("¿Desea recalcular las tablas resumen? (s/n): ").lower() != 's':
+                return
+            
+            with self.pool.conexion() as conexion:
+                resultado = self.sentencias.ejecutar(conexion, 'sp_RecalcularEstadisticasAlumnos').fetchone()
+            
+            if resultado and resultado[0] == 'SUCCESS':
+                print(f"✓ {resultado[1]}")
+            else:
+                print(f"✗ Error: {resultado[1] if resultado else 'Error desconocido'}")
                 
-                # Mostrar estadísticas
-                print("\n--- ESTADÍSTICAS DE ALUMNOS ---")
-                print(f"Total de Alumnos:                  {stats[0]}")
-                print(f"Años de Nacimiento Diferentes:     {stats[1]}")
-                print(f"Alumno más Viejo:                  {stats[2] if stats[2] else 'N/A'}")
-                print(f"Alumno más Joven:                  {stats[3] if stats[3] else 'N/A'}")
-                print(f"Lugares de Nacimiento Diferentes:  {stats[4]}")
-                print(f"Alumnos con Teléfono:              {stats[5]}")
-                print(f"Alumnos con Información Escolar:   {stats[6]}")
-                print(f"Alumnos con Información de Salud:  {stats[7]}\n")
+        except Exception as e:
+            print(f"✗ Error al verificar estadísticas: {e}")
+    
+    # ==================== HERRAMIENTAS ====================
+    def importar_alumnos(self):
+        """
+        Importa alumnos desde un archivo CSV o JSONL utilizando sp_InsertarAlumnosLote.
+        Cada lote se envía en un solo round trip y se confirma en su propia transacción.
+        """
+        try:
+            print("\n--- IMPORTAR ALUMNOS DESDE ARCHIVO ---")
+            ruta = input("Ruta del archivo (.csv o .jsonl): ").strip()
+            
+            if not ruta:
+                print("✗ Error: Debe ingresar la ruta del archivo")
+                return
+            
+            tamano_str = input(f"Tamaño de lote (Enter para {TAMANO_LOTE_DEFECTO}): ").strip()
+            try:
+                tamano_lote = int(tamano_str) if tamano_str else TAMANO_LOTE_DEFECTO
+            except ValueError:
+                print("✗ Error: El tamaño de lote debe ser un número")
+                return
+            
+            cargador = CargadorMasivoAlumnos(self.pool, tamano_lote=tamano_lote, sentencias=self.sentencias)
+            try:
+                resultado = cargador.cargar(ruta)
+            finally:
+                self._registrar_escritura()
+            mostrar_resumen(resultado)
+            
+        except FileNotFoundError:
+            print(f"✗ Error: No se encontró el archivo {ruta}")
+        except Exception as e:
+            print(f"✗ Error al importar alumnos: {e}")
+    
+    def actualizar_alumnos_desde_archivo(self):
+        """
+        Aplica las correcciones de un archivo CSV o JSONL con columna id_alumno
+        usando actualizar_alumnos_lote. Las columnas vacías no se modifican.
+        """
+        try:
+            print("\n--- ACTUALIZAR ALUMNOS EN LOTE ---")
+            print("El archivo debe tener la columna id_alumno y las columnas a corregir")
+            print("(opcionalmente version_esperada en hexadecimal para detectar conflictos)")
+            ruta = input("Ruta del archivo (.csv o .jsonl): ").strip()
+            if not ruta:
+                print("✗ Error: Debe indicar un archivo")
+                return
+            
+            entrada = input(f"Tamaño de lote [{TAMANO_LOTE_DEFECTO}]: ").strip()
+            try:
+                tamano_lote = int(entrada) if entrada else TAMANO_LOTE_DEFECTO
+            except ValueError:
+                print("✗ Error: El tamaño de lote debe ser un número")
+                return
+            
+            # Las filas del resumen corresponden a las líneas del archivo
+            resultado = self._aplicar_actualizaciones(leer_registros(ruta), tamano_lote)
+            
+            print("\n--- RESUMEN DE ACTUALIZACIÓN EN LOTE ---")
+            print(f"Actualizados:         {resultado['actualizados']}")
+            print(f"No encontrados:       {resultado['no_encontrados']}")
+            print(f"Conflictos:           {resultado['conflictos']}")
+            print(f"Registros con error:  {len(resultado['errores'])}")
+            print(f"Tiempo total:         {resultado['segundos']:.2f} s")
+            print(f"Velocidad:            {resultado['filas_por_segundo']:,.0f} filas/s")
+            for fila, id_alumno, estado, _, _, _ in resultado['resultados']:
+                if estado != 'SUCCESS':
+                    print(f"  ✗ Fila {fila} (ID {id_alumno}): {estado}")
+            for fila, mensaje in resultado['errores'][:10]:
+                print(f"  ✗ Fila {fila}: {mensaje}")
+            print()
+            
+        except FileNotFoundError:
+            print(f"✗ Error: No se encontró el archivo {ruta}")
+        except Exception as e:
+            print(f"✗ Error al actualizar alumnos: {e}")
+    
+    def purgar_alumnos(self):
+        """
+        Elimina por bloques los alumnos de un rango de años de nacimiento o de IDs
+        con PurgadorAlumnos. Si se interrumpe, al repetir la misma purga continúa
+        desde el último bloque confirmado.
+        """
+        try:
+            print("\n--- PURGAR ALUMNOS ---")
+            print("\t1. Por rango de años de nacimiento")
+            print("\t2. Por rango de IDs")
+            tipo = input("Seleccione el criterio (1-2): ").strip()
+            
+            if tipo == '1':
+                criterio = {'anio_desde': int(input("Año desde: ")), 'anio_hasta': int(input("Año hasta: "))}
+            elif tipo == '2':
+                criterio = {'id_desde': int(input("ID desde: ")), 'id_hasta': int(input("ID hasta: "))}
+            else:
+                print("✗ Opción no válida")
+                return
+            
+            entrada = input(f"Tamaño de bloque [{TAMANO_LOTE_PURGA}]: ").strip()
+            tamano_lote = int(entrada) if entrada else TAMANO_LOTE_PURGA
+            entrada = input("Pausa entre bloques en segundos [0]: ").strip()
+            pausa = float(entrada) if entrada else 0.0
+            
+            confirmacion = input(f"¿Está seguro que desea eliminar los alumnos que cumplen {criterio}? (s/n): ")
+            if confirmacion.lower() != 's':
+                print("Operación cancelada")
+                return
+            
+            purgador = PurgadorAlumnos(self.pool, tamano_lote=tamano_lote, pausa=pausa,
+                                       politica_reintentos=self.politica_reintentos,
+                                       interruptor=self.interruptor, sentencias=self.sentencias)
+            try:
+                resultado = purgador.purgar(criterio)
+            finally:
+                # Los alumnos eliminados pueden seguir en caché; el índice los retira al buscarlos
+                self.cache_alumnos.limpiar()
+                self._registrar_escritura()
+            mostrar_resumen_purga(resultado)
+            
+        except ValueError as e:
+            print(f"✗ Error: {e}")
+        except KeyboardInterrupt:
+            print("\n✗ Purga interrumpida; repita la misma purga para continuar")
+        except Exception as e:
+            print(f"✗ Error al purgar alumnos: {e}")
+    
+    def exportar_alumnos(self):
+        """
+        Exporta todos los alumnos a CSV, JSONL o Parquet leyendo la tabla en flujo:
+        cada lote se escribe apenas llega, con memoria constante.
+        """
+        try:
+            print("\n--- EXPORTAR ALUMNOS ---")
+            print("Formatos: .csv, .jsonl o .parquet (agregue .gz o .zst para comprimir)")
+            ruta = input("Archivo de salida [alumnos.csv.gz]: ").strip() or 'alumnos.csv.gz'
+            
+            filas = self.iterar_alumnos(tamano_pagina=TAMANO_PAGINA_EXPORTACION,
+                                        tamano_lote=TAMANO_LOTE_EXPORTACION)
+            resultado = exportar_lotes(agrupar_en_lotes(filas, TAMANO_LOTE_EXPORTACION), ruta)
+            mostrar_resumen_exportacion(resultado, ruta)
+            
+        except (ValueError, RuntimeError) as e:
+            print(f"✗ Error: {e}")
+        except Exception as e:
+            print(f"✗ Error al exportar alumnos: {e}")
+    
+    def sincronizar_replica(self):
+        """
+        Muestra el estado de la réplica local y permite sincronizarla o reconstruirla.
+        """
+        if self.replica is None:
+            print("\n✗ La réplica local está deshabilitada (indique \"replica_archivo\" en config.json)")
+            return
+        
+        try:
+            stats = self.replica.estadisticas()
+            antiguedad = 'nunca sincronizada' if stats['antiguedad'] == float('inf') else f"{stats['antiguedad']:.1f} s"
+            print("\n--- RÉPLICA LOCAL ---")
+            print(f"Archivo:                   {self.replica.ruta}")
+            print(f"Alumnos en la réplica:     {stats['alumnos']}")
+            print(f"Marca de agua:             {stats['marca_agua'] or 'N/A'}")
+            print(f"Antigüedad / vigencia:     {antiguedad} / {stats['vigencia']} s ({'vigente' if stats['vigente'] else 'vencida'})")
+            print(f"Lecturas locales:          {stats['lecturas_locales']}")
+            print(f"Sincronizaciones:          {stats['sincronizaciones']}")
+            print(f"Lecturas forzadas al servidor: {'SI' if self.forzar_servidor else 'NO'}")
+            
+            print("\n\t1. Sincronizar ahora")
+            print("\t2. Reconstruir la réplica completa")
+            print("\t3. Alternar lecturas forzadas al servidor")
+            opcion = input("Seleccione una opción (Enter para volver): ").strip()
+            
+            if opcion == '1':
+                mostrar_resumen_sincronizacion(self.replica.sincronizar())
+            elif opcion == '2':
+                self.replica.reiniciar()
+                mostrar_resumen_sincronizacion(self.replica.sincronizar())
+            elif opcion == '3':
+                self.forzar_servidor = not self.forzar_servidor
+                destino = 'SQL Server' if self.forzar_servidor else 'la réplica local'
+                print(f"✓ Las lecturas se harán desde {destino}")
+            
+        except Exception as e:
+            print(f"✗ Error en la réplica local: {e}")
+    
+    def mostrar_estadisticas_pool(self):
+        """
+        Muestra las estadísticas del pool de conexiones.
+        """
+        stats = self.estadisticas_pool()
+        print("\n--- ESTADÍSTICAS DEL POOL DE CONEXIONES ---")
+        print(f"Conexiones abiertas:       {stats['abiertas']} (libres: {stats['libres']}, prestadas: {stats['prestadas']})")
+        print(f"Tamaño mínimo / máximo:    {stats['tamano_minimo']} / {stats['tamano_maximo']}")
+        print(f"Préstamos:                 {stats['prestamos']}")
+        print(f"Préstamos con espera:      {stats['esperas']}")
+        print(f"Tiempo de espera promedio: {stats['tiempo_espera_promedio'] * 1000:.2f} ms")
+        print(f"Tiempo de espera máximo:   {stats['tiempo_espera_maximo'] * 1000:.2f} ms")
+        print(f"Tiempos agotados:          {stats['tiempos_agotados']}")
+        print(f"Desalojos por inactividad: {stats['desalojos_ociosas']}")
+        print(f"Desalojos por ping fallido: {stats['desalojos_invalidas']}")
+        print(f"Conexiones creadas:        {stats['conexiones_creadas']}")
+        
+        sentencias = self.sentencias.estadisticas()
+        print(f"Llamadas a procedimientos: {sentencias['llamadas']}")
+        print(f"Cursores creados / reusos: {sentencias['cursores_creados']} / {sentencias['cursores_reutilizados']}")
+        
+        circuito = self.interruptor.estadisticas()
+        print(f"Estado del circuito:       {circuito['estado']} (fallos seguidos: {circuito['fallos_consecutivos']})")
+        print(f"Reintentos / aperturas:    {circuito['reintentos']} / {circuito['aperturas']}")
+        print(f"Operaciones rechazadas:    {circuito['rechazos']}")
+        
+        lecturas = self.estadisticas_lecturas()
+        if self.pool_lectura is None:
+            print("Réplica de lectura:        no configurada\n")
+        else:
+            stats_lectura = self.pool_lectura.estadisticas()
+            print(f"Lecturas réplica / principal: {lecturas['replica']} / {lecturas['principal']} "
+                  f"(tras escritura: {lecturas['tras_escritura']}, fallos de réplica: {lecturas['fallos_replica']})")
+            print(f"Conexiones de lectura:     {stats_lectura['abiertas']} "
+                  f"(préstamos: {stats_lectura['prestamos']}, esperas: {stats_lectura['esperas']})\n")
+    
+    def mostrar_estadisticas_cache(self):
+        """
+        Muestra los contadores de la caché de alumnos para ajustar su tamaño.
+        """
+        stats = self.cache_alumnos.estadisticas()
+        print("\n--- ESTADÍSTICAS DE LA CACHÉ DE ALUMNOS ---")
+        print(f"Elementos / capacidad:     {stats['tamano']} / {stats['capacidad']}")
+        print(f"TTL:                       {stats['ttl']} s")
+        print(f"Aciertos:                  {stats['aciertos']}")
+        print(f"Fallos:                    {stats['fallos']}")
+        print(f"Tasa de aciertos:          {stats['tasa_aciertos']:.1%}")
+        print(f"Expirados:                 {stats['expirados']}")
+        print(f"Desalojos (LRU):           {stats['desalojos']}")
+        print(f"Invalidaciones:            {stats['invalidaciones']}")
+        
+        lotes = self.cargador_alumnos.estadisticas()
+        print(f"Pedidos por ID al servidor: {lotes['pedidos']} (repetidos: {lotes['repetidos']})")
+        print(f"Lotes enviados:            {lotes['lotes']} ({lotes['claves_por_lote']:.1f} IDs por lote)")
+        print(f"Lotes con error:           {lotes['errores']}\n")
+    
+    def exportar_metricas(self):
+        """
+        Exporta las métricas de latencia en formato Prometheus o como instantánea JSON.
+        """
+        if not self.metricas.habilitado:
+            print("\n✗ Las métricas están deshabilitadas (use \"metricas_habilitadas\": true en config.json)")
+            return
+        
+        try:
+            print("\n--- EXPORTAR MÉTRICAS ---")
+            print("\t1. Texto de exposición Prometheus")
+            print("\t2. Instantánea JSON")
+            formato = input("Seleccione el formato (1-2): ").strip()
+            
+            if formato == '1':
+                ruta = input("Archivo de salida (Enter para mostrar en pantalla): ").strip()
+                texto = self.metricas.exportar_prometheus()
+                if ruta:
+                    with open(ruta, 'w', encoding='utf-8') as archivo:
+                        archivo.write(texto)
+                    print(f"✓ Métricas guardadas en {ruta}")
+                else:
+                    print(texto)
+            elif formato == '2':
+                ruta = input("Archivo de salida [metricas.json]: ").strip() or 'metricas.json'
+                self.metricas.guardar_json(ruta)
+                print(f"✓ Métricas guardadas en {ruta}")
+            else:
+                print("✗ Opción no válida")
                 
         except Exception as e:
-            print(f"✗ Error al obtener estadísticas: {e}")
+            print(f"✗ Error al exportar métricas: {e}")
+    
+    def mostrar_perfil_servidor(self):
+        """
+        Muestra las lecturas lógicas, CPU y tiempo en el servidor acumulados por Store Procedure.
+        """
+        if not self.perfilador.habilitado:
+            print("\n✗ El perfil del servidor está deshabilitado (use \"perfil_habilitado\": true en config.json)")
+            return
+        
+        resumen = self.perfilador.resumen()
+        if not resumen:
+            print("\nℹ Aún no se registraron llamadas")
+            return
+        
+        print("\n--- PERFIL DEL SERVIDOR POR STORE PROCEDURE ---")
+        print(f"{'Procedimiento':<32} {'Llamadas':>8} {'Lentas':>6} {'Lect. lóg.':>11} {'Prom. lect.':>11} {'CPU ms':>8} {'Máx ms':>8}")
+        print("-" * 90)
+        # Los más costosos (por lecturas lógicas) primero
+        for nombre, totales in sorted(resumen.items(), key=lambda par: par[1]['lecturas_logicas'], reverse=True):
+            promedio = totales['lecturas_logicas'] / totales['llamadas']
+            print(f"{nombre:<32} {totales['llamadas']:>8} {totales['lentas']:>6} {totales['lecturas_logicas']:>11} "
+                  f"{promedio:>11.1f} {totales['cpu_ms']:>8} {totales['transcurrido_max_ms']:>8}")
+        print("-" * 90)
+        if self.perfilador.archivo_lentas:
+            print(f"Consultas lentas registradas en: {self.perfilador.archivo_lentas}\n")
     
     # ==================== MENÚ PRINCIPAL ====================
     def ejecutar_menu(self):
@@ -391,10 +1335,12 @@ class GestorAlumnosConSP:
         Menú interactivo CRUD que permite al usuario seleccionar operaciones.
         """
         while True:
+            self._revisar_esquema()
             self._mostrar_menu_principal()
+            reportar_arranque(INICIO_PROCESO)
             
             try:
-                opcion = input("Seleccione una opción (1-8): ").strip()
+                opcion = input("Seleccione una opción (1-9): ").strip()
                 
                 if opcion == '1':
                     self.insertar_alumno()
@@ -411,11 +1357,13 @@ class GestorAlumnosConSP:
                 elif opcion == '7':
                     self.mostrar_estadisticas()
                 elif opcion == '8':
+                    self.ejecutar_menu_herramientas()
+                elif opcion == '9':
                     self.cerrar_conexion()
                     print("Saliendo del programa...\n")
                     break
                 else:
-                    print("✗ Opción no válida. Ingrese un número entre 1 y 8")
+                    print("✗ Opción no válida. Ingrese un número entre 1 y 9")
                     
             except KeyboardInterrupt:
                 print("\n\n✗ Programa interrumpido por el usuario")
@@ -441,15 +1389,91 @@ class GestorAlumnosConSP:
         print("\t5. Actualizar datos del alumno")
         print("\t6. Eliminar alumno")
         print("\t7. Ver estadísticas")
-        print("\t8. Salir")
+        print("\t8. Herramientas de mantenimiento")
+        print("\t9. Salir")
         print("=" * 60)
     
+    def ejecutar_menu_herramientas(self):
+        """
+        Submenú de herramientas de mantenimiento (operaciones masivas y diagnóstico).
+        """
+        while True:
+            self._revisar_esquema()
+            self._mostrar_menu_herramientas()
+            opcion = input("Seleccione una herramienta (0 para volver): ").strip()
+            
+            if opcion == '1':
+                self.importar_alumnos()
+            elif opcion == '2':
+                self.mostrar_estadisticas_pool()
+            elif opcion == '3':
+                self.mostrar_estadisticas_cache()
+            elif opcion == '4':
+                self.verificar_estadisticas()
+            elif opcion == '5':
+                self.exportar_metricas()
+            elif opcion == '6':
+                self.mostrar_perfil_servidor()
+            elif opcion == '7':
+                self.exportar_alumnos()
+            elif opcion == '8':
+                self.actualizar_alumnos_desde_archivo()
+            elif opcion == '9':
+                self.purgar_alumnos()
+            elif opcion == '10':
+                self.sincronizar_replica()
+            elif opcion == '0':
+                break
+            else:
+                print("✗ Opción no válida")
+    
+    @staticmethod
+    def _mostrar_menu_herramientas():
+        """
+        Muestra el submenú de herramientas de mantenimiento.
+        """
+        print("\n" + "-" * 60)
+        print("\t** HERRAMIENTAS DE MANTENIMIENTO **")
+        print("-" * 60)
+        print("\t1. Importar alumnos desde archivo (CSV/JSONL)")
+        print("\t2. Ver estadísticas del pool de conexiones")
+        print("\t3. Ver estadísticas de la caché de alumnos")
+        print("\t4. Verificar estadísticas incrementales")
+        print("\t5. Exportar métricas de latencia (Prometheus/JSON)")
+        print("\t6. Ver perfil del servidor (lecturas/CPU por SP)")
+        print("\t7. Exportar alumnos (CSV/JSONL/Parquet)")
+        print("\t8. Actualizar alumnos en lote desde archivo (CSV/JSONL)")
+        print("\t9. Purgar alumnos por rango de años o de IDs")
+        print("\t10. Réplica local (estado, sincronizar, forzar servidor)")
+        print("\t0. Volver al menú principal")
+        print("-" * 60)
+    
+    def estadisticas_pool(self):
+        """
+        Devuelve las estadísticas del pool de conexiones
+        (préstamos, esperas, desalojos y conexiones abiertas).
+        """
+        return self.pool.estadisticas()
+    
+    def estadisticas_lecturas(self):
+        """
+        Devuelve cuántas lecturas fueron a la réplica de lectura y cuántas al principal.
+        """
+        with self._candado_lecturas:
+            return dict(self._lecturas)
+    
     def cerrar_conexion(self):
         """
-        Cierra la conexión con SQL Server.
+        Cierra las conexiones del pool con SQL Server.
         """
         try:
-            self.conexion.close()
+            if self.metricas.habilitado and self.metricas_archivo:
+                self.metricas.guardar_json(self.metricas_archivo)
+            if self.replica is not None:
+                self.replica.cerrar()
+            if self.pool_lectura is not None:
+                self.pool_lectura.cerrar()
+            self.pool.cerrar()
             print("✓ Conexión cerrada correctamente")
         except Exception as e:
             print(f"✗ Error al cerrar conexión: {e}")
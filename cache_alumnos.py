@@ -0,0 +1,115 @@
+"""
+CACHÉ LRU CON TTL PARA CONSULTAS DE ALUMNOS
+Evita repetir sp_ObtenerAlumnoPorID para los alumnos consultados con frecuencia
+
+@author Arias Javier, Andrade Eduardo, Guevara Galo
+@date 2025
+
+Descripción:
+Clase CacheLRU de tamaño acotado, segura entre hilos, con expiración por
+tiempo (TTL) y desalojo del elemento usado hace más tiempo (LRU). Expone
+contadores de aciertos, fallos, expiraciones y desalojos para ajustar
+la capacidad.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheLRU:
+    """
+    Caché en memoria con desalojo LRU y expiración por TTL.
+
+    Atributos:
+        capacidad: Número máximo de elementos almacenados
+        ttl: Segundos de vida de cada elemento (None = sin expiración)
+    """
+
+    def __init__(self, capacidad=1000, ttl=60.0):
+        """
+        Crea una caché vacía.
+        """
+        if capacidad < 1:
+            raise ValueError("La capacidad de la caché debe ser mayor que cero")
+
+        self.capacidad = capacidad
+        self.ttl = ttl
+
+        # clave -> (valor, instante_de_expiracion)
+        self._datos = OrderedDict()
+        self._candado = threading.Lock()
+
+        self._aciertos = 0
+        self._fallos = 0
+        self._expirados = 0
+        self._desalojos = 0
+        self._invalidaciones = 0
+
+    def obtener(self, clave, defecto=None):
+        """
+        Devuelve el valor asociado a la clave o defecto si no está o expiró.
+        Un acierto marca el elemento como el usado más recientemente.
+        """
+        with self._candado:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                self._fallos += 1
+                return defecto
+
+            valor, expira_en = entrada
+            if expira_en is not None and time.monotonic() >= expira_en:
+                del self._datos[clave]
+                self._expirados += 1
+                self._fallos += 1
+                return defecto
+
+            self._datos.move_to_end(clave)
+            self._aciertos += 1
+            return valor
+
+    def guardar(self, clave, valor):
+        """
+        Guarda (o refresca) un valor, desalojando el menos usado si se excede la capacidad.
+        """
+        expira_en = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._candado:
+            self._datos[clave] = (valor, expira_en)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.capacidad:
+                self._datos.popitem(last=False)
+                self._desalojos += 1
+
+    def invalidar(self, clave):
+        """
+        Elimina una clave de la caché (por ejemplo tras actualizar o eliminar).
+        """
+        with self._candado:
+            if self._datos.pop(clave, None) is not None:
+                self._invalidaciones += 1
+
+    def limpiar(self):
+        """
+        Vacía la caché sin reiniciar los contadores.
+        """
+        with self._candado:
+            self._invalidaciones += len(self._datos)
+            self._datos.clear()
+
+    def estadisticas(self):
+        """
+        Devuelve los contadores de la caché y la tasa de aciertos.
+        """
+        with self._candado:
+            consultas = self._aciertos + self._fallos
+            return {
+                'tamano': len(self._datos),
+                'capacidad': self.capacidad,
+                'ttl': self.ttl,
+                'aciertos': self._aciertos,
+                'fallos': self._fallos,
+                'expirados': self._expirados,
+                'desalojos': self._desalojos,
+                'invalidaciones': self._invalidaciones,
+                'tasa_aciertos': self._aciertos / consultas if consultas else 0.0,
+            }
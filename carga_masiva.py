@@ -0,0 +1,750 @@
+"""
+CARGA MASIVA DE ALUMNOS DESDE CSV O JSONL
+Importación por lotes usando sp_InsertarAlumnosLote (parámetro con valores de tabla)
+
+@author Arias Javier, Andrade Eduardo, Guevara Galo
+@date 2025
+
+Descripción:
+Lee archivos CSV o JSONL de matrículas, valida cada registro y los envía a
+SQL Server en lotes de tamaño configurable. Cada lote viaja en un solo round
+trip y se confirma en su propia transacción. Se reportan filas por segundo
+y los id_alumno generados. ActualizadorMasivoAlumnos aplica actualizaciones
+parciales en lote con sp_ActualizarAlumnosLote y devuelve el resultado de
+cada fila (actualizado, no encontrado o conflicto de versión).
+CargadorMasivoEstudiantes carga la tabla Estudiantes con executemany.
+Para archivos muy grandes, cargar_en_paralelo divide el archivo en rangos
+de bytes alineados a líneas y los procesa en varios procesos, cada uno con
+su propia conexión. medir_escalabilidad carga el mismo archivo con distintas
+cantidades de procesos y compara las filas por segundo.
+
+Uso:
+    python carga_masiva.py alumnos.csv --tamano-lote 1000
+    python carga_masiva.py alumnos.jsonl --procesos 8
+    python carga_masiva.py estudiantes.csv --tabla estudiantes --procesos 4
+    python carga_masiva.py alumnos.jsonl --escalabilidad 1,2,4,8
+"""
+
+import argparse
+import csv
+import io
+import json
+import multiprocessing.util
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import pyodbc
+
+from configuracion import cargar_configuracion, construir_connection_string
+from pool_conexiones import PoolConexiones
+from purga_alumnos import PurgadorAlumnos
+from registro_sentencias import RegistroSentencias
+
+
+# Columnas del tipo dbo.TipoAlumnoLote (después de la columna fila)
+COLUMNAS_ALUMNO = (
+    'nombre', 'apellido', 'fecha_nacimiento', 'lugar_nacimiento',
+    'direccion', 'telefono_alumno', 'info_escolar', 'info_salud',
+)
+
+# Columnas de la tabla Estudiantes en el orden del INSERT
+COLUMNAS_ESTUDIANTE = ('IDEstudiante', 'NombreEstudiante', 'ApellidoEstudiante', 'Email', 'Telefono')
+
+TAMANO_LOTE_DEFECTO = 1000
+
+# Carga en paralelo: particiones por proceso (para repartir mejor la carga)
+# y tamaño mínimo de una partición
+PARTICIONES_POR_PROCESO = 4
+TAMANO_MINIMO_PARTICION = 1024 * 1024
+
+
+class ErrorRegistroInvalido(ValueError):
+    """
+    Se lanza cuando un registro del archivo no cumple las validaciones.
+    """
+
+
+def formato_archivo(ruta):
+    """
+    Devuelve 'csv' o 'jsonl' según la extensión del archivo.
+    """
+    ruta_minuscula = ruta.lower()
+    if ruta_minuscula.endswith('.csv'):
+        return 'csv'
+    if ruta_minuscula.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    raise ValueError("Formato no soportado: use un archivo .csv o .jsonl")
+
+
+def leer_registros(ruta):
+    """
+    Generador de diccionarios leídos desde un archivo CSV o JSONL.
+    El formato se detecta por la extensión (.csv, .jsonl o .ndjson).
+    Produce tuplas (numero_fila, registro).
+    """
+    ruta_minuscula = ruta.lower()
+
+    if ruta_minuscula.endswith('.csv'):
+        with open(ruta, 'r', encoding='utf-8-sig', newline='') as archivo:
+            # La fila 1 es el encabezado
+            for numero, registro in enumerate(csv.DictReader(archivo), start=2):
+                yield numero, registro
+
+    elif ruta_minuscula.endswith(('.jsonl', '.ndjson')):
+        with open(ruta, 'r', encoding='utf-8') as archivo:
+            for numero, linea in enumerate(archivo, start=1):
+                linea = linea.strip()
+                if not linea:
+                    continue
+                try:
+                    yield numero, json.loads(linea)
+                except json.JSONDecodeError as e:
+                    yield numero, ErrorRegistroInvalido(f"JSON inválido: {e}")
+
+    else:
+        raise ValueError("Formato no soportado: use un archivo .csv o .jsonl")
+
+
+def _exigir_objeto(registro):
+    """
+    Propaga el error de lectura del registro y comprueba que sea un objeto:
+    una línea JSONL válida también puede ser una lista, un número o un texto.
+    """
+    if isinstance(registro, Exception):
+        raise registro
+    if not isinstance(registro, dict):
+        raise ErrorRegistroInvalido(f"Se esperaba un objeto JSON y se recibió {type(registro).__name__}")
+
+
+def normalizar_registro(numero_fila, registro):
+    """
+    Valida un registro y lo convierte en la tupla que espera dbo.TipoAlumnoLote.
+    Los campos vacíos se convierten en NULL.
+    """
+    _exigir_objeto(registro)
+
+    valores = []
+    for columna in COLUMNAS_ALUMNO:
+        valor = registro.get(columna)
+        if isinstance(valor, str):
+            valor = valor.strip() or None
+        valores.append(valor)
+
+    if not valores[0] or not valores[1]:
+        raise ErrorRegistroInvalido("Nombre y Apellido son obligatorios")
+
+    if valores[2] is not None:
+        try:
+            valores[2] = datetime.strptime(str(valores[2]), '%Y-%m-%d').date()
+        except ValueError:
+            raise ErrorRegistroInvalido("Formato de fecha inválido. Use YYYY-MM-DD")
+
+    return (numero_fila, *valores)
+
+
+def normalizar_estudiante(numero_fila, registro):
+    """
+    Valida un registro de la tabla Estudiantes y lo convierte en la tupla
+    (numero_fila, IDEstudiante, NombreEstudiante, ApellidoEstudiante, Email, Telefono).
+    """
+    _exigir_objeto(registro)
+
+    valores = []
+    for columna in COLUMNAS_ESTUDIANTE:
+        valor = registro.get(columna)
+        if isinstance(valor, str):
+            valor = valor.strip() or None
+        valores.append(valor)
+
+    try:
+        valores[0] = int(valores[0])
+    except (TypeError, ValueError):
+        raise ErrorRegistroInvalido("IDEstudiante es obligatorio y debe ser un número")
+
+    if not valores[1] or not valores[2]:
+        raise ErrorRegistroInvalido("NombreEstudiante y ApellidoEstudiante son obligatorios")
+
+    return (numero_fila, *valores)
+
+
+def normalizar_cambio(numero_fila, cambio):
+    """
+    Valida una actualización parcial y la convierte en la tupla que espera
+    dbo.TipoAlumnoActualizacion. El cambio es un diccionario con id_alumno,
+    las columnas a modificar y opcionalmente version_esperada (bytes o texto
+    hexadecimal). Las columnas ausentes o vacías no se modifican.
+    """
+    _exigir_objeto(cambio)
+
+    desconocidas = {str(columna) for columna in cambio} - set(COLUMNAS_ALUMNO) - {'id_alumno', 'version_esperada'}
+    if desconocidas:
+        raise ErrorRegistroInvalido(f"Columnas desconocidas: {', '.join(sorted(desconocidas))}")
+
+    try:
+        id_alumno = int(cambio.get('id_alumno'))
+    except (TypeError, ValueError):
+        raise ErrorRegistroInvalido("id_alumno es obligatorio y debe ser un número")
+
+    valores = []
+    for columna in COLUMNAS_ALUMNO:
+        valor = cambio.get(columna)
+        if isinstance(valor, str):
+            valor = valor.strip() or None
+        valores.append(valor)
+
+    if all(valor is None for valor in valores):
+        raise ErrorRegistroInvalido("No hay columnas para actualizar")
+
+    if isinstance(valores[2], str):
+        try:
+            valores[2] = datetime.strptime(valores[2], '%Y-%m-%d').date()
+        except ValueError:
+            raise ErrorRegistroInvalido("Formato de fecha inválido. Use YYYY-MM-DD")
+
+    version = cambio.get('version_esperada')
+    if isinstance(version, str):
+        version = version.strip()
+        try:
+            version = bytes.fromhex(version[2:] if version.lower().startswith('0x') else version) or None
+        except ValueError:
+            raise ErrorRegistroInvalido("version_esperada debe ser hexadecimal")
+    if version is not None and (not isinstance(version, (bytes, bytearray)) or len(version) != 8):
+        raise ErrorRegistroInvalido("version_esperada debe tener 8 bytes")
+
+    return (numero_fila, id_alumno, *valores, version)
+
+
+class CargadorMasivoAlumnos:
+    """
+    Carga alumnos en lote a través de sp_InsertarAlumnosLote.
+
+    Atributos:
+        pool: Pool de conexiones del que se toma una conexión por lote
+        tamano_lote: Registros enviados (y confirmados) por transacción
+        sentencias: RegistroSentencias con el que se llama al procedimiento;
+            el pool debe crearse con sus opciones_pool()
+    """
+
+    PROCEDIMIENTO = 'sp_InsertarAlumnosLote'
+
+    normalizar = staticmethod(normalizar_registro)
+
+    def __init__(self, pool, tamano_lote=TAMANO_LOTE_DEFECTO, mostrar_progreso=True, sentencias=None):
+        if tamano_lote < 1:
+            raise ValueError("El tamaño de lote debe ser mayor que cero")
+        self.pool = pool
+        self.tamano_lote = tamano_lote
+        self.mostrar_progreso = mostrar_progreso
+        self.sentencias = sentencias or RegistroSentencias()
+
+    def insertar_lote(self, lote):
+        """
+        Envía un lote en un solo round trip y una sola transacción.
+        Devuelve la lista de pares (numero_fila, id_alumno) generados.
+        """
+        with self.pool.conexion() as conexion:
+            micursor = self.sentencias.ejecutar(conexion, self.PROCEDIMIENTO, (lote,))
+            return [(fila[0], int(fila[1])) for fila in micursor.fetchall()]
+
+    def cargar(self, ruta):
+        """
+        Importa el archivo completo y devuelve un diccionario con el resumen:
+        insertados, errores [(fila, mensaje)], ids [(fila, id_alumno)],
+        segundos y filas_por_segundo.
+        """
+        return self.cargar_registros(leer_registros(ruta))
+
+    def cargar_registros(self, registros):
+        """
+        Igual que cargar, pero a partir de un iterable de pares (numero_fila, registro)
+        como los que produce leer_registros.
+        """
+        resultado = {'insertados': 0, 'errores': [], 'ids': [], 'segundos': 0.0, 'filas_por_segundo': 0.0}
+        inicio = time.perf_counter()
+        lote = []
+
+        for numero_fila, registro in registros:
+            try:
+                lote.append(self.normalizar(numero_fila, registro))
+            except ErrorRegistroInvalido as e:
+                resultado['errores'].append((numero_fila, str(e)))
+                continue
+
+            if len(lote) >= self.tamano_lote:
+                self._procesar_lote(lote, resultado, inicio)
+                lote = []
+
+        if lote:
+            self._procesar_lote(lote, resultado, inicio)
+
+        resultado['segundos'] = time.perf_counter() - inicio
+        if resultado['segundos'] > 0:
+            resultado['filas_por_segundo'] = resultado['insertados'] / resultado['segundos']
+        return resultado
+
+    def _procesar_lote(self, lote, resultado, inicio):
+        """
+        Inserta un lote y acumula sus resultados. Si el lote falla se registra
+        el error para cada una de sus filas y la carga continúa con el siguiente.
+        """
+        try:
+            ids = self.insertar_lote(lote)
+        except pyodbc.Error as e:
+            for registro in lote:
+                resultado['errores'].append((registro[0], f"Lote rechazado: {e}"))
+            return
+
+        resultado['insertados'] += len(ids)
+        resultado['ids'].extend(ids)
+
+        if self.mostrar_progreso:
+            segundos = time.perf_counter() - inicio
+            velocidad = resultado['insertados'] / segundos if segundos > 0 else 0.0
+            print(f"  ✓ {resultado['insertados']} alumnos insertados ({velocidad:,.0f} filas/s)")
+
+
+class CargadorMasivoEstudiantes(CargadorMasivoAlumnos):
+    """
+    Carga la tabla Estudiantes en lotes con executemany (fast_executemany).
+    Los IDs vienen en el archivo, por lo que ids contiene (fila, IDEstudiante).
+    """
+
+    SQL_LOTE = """INSERT INTO Estudiantes
+    (IDEstudiante, NombreEstudiante, ApellidoEstudiante, Email, Telefono)
+    VALUES (?, ?, ?, ?, ?)"""
+
+    normalizar = staticmethod(normalizar_estudiante)
+
+    def insertar_lote(self, lote):
+        """
+        Envía un lote como arreglo de parámetros en una sola transacción.
+        """
+        with self.pool.conexion() as conexion, conexion.cursor() as micursor:
+            micursor.fast_executemany = True
+            micursor.executemany(self.SQL_LOTE, [registro[1:] for registro in lote])
+        return [(registro[0], registro[1]) for registro in lote]
+
+
+# ==================== CARGA EN PARALELO ====================
+CARGADORES = {
+    'alumnos': CargadorMasivoAlumnos,
+    'estudiantes': CargadorMasivoEstudiantes,
+}
+
+# Pool y registro de sentencias de cada proceso trabajador (una conexión propia por proceso)
+_pool_proceso = None
+_sentencias_proceso = None
+
+
+def dividir_en_particiones(ruta, partes):
+    """
+    Divide el archivo en hasta 'partes' rangos de bytes [inicio, fin) que
+    empiezan al comienzo de una línea. En CSV el encabezado queda fuera de
+    los rangos. Devuelve (encabezado, rangos); encabezado es la lista de
+    columnas del CSV o None en JSONL.
+    """
+    encabezado = None
+    with open(ruta, 'rb') as archivo:
+        if formato_archivo(ruta) == 'csv':
+            encabezado = next(csv.reader([archivo.readline().decode('utf-8-sig')]), [])
+        inicio_datos = archivo.tell()
+        tamano = os.fstat(archivo.fileno()).st_size
+
+        partes = max(1, min(partes, (tamano - inicio_datos) // TAMANO_MINIMO_PARTICION))
+        limites = [inicio_datos]
+        for numero in range(1, partes):
+            archivo.seek(inicio_datos + (tamano - inicio_datos) * numero // partes)
+            # Completar la línea a medias: la partición empieza en la siguiente
+            archivo.readline()
+            posicion = archivo.tell()
+            if limites[-1] < posicion < tamano:
+                limites.append(posicion)
+        limites.append(tamano)
+
+    return encabezado, list(zip(limites, limites[1:]))
+
+
+def leer_particion(ruta, inicio, fin, encabezado=None):
+    """
+    Generador de pares (linea_en_particion, registro) de un rango de bytes.
+    Las líneas se numeran desde 1 dentro de la partición; las vacías cuentan
+    para la numeración pero no producen registros.
+    """
+    with open(ruta, 'rb') as archivo:
+        archivo.seek(inicio)
+        numero = 0
+        while archivo.tell() < fin:
+            linea = archivo.readline()
+            if not linea:
+                break
+            numero += 1
+            texto = linea.decode('utf-8').strip()
+            if not texto:
+                continue
+            if encabezado is not None:
+                yield numero, dict(zip(encabezado, next(csv.reader(io.StringIO(texto)))))
+            else:
+                try:
+                    yield numero, json.loads(texto)
+                except json.JSONDecodeError as e:
+                    yield numero, ErrorRegistroInvalido(f"JSON inválido: {e}")
+
+
+def contar_lineas(ruta, inicio, fin, tamano_bloque=TAMANO_MINIMO_PARTICION):
+    """
+    Cantidad de saltos de línea del rango de bytes, leído por bloques.
+    """
+    lineas = 0
+    with open(ruta, 'rb') as archivo:
+        archivo.seek(inicio)
+        restante = fin - inicio
+        while restante > 0:
+            bloque = archivo.read(min(tamano_bloque, restante))
+            if not bloque:
+                break
+            lineas += bloque.count(b'\n')
+            restante -= len(bloque)
+    return lineas
+
+
+def _inicializar_proceso(connection_string):
+    """
+    Abre la conexión propia del proceso trabajador y registra su cierre. Los
+    procesos de multiprocessing terminan con os._exit, que no ejecuta atexit
+    pero sí los finalizadores con exitpriority.
+    """
+    global _pool_proceso, _sentencias_proceso
+    _sentencias_proceso = RegistroSentencias()
+    _pool_proceso = PoolConexiones(connection_string, tamano_minimo=1, tamano_maximo=1,
+                                   **_sentencias_proceso.opciones_pool())
+    multiprocessing.util.Finalize(None, _cerrar_proceso, exitpriority=10)
+
+
+def _cerrar_proceso():
+    """
+    Cierra la conexión del proceso trabajador cuando el ejecutor lo termina.
+    """
+    global _pool_proceso
+    if _pool_proceso is not None:
+        _pool_proceso.cerrar()
+        _pool_proceso = None
+
+
+def _cargar_particion(ruta, inicio, fin, encabezado, tabla, tamano_lote):
+    """
+    Tarea de un proceso trabajador: lee, valida e inserta una partición.
+    Devuelve el resumen con las filas numeradas dentro de la partición y la
+    cantidad de líneas de la partición, para que el coordinador las renumere.
+    """
+    cargador = CARGADORES[tabla](_pool_proceso, tamano_lote=tamano_lote, mostrar_progreso=False,
+                                 sentencias=_sentencias_proceso)
+    resultado = cargador.cargar_registros(leer_particion(ruta, inicio, fin, encabezado))
+    resultado['lineas'] = contar_lineas(ruta, inicio, fin)
+    return resultado
+
+
+def cargar_en_paralelo(ruta, connection_string, procesos=None, tabla='alumnos',
+                       tamano_lote=TAMANO_LOTE_DEFECTO, mostrar_progreso=True):
+    """
+    Importa el archivo con varios procesos, cada uno con su propia conexión.
+    El coordinador reparte las particiones, muestra el avance a medida que
+    terminan y devuelve el mismo resumen que CargadorMasivoAlumnos.cargar
+    (con las filas numeradas como en el archivo), más procesos y particiones.
+    No admite CSV con saltos de línea dentro de campos entre comillas.
+    """
+    procesos = procesos or os.cpu_count() or 1
+    inicio = time.perf_counter()
+    encabezado, rangos = dividir_en_particiones(ruta, procesos * PARTICIONES_POR_PROCESO)
+
+    resultado = {'insertados': 0, 'errores': [], 'ids': [], 'segundos': 0.0, 'filas_por_segundo': 0.0,
+                 'procesos': procesos, 'particiones': len(rangos)}
+    parciales = {}
+
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_inicializar_proceso,
+                             initargs=(connection_string,)) as ejecutor:
+        futuros = {ejecutor.submit(_cargar_particion, ruta, desde, hasta, encabezado, tabla, tamano_lote): indice
+                   for indice, (desde, hasta) in enumerate(rangos)}
+
+        try:
+            for terminadas, futuro in enumerate(as_completed(futuros), start=1):
+                indice = futuros[futuro]
+                try:
+                    parcial = futuro.result()
+                except Exception as e:
+                    # Sin conexión o sin poder leer la partición: se informa y se sigue con las demás
+                    parcial = {'insertados': 0, 'ids': [], 'errores': [(None, f"Partición {indice + 1} fallida: {e}")]}
+                parciales[indice] = parcial
+                resultado['insertados'] += parcial['insertados']
+
+                if mostrar_progreso:
+                    segundos = time.perf_counter() - inicio
+                    velocidad = resultado['insertados'] / segundos if segundos > 0 else 0.0
+                    print(f"  ✓ Partición {terminadas}/{len(rangos)}: {resultado['insertados']} "
+                          f"registros insertados ({velocidad:,.0f} filas/s)")
+        except BaseException:
+            # Ctrl+C en el coordinador: las particiones que no empezaron se descartan
+            # en lugar de esperar a que el ejecutor las procese al salir del bloque
+            ejecutor.shutdown(wait=True, cancel_futures=True)
+            raise
+
+    # Pasar las filas de cada partición a números de línea del archivo
+    desplazamiento = 1 if encabezado is not None else 0
+    for indice, (desde, hasta) in enumerate(rangos):
+        parcial = parciales[indice]
+        resultado['ids'].extend((desplazamiento + fila, valor) for fila, valor in parcial['ids'])
+        resultado['errores'].extend((desplazamiento + fila if fila is not None else '-', mensaje)
+                                    for fila, mensaje in parcial['errores'])
+        lineas = parcial.get('lineas')
+        desplazamiento += lineas if lineas is not None else contar_lineas(ruta, desde, hasta)
+
+    resultado['segundos'] = time.perf_counter() - inicio
+    if resultado['segundos'] > 0:
+        resultado['filas_por_segundo'] = resultado['insertados'] / resultado['segundos']
+    return resultado
+
+
+class ActualizadorMasivoAlumnos:
+    """
+    Aplica actualizaciones parciales en lote a través de sp_ActualizarAlumnosLote.
+
+    Atributos:
+        pool: Pool de conexiones del que se toma una conexión por lote
+        tamano_lote: Actualizaciones enviadas (y confirmadas) por transacción
+        sentencias: RegistroSentencias con el que se llama al procedimiento;
+            el pool debe crearse con sus opciones_pool()
+    """
+
+    PROCEDIMIENTO = 'sp_ActualizarAlumnosLote'
+
+    def __init__(self, pool, tamano_lote=TAMANO_LOTE_DEFECTO, mostrar_progreso=False, sentencias=None):
+        if tamano_lote < 1:
+            raise ValueError("El tamaño de lote debe ser mayor que cero")
+        self.pool = pool
+        self.tamano_lote = tamano_lote
+        self.mostrar_progreso = mostrar_progreso
+        self.sentencias = sentencias or RegistroSentencias()
+
+    def actualizar_lote(self, lote):
+        """
+        Envía un lote en un solo round trip y una sola transacción.
+        Devuelve una fila (fila, id_alumno, Resultado, nombre, apellido, version_fila)
+        por cada actualización, donde Resultado es SUCCESS, NOT_FOUND o CONFLICT.
+        """
+        with self.pool.conexion() as conexion:
+            micursor = self.sentencias.ejecutar(conexion, self.PROCEDIMIENTO, (lote,))
+            return [tuple(fila) for fila in micursor.fetchall()]
+
+    def actualizar(self, cambios):
+        """
+        Aplica un iterable de pares (numero_fila, cambio), como los que produce
+        leer_registros (ver normalizar_cambio), y devuelve el resumen:
+        actualizados, no_encontrados, conflictos, errores [(fila, mensaje)],
+        resultados [(fila, id_alumno, Resultado, nombre, apellido, version_fila)],
+        segundos y filas_por_segundo.
+        """
+        resultado = {'actualizados': 0, 'no_encontrados': 0, 'conflictos': 0, 'errores': [],
+                     'resultados': [], 'segundos': 0.0, 'filas_por_segundo': 0.0}
+        inicio = time.perf_counter()
+        lote = []
+        ids_lote = set()
+
+        for numero_fila, cambio in cambios:
+            try:
+                fila = normalizar_cambio(numero_fila, cambio)
+            except ErrorRegistroInvalido as e:
+                resultado['errores'].append((numero_fila, str(e)))
+                continue
+
+            # Un mismo alumno no puede repetirse en un lote: el cambio posterior
+            # va en el lote siguiente para respetar el orden de aplicación
+            if fila[1] in ids_lote or len(lote) >= self.tamano_lote:
+                self._procesar_lote(lote, resultado, inicio)
+                lote, ids_lote = [], set()
+
+            lote.append(fila)
+            ids_lote.add(fila[1])
+
+        if lote:
+            self._procesar_lote(lote, resultado, inicio)
+
+        resultado['segundos'] = time.perf_counter() - inicio
+        if resultado['segundos'] > 0:
+            resultado['filas_por_segundo'] = len(resultado['resultados']) / resultado['segundos']
+        return resultado
+
+    def _procesar_lote(self, lote, resultado, inicio):
+        """
+        Actualiza un lote y acumula sus resultados. Si el lote falla se registra
+        el error para cada una de sus filas y se continúa con el siguiente.
+        """
+        try:
+            filas = self.actualizar_lote(lote)
+        except pyodbc.Error as e:
+            for cambio in lote:
+                resultado['errores'].append((cambio[0], f"Lote rechazado: {e}"))
+            return
+
+        for fila in filas:
+            if fila[2] == 'SUCCESS':
+                resultado['actualizados'] += 1
+            elif fila[2] == 'NOT_FOUND':
+                resultado['no_encontrados'] += 1
+            else:
+                resultado['conflictos'] += 1
+        resultado['resultados'].extend(filas)
+
+        if self.mostrar_progreso:
+            segundos = time.perf_counter() - inicio
+            velocidad = len(resultado['resultados']) / segundos if segundos > 0 else 0.0
+            print(f"  ✓ {len(resultado['resultados'])} cambios procesados ({velocidad:,.0f} filas/s)")
+
+
+# ==================== ESCALABILIDAD ====================
+def medir_escalabilidad(ruta, connection_string, procesos=(1, 2, 4, 8), tamano_lote=TAMANO_LOTE_DEFECTO,
+                        mostrar_progreso=True):
+    """
+    Carga el mismo archivo de alumnos con cada cantidad de procesos y devuelve
+    una lista de diccionarios con procesos, insertados, errores, segundos,
+    filas_por_segundo y aceleracion (respecto de la primera medición). Después
+    de cada medición los alumnos insertados se eliminan con PurgadorAlumnos,
+    fuera del tiempo medido, para que todas partan de la misma tabla.
+    """
+    mediciones = []
+    sentencias = RegistroSentencias()
+    pool = PoolConexiones(connection_string, tamano_minimo=1, tamano_maximo=1, **sentencias.opciones_pool())
+    purgador = PurgadorAlumnos(pool, archivo_control=None, mostrar_progreso=False, sentencias=sentencias)
+
+    try:
+        for cantidad in procesos:
+            resultado = cargar_en_paralelo(ruta, connection_string, procesos=cantidad,
+                                           tamano_lote=tamano_lote, mostrar_progreso=False)
+            medicion = {'procesos': cantidad, 'insertados': resultado['insertados'],
+                        'errores': len(resultado['errores']), 'segundos': resultado['segundos'],
+                        'filas_por_segundo': resultado['filas_por_segundo'], 'aceleracion': 1.0}
+            if mediciones and mediciones[0]['filas_por_segundo'] > 0:
+                medicion['aceleracion'] = medicion['filas_por_segundo'] / mediciones[0]['filas_por_segundo']
+            mediciones.append(medicion)
+
+            if mostrar_progreso:
+                print(f"  ✓ {cantidad} procesos: {medicion['filas_por_segundo']:,.0f} filas/s")
+
+            if resultado['ids']:
+                purgador.purgar({'ids': [id_alumno for _, id_alumno in resultado['ids']]})
+    finally:
+        pool.cerrar()
+
+    return mediciones
+
+
+def mostrar_escalabilidad(mediciones):
+    """
+    Imprime la tabla de filas por segundo según la cantidad de procesos.
+    """
+    print("\n--- ESCALABILIDAD DE LA CARGA EN PARALELO ---")
+    print(f"{'Procesos':>8} {'Insertados':>11} {'Errores':>8} {'Segundos':>9} {'Filas/s':>10} {'Aceleración':>12}")
+    print("-" * 63)
+    for medicion in mediciones:
+        print(f"{medicion['procesos']:>8} {medicion['insertados']:>11} {medicion['errores']:>8} "
+              f"{medicion['segundos']:>9.2f} {medicion['filas_por_segundo']:>10,.0f} "
+              f"{medicion['aceleracion']:>11.2f}x")
+    print()
+
+
+def mostrar_resumen(resultado, max_errores=10):
+    """
+    Imprime el resumen de una carga masiva.
+    """
+    print("\n--- RESUMEN DE CARGA MASIVA ---")
+    print(f"Registros insertados: {resultado['insertados']}")
+    print(f"Registros con error:  {len(resultado['errores'])}")
+    print(f"Tiempo total:         {resultado['segundos']:.2f} s")
+    print(f"Velocidad:            {resultado['filas_por_segundo']:,.0f} filas/s")
+
+    if resultado['ids']:
+        ids = [valor for _, valor in resultado['ids']]
+        print(f"IDs generados:        {min(ids)} ... {max(ids)}")
+
+    for numero_fila, mensaje in resultado['errores'][:max_errores]:
+        print(f"  ✗ Fila {numero_fila}: {mensaje}")
+    if len(resultado['errores']) > max_errores:
+        print(f"  ... y {len(resultado['errores']) - max_errores} errores más")
+    print()
+
+
+# ==================== PROGRAMA PRINCIPAL ====================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Carga masiva de alumnos o estudiantes desde CSV o JSONL")
+    parser.add_argument('archivo', help="Ruta del archivo .csv o .jsonl")
+    parser.add_argument('--tabla', choices=sorted(CARGADORES), default='alumnos',
+                        help="Tabla de destino (por defecto alumnos)")
+    parser.add_argument('--tamano-lote', type=int, default=TAMANO_LOTE_DEFECTO,
+                        help=f"Registros por transacción (por defecto {TAMANO_LOTE_DEFECTO})")
+    parser.add_argument('--procesos', type=int, default=1,
+                        help="Procesos en paralelo, cada uno con su conexión (0 = uno por núcleo; por defecto 1)")
+    parser.add_argument('--ids', metavar='ARCHIVO',
+                        help="Guardar los pares fila,id generados en un CSV")
+    parser.add_argument('--escalabilidad', metavar='PROCESOS',
+                        help="Medir filas/s con cada cantidad de procesos (por ejemplo 1,2,4,8); "
+                             "los alumnos insertados se eliminan después de cada medición")
+    argumentos = parser.parse_args()
+
+    cantidades_procesos = None
+    if argumentos.escalabilidad:
+        if argumentos.tabla != 'alumnos':
+            parser.error("--escalabilidad solo admite --tabla alumnos")
+        try:
+            cantidades_procesos = [int(valor) for valor in argumentos.escalabilidad.split(',')]
+        except ValueError:
+            parser.error("--escalabilidad espera números separados por comas")
+        if not cantidades_procesos or min(cantidades_procesos) < 1:
+            parser.error("--escalabilidad espera cantidades de procesos mayores que cero")
+
+    try:
+        config = cargar_configuracion()
+        connection_string = construir_connection_string(config)
+
+        if cantidades_procesos:
+            mostrar_escalabilidad(medir_escalabilidad(argumentos.archivo, connection_string,
+                                                      procesos=cantidades_procesos,
+                                                      tamano_lote=argumentos.tamano_lote))
+            sys.exit(0)
+
+        if argumentos.procesos != 1:
+            resultado = cargar_en_paralelo(argumentos.archivo, connection_string,
+                                           procesos=argumentos.procesos or None, tabla=argumentos.tabla,
+                                           tamano_lote=argumentos.tamano_lote)
+            print(f"\n✓ {resultado['particiones']} particiones procesadas con {resultado['procesos']} procesos")
+        else:
+            sentencias = RegistroSentencias()
+            pool = PoolConexiones(connection_string, tamano_minimo=1, tamano_maximo=1,
+                                  **sentencias.opciones_pool())
+            try:
+                cargador = CARGADORES[argumentos.tabla](pool, tamano_lote=argumentos.tamano_lote,
+                                                        sentencias=sentencias)
+                resultado = cargador.cargar(argumentos.archivo)
+            finally:
+                pool.cerrar()
+
+        mostrar_resumen(resultado)
+
+        if argumentos.ids:
+            with open(argumentos.ids, 'w', encoding='utf-8', newline='') as archivo_ids:
+                escritor = csv.writer(archivo_ids)
+                escritor.writerow(('fila', 'id_alumno' if argumentos.tabla == 'alumnos' else 'IDEstudiante'))
+                escritor.writerows(resultado['ids'])
+            print(f"✓ IDs generados guardados en {argumentos.ids}")
+
+        sys.exit(0 if not resultado['errores'] else 2)
+
+    except FileNotFoundError as e:
+        print(f"✗ Error: No se encontró el archivo {e.filename}")
+        sys.exit(1)
+    except pyodbc.DatabaseError as e:
+        print(f"✗ Error de conexión a SQL Server: {e}")
+        sys.exit(1)
+    except ValueError as e:
+        print(f"✗ Error: {e}")
+        sys.exit(1)
@@ -0,0 +1,151 @@
+"""
+CARGADOR POR LOTES DE CONSULTAS POR CLAVE
+Agrupa las consultas concurrentes por ID en un solo round trip
+
+@author Arias Javier, Andrade Eduardo, Guevara Galo
+@date 2025
+
+Descripción:
+Clase CargadorPorLotes al estilo DataLoader: las llamadas a obtener(clave)
+que llegan dentro de una ventana corta (por defecto 2 ms) se juntan en un
+lote, las claves repetidas se piden una sola vez y todo el lote se resuelve
+con una sola llamada a la función de carga (por ejemplo
+sp_ObtenerAlumnosPorIDs). El primer hilo que abre un lote es quien lo
+despacha al cerrarse la ventana o al llenarse; los demás esperan su
+resultado. No usa hilos propios.
+"""
+
+import threading
+from concurrent.futures import Future
+
+
+class _Lote:
+    """
+    Claves pendientes de un lote abierto y el resultado que esperan.
+    """
+
+    def __init__(self):
+        self.futuros = {}
+        self.lleno = threading.Event()
+
+
+class CargadorPorLotes:
+    """
+    Junta pedidos por clave y los resuelve en lotes.
+
+    Atributos:
+        funcion_lote: Recibe una lista de claves sin repetir y devuelve un
+                      diccionario clave -> valor; las claves ausentes valen None
+        ventana: Segundos que se espera a otros pedidos antes de despachar el lote
+        tamano_maximo: Claves por lote; un lote lleno se despacha sin esperar la ventana
+    """
+
+    def __init__(self, funcion_lote, ventana=0.002, tamano_maximo=1000):
+        if tamano_maximo < 1:
+            raise ValueError("El tamaño máximo del lote debe ser mayor que cero")
+
+        self.funcion_lote = funcion_lote
+        self.ventana = ventana
+        self.tamano_maximo = tamano_maximo
+
+        self._lote = None
+        self._candado = threading.Lock()
+
+        self._estadisticas = {
+            'pedidos': 0,
+            'repetidos': 0,
+            'lotes': 0,
+            'claves_cargadas': 0,
+            'errores': 0,
+        }
+
+    # ==================== PEDIDOS ====================
+    def _encolar(self, claves):
+        """
+        Agrega las claves al lote abierto (o abre uno) y devuelve los futuros de
+        cada clave y los lotes que este hilo debe despachar.
+        """
+        futuros = {}
+        propios = []
+        with self._candado:
+            for clave in claves:
+                self._estadisticas['pedidos'] += 1
+                if clave in futuros:
+                    self._estadisticas['repetidos'] += 1
+                    continue
+
+                if self._lote is None:
+                    # Quien abre el lote lo despacha
+                    self._lote = _Lote()
+                    propios.append(self._lote)
+
+                futuro = self._lote.futuros.get(clave)
+                if futuro is None:
+                    futuro = self._lote.futuros[clave] = Future()
+                else:
+                    self._estadisticas['repetidos'] += 1
+                futuros[clave] = futuro
+
+                if len(self._lote.futuros) >= self.tamano_maximo:
+                    # Lote lleno: se cierra y los pedidos siguientes abren otro
+                    self._lote.lleno.set()
+                    self._lote = None
+        return futuros, propios
+
+    def _despachar(self, lote, esperar):
+        """
+        Espera la ventana (salvo que el lote se llene), cierra el lote y lo
+        resuelve con una llamada a funcion_lote.
+        """
+        if esperar and self.ventana > 0:
+            lote.lleno.wait(self.ventana)
+        with self._candado:
+            if self._lote is lote:
+                self._lote = None
+            self._estadisticas['lotes'] += 1
+            self._estadisticas['claves_cargadas'] += len(lote.futuros)
+
+        claves = list(lote.futuros)
+        try:
+            valores = self.funcion_lote(claves)
+        except BaseException as e:
+            with self._candado:
+                self._estadisticas['errores'] += 1
+            for futuro in lote.futuros.values():
+                futuro.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+            return
+
+        for clave, futuro in lote.futuros.items():
+            futuro.set_result(valores.get(clave))
+
+    def obtener(self, clave):
+        """
+        Devuelve el valor de la clave (o None si no existe), resuelto junto con
+        los demás pedidos que lleguen dentro de la ventana.
+        """
+        return self.obtener_varios([clave])[clave]
+
+    def obtener_varios(self, claves):
+        """
+        Devuelve un diccionario clave -> valor. Todas las claves entran al lote
+        abierto de una vez, por lo que N claves cuestan un round trip por
+        cada tamano_maximo claves y no N.
+        """
+        futuros, propios = self._encolar(claves)
+        # El último lote propio puede recibir pedidos de otros hilos durante la
+        # ventana; los anteriores ya están llenos
+        for indice, lote in enumerate(propios):
+            self._despachar(lote, esperar=indice == len(propios) - 1)
+        return {clave: futuro.result() for clave, futuro in futuros.items()}
+
+    # ==================== ESTADÍSTICAS ====================
+    def estadisticas(self):
+        """
+        Devuelve una copia de los contadores del cargador.
+        """
+        with self._candado:
+            datos = dict(self._estadisticas)
+        datos['claves_por_lote'] = datos['claves_cargadas'] / datos['lotes'] if datos['lotes'] else 0.0
+        return datos
@@ -0,0 +1,145 @@
+"""
+CONFIGURACIÓN Y CONEXIÓN COMPARTIDAS
+Lectura única de config.json, variables de entorno y pool de arranque diferido
+
+@author Arias Javier, Andrade Eduardo, Guevara Galo
+@date 2025
+
+Descripción:
+Funciones usadas por todos los scripts para cargar config.json, aplicar las
+variables de entorno DB_SERVER, DB_NAME, DB_USER,
+DB_PASSWORD y DB_DRIVER por encima del archivo, formar la cadena de conexión
+y crear el pool sin bloquear el arranque: las conexiones se abren en un hilo
+en segundo plano mientras se dibuja el menú, o en el primer uso.
+"""
+
+import json
+import os
+import time
+
+from pool_conexiones import PoolConexiones
+from reintentos import InterruptorCircuito, PoliticaReintentos
+
+
+ARCHIVO_CONFIGURACION = 'config.json'
+
+# Clave de config.json -> variable de entorno que la reemplaza
+VARIABLES_ENTORNO = {
+    'name_server': 'DB_SERVER',
+    'database': 'DB_NAME',
+    'username': 'DB_USER',
+    'password': 'DB_PASSWORD',
+    'controlador_odbc': 'DB_DRIVER',
+}
+
+
+def cargar_configuracion(ruta=ARCHIVO_CONFIGURACION):
+    """
+    Devuelve la configuración de config.json con las variables de entorno aplicadas.
+    Si el archivo no existe pero las variables de entorno definen todos los
+    datos de conexión, se usan solas. Lanza FileNotFoundError si no hay
+    archivo ni variables suficientes.
+    """
+    # Cada script lee el archivo una vez al arrancar: interpretar unos pocos
+    # cientos de bytes de JSON cuesta microsegundos, no justifica una caché
+    try:
+        with open(ruta, 'r', encoding='utf-8') as archivo_config:
+            config = json.load(archivo_config)
+        encontrado = True
+    except FileNotFoundError:
+        config, encontrado = {}, False
+
+    for clave_config, variable in VARIABLES_ENTORNO.items():
+        valor = os.getenv(variable)
+        if valor:
+            config[clave_config] = valor
+
+    if not encontrado and any(clave_config not in config for clave_config in VARIABLES_ENTORNO):
+        raise FileNotFoundError(2, "No se encontró el archivo de configuración", ruta)
+    return config
+
+
+def construir_connection_string(config):
+    """
+    Forma la cadena de conexión ODBC a partir de la configuración.
+    """
+    return (f"DRIVER={config['controlador_odbc']};SERVER={config['name_server']};"
+            f"DATABASE={config['database']};UID={config['username']};PWD={config['password']}")
+
+
+def construir_connection_string_lectura(config):
+    """
+    Forma la cadena de conexión de solo lectura, o devuelve None si no se
+    configuró una réplica. lectura_connection_string se usa tal cual; si no,
+    se parte de la conexión principal cambiando el servidor (lectura_name_server)
+    o la base (lectura_database). Siempre se declara ApplicationIntent=ReadOnly
+    para que un grupo de disponibilidad la dirija a una secundaria legible.
+    """
+    cadena = config.get('lectura_connection_string')
+    if not cadena:
+        if not (config.get('lectura_name_server') or config.get('lectura_database')):
+            return None
+        cadena = construir_connection_string({
+            **config,
+            'name_server': config.get('lectura_name_server') or config['name_server'],
+            'database': config.get('lectura_database') or config['database'],
+        })
+    if 'applicationintent' not in cadena.lower():
+        cadena = f"{cadena.rstrip(';')};ApplicationIntent=ReadOnly"
+    return cadena
+
+
+def crear_pool(config, connection_string=None, **opciones):
+    """
+    Crea el pool de conexiones con las claves pool_* de la configuración sin abrir
+    ninguna conexión. Con pool_precalentar (por defecto True) las conexiones mínimas
+    se abren en un hilo en segundo plano; si no, se abren en el primer uso.
+    connection_string reemplaza a la cadena principal (por ejemplo, la de lectura).
+    Las opciones adicionales se pasan a PoolConexiones.
+    """
+    parametros = {
+        'tamano_minimo': config.get('pool_minimo', 1),
+        'tamano_maximo': config.get('pool_maximo', 10),
+        'tiempo_espera': config.get('pool_tiempo_espera', 30.0),
+        'tiempo_ocioso': config.get('pool_tiempo_ocioso', 300.0),
+    }
+    parametros.update(opciones)
+    pool = PoolConexiones(connection_string or construir_connection_string(config),
+                          abrir_minimo=False, **parametros)
+    if config.get('pool_precalentar', True):
+        pool.precalentar_en_segundo_plano()
+    return pool
+
+
+def crear_reintentos(config):
+    """
+    Crea la política de reintentos y el interruptor de circuito con las claves
+    reintentos_* y circuito_* de la configuración.
+    """
+    politica = PoliticaReintentos(
+        intentos=config.get('reintentos_intentos', 3),
+        espera_base=config.get('reintentos_espera_base', 0.2),
+        espera_maxima=config.get('reintentos_espera_maxima', 5.0))
+    interruptor = InterruptorCircuito(
+        umbral_fallos=config.get('circuito_umbral_fallos', 5),
+        tiempo_apertura=config.get('circuito_tiempo_apertura', 30.0))
+    return politica, interruptor
+
+
+_arranque_reportado = False
+
+
+def reportar_arranque(inicio, descripcion="primer menú"):
+    """
+    Muestra (una sola vez) el tiempo transcurrido desde inicio (time.perf_counter()
+    tomado en la primera línea del script, antes de importar pyodbc y los
+    módulos del proyecto) hasta que la interfaz está lista. Devuelve los
+    milisegundos medidos. El arranque del intérprete anterior al script no
+    se incluye; para desglosar las importaciones use python -X importtime.
+    """
+    global _arranque_reportado
+    milisegundos = (time.perf_counter() - inicio) * 1000
+    if not _arranque_reportado:
+        _arranque_reportado = True
+        print(f"⏱ Tiempo hasta el {descripcion}: {milisegundos:.1f} ms")
+    return milisegundos
@@ -0,0 +1,285 @@
+"""
+EXPORTACIÓN DE ALUMNOS A CSV, JSONL O PARQUET
+Volcado en flujo con memoria constante usando sp_ObtenerAlumnosPaginado
+
+@author Arias Javier, Andrade Eduardo, Guevara Galo
+@date 2025
+
+Descripción:
+Recorre dbo.Alumno por páginas keyset leídas con fetchmany y escribe cada
+lote en el archivo de salida apenas llega, sin acumular la tabla en memoria.
+Formatos: CSV, JSONL y Parquet (requiere pyarrow). Compresión opcional gzip
+o zstd (requiere zstandard); en Parquet se usa el códec interno del formato.
+Se reportan filas por segundo durante y al final de la exportación.
+
+Uso:
+    python exportacion.py alumnos.csv.gz
+    python exportacion.py alumnos.parquet --compresion zstd
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import sys
+import time
+from datetime import date, datetime
+
+import pyodbc
+
+from configuracion import cargar_configuracion, construir_connection_string
+from pool_conexiones import PoolConexiones
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# Columnas devueltas por sp_ObtenerAlumnosPaginado, en orden
+COLUMNAS_EXPORTACION = (
+    'id_alumno', 'nombre', 'apellido', 'fecha_nacimiento', 'lugar_nacimiento',
+    'direccion', 'telefono_alumno', 'info_escolar', 'info_salud',
+)
+
+FORMATOS = ('csv', 'jsonl', 'parquet')
+COMPRESIONES = ('gzip', 'zstd')
+
+TAMANO_PAGINA_EXPORTACION = 5000
+TAMANO_LOTE_EXPORTACION = 1000
+
+
+def detectar_compresion(ruta):
+    """
+    Deduce la compresión de la última extensión: alumnos.csv.gz -> 'gzip'.
+    Devuelve (compresion, nombre sin esa extensión); sin .gz ni .zst, compresion es None.
+    """
+    nombre = ruta.lower()
+    if nombre.endswith('.gz'):
+        return 'gzip', nombre[:-3]
+    if nombre.endswith('.zst'):
+        return 'zstd', nombre[:-4]
+    return None, nombre
+
+
+def detectar_formato(ruta):
+    """
+    Deduce formato y compresión de la extensión: alumnos.csv.gz -> ('csv', 'gzip').
+    """
+    compresion, nombre = detectar_compresion(ruta)
+    for formato, extensiones in (('csv', ('.csv',)), ('jsonl', ('.jsonl', '.ndjson')), ('parquet', ('.parquet',))):
+        if nombre.endswith(extensiones):
+            return formato, compresion
+    raise ValueError("No se reconoce el formato: use .csv, .jsonl o .parquet (opcionalmente .gz o .zst)")
+
+
+def abrir_salida_texto(ruta, compresion):
+    """
+    Abre el archivo de salida en modo texto UTF-8, con compresión opcional en flujo.
+    """
+    if compresion is None:
+        return open(ruta, 'w', encoding='utf-8', newline='')
+    if compresion == 'gzip':
+        return gzip.open(ruta, 'wt', encoding='utf-8', newline='')
+    if compresion == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("La compresión zstd requiere el paquete zstandard (pip install zstandard)")
+        binario = open(ruta, 'wb')
+        comprimido = zstandard.ZstdCompressor().stream_writer(binario, closefd=True)
+        return io.TextIOWrapper(comprimido, encoding='utf-8', newline='')
+    raise ValueError(f"Compresión no soportada: {compresion}")
+
+
+def _valor_json(valor):
+    return valor.isoformat() if isinstance(valor, (date, datetime)) else valor
+
+
+# ==================== ESCRITORES ====================
+class EscritorCSV:
+    def __init__(self, ruta, compresion):
+        self._archivo = abrir_salida_texto(ruta, compresion)
+        self._escritor = csv.writer(self._archivo)
+        self._escritor.writerow(COLUMNAS_EXPORTACION)
+
+    def escribir(self, lote):
+        self._escritor.writerows(lote)
+
+    def cerrar(self):
+        self._archivo.close()
+
+
+class EscritorJSONL:
+    def __init__(self, ruta, compresion):
+        self._archivo = abrir_salida_texto(ruta, compresion)
+
+    def escribir(self, lote):
+        self._archivo.write(''.join(
+            json.dumps({columna: _valor_json(valor) for columna, valor in zip(COLUMNAS_EXPORTACION, fila)},
+                       ensure_ascii=False) + '\n'
+            for fila in lote))
+
+    def cerrar(self):
+        self._archivo.close()
+
+
+class EscritorParquet:
+    """
+    Escribe un row group por lote, de modo que el archivo crece sin retener filas.
+    """
+
+    def __init__(self, ruta, compresion):
+        if pyarrow is None:
+            raise RuntimeError("La exportación a Parquet requiere el paquete pyarrow (pip install pyarrow)")
+        self._esquema = pyarrow.schema(
+            [('id_alumno', pyarrow.int32())]
+            + [(columna, pyarrow.date32() if columna == 'fecha_nacimiento' else pyarrow.string())
+               for columna in COLUMNAS_EXPORTACION[1:]])
+        self._escritor = pyarrow.parquet.ParquetWriter(
+            ruta, self._esquema, compression=compresion or 'snappy')
+
+    def escribir(self, lote):
+        columnas = list(zip(*lote))
+        self._escritor.write_table(pyarrow.Table.from_arrays(
+            [pyarrow.array(valores, type=campo.type) for valores, campo in zip(columnas, self._esquema)],
+            schema=self._esquema))
+
+    def cerrar(self):
+        self._escritor.close()
+
+
+ESCRITORES = {'csv': EscritorCSV, 'jsonl': EscritorJSONL, 'parquet': EscritorParquet}
+
+
+# ==================== EXPORTACIÓN ====================
+def leer_alumnos(pool, tamano_pagina=TAMANO_PAGINA_EXPORTACION, tamano_lote=TAMANO_LOTE_EXPORTACION):
+    """
+    Generador de lotes de alumnos con sp_ObtenerAlumnosPaginado (keyset sobre
+    id_alumno), cada uno leído con fetchmany. Cada página usa una conexión del pool.
+    """
+    ultimo_id = 0
+    while True:
+        leidos = 0
+        with pool.conexion() as conexion, conexion.cursor() as micursor:
+            micursor.execute("EXEC sp_ObtenerAlumnosPaginado @UltimoId = ?, @Tamano = ?",
+                             (ultimo_id, tamano_pagina))
+            while True:
+                lote = micursor.fetchmany(tamano_lote)
+                if not lote:
+                    break
+                yield lote
+                leidos += len(lote)
+                ultimo_id = lote[-1][0]
+
+        if leidos < tamano_pagina:
+            return
+
+
+def agrupar_en_lotes(filas, tamano_lote):
+    """
+    Agrupa un iterable de filas en listas de hasta tamano_lote elementos.
+    """
+    lote = []
+    for fila in filas:
+        lote.append(fila)
+        if len(lote) >= tamano_lote:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def exportar_lotes(lotes, ruta, formato=None, compresion=None, mostrar_progreso=True):
+    """
+    Escribe los lotes de filas en el archivo indicado y devuelve el resumen:
+    filas, segundos, filas_por_segundo y bytes (tamaño final del archivo).
+    Si formato o compresión no se indican se deducen de la extensión, cada uno
+    por separado: alumnos.csv.gz con formato='csv' se escribe con gzip.
+    """
+    if formato is None:
+        formato = detectar_formato(ruta)[0]
+    if compresion is None:
+        compresion = detectar_compresion(ruta)[0]
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato no soportado: {formato}")
+    if compresion is not None and compresion not in COMPRESIONES:
+        raise ValueError(f"Compresión no soportada: {compresion}")
+
+    resultado = {'filas': 0, 'segundos': 0.0, 'filas_por_segundo': 0.0, 'bytes': 0}
+    inicio = time.perf_counter()
+    escritor = ESCRITORES[formato](ruta, compresion)
+    try:
+        for lote in lotes:
+            escritor.escribir(lote)
+            resultado['filas'] += len(lote)
+            if mostrar_progreso and resultado['filas'] % 50000 < len(lote):
+                segundos = time.perf_counter() - inicio
+                velocidad = resultado['filas'] / segundos if segundos > 0 else 0.0
+                print(f"  ✓ {resultado['filas']:,} alumnos exportados ({velocidad:,.0f} filas/s)")
+    finally:
+        escritor.cerrar()
+
+    resultado['segundos'] = time.perf_counter() - inicio
+    if resultado['segundos'] > 0:
+        resultado['filas_por_segundo'] = resultado['filas'] / resultado['segundos']
+    try:
+        with open(ruta, 'rb') as archivo:
+            archivo.seek(0, io.SEEK_END)
+            resultado['bytes'] = archivo.tell()
+    except OSError:
+        pass
+    return resultado
+
+
+def mostrar_resumen_exportacion(resultado, ruta):
+    """
+    Imprime el resumen de una exportación.
+    """
+    print("\n--- RESUMEN DE EXPORTACIÓN ---")
+    print(f"Archivo:              {ruta}")
+    print(f"Alumnos exportados:   {resultado['filas']:,}")
+    print(f"Tamaño del archivo:   {resultado['bytes'] / 1024:,.1f} KB")
+    print(f"Tiempo total:         {resultado['segundos']:.2f} s")
+    print(f"Velocidad:            {resultado['filas_por_segundo']:,.0f} filas/s\n")
+
+
+# ==================== PROGRAMA PRINCIPAL ====================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exportación de alumnos a CSV, JSONL o Parquet")
+    parser.add_argument('archivo', help="Ruta de salida (.csv, .jsonl o .parquet, opcionalmente .gz o .zst)")
+    parser.add_argument('--formato', choices=FORMATOS, help="Formato (por defecto se deduce de la extensión)")
+    parser.add_argument('--compresion', choices=COMPRESIONES, help="Compresión (por defecto se deduce de la extensión)")
+    parser.add_argument('--tamano-pagina', type=int, default=TAMANO_PAGINA_EXPORTACION,
+                        help=f"Registros por llamada al servidor (por defecto {TAMANO_PAGINA_EXPORTACION})")
+    parser.add_argument('--tamano-lote', type=int, default=TAMANO_LOTE_EXPORTACION,
+                        help=f"Registros por fetchmany y por escritura (por defecto {TAMANO_LOTE_EXPORTACION})")
+    argumentos = parser.parse_args()
+
+    try:
+        config = cargar_configuracion()
+        pool = PoolConexiones(construir_connection_string(config), tamano_minimo=1, tamano_maximo=1)
+
+        try:
+            resultado = exportar_lotes(
+                leer_alumnos(pool, argumentos.tamano_pagina, argumentos.tamano_lote),
+                argumentos.archivo, formato=argumentos.formato, compresion=argumentos.compresion)
+        finally:
+            pool.cerrar()
+
+        mostrar_resumen_exportacion(resultado, argumentos.archivo)
+
+    except FileNotFoundError as e:
+        print(f"✗ Error: No se encontró el archivo {e.filename}")
+        sys.exit(1)
+    except pyodbc.DatabaseError as e:
+        print(f"✗ Error de conexión a SQL Server: {e}")
+        sys.exit(1)
+    except (ValueError, RuntimeError) as e:
+        print(f"✗ Error: {e}")
+        sys.exit(1)
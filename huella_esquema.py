@@ -0,0 +1,251 @@
+"""
+HUELLA DEL ESQUEMA DE CATEQUESISDB
+Verificación barata del esquema al arrancar y mapas de posición de columnas
+
+@author Arias Javier, Andrade Eduardo, Guevara Galo
+@date 2025
+
+Descripción:
+Calcula una huella (SHA-256) con las columnas de las tablas usadas por los
+gestores (INFORMATION_SCHEMA.COLUMNS: nombre, tipo, largo y posición), la
+definición de sus Store Procedures y las columnas de sus resultados, y la
+guarda junto con esos metadatos en un archivo JSON. Al arrancar solo se
+consulta la fecha de modificación más reciente y la cantidad de objetos de
+sys.objects: si no cambiaron, se usan los metadatos guardados sin más
+consultas. La validación completa se repite solo cuando cambia la huella.
+Los gestores leen las columnas por nombre con los mapas de posición que se
+arman a partir de esos metadatos.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+
+ARCHIVO_HUELLA_DEFECTO = 'huella_esquema.json'
+
+TABLAS_HUELLA = ('dbo.Alumno',)
+
+COLUMNAS_ALUMNO = (
+    'id_alumno', 'nombre', 'apellido', 'fecha_nacimiento', 'lugar_nacimiento',
+    'direccion', 'telefono_alumno', 'info_escolar', 'info_salud', 'version_fila',
+)
+
+# Procedimiento -> columnas que los gestores leen de su primer resultado
+RESULTADOS_ESPERADOS = {
+    'sp_ObtenerAlumnosPaginado': COLUMNAS_ALUMNO[:9],
+    'sp_ObtenerAlumnoPorID': COLUMNAS_ALUMNO,
+    'sp_ObtenerAlumnosPorIDs': COLUMNAS_ALUMNO,
+    'sp_EstadisticasAlumnos': (
+        'TotalAlumnos', 'AniosNacimientoDiferentes', 'AlumnoMasViejo', 'AlumnoMasJoven',
+        'LugaresNacimientoDiferentes', 'AlumnosConTelefono', 'AlumnosConInfoEscolar',
+        'AlumnosConInfoSalud',
+    ),
+}
+
+# Una sola consulta barata: cualquier CREATE, ALTER o DROP cambia alguno de los dos valores
+CONSULTA_MARCA = """
+SELECT CONVERT(VARCHAR(27), MAX(modify_date), 126), COUNT(*)
+FROM sys.objects
+WHERE is_ms_shipped = 0
+"""
+
+CONSULTA_COLUMNAS = """
+SELECT TABLE_SCHEMA + '.' + TABLE_NAME, COLUMN_NAME, ORDINAL_POSITION, DATA_TYPE,
+       CHARACTER_MAXIMUM_LENGTH, IS_NULLABLE
+FROM INFORMATION_SCHEMA.COLUMNS
+WHERE TABLE_SCHEMA + '.' + TABLE_NAME IN (SELECT value FROM OPENJSON(?))
+ORDER BY TABLE_SCHEMA, TABLE_NAME, ORDINAL_POSITION
+"""
+
+CONSULTA_DEFINICIONES = """
+SELECT OBJECT_NAME(object_id), definition
+FROM sys.sql_modules
+WHERE object_id IN (SELECT OBJECT_ID('dbo.' + value) FROM OPENJSON(?))
+ORDER BY OBJECT_NAME(object_id)
+"""
+
+CONSULTA_RESULTADOS = """
+SELECT p.name, r.column_ordinal, r.name, r.system_type_name
+FROM sys.procedures p
+    CROSS APPLY sys.dm_exec_describe_first_result_set_for_object(p.object_id, 0) r
+WHERE p.object_id IN (SELECT OBJECT_ID('dbo.' + value) FROM OPENJSON(?))
+    AND r.error_number IS NULL
+    AND r.is_hidden = 0
+ORDER BY p.name, r.column_ordinal
+"""
+
+
+def mapa_posiciones(columnas):
+    """
+    Devuelve un objeto con la posición de cada columna como atributo:
+    mapa_posiciones(('id_alumno', 'nombre')).nombre == 1
+    """
+    return SimpleNamespace(**{columna: posicion for posicion, columna in enumerate(columnas)})
+
+
+class HuellaEsquema:
+    """
+    Huella del esquema guardada en disco con los metadatos de los que se arman
+    los mapas de posición.
+
+    Atributos:
+        archivo: Archivo JSON con la huella, la marca de sys.objects y los metadatos
+        estado: Resultado de la última verificación ('sin verificar', 'sin cambios',
+                'huella igual', 'actualizada' o 'error')
+        problemas: Columnas esperadas que faltan, según la última validación completa
+    """
+
+    def __init__(self, archivo=ARCHIVO_HUELLA_DEFECTO, tablas=TABLAS_HUELLA,
+                 resultados_esperados=RESULTADOS_ESPERADOS):
+        self.archivo = archivo
+        self.tablas = tuple(tablas)
+        self.resultados_esperados = resultados_esperados
+        self.estado = 'sin verificar'
+        self.problemas = []
+        self.error = None
+        self.segundos = 0.0
+        self._candado = threading.Lock()
+        self._metadatos = self._leer_archivo()
+        if self._metadatos:
+            self.problemas = self._metadatos.get('problemas', [])
+
+    # ==================== ARCHIVO ====================
+    def _leer_archivo(self):
+        if not self.archivo or not os.path.exists(self.archivo):
+            return None
+        try:
+            with open(self.archivo, 'r', encoding='utf-8') as archivo:
+                return json.load(archivo)
+        except (OSError, ValueError):
+            # Un archivo dañado equivale a no tener huella: se recalcula
+            return None
+
+    def _guardar_archivo(self, metadatos):
+        if not self.archivo:
+            return
+        temporal = self.archivo + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            json.dump(metadatos, archivo, ensure_ascii=False, indent=2)
+        os.replace(temporal, self.archivo)
+
+    # ==================== MAPAS DE POSICIÓN ====================
+    def columnas(self, procedimiento):
+        """
+        Columnas del primer resultado del procedimiento según los metadatos
+        guardados, o las esperadas si todavía no hay huella.
+        """
+        metadatos = self._metadatos
+        if metadatos and not self.problemas:
+            columnas = metadatos.get('resultados', {}).get(procedimiento)
+            if columnas:
+                return tuple(columna[0] for columna in columnas)
+        return tuple(self.resultados_esperados[procedimiento])
+
+    def posiciones(self, procedimiento):
+        """
+        Mapa de posiciones del resultado del procedimiento (ver mapa_posiciones).
+        """
+        return mapa_posiciones(self.columnas(procedimiento))
+
+    # ==================== VERIFICACIÓN ====================
+    def _leer_metadatos(self, micursor):
+        """
+        Lee columnas de las tablas, definiciones y columnas de resultado de los
+        procedimientos, y calcula la huella sobre todo ello.
+        """
+        procedimientos = json.dumps(sorted(self.resultados_esperados))
+
+        micursor.execute(CONSULTA_COLUMNAS, (json.dumps(list(self.tablas)),))
+        tablas = {}
+        for tabla, columna, posicion, tipo, largo, nullable in micursor.fetchall():
+            tablas.setdefault(tabla, []).append([columna, posicion, tipo, largo, nullable])
+
+        micursor.execute(CONSULTA_DEFINICIONES, (procedimientos,))
+        definiciones = {nombre: definicion for nombre, definicion in micursor.fetchall()}
+
+        micursor.execute(CONSULTA_RESULTADOS, (procedimientos,))
+        resultados = {}
+        for procedimiento, _, columna, tipo in micursor.fetchall():
+            resultados.setdefault(procedimiento, []).append([columna, tipo])
+
+        huella = hashlib.sha256(json.dumps(
+            [tablas, definiciones, resultados], sort_keys=True, default=str).encode('utf-8')).hexdigest()
+        return {'huella': huella, 'tablas': tablas, 'resultados': resultados}
+
+    def validar(self, metadatos):
+        """
+        Validación completa: devuelve la lista de problemas (tablas o columnas
+        esperadas que no existen en el servidor).
+        """
+        problemas = []
+        for tabla in self.tablas:
+            if tabla not in metadatos['tablas']:
+                problemas.append(f"No existe la tabla {tabla}")
+        for procedimiento, esperadas in self.resultados_esperados.items():
+            columnas = [columna for columna, _ in metadatos['resultados'].get(procedimiento, [])]
+            if not columnas:
+                problemas.append(f"No se pudo describir el resultado de {procedimiento}")
+                continue
+            faltantes = [columna for columna in esperadas if columna not in columnas]
+            if faltantes:
+                problemas.append(f"{procedimiento} no devuelve: {', '.join(faltantes)}")
+        return problemas
+
+    def verificar(self, pool):
+        """
+        Compara la marca de sys.objects con la guardada. Si coincide no hace nada
+        más; si no, recalcula la huella y solo si cambió valida el esquema completo
+        y guarda los metadatos nuevos. Devuelve el estado resultante.
+        """
+        inicio = time.perf_counter()
+        with pool.conexion() as conexion, conexion.cursor() as micursor:
+            micursor.execute(CONSULTA_MARCA)
+            marca = list(micursor.fetchone())
+
+            guardados = self._metadatos
+            if guardados and guardados.get('marca') == marca:
+                estado = 'sin cambios'
+                problemas = guardados.get('problemas', [])
+            else:
+                metadatos = self._leer_metadatos(micursor)
+                if guardados and guardados.get('huella') == metadatos['huella']:
+                    # Cambió otro objeto de la base: basta con renovar la marca
+                    estado = 'huella igual'
+                    problemas = guardados.get('problemas', [])
+                else:
+                    estado = 'actualizada'
+                    problemas = self.validar(metadatos)
+                metadatos.update({'marca': marca, 'problemas': problemas,
+                                  'generada': datetime.now().isoformat(timespec='seconds')})
+                self._guardar_archivo(metadatos)
+                guardados = metadatos
+
+        with self._candado:
+            self._metadatos = guardados
+            self.problemas = problemas
+            self.estado = estado
+        self.segundos = time.perf_counter() - inicio
+        return estado
+
+    def verificar_en_segundo_plano(self, pool):
+        """
+        Ejecuta verificar() en un hilo daemon para no demorar el arranque y
+        devuelve el hilo. El hilo no imprime nada: quien lo lanzó consulta estado
+        y problemas cuando termina. Si falla, el error queda en error y se siguen
+        usando los metadatos guardados.
+        """
+        def verificar_seguro():
+            try:
+                self.verificar(pool)
+            except Exception as e:
+                self.error = e
+                self.estado = 'error'
+
+        hilo = threading.Thread(target=verificar_seguro, name='verificar-esquema', daemon=True)
+        hilo.start()
+        return hilo
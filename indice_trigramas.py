@@ -0,0 +1,164 @@
+"""
+ÍNDICE DE TRIGRAMAS PARA BÚSQUEDA DE ALUMNOS POR NOMBRE
+Búsqueda por subcadena sin LIKE con comodín inicial
+
+@author Arias Javier, Andrade Eduardo, Guevara Galo
+@date 2025
+
+Descripción:
+Clase IndiceTrigramas: índice invertido en memoria que asocia cada trigrama
+(secuencia de 3 caracteres) de nombre y apellido con los id_alumno que lo
+contienen. Una búsqueda intersecta las listas de sus trigramas y verifica
+los candidatos, sin recorrer la tabla. El texto se normaliza sin tildes ni
+mayúsculas, de modo que "jose" encuentra a "José" y "munoz" a "Muñoz".
+El índice se mantiene al día con los bloques de sp_ObtenerCambiosAlumnos
+(altas, cambios y bajas desde una marca de agua de version_fila).
+"""
+
+import threading
+import unicodedata
+
+
+TAMANO_NGRAMA = 3
+
+# Marca de agua de un índice vacío (version_fila es BINARY(8))
+MARCA_INICIAL = bytes(8)
+
+
+def normalizar_texto(texto):
+    """
+    Convierte el texto a minúsculas, sin tildes ni diacríticos y con
+    espacios simples. La ñ se trata como n, igual que las vocales acentuadas.
+    """
+    if not texto:
+        return ''
+    descompuesto = unicodedata.normalize('NFKD', texto)
+    sin_marcas = ''.join(c for c in descompuesto if not unicodedata.combining(c))
+    return ' '.join(sin_marcas.casefold().split())
+
+
+def obtener_trigramas(texto_normalizado):
+    """
+    Devuelve el conjunto de trigramas de un texto ya normalizado.
+    """
+    return {texto_normalizado[i:i + TAMANO_NGRAMA]
+            for i in range(len(texto_normalizado) - TAMANO_NGRAMA + 1)}
+
+
+class IndiceTrigramas:
+    """
+    Índice invertido de trigramas sobre nombre y apellido de alumnos.
+
+    Atributos:
+        construido: Indica si el índice ya se cargó completo desde la base
+        marca: version_fila hasta la que se aplicaron los cambios (para refrescos incrementales)
+    """
+
+    def __init__(self):
+        # trigrama -> conjunto de id_alumno
+        self._listas = {}
+        # id_alumno -> (nombre_normalizado, apellido_normalizado)
+        self._textos = {}
+        self._candado = threading.RLock()
+        self.construido = False
+        self.marca = MARCA_INICIAL
+
+    def __len__(self):
+        return len(self._textos)
+
+    # ==================== MANTENIMIENTO ====================
+    def agregar(self, id_alumno, nombre, apellido):
+        """
+        Indexa (o reindexa) un alumno con su nombre y apellido.
+        """
+        textos = (normalizar_texto(nombre), normalizar_texto(apellido))
+        with self._candado:
+            if id_alumno in self._textos:
+                self._quitar_listas(id_alumno)
+            self._textos[id_alumno] = textos
+            for trigrama in obtener_trigramas(textos[0]) | obtener_trigramas(textos[1]):
+                self._listas.setdefault(trigrama, set()).add(id_alumno)
+
+    def eliminar(self, id_alumno):
+        """
+        Quita un alumno del índice.
+        """
+        with self._candado:
+            if id_alumno in self._textos:
+                self._quitar_listas(id_alumno)
+                del self._textos[id_alumno]
+
+    def _quitar_listas(self, id_alumno):
+        """
+        Retira el id de las listas de sus trigramas. Requiere el candado tomado.
+        """
+        nombre, apellido = self._textos[id_alumno]
+        for trigrama in obtener_trigramas(nombre) | obtener_trigramas(apellido):
+            lista = self._listas.get(trigrama)
+            if lista is not None:
+                lista.discard(id_alumno)
+                if not lista:
+                    del self._listas[trigrama]
+
+    def aplicar_cambios(self, marca, alumnos, eliminados):
+        """
+        Aplica un bloque de sp_ObtenerCambiosAlumnos: quita los IDs eliminados,
+        reindexa los alumnos (filas con id_alumno, nombre y apellido en las
+        posiciones 0, 1 y 2) y avanza la marca de agua.
+        """
+        with self._candado:
+            # Primero las bajas: un ID reutilizado después de eliminarse llega como alta
+            for id_alumno in eliminados:
+                self.eliminar(id_alumno)
+            for registro in alumnos:
+                self.agregar(registro[0], registro[1], registro[2])
+            self.marca = marca
+
+    def reconstruir(self, bloques):
+        """
+        Reemplaza el contenido del índice con los bloques (marca, alumnos, eliminados)
+        de sp_ObtenerCambiosAlumnos leídos desde MARCA_INICIAL.
+        """
+        # Se construye aparte para no bloquear las búsquedas mientras se leen los bloques
+        nuevo = IndiceTrigramas()
+        for marca, alumnos, eliminados in bloques:
+            nuevo.aplicar_cambios(marca, alumnos, eliminados)
+
+        with self._candado:
+            self._listas = nuevo._listas
+            self._textos = nuevo._textos
+            self.marca = nuevo.marca
+            self.construido = True
+
+    # ==================== BÚSQUEDA ====================
+    def buscar(self, termino):
+        """
+        Devuelve los id_alumno cuyo nombre o apellido contienen el término,
+        sin distinguir mayúsculas ni tildes.
+        """
+        termino = normalizar_texto(termino)
+        if not termino:
+            return []
+
+        with self._candado:
+            if len(termino) < TAMANO_NGRAMA:
+                # Términos muy cortos no tienen trigramas: se revisan los textos
+                candidatos = self._textos.keys()
+            else:
+                # Intersectar empezando por la lista más corta
+                listas = []
+                for trigrama in obtener_trigramas(termino):
+                    lista = self._listas.get(trigrama)
+                    if not lista:
+                        return []
+                    listas.append(lista)
+                listas.sort(key=len)
+                candidatos = set(listas[0])
+                for lista in listas[1:]:
+                    candidatos &= lista
+                    if not candidatos:
+                        return []
+
+            # Verificar: los trigramas pueden coincidir en otro orden
+            return [id_alumno for id_alumno in candidatos
+                    if termino in self._textos[id_alumno][0] or termino in self._textos[id_alumno][1]]
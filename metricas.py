@@ -0,0 +1,408 @@
+"""
+MÉTRICAS DE LATENCIA Y ROUND TRIPS
+Instrumentación de cursores y métodos de los gestores CRUD
+
+@author Arias Javier, Andrade Eduardo, Guevara Galo
+@date 2025
+
+Descripción:
+RegistroMetricas acumula, por Store Procedure y por método del gestor, un
+histograma de latencia (p50/p95/p99), la cantidad de round trips, filas y
+bytes devueltos y los errores. ConexionInstrumentada y CursorInstrumentado
+envuelven los objetos de pyodbc para medir cada llamada; los round trips,
+filas y bytes se suman también a los métodos del gestor que están en curso
+en el hilo (marcados por medir_operacion). Las métricas se
+exportan en formato de texto de Prometheus o como instantánea JSON.
+
+Cuando las métricas están deshabilitadas el pool entrega las conexiones sin
+envolver y el decorador medir_operacion solo hace una comprobación booleana.
+"""
+
+import bisect
+import functools
+import json
+import re
+import threading
+import time
+from datetime import datetime
+
+
+# Límites superiores (segundos) de los buckets del histograma
+LIMITES_LATENCIA = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+# EXEC sp_X / EXECUTE dbo.sp_X / {CALL dbo.sp_X (?)}
+PATRON_PROCEDIMIENTO = re.compile(
+    r'^\s*(?:EXEC(?:UTE)?\s+|\{\s*CALL\s+)(?:\[?dbo\]?\.)?\[?(\w+)', re.IGNORECASE)
+
+
+def nombre_procedimiento(sql):
+    """
+    Extrae el nombre del Store Procedure de una sentencia, o 'sql_directo'
+    si la sentencia no es una llamada a procedimiento.
+    """
+    coincidencia = PATRON_PROCEDIMIENTO.match(sql)
+    return coincidencia.group(1) if coincidencia else 'sql_directo'
+
+
+def estimar_bytes(fila):
+    """
+    Estima el tamaño en bytes de los valores de una fila tal como viajan por la red.
+    """
+    total = 0
+    for valor in fila:
+        if valor is None:
+            continue
+        if isinstance(valor, (str, bytes, bytearray)):
+            total += len(valor)
+        else:
+            # Números y fechas viajan en tamaño fijo
+            total += 8
+    return total
+
+
+class HistogramaLatencia:
+    """
+    Histograma acumulativo de latencias con buckets fijos.
+    """
+
+    def __init__(self, limites=LIMITES_LATENCIA):
+        self.limites = limites
+        # Un bucket extra para valores por encima del último límite (+Inf)
+        self.conteos = [0] * (len(limites) + 1)
+        self.cantidad = 0
+        self.suma = 0.0
+        self.maximo = 0.0
+
+    def observar(self, segundos):
+        self.conteos[bisect.bisect_left(self.limites, segundos)] += 1
+        self.cantidad += 1
+        self.suma += segundos
+        if segundos > self.maximo:
+            self.maximo = segundos
+
+    def percentil(self, p):
+        """
+        Estima el percentil p (0-100) interpolando dentro del bucket correspondiente.
+        """
+        if self.cantidad == 0:
+            return 0.0
+        objetivo = self.cantidad * p / 100.0
+        acumulado = 0
+        for indice, conteo in enumerate(self.conteos):
+            if conteo and acumulado + conteo >= objetivo:
+                inferior = self.limites[indice - 1] if indice > 0 else 0.0
+                superior = self.limites[indice] if indice < len(self.limites) else self.maximo
+                fraccion = (objetivo - acumulado) / conteo
+                return min(inferior + (superior - inferior) * fraccion, self.maximo)
+            acumulado += conteo
+        return self.maximo
+
+
+class EstadisticaOperacion:
+    """
+    Contadores de un Store Procedure o de un método del gestor.
+    """
+
+    def __init__(self):
+        self.latencia = HistogramaLatencia()
+        self.round_trips = 0
+        self.filas = 0
+        self.bytes = 0
+        self.errores = 0
+
+    def como_diccionario(self):
+        return {
+            'llamadas': self.latencia.cantidad,
+            'round_trips': self.round_trips,
+            'filas': self.filas,
+            'bytes': self.bytes,
+            'errores': self.errores,
+            'latencia_total_s': self.latencia.suma,
+            'latencia_p50_ms': self.latencia.percentil(50) * 1000,
+            'latencia_p95_ms': self.latencia.percentil(95) * 1000,
+            'latencia_p99_ms': self.latencia.percentil(99) * 1000,
+            'latencia_max_ms': self.latencia.maximo * 1000,
+        }
+
+
+class RegistroMetricas:
+    """
+    Registro de métricas seguro entre hilos.
+
+    Atributos:
+        habilitado: Si es False no se registra nada
+    """
+
+    def __init__(self, habilitado=True):
+        self.habilitado = habilitado
+        self._procedimientos = {}
+        self._operaciones = {}
+        self._candado = threading.Lock()
+        # Pila de métodos del gestor en curso, propia de cada hilo
+        self._local = threading.local()
+
+    def _estadistica(self, tabla, nombre):
+        estadistica = tabla.get(nombre)
+        if estadistica is None:
+            estadistica = tabla[nombre] = EstadisticaOperacion()
+        return estadistica
+
+    def _metodos_en_curso(self):
+        """
+        Estadísticas de los métodos en curso en este hilo, sin repetir (un método
+        que se llama a sí mismo cuenta una vez). Requiere el candado tomado.
+        """
+        metodos = getattr(self._local, 'metodos', None)
+        if not metodos:
+            return ()
+        return [self._estadistica(self._operaciones, metodo) for metodo in dict.fromkeys(metodos)]
+
+    # ==================== MÉTODOS EN CURSO ====================
+    def iniciar_operacion(self, metodo):
+        """
+        Marca el método como en curso en este hilo: los round trips, filas y
+        bytes registrados hasta terminar_operacion() se le suman también a él
+        (y a los métodos que lo llamaron).
+        """
+        metodos = getattr(self._local, 'metodos', None)
+        if metodos is None:
+            metodos = self._local.metodos = []
+        metodos.append(metodo)
+
+    def terminar_operacion(self):
+        """
+        Quita el último método marcado con iniciar_operacion().
+        """
+        self._local.metodos.pop()
+
+    # ==================== REGISTRO ====================
+    def registrar_llamada(self, procedimiento, segundos, error=False):
+        """
+        Registra un round trip (execute) a un Store Procedure.
+        """
+        with self._candado:
+            estadistica = self._estadistica(self._procedimientos, procedimiento)
+            estadistica.latencia.observar(segundos)
+            estadistica.round_trips += 1
+            if error:
+                estadistica.errores += 1
+            # Los errores del método los registra registrar_operacion si llegan a él
+            for operacion in self._metodos_en_curso():
+                operacion.round_trips += 1
+
+    def registrar_filas(self, procedimiento, filas, cantidad_bytes):
+        """
+        Registra filas y bytes leídos del resultado de un Store Procedure.
+        """
+        with self._candado:
+            for estadistica in [self._estadistica(self._procedimientos, procedimiento)] + list(self._metodos_en_curso()):
+                estadistica.filas += filas
+                estadistica.bytes += cantidad_bytes
+
+    def registrar_operacion(self, metodo, segundos, error=False):
+        """
+        Registra la ejecución completa de un método del gestor.
+        """
+        with self._candado:
+            estadistica = self._estadistica(self._operaciones, metodo)
+            estadistica.latencia.observar(segundos)
+            if error:
+                estadistica.errores += 1
+
+    def reiniciar(self):
+        with self._candado:
+            self._procedimientos = {}
+            self._operaciones = {}
+
+    # ==================== EXPORTACIÓN ====================
+    def instantanea(self):
+        """
+        Devuelve un diccionario serializable con todas las métricas.
+        """
+        with self._candado:
+            return {
+                'generado_en': datetime.now().isoformat(timespec='seconds'),
+                'procedimientos': {nombre: e.como_diccionario() for nombre, e in self._procedimientos.items()},
+                'operaciones': {nombre: e.como_diccionario() for nombre, e in self._operaciones.items()},
+            }
+
+    def guardar_json(self, ruta):
+        """
+        Escribe la instantánea de métricas en un archivo JSON.
+        """
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            json.dump(self.instantanea(), archivo, indent=2, ensure_ascii=False)
+
+    def exportar_prometheus(self):
+        """
+        Devuelve las métricas en el formato de texto de exposición de Prometheus.
+        """
+        lineas = []
+        with self._candado:
+            for prefijo, etiqueta, tabla in (
+                    ('catequesis_sp', 'procedimiento', self._procedimientos),
+                    ('catequesis_operacion', 'metodo', self._operaciones)):
+                if not tabla:
+                    continue
+
+                lineas.append(f"# HELP {prefijo}_latencia_segundos Latencia por {etiqueta}")
+                lineas.append(f"# TYPE {prefijo}_latencia_segundos histogram")
+                for nombre, estadistica in sorted(tabla.items()):
+                    histograma = estadistica.latencia
+                    acumulado = 0
+                    for limite, conteo in zip(histograma.limites, histograma.conteos):
+                        acumulado += conteo
+                        lineas.append(f'{prefijo}_latencia_segundos_bucket{{{etiqueta}="{nombre}",le="{limite}"}} {acumulado}')
+                    lineas.append(f'{prefijo}_latencia_segundos_bucket{{{etiqueta}="{nombre}",le="+Inf"}} {histograma.cantidad}')
+                    lineas.append(f'{prefijo}_latencia_segundos_sum{{{etiqueta}="{nombre}"}} {histograma.suma}')
+                    lineas.append(f'{prefijo}_latencia_segundos_count{{{etiqueta}="{nombre}"}} {histograma.cantidad}')
+
+                contadores = [
+                    ('round_trips_total', 'round_trips', 'Round trips al servidor'),
+                    ('filas_total', 'filas', 'Filas devueltas'),
+                    ('bytes_total', 'bytes', 'Bytes leídos (estimados)'),
+                    ('errores_total', 'errores', 'Errores'),
+                ]
+
+                for sufijo, atributo, descripcion in contadores:
+                    lineas.append(f"# HELP {prefijo}_{sufijo} {descripcion} por {etiqueta}")
+                    lineas.append(f"# TYPE {prefijo}_{sufijo} counter")
+                    for nombre, estadistica in sorted(tabla.items()):
+                        lineas.append(f'{prefijo}_{sufijo}{{{etiqueta}="{nombre}"}} {getattr(estadistica, atributo)}')
+
+        return '\n'.join(lineas) + '\n'
+
+
+# ==================== ENVOLTORIOS DE PYODBC ====================
+class CursorInstrumentado:
+    """
+    Envuelve un cursor de pyodbc y registra latencia, filas, bytes y errores
+    de cada execute. El resto de atributos se delegan al cursor original.
+    """
+
+    def __init__(self, cursor, metricas):
+        self._cursor = cursor
+        self._metricas = metricas
+        self._procedimiento = 'sql_directo'
+
+    def execute(self, sql, *parametros):
+        self._procedimiento = nombre_procedimiento(sql)
+        inicio = time.perf_counter()
+        try:
+            self._cursor.execute(sql, *parametros)
+        except Exception:
+            self._metricas.registrar_llamada(self._procedimiento, time.perf_counter() - inicio, error=True)
+            raise
+        self._metricas.registrar_llamada(self._procedimiento, time.perf_counter() - inicio)
+        return self
+
+    def executemany(self, sql, secuencia):
+        self._procedimiento = nombre_procedimiento(sql)
+        inicio = time.perf_counter()
+        try:
+            self._cursor.executemany(sql, secuencia)
+        except Exception:
+            self._metricas.registrar_llamada(self._procedimiento, time.perf_counter() - inicio, error=True)
+            raise
+        self._metricas.registrar_llamada(self._procedimiento, time.perf_counter() - inicio)
+
+    def _contar(self, filas):
+        self._metricas.registrar_filas(
+            self._procedimiento, len(filas), sum(estimar_bytes(fila) for fila in filas))
+        return filas
+
+    def fetchone(self):
+        fila = self._cursor.fetchone()
+        if fila is not None:
+            self._metricas.registrar_filas(self._procedimiento, 1, estimar_bytes(fila))
+        return fila
+
+    def fetchmany(self, tamano=None):
+        filas = self._cursor.fetchmany(tamano) if tamano is not None else self._cursor.fetchmany()
+        return self._contar(filas)
+
+    def fetchall(self):
+        return self._contar(self._cursor.fetchall())
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        fila = self.fetchone()
+        if fila is None:
+            raise StopIteration
+        return fila
+
+    def __enter__(self):
+        self._cursor.__enter__()
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        return self._cursor.__exit__(tipo, valor, traza)
+
+    def __getattr__(self, nombre):
+        return getattr(self._cursor, nombre)
+
+
+class ConexionInstrumentada:
+    """
+    Envuelve una conexión de pyodbc para que sus cursores queden instrumentados.
+    """
+
+    def __init__(self, conexion, metricas):
+        self._conexion = conexion
+        self._metricas = metricas
+
+    def cursor(self):
+        return CursorInstrumentado(self._conexion.cursor(), self._metricas)
+
+    def envolver_cursor(self, cursor):
+        """
+        Instrumenta un cursor creado sobre la conexión física (ver RegistroSentencias),
+        aplicando antes los envoltorios interiores.
+        """
+        interior = getattr(self._conexion, 'envolver_cursor', None)
+        return CursorInstrumentado(interior(cursor) if interior is not None else cursor, self._metricas)
+
+    @property
+    def fisica(self):
+        """
+        Conexión de pyodbc debajo de todos los envoltorios.
+        """
+        return getattr(self._conexion, 'fisica', self._conexion)
+
+    def __getattr__(self, nombre):
+        return getattr(self._conexion, nombre)
+
+
+def medir_operacion(metodo):
+    """
+    Decorador para métodos del gestor: registra la latencia y los errores del
+    método en self.metricas y lo marca como en curso para que los round trips,
+    filas y bytes de sus cursores también se le sumen. Si las métricas están
+    deshabilitadas solo llama al método.
+    """
+    nombre = metodo.__name__
+
+    @functools.wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        metricas = self.metricas
+        if metricas is None or not metricas.habilitado:
+            return metodo(self, *args, **kwargs)
+
+        inicio = time.perf_counter()
+        metricas.iniciar_operacion(nombre)
+        try:
+            resultado = metodo(self, *args, **kwargs)
+        except Exception:
+            metricas.registrar_operacion(nombre, time.perf_counter() - inicio, error=True)
+            raise
+        finally:
+            metricas.terminar_operacion()
+        metricas.registrar_operacion(nombre, time.perf_counter() - inicio)
+        return resultado
+
+    return envoltura
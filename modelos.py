@@ -0,0 +1,342 @@
+"""
+MODELOS COMPACTOS DE RESULTADOS
+Registros con __slots__ y lotes columnares para resultados grandes
+
+@author Arias Javier, Andrade Eduardo, Guevara Galo
+@date 2025
+
+Descripción:
+Clases Alumno y Estudiante: registros con __slots__ (sin diccionario por
+instancia) con acceso por nombre (alumno.nombre) y también por posición,
+para que sirvan donde antes se usaba una pyodbc.Row. Clase LoteColumnar:
+guarda un resultado completo con una lista por columna en lugar de un
+objeto por fila; los enteros no nulos van en un array('q') y los valores
+que se repiten mucho (lugar de nacimiento, nombres, fechas) se internan,
+de modo que todas las filas comparten el mismo objeto. Los registros se
+arman recién al recorrer el lote. Incluye un benchmark de memoria.
+
+Uso del benchmark:
+    python modelos.py                          (1.000.000 de filas sintéticas)
+    python modelos.py --filas 200000 --servidor
+"""
+
+import argparse
+import gc
+import random
+import tracemalloc
+from array import array
+from datetime import date
+
+import pyodbc
+
+from configuracion import cargar_configuracion, construir_connection_string
+from huella_esquema import COLUMNAS_ALUMNO, mapa_posiciones
+
+
+COLUMNAS_ESTUDIANTE = ('id_estudiante', 'nombre', 'apellido', 'email', 'telefono')
+
+# Columnas de Alumno con pocos valores distintos: se internan en el lote columnar
+INTERNAR_ALUMNO = ('nombre', 'apellido', 'fecha_nacimiento', 'lugar_nacimiento', 'info_escolar')
+
+
+def _indices(campos, posiciones):
+    """
+    Posición en la fila de cada campo según el mapa de posiciones
+    (None si el resultado no trae esa columna).
+    """
+    if posiciones is None:
+        return tuple(range(len(campos)))
+    return tuple(getattr(posiciones, campo, None) for campo in campos)
+
+
+def _valores(fila, indices):
+    largo = len(fila)
+    return [fila[indice] if indice is not None and indice < largo else None for indice in indices]
+
+
+class RegistroCompacto:
+    """
+    Base de los registros con __slots__. Las subclases declaran CAMPOS y los
+    mismos nombres en __slots__. Los campos no indicados quedan en None (por
+    ejemplo version_fila en el listado, que no la devuelve).
+    """
+
+    __slots__ = ()
+    CAMPOS = ()
+
+    def __init__(self, *valores):
+        if len(valores) > len(self.CAMPOS):
+            raise TypeError(f"{type(self).__name__} recibe como máximo {len(self.CAMPOS)} valores")
+        for campo, valor in zip(self.CAMPOS, valores):
+            setattr(self, campo, valor)
+        for campo in self.CAMPOS[len(valores):]:
+            setattr(self, campo, None)
+
+    @classmethod
+    def desde_fila(cls, fila, posiciones=None):
+        """
+        Arma el registro con una fila de pyodbc (o tupla) leyendo cada columna
+        con el mapa de posiciones de la huella del esquema. Sin mapa, la fila
+        debe venir en el orden de CAMPOS.
+        """
+        return cls(*_valores(fila, _indices(cls.CAMPOS, posiciones)))
+
+    @classmethod
+    def desde_filas(cls, filas, posiciones=None):
+        """
+        Generador de registros a partir de un iterador de filas. El mapa de
+        posiciones se resuelve una sola vez.
+        """
+        indices = _indices(cls.CAMPOS, posiciones)
+        for fila in filas:
+            yield cls(*_valores(fila, indices))
+
+    # ==================== ACCESO COMO FILA ====================
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return tuple(getattr(self, campo) for campo in self.CAMPOS[indice])
+        return getattr(self, self.CAMPOS[indice])
+
+    def __len__(self):
+        return len(self.CAMPOS)
+
+    def __iter__(self):
+        return (getattr(self, campo) for campo in self.CAMPOS)
+
+    def __eq__(self, otro):
+        if type(otro) is not type(self):
+            return NotImplemented
+        return tuple(self) == tuple(otro)
+
+    __hash__ = None
+
+    def __repr__(self):
+        campos = ', '.join(f"{campo}={getattr(self, campo)!r}" for campo in self.CAMPOS)
+        return f"{type(self).__name__}({campos})"
+
+    def como_diccionario(self):
+        return {campo: getattr(self, campo) for campo in self.CAMPOS}
+
+
+class Alumno(RegistroCompacto):
+    """
+    Alumno con las columnas de sp_ObtenerAlumnoPorID. POS tiene la posición de
+    cada campo para usar con Columna de presentacion.py.
+    """
+
+    __slots__ = COLUMNAS_ALUMNO
+    CAMPOS = COLUMNAS_ALUMNO
+    POS = mapa_posiciones(COLUMNAS_ALUMNO)
+
+
+class Estudiante(RegistroCompacto):
+    """
+    Estudiante con las columnas de la consulta de 01-EjercicioEnClase_OOP.py.
+    """
+
+    __slots__ = COLUMNAS_ESTUDIANTE
+    CAMPOS = COLUMNAS_ESTUDIANTE
+    POS = mapa_posiciones(COLUMNAS_ESTUDIANTE)
+
+
+class LoteColumnar:
+    """
+    Resultado completo guardado por columnas.
+
+    Atributos:
+        tipo: Clase de registro (Alumno, Estudiante) que define las columnas
+        internar: Columnas cuyos valores repetidos se guardan una sola vez
+        enteros: Columnas enteras sin nulos guardadas en array('q') (8 bytes por valor)
+    """
+
+    def __init__(self, tipo, internar=(), enteros=()):
+        self.tipo = tipo
+        self.internar = tuple(internar)
+        self.enteros = tuple(enteros)
+        self._columnas = [array('q') if campo in self.enteros else [] for campo in tipo.CAMPOS]
+        # Un diccionario por columna internada: valor -> primer objeto visto.
+        # No se usa sys.intern para que la memoria se libere junto con el lote
+        self._internados = [{} if campo in self.internar else None for campo in tipo.CAMPOS]
+
+    # ==================== CARGA ====================
+    def agregar(self, valores):
+        """
+        Agrega una fila con los valores en el orden de tipo.CAMPOS.
+        """
+        for columna, internados, valor in zip(self._columnas, self._internados, valores):
+            if internados is not None and valor is not None:
+                valor = internados.setdefault(valor, valor)
+            columna.append(valor)
+        # Columnas que la fila no trae (por ejemplo version_fila en el listado)
+        for columna in self._columnas[len(valores):]:
+            columna.append(None)
+
+    def extender(self, filas, posiciones=None):
+        """
+        Agrega las filas de un iterador (pyodbc, tuplas o registros) leyendo
+        cada columna con el mapa de posiciones. Devuelve el lote.
+        """
+        indices = _indices(self.tipo.CAMPOS, posiciones)
+        for fila in filas:
+            self.agregar(_valores(fila, indices))
+        return self
+
+    def compactar(self):
+        """
+        Libera los diccionarios de internado cuando el lote ya no va a crecer.
+        Las filas agregadas después ya no se internan y estadisticas() ya no
+        informa valores internados.
+        """
+        self._internados = [None] * len(self._columnas)
+
+    # ==================== LECTURA ====================
+    def __len__(self):
+        return len(self._columnas[0]) if self._columnas else 0
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self.tipo(*valores) for valores in zip(*(columna[indice] for columna in self._columnas))]
+        return self.tipo(*(columna[indice] for columna in self._columnas))
+
+    def __iter__(self):
+        # Los registros se arman al recorrer y no quedan guardados en el lote
+        for valores in zip(*self._columnas):
+            yield self.tipo(*valores)
+
+    def columna(self, nombre):
+        """
+        Devuelve la secuencia de valores de una columna (sin copiarla).
+        """
+        return self._columnas[self.tipo.CAMPOS.index(nombre)]
+
+    def estadisticas(self):
+        """
+        Devuelve las filas del lote y los valores distintos de cada columna internada.
+        """
+        return {
+            'filas': len(self),
+            'valores_internados': {campo: len(internados)
+                                   for campo, internados in zip(self.tipo.CAMPOS, self._internados)
+                                   if internados is not None},
+        }
+
+
+def crear_lote_alumnos():
+    """
+    Lote columnar vacío para alumnos: id_alumno en array y las columnas de
+    INTERNAR_ALUMNO internadas.
+    """
+    return LoteColumnar(Alumno, internar=INTERNAR_ALUMNO, enteros=('id_alumno',))
+
+
+def crear_lote_estudiantes():
+    """
+    Lote columnar vacío para estudiantes, con nombre y apellido internados.
+    """
+    return LoteColumnar(Estudiante, internar=('nombre', 'apellido'), enteros=('id_estudiante',))
+
+
+# ==================== BENCHMARK DE MEMORIA ====================
+NOMBRES = ('Ana', 'Luis', 'María', 'José', 'Carmen', 'Pedro', 'Lucía', 'Jorge', 'Sofía', 'Diego')
+APELLIDOS = ('García', 'López', 'Pérez', 'Sánchez', 'Romero', 'Torres', 'Flores', 'Vega', 'Ruiz', 'Mora')
+LUGARES = ('Quito', 'Guayaquil', 'Cuenca', 'Ambato', 'Loja', 'Manta', 'Ibarra', 'Riobamba')
+
+
+def _nuevo(texto):
+    # Como el controlador, que decodifica cada valor en un objeto nuevo
+    return texto.encode('utf-8').decode('utf-8')
+
+
+def filas_sinteticas(filas, semilla=1):
+    """
+    Generador de filas con las 9 columnas de sp_ObtenerAlumnosPaginado.
+    Cada valor es un objeto nuevo, igual que al leer del servidor.
+    """
+    azar = random.Random(semilla)
+    for id_alumno in range(1, filas + 1):
+        yield (id_alumno, _nuevo(azar.choice(NOMBRES)), _nuevo(azar.choice(APELLIDOS)),
+               date(azar.randint(2010, 2018), azar.randint(1, 12), azar.randint(1, 28)),
+               _nuevo(azar.choice(LUGARES)), _nuevo(f"Calle {azar.randint(1, 500)} y Av. {id_alumno}"),
+               _nuevo(f"09{azar.randint(10000000, 99999999)}"), _nuevo(f"Nivel {azar.randint(1, 9)}"),
+               None)
+
+
+def filas_servidor(connection_string, filas, tamano_pagina=5000):
+    """
+    Generador con hasta 'filas' pyodbc.Row de sp_ObtenerAlumnosPaginado.
+    """
+    conexion = pyodbc.connect(connection_string)
+    try:
+        micursor = conexion.cursor()
+        ultimo_id = 0
+        leidas = 0
+        while leidas < filas:
+            tamano = min(tamano_pagina, filas - leidas)
+            micursor.execute("{CALL dbo.sp_ObtenerAlumnosPaginado (?, ?)}", (ultimo_id, tamano))
+            pagina = micursor.fetchall()
+            yield from pagina
+            leidas += len(pagina)
+            if len(pagina) < tamano:
+                return
+            ultimo_id = pagina[-1][0]
+    finally:
+        conexion.close()
+
+
+def _medir(construir):
+    """
+    Bytes que quedan asignados por el resultado de construir() y su cantidad de filas.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        resultado = construir()
+        gc.collect()
+        bytes_usados = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return bytes_usados, len(resultado)
+
+
+def ejecutar_benchmark(fuente, descripcion_filas="Lista de filas"):
+    """
+    Compara la memoria que ocupa el mismo resultado como lista de filas, como
+    lista de Alumno y como LoteColumnar. fuente() devuelve un iterador nuevo
+    en cada llamada para que ninguna forma comparta objetos con otra.
+    """
+    casos = (
+        (descripcion_filas, lambda: list(fuente())),
+        ("Lista de Alumno (__slots__)", lambda: list(Alumno.desde_filas(fuente()))),
+        ("LoteColumnar (internado)", lambda: crear_lote_alumnos().extender(fuente())),
+    )
+
+    print("\n--- BENCHMARK DE MEMORIA DE RESULTADOS ---")
+    print(f"{'Forma':<30} {'Filas':>10} {'MiB':>9} {'Bytes/fila':>11} {'Factor':>7}")
+    print("-" * 71)
+    referencia = None
+    for nombre, construir in casos:
+        bytes_usados, filas = _medir(construir)
+        referencia = referencia or bytes_usados
+        por_fila = bytes_usados / filas if filas else 0.0
+        factor = referencia / bytes_usados if bytes_usados else 0.0
+        print(f"{nombre:<30} {filas:>10} {bytes_usados / 1048576:>9.1f} {por_fila:>11.1f} {factor:>6.2f}x")
+    print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Memoria de un resultado grande: filas, registros con __slots__ y lote columnar")
+    parser.add_argument('--filas', type=int, default=1000000, help="Filas del resultado")
+    parser.add_argument('--servidor', action='store_true',
+                        help="Leer las filas de sp_ObtenerAlumnosPaginado en lugar de generarlas")
+    argumentos = parser.parse_args()
+
+    if argumentos.servidor:
+        try:
+            cadena = construir_connection_string(cargar_configuracion())
+            ejecutar_benchmark(lambda: filas_servidor(cadena, argumentos.filas), "Lista de pyodbc.Row")
+        except pyodbc.Error as e:
+            print(f"✗ Error de conexión: {e}")
+    else:
+        # Las tuplas son una cota inferior: una pyodbc.Row ocupa algo más
+        ejecutar_benchmark(lambda: filas_sinteticas(argumentos.filas), "Lista de tuplas")
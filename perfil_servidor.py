@@ -0,0 +1,283 @@
+"""
+PERFIL DE E/S Y CPU EN EL SERVIDOR
+Lecturas lógicas, CPU y tiempo transcurrido de cada Store Procedure
+
+@author Arias Javier, Andrade Eduardo, Guevara Galo
+@date 2025
+
+Descripción:
+ConexionPerfilada y CursorPerfilado anteponen SET STATISTICS IO, TIME ON a
+cada llamada (en el mismo lote, sin round trips extra) y leen los mensajes
+informativos que SQL Server devuelve junto a los resultados. Los mensajes se
+interpretan tanto en inglés como en español. PerfiladorServidor acumula los
+totales por procedimiento y escribe en un log JSONL las llamadas que superan
+el umbral de tiempo o de lecturas, con los parámetros redactados.
+"""
+
+import json
+import re
+import threading
+from datetime import datetime
+
+import pyodbc
+
+from metricas import nombre_procedimiento
+
+
+PREFIJO_ESTADISTICAS = "SET STATISTICS IO, TIME ON;\n"
+
+# Table 'Alumno'. Scan count 1, logical reads 3, physical reads 0, ...
+# Tabla 'Alumno'. Recuento de exámenes 1, lecturas lógicas 3, lecturas físicas 0, ...
+PATRON_TABLA = re.compile(r"(?:Table|Tabla) '([^']+)'\.")
+PATRON_LECTURAS_LOGICAS = re.compile(r"(?:logical reads|lecturas l[oó]gicas) (\d+)", re.IGNORECASE)
+PATRON_LECTURAS_FISICAS = re.compile(r"(?:physical reads|lecturas f[ií]sicas) (\d+)", re.IGNORECASE)
+
+# CPU time = 15 ms, elapsed time = 20 ms.
+# Tiempo de CPU = 15 ms, tiempo transcurrido = 20 ms.
+PATRON_TIEMPOS = re.compile(
+    r"(?:CPU time|tiempo de CPU) = (\d+) ms, (?:elapsed time|tiempo transcurrido) = (\d+) ms",
+    re.IGNORECASE)
+PATRON_COMPILACION = re.compile(r"parse and compile|an[aá]lisis y compilaci[oó]n", re.IGNORECASE)
+
+
+def redactar_parametros(parametros):
+    """
+    Sustituye cada parámetro por su tipo (y longitud en textos) para que el
+    log no contenga datos personales de los alumnos.
+    """
+    redactados = []
+    for valor in parametros:
+        if valor is None:
+            redactados.append(None)
+        elif isinstance(valor, (str, bytes, bytearray)):
+            redactados.append(f"<{type(valor).__name__}:{len(valor)}>")
+        else:
+            redactados.append(f"<{type(valor).__name__}>")
+    return redactados
+
+
+class LlamadaPerfilada:
+    """
+    Estadísticas del servidor de una llamada a Store Procedure.
+    """
+
+    def __init__(self, procedimiento, parametros):
+        self.procedimiento = procedimiento
+        self.parametros = parametros
+        self.lecturas_logicas = 0
+        self.lecturas_fisicas = 0
+        self.cpu_ms = 0
+        self.transcurrido_ms = 0
+        self.compilacion_ms = 0
+        # tabla -> lecturas lógicas
+        self.tablas = {}
+
+    def agregar_mensajes(self, mensajes):
+        """
+        Interpreta los mensajes informativos de cursor.messages.
+        """
+        for _, texto in mensajes or ():
+            tabla = PATRON_TABLA.search(texto)
+            if tabla:
+                logicas = PATRON_LECTURAS_LOGICAS.search(texto)
+                fisicas = PATRON_LECTURAS_FISICAS.search(texto)
+                cantidad = int(logicas.group(1)) if logicas else 0
+                self.lecturas_logicas += cantidad
+                self.lecturas_fisicas += int(fisicas.group(1)) if fisicas else 0
+                self.tablas[tabla.group(1)] = self.tablas.get(tabla.group(1), 0) + cantidad
+                continue
+
+            tiempos = PATRON_TIEMPOS.search(texto)
+            if tiempos:
+                cpu, transcurrido = int(tiempos.group(1)), int(tiempos.group(2))
+                if PATRON_COMPILACION.search(texto):
+                    self.compilacion_ms += transcurrido
+                else:
+                    # Cada sentencia del SP informa sus tiempos y al final se informa
+                    # el EXEC completo, que es el mayor: se conserva el máximo
+                    self.cpu_ms = max(self.cpu_ms, cpu)
+                    self.transcurrido_ms = max(self.transcurrido_ms, transcurrido)
+
+    def como_diccionario(self):
+        return {
+            'fecha': datetime.now().isoformat(timespec='milliseconds'),
+            'procedimiento': self.procedimiento,
+            'parametros': redactar_parametros(self.parametros),
+            'lecturas_logicas': self.lecturas_logicas,
+            'lecturas_fisicas': self.lecturas_fisicas,
+            'cpu_ms': self.cpu_ms,
+            'transcurrido_ms': self.transcurrido_ms,
+            'compilacion_ms': self.compilacion_ms,
+            'tablas': self.tablas,
+        }
+
+
+class PerfiladorServidor:
+    """
+    Acumula el perfil del servidor por Store Procedure y registra las llamadas lentas.
+
+    Atributos:
+        habilitado: Si es False las conexiones no se envuelven
+        archivo_lentas: Ruta del log JSONL de consultas lentas (None = no se escribe)
+        umbral_ms: Tiempo transcurrido en el servidor a partir del cual una llamada es lenta
+        umbral_lecturas: Lecturas lógicas a partir de las cuales una llamada es lenta (None = no aplica)
+    """
+
+    def __init__(self, habilitado=True, archivo_lentas='consultas_lentas.jsonl',
+                 umbral_ms=100.0, umbral_lecturas=None):
+        self.habilitado = habilitado
+        self.archivo_lentas = archivo_lentas
+        self.umbral_ms = umbral_ms
+        self.umbral_lecturas = umbral_lecturas
+        self._totales = {}
+        self._candado = threading.Lock()
+
+    def es_lenta(self, llamada):
+        if self.umbral_ms is not None and llamada.transcurrido_ms >= self.umbral_ms:
+            return True
+        return self.umbral_lecturas is not None and llamada.lecturas_logicas >= self.umbral_lecturas
+
+    def registrar(self, llamada):
+        """
+        Suma la llamada a los totales de su procedimiento y la escribe en el log si es lenta.
+        """
+        lenta = self.es_lenta(llamada)
+        with self._candado:
+            totales = self._totales.setdefault(llamada.procedimiento, {
+                'llamadas': 0, 'lentas': 0, 'lecturas_logicas': 0, 'lecturas_fisicas': 0,
+                'cpu_ms': 0, 'transcurrido_ms': 0, 'transcurrido_max_ms': 0,
+            })
+            totales['llamadas'] += 1
+            totales['lecturas_logicas'] += llamada.lecturas_logicas
+            totales['lecturas_fisicas'] += llamada.lecturas_fisicas
+            totales['cpu_ms'] += llamada.cpu_ms
+            totales['transcurrido_ms'] += llamada.transcurrido_ms
+            totales['transcurrido_max_ms'] = max(totales['transcurrido_max_ms'], llamada.transcurrido_ms)
+            if lenta:
+                totales['lentas'] += 1
+                if self.archivo_lentas:
+                    with open(self.archivo_lentas, 'a', encoding='utf-8') as archivo:
+                        archivo.write(json.dumps(llamada.como_diccionario(), ensure_ascii=False) + '\n')
+
+    def resumen(self):
+        """
+        Devuelve una copia de los totales por procedimiento.
+        """
+        with self._candado:
+            return {nombre: dict(totales) for nombre, totales in self._totales.items()}
+
+    def reiniciar(self):
+        with self._candado:
+            self._totales = {}
+
+
+# ==================== ENVOLTORIOS DE PYODBC ====================
+class CursorPerfilado:
+    """
+    Envuelve un cursor de pyodbc y captura las estadísticas del servidor de cada execute.
+    La llamada se cierra al agotar sus conjuntos de resultados, al ejecutar otra
+    sentencia o al cerrar el cursor; en ese momento se registra en el perfilador.
+    """
+
+    def __init__(self, cursor, perfilador):
+        self._cursor = cursor
+        self._perfilador = perfilador
+        self._llamada = None
+        self._mensajes_leidos = None
+
+    def _leer_mensajes(self):
+        # pyodbc reemplaza la lista en cada execute/nextset; la misma lista ya se leyó
+        mensajes = getattr(self._cursor, 'messages', None)
+        if self._llamada is not None and mensajes is not None and mensajes is not self._mensajes_leidos:
+            self._mensajes_leidos = mensajes
+            self._llamada.agregar_mensajes(mensajes)
+
+    def _finalizar(self, drenar=True):
+        """
+        Registra la llamada en curso. Con drenar=True recorre los conjuntos de
+        resultados restantes, porque los tiempos del EXEC llegan al final.
+        """
+        if self._llamada is None:
+            return
+        if drenar:
+            try:
+                while self._cursor.nextset():
+                    self._leer_mensajes()
+                self._leer_mensajes()
+            except pyodbc.Error:
+                pass
+        llamada, self._llamada = self._llamada, None
+        self._perfilador.registrar(llamada)
+
+    def execute(self, sql, *parametros):
+        self._finalizar()
+        self._llamada = LlamadaPerfilada(nombre_procedimiento(sql), parametros)
+        try:
+            self._cursor.execute(PREFIJO_ESTADISTICAS + sql, *parametros)
+        except Exception:
+            self._llamada = None
+            raise
+        self._leer_mensajes()
+        return self
+
+    def nextset(self):
+        hay_mas = self._cursor.nextset()
+        self._leer_mensajes()
+        if not hay_mas:
+            self._finalizar(drenar=False)
+        return hay_mas
+
+    def close(self):
+        self._finalizar()
+        self._cursor.close()
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        self._cursor.__enter__()
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        if tipo is None:
+            self._finalizar()
+        else:
+            self._llamada = None
+        return self._cursor.__exit__(tipo, valor, traza)
+
+    def __getattr__(self, nombre):
+        return getattr(self._cursor, nombre)
+
+
+class ConexionPerfilada:
+    """
+    Envuelve una conexión de pyodbc para que sus cursores capturen el perfil del servidor.
+    """
+
+    # El prefijo SET STATISTICS convierte la sentencia en un lote: {CALL} no sirve
+    requiere_texto = True
+
+    def __init__(self, conexion, perfilador):
+        self._conexion = conexion
+        self._perfilador = perfilador
+
+    def cursor(self):
+        return CursorPerfilado(self._conexion.cursor(), self._perfilador)
+
+    def envolver_cursor(self, cursor):
+        """
+        Perfila un cursor creado sobre la conexión física (ver RegistroSentencias),
+        aplicando antes los envoltorios interiores.
+        """
+        interior = getattr(self._conexion, 'envolver_cursor', None)
+        return CursorPerfilado(interior(cursor) if interior is not None else cursor, self._perfilador)
+
+    @property
+    def fisica(self):
+        """
+        Conexión de pyodbc debajo de todos los envoltorios.
+        """
+        return getattr(self._conexion, 'fisica', self._conexion)
+
+    def __getattr__(self, nombre):
+        return getattr(self._conexion, nombre)
@@ -0,0 +1,387 @@
+"""
+POOL DE CONEXIONES A SQL SERVER
+Conexiones reutilizables y seguras entre hilos para los gestores CRUD
+
+@author Arias Javier, Andrade Eduardo, Guevara Galo
+@date 2025
+
+Descripción:
+Clase PoolConexiones que mantiene un conjunto acotado de conexiones pyodbc
+abiertas. Los gestores toman prestada una conexión para cada operación y la
+devuelven al terminar, evitando un login TDS completo por operación y
+permitiendo atender solicitudes concurrentes.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+import pyodbc
+
+from reintentos import es_error_conexion
+
+
+class ErrorPoolAgotado(Exception):
+    """
+    Se lanza cuando no hay conexiones libres dentro del tiempo de espera.
+    """
+
+
+class PoolConexiones:
+    """
+    Pool acotado de conexiones a SQL Server.
+
+    Atributos:
+        connection_string: Cadena de conexión usada para abrir conexiones nuevas
+        tamano_minimo: Conexiones que se mantienen abiertas aunque estén ociosas
+        tamano_maximo: Límite de conexiones abiertas (libres + prestadas)
+        tiempo_espera: Segundos máximos para obtener una conexión libre
+        tiempo_ocioso: Segundos tras los cuales una conexión libre se cierra
+        intervalo_validacion: Segundos sin uso tras los cuales se valida con un ping
+        envoltorio: Función opcional que envuelve la conexión entregada por conexion()
+                    (por ejemplo para instrumentarla); None la entrega sin envolver
+        al_cerrar: Función opcional llamada con cada conexión física que se cierra
+                   (por ejemplo para descartar los cursores guardados de esa conexión)
+        al_devolver: Función opcional llamada con la conexión física al terminar el
+                     bloque de conexion(), antes de confirmar o revertir (por ejemplo
+                     para descartar resultados que quedaron sin leer)
+        error_precalentamiento: Último error al abrir conexiones en segundo plano (o None)
+    """
+
+    CONSULTA_VALIDACION = "SELECT 1"
+
+    def __init__(self, connection_string, tamano_minimo=1, tamano_maximo=10,
+                 tiempo_espera=30.0, tiempo_ocioso=300.0, intervalo_validacion=30.0,
+                 envoltorio=None, abrir_minimo=True, al_cerrar=None, al_devolver=None):
+        """
+        Crea el pool y abre las conexiones mínimas.
+        Con abrir_minimo=False no se conecta todavía: las conexiones se abren con
+        precalentar() o a medida que se piden.
+        """
+        if tamano_minimo < 0 or tamano_maximo < 1 or tamano_minimo > tamano_maximo:
+            raise ValueError("Tamaños de pool inválidos: se requiere 0 <= mínimo <= máximo y máximo >= 1")
+
+        self.connection_string = connection_string
+        self.tamano_minimo = tamano_minimo
+        self.tamano_maximo = tamano_maximo
+        self.tiempo_espera = tiempo_espera
+        self.tiempo_ocioso = tiempo_ocioso
+        self.intervalo_validacion = intervalo_validacion
+        self.envoltorio = envoltorio
+        self.al_cerrar = al_cerrar
+        self.al_devolver = al_devolver
+        self.error_precalentamiento = None
+
+        # Conexiones libres como pares (conexion, instante_de_devolucion)
+        self._libres = []
+        self._total_abiertas = 0
+        self._cerrado = False
+        self._condicion = threading.Condition(threading.Lock())
+
+        self._estadisticas = {
+            'prestamos': 0,
+            'devoluciones': 0,
+            'conexiones_creadas': 0,
+            'conexiones_cerradas': 0,
+            'desalojos_ociosas': 0,
+            'desalojos_invalidas': 0,
+            'esperas': 0,
+            'tiempos_agotados': 0,
+            'tiempo_espera_total': 0.0,
+            'tiempo_espera_maximo': 0.0,
+        }
+
+        if abrir_minimo:
+            self.precalentar()
+
+    # ==================== CICLO DE VIDA DE CONEXIONES ====================
+    def _abrir_conexion(self):
+        """
+        Abre una conexión física nueva a SQL Server.
+        """
+        conexion = pyodbc.connect(self.connection_string)
+        with self._condicion:
+            self._estadisticas['conexiones_creadas'] += 1
+        return conexion
+
+    def _cerrar_fisica(self, conexion):
+        """
+        Cierra una conexión física ignorando errores (puede estar rota).
+        """
+        if self.al_cerrar is not None:
+            try:
+                self.al_cerrar(conexion)
+            except Exception:
+                pass
+        try:
+            conexion.close()
+        except Exception:
+            pass
+        with self._condicion:
+            self._estadisticas['conexiones_cerradas'] += 1
+
+    def _es_valida(self, conexion):
+        """
+        Ejecuta la consulta de validación (ping) sobre la conexión.
+        """
+        try:
+            cursor = conexion.cursor()
+            try:
+                cursor.execute(self.CONSULTA_VALIDACION)
+                cursor.fetchone()
+            finally:
+                cursor.close()
+            return True
+        except pyodbc.Error:
+            return False
+
+    def _desalojar_ociosas(self, ahora):
+        """
+        Retira las conexiones libres que superaron el tiempo ocioso,
+        respetando el tamaño mínimo. Debe llamarse con el candado tomado.
+        Devuelve la lista de conexiones a cerrar fuera del candado.
+        """
+        a_cerrar = []
+        conservadas = []
+        # Las más antiguas están al inicio de la lista
+        for conexion, devuelta_en in self._libres:
+            excedente = self._total_abiertas - len(a_cerrar) > self.tamano_minimo
+            if excedente and ahora - devuelta_en >= self.tiempo_ocioso:
+                a_cerrar.append(conexion)
+            else:
+                conservadas.append((conexion, devuelta_en))
+        self._libres = conservadas
+        self._total_abiertas -= len(a_cerrar)
+        self._estadisticas['desalojos_ociosas'] += len(a_cerrar)
+        return a_cerrar
+
+    def precalentar(self):
+        """
+        Abre conexiones hasta completar el tamaño mínimo. Devuelve cuántas abrió.
+        """
+        abiertas = 0
+        while True:
+            with self._condicion:
+                if self._cerrado or self._total_abiertas >= self.tamano_minimo:
+                    return abiertas
+                # Reservar el lugar antes de conectar, fuera del candado
+                self._total_abiertas += 1
+
+            try:
+                conexion = self._abrir_conexion()
+            except Exception:
+                with self._condicion:
+                    self._total_abiertas -= 1
+                    self._condicion.notify()
+                raise
+
+            with self._condicion:
+                cerrado = self._cerrado
+                if cerrado:
+                    self._total_abiertas -= 1
+                else:
+                    self._libres.append((conexion, time.monotonic()))
+                    self._condicion.notify()
+            if cerrado:
+                # El pool se cerró mientras se conectaba
+                self._cerrar_fisica(conexion)
+                return abiertas
+            abiertas += 1
+
+    def precalentar_en_segundo_plano(self):
+        """
+        Ejecuta precalentar() en un hilo daemon para no bloquear el arranque.
+        Si falla, el error queda en error_precalentamiento y la primera
+        operación vuelve a intentar la conexión.
+        """
+        def precalentar_seguro():
+            try:
+                self.precalentar()
+            except Exception as e:
+                self.error_precalentamiento = e
+
+        hilo = threading.Thread(target=precalentar_seguro, name='precalentar-pool', daemon=True)
+        hilo.start()
+        return hilo
+
+    # ==================== PRÉSTAMO Y DEVOLUCIÓN ====================
+    def obtener(self, tiempo_espera=None):
+        """
+        Toma prestada una conexión del pool.
+        Si no hay libres y se alcanzó el máximo, espera hasta tiempo_espera segundos.
+        """
+        if tiempo_espera is None:
+            tiempo_espera = self.tiempo_espera
+
+        inicio = time.monotonic()
+        limite = inicio + tiempo_espera
+        espero = False
+
+        while True:
+            conexion = None
+            devuelta_en = None
+            crear = False
+
+            with self._condicion:
+                if self._cerrado:
+                    raise ErrorPoolAgotado("El pool de conexiones está cerrado")
+
+                a_cerrar = self._desalojar_ociosas(time.monotonic())
+
+                if self._libres:
+                    # LIFO: la conexión más reciente tiene menos riesgo de estar caída
+                    conexion, devuelta_en = self._libres.pop()
+                elif self._total_abiertas < self.tamano_maximo:
+                    self._total_abiertas += 1
+                    crear = True
+                else:
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        self._estadisticas['tiempos_agotados'] += 1
+                        self._registrar_espera(time.monotonic() - inicio, espero)
+                        raise ErrorPoolAgotado(
+                            f"No hay conexiones libres tras {tiempo_espera:.1f} s "
+                            f"(máximo {self.tamano_maximo})")
+                    espero = True
+                    self._condicion.wait(restante)
+
+            for obsoleta in a_cerrar:
+                self._cerrar_fisica(obsoleta)
+
+            if crear:
+                try:
+                    conexion = self._abrir_conexion()
+                except Exception:
+                    with self._condicion:
+                        self._total_abiertas -= 1
+                        self._condicion.notify()
+                    raise
+            elif conexion is not None:
+                # Validar solo las conexiones que llevan tiempo sin usarse
+                if time.monotonic() - devuelta_en >= self.intervalo_validacion and not self._es_valida(conexion):
+                    self._cerrar_fisica(conexion)
+                    with self._condicion:
+                        self._total_abiertas -= 1
+                        self._estadisticas['desalojos_invalidas'] += 1
+                    continue
+            else:
+                continue
+
+            with self._condicion:
+                self._estadisticas['prestamos'] += 1
+                self._registrar_espera(time.monotonic() - inicio, espero)
+            return conexion
+
+    def _registrar_espera(self, segundos, espero):
+        """
+        Acumula el tiempo de espera de un préstamo. Requiere el candado tomado.
+        """
+        if espero:
+            self._estadisticas['esperas'] += 1
+        self._estadisticas['tiempo_espera_total'] += segundos
+        if segundos > self._estadisticas['tiempo_espera_maximo']:
+            self._estadisticas['tiempo_espera_maximo'] = segundos
+
+    def devolver(self, conexion, descartar=False):
+        """
+        Devuelve una conexión al pool.
+        Si descartar es True (por ejemplo tras un error de red) se cierra.
+        """
+        with self._condicion:
+            self._estadisticas['devoluciones'] += 1
+            cerrar = descartar or self._cerrado
+            if cerrar:
+                self._total_abiertas -= 1
+            else:
+                self._libres.append((conexion, time.monotonic()))
+            self._condicion.notify()
+
+        if cerrar:
+            self._cerrar_fisica(conexion)
+
+    @contextmanager
+    def conexion(self, tiempo_espera=None):
+        """
+        Context manager que presta una conexión y la devuelve al salir.
+        Confirma la transacción si el bloque termina bien y la revierte si falla,
+        para que la siguiente operación reciba la conexión sin trabajo pendiente.
+        Si la conexión se perdió se descarta, junto con las libres, en lugar de devolverse.
+        """
+        conexion = self.obtener(tiempo_espera)
+        descartar = False
+        try:
+            yield self.envoltorio(conexion) if self.envoltorio is not None else conexion
+            self._terminar_uso(conexion)
+            conexion.commit()
+        except BaseException as e:
+            self._terminar_uso(conexion)
+            if es_error_conexion(e):
+                # La conexión se perdió (red, failover): tras un failover las
+                # conexiones libres también están rotas, se cierran todas
+                descartar = True
+                self.descartar_libres()
+            else:
+                try:
+                    conexion.rollback()
+                except pyodbc.Error:
+                    # Si ni siquiera se puede revertir, la conexión está rota
+                    descartar = True
+            raise
+        finally:
+            self.devolver(conexion, descartar=descartar)
+
+    def _terminar_uso(self, conexion):
+        """
+        Llama a al_devolver ignorando sus errores: si la conexión está rota, lo
+        decide el commit o el rollback que siguen.
+        """
+        if self.al_devolver is not None:
+            try:
+                self.al_devolver(conexion)
+            except Exception:
+                pass
+
+    def descartar_libres(self):
+        """
+        Cierra todas las conexiones libres para que las siguientes operaciones
+        abran conexiones nuevas. Se usa al detectar una pérdida de conexión.
+        """
+        with self._condicion:
+            libres = [conexion for conexion, _ in self._libres]
+            self._libres = []
+            self._total_abiertas -= len(libres)
+            self._estadisticas['desalojos_invalidas'] += len(libres)
+            self._condicion.notify_all()
+
+        for conexion in libres:
+            self._cerrar_fisica(conexion)
+
+    # ==================== ESTADÍSTICAS Y CIERRE ====================
+    def estadisticas(self):
+        """
+        Devuelve una copia de las estadísticas del pool.
+        """
+        with self._condicion:
+            datos = dict(self._estadisticas)
+            datos['abiertas'] = self._total_abiertas
+            datos['libres'] = len(self._libres)
+            datos['prestadas'] = self._total_abiertas - len(self._libres)
+            datos['tamano_minimo'] = self.tamano_minimo
+            datos['tamano_maximo'] = self.tamano_maximo
+        prestamos = datos['prestamos']
+        datos['tiempo_espera_promedio'] = datos['tiempo_espera_total'] / prestamos if prestamos else 0.0
+        return datos
+
+    def cerrar(self):
+        """
+        Cierra todas las conexiones libres. Las prestadas se cierran al devolverse.
+        """
+        with self._condicion:
+            self._cerrado = True
+            libres = [conexion for conexion, _ in self._libres]
+            self._total_abiertas -= len(libres)
+            self._libres = []
+            self._condicion.notify_all()
+
+        for conexion in libres:
+            self._cerrar_fisica(conexion)
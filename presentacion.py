@@ -0,0 +1,184 @@
+"""
+PRESENTACIÓN PAGINADA DE RESULTADOS EN LA TERMINAL
+Una escritura por página en lugar de un print() por fila
+
+@author Arias Javier, Andrade Eduardo, Guevara Galo
+@date 2025
+
+Descripción:
+Clase Paginador que toma las filas de un iterador (por ejemplo un generador
+que lee del servidor página por página), arma cada página completa en un
+búfer y la escribe con una sola llamada. En una terminal interactiva permite
+avanzar, retroceder y saltar a una página; solo se leen del iterador las
+filas de las páginas que se visitan. Si la salida se redirige a un archivo,
+se escriben todas las filas por bloques, sin preguntar. En modo de ancho
+automático el ancho de cada columna se calcula con las filas de la página.
+"""
+
+import shutil
+import sys
+from collections import namedtuple
+from itertools import islice
+
+
+# titulo: encabezado; posicion: índice en la fila; ancho: ancho fijo (sin ancho automático)
+Columna = namedtuple('Columna', ['titulo', 'posicion', 'ancho'])
+
+ANCHO_MAXIMO_COLUMNA = 40
+TAMANO_BLOQUE_NO_INTERACTIVO = 1000
+
+# Líneas de la terminal reservadas para título, encabezado, separador y pie
+LINEAS_RESERVADAS = 6
+
+
+def tamano_pagina_terminal(minimo=5):
+    """
+    Filas que caben en la terminal actual descontando encabezado y pie.
+    """
+    return max(minimo, shutil.get_terminal_size().lines - LINEAS_RESERVADAS)
+
+
+def _texto(valor):
+    return 'N/A' if valor is None or valor == '' else str(valor)
+
+
+class Paginador:
+    """
+    Muestra filas en páginas escritas de una sola vez.
+
+    Atributos:
+        columnas: Lista de Columna a mostrar
+        titulo: Línea que encabeza cada página (opcional)
+        tamano_pagina: Filas por página (por defecto, las que caben en la terminal)
+        ancho_automatico: Calcular el ancho de cada columna con las filas de la página
+        interactivo: Navegar con teclas (solo si entrada y salida son una terminal)
+        completo: Indica si la última ejecución leyó todas las filas del iterador
+    """
+
+    def __init__(self, columnas, titulo=None, tamano_pagina=None, salida=None,
+                 ancho_automatico=True, ancho_maximo=ANCHO_MAXIMO_COLUMNA, interactivo=None):
+        self.columnas = list(columnas)
+        self.titulo = titulo
+        self.salida = salida or sys.stdout
+        self.ancho_automatico = ancho_automatico
+        self.ancho_maximo = ancho_maximo
+        if interactivo is None:
+            interactivo = self.salida.isatty() and sys.stdin.isatty()
+        self.interactivo = interactivo
+        if tamano_pagina is None:
+            tamano_pagina = tamano_pagina_terminal() if interactivo else TAMANO_BLOQUE_NO_INTERACTIVO
+        self.tamano_pagina = tamano_pagina
+        self.completo = False
+
+    # ==================== FORMATO ====================
+    def _anchos(self, textos):
+        if not self.ancho_automatico:
+            return [columna.ancho for columna in self.columnas]
+        return [min(self.ancho_maximo, max([len(columna.titulo)] + [len(fila[indice]) for fila in textos]))
+                for indice, columna in enumerate(self.columnas)]
+
+    def formatear(self, filas, anchos=None, encabezado=True):
+        """
+        Devuelve el texto de las filas (con encabezado opcional) y los anchos usados.
+        El formato se arma una vez por página y los textos se truncan al ancho.
+        """
+        textos = [[_texto(fila[columna.posicion]) for columna in self.columnas] for fila in filas]
+        anchos = anchos or self._anchos(textos)
+        formato = ' '.join(f'{{:<{ancho}.{ancho}}}' for ancho in anchos)
+
+        lineas = []
+        if encabezado:
+            if self.titulo:
+                lineas.append(f"\n{self.titulo}")
+            lineas.append(formato.format(*(columna.titulo for columna in self.columnas)))
+            lineas.append('-' * (sum(anchos) + len(anchos) - 1))
+        lineas.extend(formato.format(*texto) for texto in textos)
+        lineas.append('')
+        return '\n'.join(lineas), anchos
+
+    def _escribir(self, texto):
+        # Una sola escritura (y un solo flush) por página
+        self.salida.write(texto)
+        self.salida.flush()
+
+    # ==================== SALIDA ====================
+    def ejecutar(self, filas):
+        """
+        Muestra las filas del iterador y devuelve cuántas filas se leyeron.
+        """
+        if self.interactivo:
+            return self.navegar(filas)
+        return self.mostrar_todo(filas)
+
+    def mostrar_todo(self, filas):
+        """
+        Escribe todas las filas por bloques de tamano_pagina, con un solo
+        encabezado y anchos tomados del primer bloque. La memoria usada no
+        depende de la cantidad de filas.
+        """
+        filas = iter(filas)
+        total = 0
+        anchos = None
+        while True:
+            bloque = list(islice(filas, self.tamano_pagina))
+            if not bloque:
+                self.completo = True
+                return total
+            texto, anchos = self.formatear(bloque, anchos, encabezado=anchos is None)
+            self._escribir(texto)
+            total += len(bloque)
+
+    def navegar(self, filas, entrada=input):
+        """
+        Navegación interactiva: Enter o 's' avanza (en la última página termina),
+        'a' retrocede, un número salta a esa página y 'q' termina. Devuelve las
+        filas leídas del iterador. Las páginas se leen del iterador a
+        medida que se visitan y se guardan para poder volver atrás.
+        """
+        filas = iter(filas)
+        paginas = []
+        agotado = False
+
+        def leer_hasta(numero):
+            nonlocal agotado
+            while len(paginas) <= numero and not agotado:
+                pagina = list(islice(filas, self.tamano_pagina))
+                if pagina:
+                    paginas.append(pagina)
+                if len(pagina) < self.tamano_pagina:
+                    agotado = True
+            return numero < len(paginas)
+
+        actual = 0
+        self.completo = False
+        if not leer_hasta(0):
+            self.completo = True
+            return 0
+
+        while True:
+            texto, _ = self.formatear(paginas[actual])
+            hay_siguiente = leer_hasta(actual + 1)
+            inicio = actual * self.tamano_pagina + 1
+            fin = inicio + len(paginas[actual]) - 1
+            total = f"{len(paginas)}" if agotado else f"{len(paginas)}+"
+            self._escribir(f"{texto}Página {actual + 1} de {total} (filas {inicio}-{fin})\n")
+
+            if not hay_siguiente and actual == 0:
+                self.completo = True
+                return fin
+
+            opcion = entrada("[Enter] siguiente, [a] anterior, [número] ir a página, [q] salir: ").strip().lower()
+            if opcion in ('', 's'):
+                if not hay_siguiente:
+                    self.completo = True
+                    return sum(len(pagina) for pagina in paginas)
+                actual += 1
+            elif opcion == 'a':
+                actual = max(0, actual - 1)
+            elif opcion.isdigit():
+                destino = max(0, int(opcion) - 1)
+                # Avanzar lee (sin mostrar) las páginas intermedias
+                leer_hasta(destino)
+                actual = min(destino, len(paginas) - 1)
+            elif opcion == 'q':
+                return sum(len(pagina) for pagina in paginas)
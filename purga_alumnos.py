@@ -0,0 +1,285 @@
+"""
+PURGA DE ALUMNOS POR BLOQUES
+Eliminación masiva sin bloquear la tabla usando sp_PurgarAlumnosLote
+
+@author Arias Javier, Andrade Eduardo, Guevara Galo
+@date 2025
+
+Descripción:
+Elimina los alumnos que cumplen un criterio (lista de IDs, rango de IDs o
+rango de años de nacimiento) en bloques pequeños, cada uno en su propia
+transacción corta, para que SQL Server no escale a un bloqueo de tabla y el
+menú CRUD siga respondiendo. Entre bloques se puede hacer una pausa. Después
+de cada bloque se guarda un archivo de control con el último ID eliminado,
+de modo que una purga interrumpida continúa donde quedó.
+
+Uso:
+    python purga_alumnos.py --anio-desde 2005 --anio-hasta 2007 --pausa 0.2
+    python purga_alumnos.py --ids egresados.txt --tamano-lote 500
+"""
+
+import argparse
+import bisect
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import pyodbc
+
+from configuracion import cargar_configuracion, construir_connection_string, crear_reintentos
+from pool_conexiones import PoolConexiones
+from registro_sentencias import RegistroSentencias
+from reintentos import ejecutar_con_reintentos
+
+
+TAMANO_LOTE_PURGA = 1000
+ARCHIVO_CONTROL_DEFECTO = 'purga_alumnos.control.json'
+
+CLAVES_CRITERIO = ('ids', 'id_desde', 'id_hasta', 'anio_desde', 'anio_hasta')
+
+
+def validar_criterio(criterio):
+    """
+    Comprueba que el criterio tenga al menos una condición y devuelve una copia
+    normalizada (IDs ordenados y sin repetir). Un criterio vacío borraría la tabla entera.
+    """
+    desconocidas = set(criterio) - set(CLAVES_CRITERIO)
+    if desconocidas:
+        raise ValueError(f"Criterios desconocidos: {', '.join(sorted(desconocidas))}")
+
+    normalizado = {clave: valor for clave, valor in criterio.items() if valor is not None}
+    if not normalizado:
+        raise ValueError("Debe indicar IDs, un rango de IDs o un rango de años")
+    if 'ids' in normalizado:
+        normalizado['ids'] = sorted({int(id_alumno) for id_alumno in normalizado['ids']})
+        if not normalizado['ids']:
+            raise ValueError("La lista de IDs está vacía")
+    return normalizado
+
+
+class PurgadorAlumnos:
+    """
+    Purga alumnos por bloques con sp_PurgarAlumnosLote.
+
+    Atributos:
+        pool: Pool de conexiones del que se toma una conexión por bloque
+        tamano_lote: Alumnos eliminados como máximo por bloque y transacción
+        pausa: Segundos de espera entre bloques para limitar la carga
+        archivo_control: Archivo JSON con el avance para reanudar (None = sin reanudación)
+        sentencias: RegistroSentencias con el que se llama a sp_PurgarAlumnosLote;
+            el pool debe crearse con sus opciones_pool()
+    """
+
+    def __init__(self, pool, tamano_lote=TAMANO_LOTE_PURGA, pausa=0.0,
+                 archivo_control=ARCHIVO_CONTROL_DEFECTO, mostrar_progreso=True,
+                 politica_reintentos=None, interruptor=None, sentencias=None):
+        if not 1 <= tamano_lote <= 4000:
+            raise ValueError("El tamaño de lote debe estar entre 1 y 4000")
+        self.pool = pool
+        self.tamano_lote = tamano_lote
+        self.pausa = pausa
+        self.archivo_control = archivo_control
+        self.mostrar_progreso = mostrar_progreso
+        self.politica_reintentos = politica_reintentos
+        self.interruptor = interruptor
+        self.sentencias = sentencias or RegistroSentencias()
+
+    # ==================== ARCHIVO DE CONTROL ====================
+    def _leer_control(self, criterio):
+        """
+        Devuelve el avance guardado si corresponde al mismo criterio, o None.
+        """
+        if not self.archivo_control or not os.path.exists(self.archivo_control):
+            return None
+        with open(self.archivo_control, 'r', encoding='utf-8') as archivo:
+            control = json.load(archivo)
+        return control if control.get('criterio') == criterio else None
+
+    def _guardar_control(self, criterio, ultimo_id, eliminados):
+        if not self.archivo_control:
+            return
+        temporal = self.archivo_control + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            json.dump({
+                'criterio': criterio,
+                'ultimo_id': ultimo_id,
+                'eliminados': eliminados,
+                'actualizado': datetime.now().isoformat(timespec='seconds'),
+            }, archivo)
+        # Reemplazo atómico: una interrupción nunca deja el archivo a medias
+        os.replace(temporal, self.archivo_control)
+
+    def _borrar_control(self):
+        if self.archivo_control and os.path.exists(self.archivo_control):
+            os.remove(self.archivo_control)
+
+    # ==================== PURGA ====================
+    def eliminar_bloque(self, criterio, despues_de_id, ids=None):
+        """
+        Elimina un bloque en su propia transacción y devuelve (eliminados, ultimo_id).
+        Es idempotente: repetirlo tras una falla no elimina alumnos fuera del criterio.
+        """
+        # Orden de la declaración: @Tamano, @DespuesDeId, @Ids, @IdDesde, @IdHasta, @AnioDesde, @AnioHasta
+        parametros = (
+            self.tamano_lote, despues_de_id,
+            json.dumps(ids) if ids is not None else None,
+            criterio.get('id_desde'), criterio.get('id_hasta'),
+            criterio.get('anio_desde'), criterio.get('anio_hasta'))
+
+        def ejecutar():
+            with self.pool.conexion() as conexion:
+                fila = self.sentencias.ejecutar(conexion, 'sp_PurgarAlumnosLote', parametros).fetchone()
+            return int(fila[0]), fila[1]
+
+        if self.politica_reintentos is None:
+            return ejecutar()
+        return ejecutar_con_reintentos(ejecutar, self.politica_reintentos, self.interruptor)
+
+    def purgar(self, criterio):
+        """
+        Elimina todos los alumnos que cumplen el criterio, bloque por bloque.
+        Devuelve el resumen: eliminados, bloques, reanudada, segundos y filas_por_segundo.
+        """
+        criterio = validar_criterio(criterio)
+        resultado = {'eliminados': 0, 'bloques': 0, 'reanudada': False, 'segundos': 0.0, 'filas_por_segundo': 0.0}
+
+        ultimo_id = 0
+        control = self._leer_control(criterio)
+        if control is not None:
+            ultimo_id = control['ultimo_id']
+            resultado['eliminados'] = control['eliminados']
+            resultado['reanudada'] = True
+            if self.mostrar_progreso:
+                print(f"  ↻ Reanudando purga desde el ID {ultimo_id} ({control['eliminados']} ya eliminados)")
+
+        inicio = time.perf_counter()
+        eliminados_sesion = 0
+        ids = criterio.get('ids')
+
+        while True:
+            bloque_ids = None
+            if ids is not None:
+                # Solo los IDs pendientes, de a un bloque por llamada
+                posicion = bisect.bisect_right(ids, ultimo_id)
+                pendientes = ids[posicion:posicion + self.tamano_lote]
+                if not pendientes:
+                    break
+                bloque_ids = pendientes
+
+            eliminados, ultimo_bloque = self.eliminar_bloque(criterio, ultimo_id, bloque_ids)
+            resultado['bloques'] += 1
+
+            if ids is not None:
+                # Los IDs del bloque que ya no existían también quedan procesados
+                ultimo_id = bloque_ids[-1]
+            elif eliminados == 0:
+                break
+            else:
+                ultimo_id = ultimo_bloque
+
+            eliminados_sesion += eliminados
+            resultado['eliminados'] += eliminados
+            self._guardar_control(criterio, ultimo_id, resultado['eliminados'])
+
+            if self.mostrar_progreso:
+                segundos = time.perf_counter() - inicio
+                velocidad = eliminados_sesion / segundos if segundos > 0 else 0.0
+                print(f"  ✓ {resultado['eliminados']} alumnos eliminados hasta el ID {ultimo_id} ({velocidad:,.0f} filas/s)")
+
+            if self.pausa > 0:
+                time.sleep(self.pausa)
+
+        self._borrar_control()
+        resultado['segundos'] = time.perf_counter() - inicio
+        if resultado['segundos'] > 0:
+            resultado['filas_por_segundo'] = eliminados_sesion / resultado['segundos']
+        return resultado
+
+
+def leer_ids(ruta):
+    """
+    Lee IDs desde un archivo JSON (arreglo) o de texto con un ID por línea.
+    """
+    with open(ruta, 'r', encoding='utf-8') as archivo:
+        contenido = archivo.read().strip()
+    if contenido.startswith('['):
+        return [int(valor) for valor in json.loads(contenido)]
+    return [int(linea) for linea in contenido.split() if linea.strip()]
+
+
+def mostrar_resumen_purga(resultado):
+    """
+    Imprime el resumen de una purga.
+    """
+    print("\n--- RESUMEN DE PURGA ---")
+    print(f"Alumnos eliminados:   {resultado['eliminados']}")
+    print(f"Bloques ejecutados:   {resultado['bloques']}")
+    print(f"Reanudada:            {'SI' if resultado['reanudada'] else 'NO'}")
+    print(f"Tiempo total:         {resultado['segundos']:.2f} s")
+    print(f"Velocidad:            {resultado['filas_por_segundo']:,.0f} filas/s\n")
+
+
+# ==================== PROGRAMA PRINCIPAL ====================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Purga de alumnos por bloques con reanudación")
+    parser.add_argument('--ids', metavar='ARCHIVO', help="Archivo con los IDs a eliminar (JSON o uno por línea)")
+    parser.add_argument('--id-desde', type=int, help="Primer ID del rango a eliminar")
+    parser.add_argument('--id-hasta', type=int, help="Último ID del rango a eliminar")
+    parser.add_argument('--anio-desde', type=int, help="Primer año de nacimiento a eliminar")
+    parser.add_argument('--anio-hasta', type=int, help="Último año de nacimiento a eliminar")
+    parser.add_argument('--tamano-lote', type=int, default=TAMANO_LOTE_PURGA,
+                        help=f"Alumnos eliminados por bloque (por defecto {TAMANO_LOTE_PURGA}, máximo 4000)")
+    parser.add_argument('--pausa', type=float, default=0.0, help="Segundos de pausa entre bloques")
+    parser.add_argument('--control', default=ARCHIVO_CONTROL_DEFECTO,
+                        help=f"Archivo de control para reanudar (por defecto {ARCHIVO_CONTROL_DEFECTO})")
+    parser.add_argument('--si', action='store_true', help="No pedir confirmación")
+    argumentos = parser.parse_args()
+
+    try:
+        criterio = {
+            'ids': leer_ids(argumentos.ids) if argumentos.ids else None,
+            'id_desde': argumentos.id_desde,
+            'id_hasta': argumentos.id_hasta,
+            'anio_desde': argumentos.anio_desde,
+            'anio_hasta': argumentos.anio_hasta,
+        }
+        criterio = validar_criterio(criterio)
+
+        if not argumentos.si:
+            descripcion = {clave: (f"{len(valor)} IDs" if clave == 'ids' else valor) for clave, valor in criterio.items()}
+            confirmacion = input(f"¿Eliminar los alumnos que cumplen {descripcion}? (s/n): ")
+            if confirmacion.lower() != 's':
+                print("Operación cancelada")
+                sys.exit(0)
+
+        config = cargar_configuracion()
+        politica, interruptor = crear_reintentos(config)
+        sentencias = RegistroSentencias()
+        pool = PoolConexiones(construir_connection_string(config), tamano_minimo=1, tamano_maximo=1,
+                              **sentencias.opciones_pool())
+
+        try:
+            purgador = PurgadorAlumnos(pool, tamano_lote=argumentos.tamano_lote, pausa=argumentos.pausa,
+                                       archivo_control=argumentos.control,
+                                       politica_reintentos=politica, interruptor=interruptor,
+                                       sentencias=sentencias)
+            resultado = purgador.purgar(criterio)
+        finally:
+            pool.cerrar()
+
+        mostrar_resumen_purga(resultado)
+
+    except KeyboardInterrupt:
+        print(f"\n✗ Purga interrumpida; ejecute el mismo comando para continuar ({argumentos.control})")
+        sys.exit(130)
+    except FileNotFoundError as e:
+        print(f"✗ Error: No se encontró el archivo {e.filename}")
+        sys.exit(1)
+    except pyodbc.DatabaseError as e:
+        print(f"✗ Error de conexión a SQL Server: {e}")
+        sys.exit(1)
+    except ValueError as e:
+        print(f"✗ Error: {e}")
+        sys.exit(1)
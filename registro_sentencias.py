@@ -0,0 +1,336 @@
+"""
+REGISTRO DE SENTENCIAS PREPARADAS
+Llamadas RPC {CALL} a los Store Procedures con cursores reutilizados
+
+@author Arias Javier, Andrade Eduardo, Guevara Galo
+@date 2025
+
+Descripción:
+Clase RegistroSentencias que declara una sola vez cada Store Procedure que
+usan los gestores, con la cantidad y el tipo de sus parámetros, y lo ejecuta
+con la secuencia de escape ODBC {CALL dbo.sp_X (?, ?)}. El controlador envía
+esa forma como una llamada RPC en lugar de un lote de texto que el servidor
+debe analizar. Cada conexión física guarda un cursor por sentencia con los
+tipos fijados con setinputsizes, de modo que el controlador conserva la
+sentencia preparada entre llamadas. Incluye un microbenchmark que compara
+el costo por llamada con el de un lote EXEC de texto y un cursor nuevo.
+"""
+
+import argparse
+import statistics
+import threading
+import time
+from collections import namedtuple
+
+import pyodbc
+
+from configuracion import cargar_configuracion, construir_connection_string
+
+
+# tipo: constante SQL_* de pyodbc; tamano y decimales como en setinputsizes
+Parametro = namedtuple('Parametro', ['nombre', 'tipo', 'tamano', 'decimales'])
+
+
+def _entero(nombre):
+    return Parametro(nombre, pyodbc.SQL_INTEGER, 0, 0)
+
+
+def _texto(nombre, largo):
+    # largo 0 equivale a NVARCHAR(MAX)
+    tipo = pyodbc.SQL_WVARCHAR if largo else pyodbc.SQL_WLONGVARCHAR
+    return Parametro(nombre, tipo, largo, 0)
+
+
+def _fecha(nombre):
+    return Parametro(nombre, pyodbc.SQL_TYPE_DATE, 10, 0)
+
+
+def _version(nombre):
+    return Parametro(nombre, pyodbc.SQL_BINARY, 8, 0)
+
+
+def _guid(nombre):
+    return Parametro(nombre, pyodbc.SQL_GUID, 16, 0)
+
+
+def _tabla(nombre):
+    # Parámetro con valores de tabla: pyodbc deduce el tipo de la lista de filas
+    return Parametro(nombre, None, 0, 0)
+
+
+class Sentencia:
+    """
+    Store Procedure con sus parámetros en el orden de su declaración.
+
+    Atributos:
+        nombre: Nombre del procedimiento (sin esquema)
+        parametros: Tupla de Parametro
+        llamada: Texto {CALL dbo.sp_X (?, ...)} que se envía como RPC
+        texto: Forma EXEC equivalente, para conexiones con perfil
+        tamanos: Lista para cursor.setinputsizes (None en las tablas)
+    """
+
+    def __init__(self, nombre, *parametros):
+        self.nombre = nombre
+        self.parametros = parametros
+        marcas = ', '.join('?' for _ in parametros)
+        self.llamada = f"{{CALL dbo.{nombre} ({marcas})}}" if parametros else f"{{CALL dbo.{nombre}}}"
+        self.texto = f"EXEC dbo.{nombre} {marcas}".rstrip()
+        self.tamanos = [(parametro.tipo, parametro.tamano, parametro.decimales)
+                        if parametro.tipo is not None else None for parametro in parametros]
+
+
+# Firmas según 02-store_procedures_alumno.sql
+SENTENCIAS_ALUMNOS = (
+    Sentencia('sp_InsertarAlumno',
+              _texto('@Nombre', 100), _texto('@Apellido', 100), _fecha('@FechaNacimiento'),
+              _texto('@LugarNacimiento', 100), _texto('@Direccion', 255),
+              _texto('@TelefonoAlumno', 20), _texto('@InfoEscolar', 255),
+              _texto('@InfoSalud', 500), _guid('@ClaveIdempotencia')),
+    Sentencia('sp_ObtenerAlumnoPorID', _entero('@IdAlumno')),
+    Sentencia('sp_ObtenerAlumnosPaginado', _entero('@UltimoId'), _entero('@Tamano')),
+    Sentencia('sp_ObtenerAlumnosPorIDs', _texto('@Ids', 0)),
+    Sentencia('sp_ActualizarAlumno',
+              _entero('@IdAlumno'), _texto('@Nombre', 100), _texto('@Apellido', 100),
+              _fecha('@FechaNacimiento'), _texto('@LugarNacimiento', 100),
+              _texto('@Direccion', 255), _texto('@TelefonoAlumno', 20),
+              _texto('@InfoEscolar', 255), _texto('@InfoSalud', 500),
+              _version('@VersionEsperada')),
+    Sentencia('sp_EliminarAlumno', _entero('@IdAlumno'), _version('@VersionEsperada')),
+    Sentencia('sp_EstadisticasAlumnos'),
+    Sentencia('sp_EstadisticasAlumnosCompleto'),
+    Sentencia('sp_RecalcularEstadisticasAlumnos'),
+    Sentencia('sp_InsertarAlumnosLote', _tabla('@Alumnos')),
+    Sentencia('sp_ActualizarAlumnosLote', _tabla('@Cambios')),
+    Sentencia('sp_PurgarAlumnosLote',
+              _entero('@Tamano'), _entero('@DespuesDeId'), _texto('@Ids', 0),
+              _entero('@IdDesde'), _entero('@IdHasta'), _entero('@AnioDesde'), _entero('@AnioHasta')),
+    Sentencia('sp_ObtenerCambiosAlumnos', _version('@DesdeVersion'), _entero('@Tamano')),
+)
+
+
+def conexion_fisica(conexion):
+    """
+    Conexión de pyodbc debajo de los envoltorios de métricas y perfil (ver
+    ConexionInstrumentada.fisica); la misma conexión si no está envuelta.
+    """
+    return getattr(conexion, 'fisica', conexion)
+
+
+class RegistroSentencias:
+    """
+    Sentencias registradas y cursores reutilizados por conexión física.
+
+    Una conexión del pool la usa un solo hilo a la vez, por lo que sus cursores
+    no se comparten entre hilos. Los cursores de una conexión se olvidan cuando
+    el pool la cierra (ver olvidar). Sin MARS una conexión atiende un solo
+    conjunto de resultados a la vez: los resultados que el llamador no leyó se
+    descartan antes de la siguiente sentencia en esa conexión y cuando vuelve
+    al pool (ver liberar).
+
+    Los cursores se guardan por conexión física aunque el pool entregue la
+    conexión envuelta por métricas o perfil: el cursor se crea sobre la
+    conexión física y se envuelve una sola vez (ver envolver_cursor). Un pool
+    envuelve siempre sus conexiones de la misma forma, por lo que el cursor
+    guardado sirve para todos los préstamos. Con perfil se usa la forma EXEC,
+    porque el perfil antepone SET STATISTICS a la sentencia.
+
+    Atributos:
+        sentencias: Diccionario nombre -> Sentencia
+        habilitado: Con False se usa un cursor nuevo por llamada, que se cierra
+            en liberar (para comparar)
+    """
+
+    def __init__(self, sentencias=SENTENCIAS_ALUMNOS, habilitado=True):
+        self.sentencias = {sentencia.nombre: sentencia for sentencia in sentencias}
+        self.habilitado = habilitado
+        # conexión física -> {nombre: cursor}
+        self._cursores = {}
+        # conexión física -> [(cursor, desechable)] con resultados quizá sin leer
+        self._pendientes = {}
+        self._candado = threading.Lock()
+        self._estadisticas = {'llamadas': 0, 'cursores_creados': 0, 'cursores_reutilizados': 0}
+
+    def opciones_pool(self):
+        """
+        Funciones al_cerrar y al_devolver para PoolConexiones/crear_pool.
+        """
+        return {'al_cerrar': self.olvidar, 'al_devolver': self.liberar}
+
+    @staticmethod
+    def _nuevo_cursor(conexion, sentencia):
+        """
+        Cursor tipado sobre la conexión física, con los envoltorios de la conexión.
+        """
+        micursor = conexion_fisica(conexion).cursor()
+        if any(sentencia.tamanos):
+            micursor.setinputsizes(sentencia.tamanos)
+        envolver = getattr(conexion, 'envolver_cursor', None)
+        return envolver(micursor) if envolver is not None else micursor
+
+    def _cursor(self, conexion, sentencia):
+        """
+        Cursor de la sentencia en la conexión física, creado y tipado la primera vez.
+        """
+        fisica = conexion_fisica(conexion)
+        with self._candado:
+            micursor = self._cursores.get(fisica, {}).get(sentencia.nombre)
+            if micursor is not None:
+                self._estadisticas['cursores_reutilizados'] += 1
+                return micursor
+
+        micursor = self._nuevo_cursor(conexion, sentencia)
+        with self._candado:
+            self._cursores.setdefault(fisica, {})[sentencia.nombre] = micursor
+            self._estadisticas['cursores_creados'] += 1
+        return micursor
+
+    def ejecutar(self, conexion, nombre, parametros=()):
+        """
+        Ejecuta la sentencia registrada y devuelve el cursor con sus resultados.
+        El cursor pertenece al registro: no debe cerrarse ni usarse con 'with'.
+        """
+        sentencia = self.sentencias[nombre]
+        if len(parametros) != len(sentencia.parametros):
+            raise ValueError(f"{nombre} espera {len(sentencia.parametros)} parámetros "
+                             f"y recibió {len(parametros)}")
+
+        with self._candado:
+            self._estadisticas['llamadas'] += 1
+
+        # La llamada anterior en esta conexión puede haber dejado filas o
+        # conjuntos de resultados sin leer (por ejemplo tras un fetchone)
+        self.liberar(conexion)
+
+        desechable = not self.habilitado
+        micursor = self._nuevo_cursor(conexion, sentencia) if desechable else self._cursor(conexion, sentencia)
+        sql = sentencia.texto if getattr(conexion, 'requiere_texto', False) else sentencia.llamada
+
+        if parametros:
+            micursor.execute(sql, tuple(parametros))
+        else:
+            micursor.execute(sql)
+        with self._candado:
+            self._pendientes.setdefault(conexion_fisica(conexion), []).append((micursor, desechable))
+        return micursor
+
+    def liberar(self, conexion):
+        """
+        Descarta los resultados que quedaron sin leer en los cursores del registro
+        usados en la conexión y cierra los cursores de un solo uso. El pool lo
+        llama antes de confirmar y devolver la conexión (al_devolver).
+        """
+        with self._candado:
+            pendientes = self._pendientes.pop(conexion_fisica(conexion), [])
+        for micursor, desechable in pendientes:
+            try:
+                while micursor.nextset():
+                    pass
+            except pyodbc.Error:
+                # Sin resultados pendientes o conexión rota: no hay nada que descartar
+                pass
+            if desechable:
+                try:
+                    micursor.close()
+                except pyodbc.Error:
+                    pass
+
+    def olvidar(self, conexion):
+        """
+        Descarta los cursores de una conexión física. El pool lo llama al cerrarla.
+        """
+        with self._candado:
+            cursores = self._cursores.pop(conexion, {})
+            self._pendientes.pop(conexion, None)
+        for micursor in cursores.values():
+            try:
+                micursor.close()
+            except Exception:
+                pass
+
+    def estadisticas(self):
+        """
+        Devuelve una copia de los contadores del registro.
+        """
+        with self._candado:
+            datos = dict(self._estadisticas)
+            datos['conexiones'] = len(self._cursores)
+            datos['cursores_abiertos'] = sum(len(cursores) for cursores in self._cursores.values())
+        return datos
+
+
+# ==================== MICROBENCHMARK ====================
+def _medir(llamada, iteraciones):
+    """
+    Ejecuta la llamada las veces indicadas y devuelve los tiempos (reloj y CPU
+    del cliente) de cada una, en milisegundos.
+    """
+    reloj = []
+    cpu = []
+    for _ in range(iteraciones):
+        inicio_reloj = time.perf_counter()
+        inicio_cpu = time.process_time()
+        llamada()
+        cpu.append((time.process_time() - inicio_cpu) * 1000.0)
+        reloj.append((time.perf_counter() - inicio_reloj) * 1000.0)
+    return reloj, cpu
+
+
+def ejecutar_microbenchmark(connection_string, iteraciones=1000, id_alumno=1):
+    """
+    Compara el costo por llamada de sp_ObtenerAlumnoPorID y sp_ObtenerAlumnosPaginado:
+    antes (cursor nuevo y lote EXEC de texto con parámetros con nombre, como
+    se llamaba hasta ahora) y después (cursor del registro y {CALL}).
+    Usa una sola conexión para medir solo el costo de la llamada.
+    """
+    conexion = pyodbc.connect(connection_string)
+    registro = RegistroSentencias()
+    casos = (
+        ('sp_ObtenerAlumnoPorID', "EXEC sp_ObtenerAlumnoPorID @IdAlumno = ?", (id_alumno,)),
+        ('sp_ObtenerAlumnosPaginado', "EXEC sp_ObtenerAlumnosPaginado @UltimoId = ?, @Tamano = ?", (0, 1)),
+    )
+
+    def antes(sql, parametros):
+        def llamada():
+            with conexion.cursor() as micursor:
+                micursor.execute(sql, parametros)
+                micursor.fetchall()
+        return llamada
+
+    def despues(nombre, parametros):
+        def llamada():
+            registro.ejecutar(conexion, nombre, parametros).fetchall()
+        return llamada
+
+    try:
+        print(f"\n--- MICROBENCHMARK DE LLAMADAS ({iteraciones} por caso) ---")
+        print(f"{'Procedimiento':<28} {'Forma':<18} {'Media ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'CPU ms':>9}")
+        print("-" * 86)
+        for nombre, sql, parametros in casos:
+            for forma, llamada in (("EXEC + cursor", antes(sql, parametros)),
+                                   ("{CALL} registro", despues(nombre, parametros))):
+                # Calentamiento: planes en caché y primera preparación fuera de la medición
+                _medir(llamada, min(20, iteraciones))
+                reloj, cpu = _medir(llamada, iteraciones)
+                reloj.sort()
+                p95 = reloj[max(0, int(len(reloj) * 0.95 + 0.5) - 1)]
+                print(f"{nombre:<28} {forma:<18} {statistics.fmean(reloj):>9.3f} "
+                      f"{statistics.median(reloj):>9.3f} {p95:>9.3f} {statistics.fmean(cpu):>9.3f}")
+        print()
+    finally:
+        registro.olvidar(conexion)
+        conexion.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Microbenchmark de llamadas a Store Procedures: EXEC de texto frente a {CALL} con cursor reutilizado")
+    parser.add_argument('--iteraciones', type=int, default=1000, help="Llamadas medidas por caso")
+    parser.add_argument('--id-alumno', type=int, default=1, help="ID usado con sp_ObtenerAlumnoPorID")
+    argumentos = parser.parse_args()
+
+    try:
+        ejecutar_microbenchmark(construir_connection_string(cargar_configuracion()),
+                                argumentos.iteraciones, argumentos.id_alumno)
+    except pyodbc.Error as e:
+        print(f"✗ Error de conexión: {e}")
@@ -0,0 +1,240 @@
+"""
+REINTENTOS ANTE FALLAS TRANSITORIAS DE SQL SERVER
+Backoff exponencial con jitter e interruptor de circuito
+
+@author Arias Javier, Andrade Eduardo, Guevara Galo
+@date 2025
+
+Descripción:
+Clasifica los errores de pyodbc en pérdida de conexión (red caída, failover,
+conexión cerrada por inactividad) y fallas transitorias (además, deadlocks y
+tiempos de espera). Las operaciones de lectura se reintentan con espera
+exponencial aleatoria; las de escritura solo si llevan clave de idempotencia.
+InterruptorCircuito deja de intentar tras varias fallas seguidas, para
+responder de inmediato mientras el servidor no está disponible.
+"""
+
+import functools
+import random
+import re
+import threading
+import time
+
+import pyodbc
+
+
+# SQLSTATE de ODBC que indican que la conexión ya no sirve
+SQLSTATES_CONEXION = {'08S01', '08001', '08003', '08004', '08007', '01002'}
+
+# Errores nativos de SQL Server / TCP asociados a pérdida de conexión o failover
+ERRORES_NATIVOS_CONEXION = {64, 233, 4060, 10053, 10054, 10060, 10061,
+                            40197, 40501, 40613, 49918, 49919, 49920}
+
+# Fallas transitorias que no invalidan la conexión: deadlock y tiempo de espera
+SQLSTATES_TRANSITORIOS = {'40001', 'HYT00', 'HYT01'}
+ERRORES_NATIVOS_TRANSITORIOS = {1205}
+
+# El código nativo es el último número entre paréntesis de cada registro de
+# diagnóstico, antes de la función ODBC: "... (2627) (SQLExecDirectW); [01000] ...".
+# Los números entre paréntesis dentro del texto (por ejemplo el valor de una clave
+# duplicada, "The duplicate key value is (64).") no son códigos de error
+PATRON_ERROR_NATIVO = re.compile(r'\((\d+)\)\s*(?:\(\w+\))?\s*(?:;|$)')
+
+
+def _sqlstate(error):
+    return error.args[0] if error.args and isinstance(error.args[0], str) else ''
+
+
+def _errores_nativos(error):
+    mensaje = error.args[1] if len(error.args) > 1 else str(error)
+    return {int(numero) for numero in PATRON_ERROR_NATIVO.findall(str(mensaje))}
+
+
+def es_error_conexion(error):
+    """
+    Indica si el error de pyodbc significa que la conexión está rota
+    y debe descartarse en lugar de devolverse al pool.
+    """
+    if not isinstance(error, pyodbc.Error):
+        return False
+    return (_sqlstate(error) in SQLSTATES_CONEXION
+            or bool(_errores_nativos(error) & ERRORES_NATIVOS_CONEXION))
+
+
+def es_error_transitorio(error):
+    """
+    Indica si vale la pena reintentar la operación: pérdida de conexión,
+    deadlock o tiempo de espera agotado.
+    """
+    if es_error_conexion(error):
+        return True
+    if not isinstance(error, pyodbc.Error):
+        return False
+    return (_sqlstate(error) in SQLSTATES_TRANSITORIOS
+            or bool(_errores_nativos(error) & ERRORES_NATIVOS_TRANSITORIOS))
+
+
+class PoliticaReintentos:
+    """
+    Espera exponencial con jitter completo entre reintentos.
+
+    Atributos:
+        intentos: Reintentos máximos después del primer intento
+        espera_base: Segundos de espera del primer reintento (antes del jitter)
+        espera_maxima: Tope de la espera entre reintentos
+    """
+
+    def __init__(self, intentos=3, espera_base=0.2, espera_maxima=5.0):
+        self.intentos = intentos
+        self.espera_base = espera_base
+        self.espera_maxima = espera_maxima
+
+    def espera(self, intento):
+        """
+        Segundos a esperar antes del reintento número intento (desde 0).
+        El valor aleatorio evita que varios clientes reintenten a la vez.
+        """
+        return random.uniform(0, min(self.espera_maxima, self.espera_base * (2 ** intento)))
+
+
+class ErrorCircuitoAbierto(Exception):
+    """
+    Se lanza cuando el interruptor está abierto y la operación no se intenta.
+    """
+
+
+class InterruptorCircuito:
+    """
+    Interruptor de circuito: tras umbral_fallos fallas transitorias seguidas se
+    abre y rechaza las operaciones durante tiempo_apertura segundos. Luego deja
+    pasar una operación de prueba (semiabierto): si funciona se cierra.
+
+    Atributos:
+        umbral_fallos: Fallas consecutivas que abren el circuito
+        tiempo_apertura: Segundos que el circuito permanece abierto
+    """
+
+    CERRADO = 'cerrado'
+    ABIERTO = 'abierto'
+    SEMIABIERTO = 'semiabierto'
+
+    def __init__(self, umbral_fallos=5, tiempo_apertura=30.0):
+        self.umbral_fallos = umbral_fallos
+        self.tiempo_apertura = tiempo_apertura
+        self._estado = self.CERRADO
+        self._fallos_consecutivos = 0
+        self._abierto_en = 0.0
+        self._prueba_en_curso = False
+        self._candado = threading.Lock()
+        self._estadisticas = {'aperturas': 0, 'rechazos': 0, 'reintentos': 0}
+
+    @property
+    def estado(self):
+        with self._candado:
+            return self._estado
+
+    def permitir(self):
+        """
+        Lanza ErrorCircuitoAbierto si la operación no debe intentarse.
+        """
+        with self._candado:
+            if self._estado == self.ABIERTO:
+                restante = self._abierto_en + self.tiempo_apertura - time.monotonic()
+                if restante > 0:
+                    self._estadisticas['rechazos'] += 1
+                    raise ErrorCircuitoAbierto(
+                        f"SQL Server no disponible; se reintentará en {restante:.0f} s")
+                self._estado = self.SEMIABIERTO
+                self._prueba_en_curso = False
+
+            if self._estado == self.SEMIABIERTO:
+                if self._prueba_en_curso:
+                    self._estadisticas['rechazos'] += 1
+                    raise ErrorCircuitoAbierto("SQL Server no disponible; verificando la conexión")
+                self._prueba_en_curso = True
+
+    def registrar_exito(self):
+        with self._candado:
+            self._estado = self.CERRADO
+            self._fallos_consecutivos = 0
+            self._prueba_en_curso = False
+
+    def registrar_fallo(self):
+        with self._candado:
+            self._fallos_consecutivos += 1
+            self._prueba_en_curso = False
+            if self._estado == self.SEMIABIERTO or (
+                    self._estado == self.CERRADO and self._fallos_consecutivos >= self.umbral_fallos):
+                self._estado = self.ABIERTO
+                self._abierto_en = time.monotonic()
+                self._estadisticas['aperturas'] += 1
+
+    def liberar_prueba(self):
+        """
+        Libera la operación de prueba cuando falló por un motivo ajeno al servidor.
+        """
+        with self._candado:
+            self._prueba_en_curso = False
+
+    def registrar_reintento(self):
+        with self._candado:
+            self._estadisticas['reintentos'] += 1
+
+    def estadisticas(self):
+        with self._candado:
+            datos = dict(self._estadisticas)
+            datos['estado'] = self._estado
+            datos['fallos_consecutivos'] = self._fallos_consecutivos
+            return datos
+
+
+def ejecutar_con_reintentos(funcion, politica, interruptor=None, reintentar=True):
+    """
+    Ejecuta funcion() reintentando las fallas transitorias según la política.
+    Con reintentar=False (operaciones no idempotentes) solo se consulta y
+    actualiza el interruptor. Los errores no transitorios se propagan sin reintento.
+    """
+    intento = 0
+    while True:
+        if interruptor is not None:
+            interruptor.permitir()
+        try:
+            resultado = funcion()
+        except pyodbc.Error as e:
+            if not es_error_transitorio(e):
+                if interruptor is not None:
+                    # El servidor respondió: la falla es de la operación, no de la conexión
+                    interruptor.registrar_exito()
+                raise
+            if interruptor is not None:
+                interruptor.registrar_fallo()
+            if not reintentar or intento >= politica.intentos:
+                raise
+            if interruptor is not None:
+                interruptor.registrar_reintento()
+            time.sleep(politica.espera(intento))
+            intento += 1
+            continue
+        except BaseException:
+            if interruptor is not None:
+                interruptor.liberar_prueba()
+            raise
+        if interruptor is not None:
+            interruptor.registrar_exito()
+        return resultado
+
+
+def con_reintentos(idempotente=True):
+    """
+    Decorador para métodos del gestor que ejecuta el método con
+    self.politica_reintentos y self.interruptor. Los métodos no idempotentes
+    (idempotente=False) no se reintentan, pero respetan el interruptor.
+    """
+    def decorador(metodo):
+        @functools.wraps(metodo)
+        def envoltura(self, *args, **kwargs):
+            return ejecutar_con_reintentos(
+                lambda: metodo(self, *args, **kwargs),
+                self.politica_reintentos, self.interruptor, reintentar=idempotente)
+        return envoltura
+    return decorador
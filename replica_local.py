@@ -0,0 +1,365 @@
+"""
+RÉPLICA LOCAL DE ALUMNOS EN SQLITE
+Lecturas locales sincronizadas por marca de agua con sp_ObtenerCambiosAlumnos
+
+@author Arias Javier, Andrade Eduardo, Guevara Galo
+@date 2025
+
+Descripción:
+Copia de dbo.Alumno en un archivo SQLite con índices sobre id_alumno, nombre y
+apellido. Cada sincronización pide al servidor solo lo que cambió desde la
+última marca de agua (version_fila) y los IDs eliminados desde entonces
+(dbo.AlumnoEliminado), de modo que mantenerla al día cuesta una llamada
+pequeña. El listado, la consulta por ID, la búsqueda y las estadísticas se
+responden localmente mientras la copia no supere la antigüedad configurada;
+al superarla, la siguiente lectura sincroniza antes de responder.
+
+Uso:
+    python replica_local.py                 (sincronización incremental)
+    python replica_local.py --reiniciar     (vuelve a copiar la tabla completa)
+"""
+
+import argparse
+import sqlite3
+import sys
+import threading
+import time
+from datetime import date
+
+import pyodbc
+
+from configuracion import cargar_configuracion, construir_connection_string, crear_reintentos
+from indice_trigramas import normalizar_texto
+from pool_conexiones import PoolConexiones
+from registro_sentencias import RegistroSentencias
+from reintentos import ejecutar_con_reintentos
+
+
+ARCHIVO_REPLICA_DEFECTO = 'replica_alumnos.sqlite3'
+TAMANO_LOTE_REPLICA = 5000
+MARCA_INICIAL = bytes(8)
+
+ESQUEMA_REPLICA = """
+CREATE TABLE IF NOT EXISTS alumno (
+    id_alumno INTEGER PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    apellido TEXT NOT NULL,
+    fecha_nacimiento TEXT,
+    lugar_nacimiento TEXT COLLATE NOCASE,
+    direccion TEXT,
+    telefono_alumno TEXT,
+    info_escolar TEXT,
+    info_salud TEXT,
+    version_fila BLOB NOT NULL,
+    nombre_normalizado TEXT NOT NULL,
+    apellido_normalizado TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_alumno_nombre ON alumno (nombre_normalizado, apellido_normalizado);
+CREATE INDEX IF NOT EXISTS idx_alumno_apellido ON alumno (apellido_normalizado);
+CREATE TABLE IF NOT EXISTS replica_estado (
+    clave TEXT PRIMARY KEY,
+    valor
+);
+"""
+
+# Columnas en el orden de sp_ObtenerAlumnoPorID (la última es version_fila)
+COLUMNAS_ALUMNO = ('id_alumno, nombre, apellido, fecha_nacimiento, lugar_nacimiento, '
+                   'direccion, telefono_alumno, info_escolar, info_salud, version_fila')
+
+
+def pedir_cambios(pool, sentencias, marca, tamano_lote=TAMANO_LOTE_REPLICA):
+    """
+    Ejecuta sp_ObtenerCambiosAlumnos y devuelve (nueva_marca, hay_mas, alumnos, ids_eliminados).
+    Los alumnos traen las columnas de sp_ObtenerAlumnoPorID (la última es version_fila).
+    """
+    with pool.conexion() as conexion:
+        micursor = sentencias.ejecutar(conexion, 'sp_ObtenerCambiosAlumnos', (marca, tamano_lote))
+        nueva_marca, hay_mas = micursor.fetchone()
+        micursor.nextset()
+        alumnos = micursor.fetchall()
+        micursor.nextset()
+        eliminados = [fila[0] for fila in micursor.fetchall()]
+    return bytes(nueva_marca), bool(hay_mas), alumnos, eliminados
+
+
+def _fila_servidor(fila):
+    """
+    Convierte una fila de SQLite al formato que devuelve pyodbc (fecha como date).
+    """
+    if fila[3] is None:
+        return tuple(fila)
+    return fila[:3] + (date.fromisoformat(fila[3]),) + tuple(fila[4:])
+
+
+class ReplicaLocal:
+    """
+    Réplica de solo lectura de dbo.Alumno en SQLite.
+
+    Atributos:
+        ruta: Archivo SQLite de la réplica
+        pool: Pool de conexiones usado para sincronizar
+        vigencia: Segundos de antigüedad tolerados antes de volver a sincronizar
+        tamano_lote: Cambios pedidos al servidor por llamada
+        sentencias: RegistroSentencias con el que se llama a sp_ObtenerCambiosAlumnos;
+            el pool debe crearse con sus opciones_pool()
+    """
+
+    def __init__(self, ruta, pool, vigencia=30.0, tamano_lote=TAMANO_LOTE_REPLICA,
+                 politica_reintentos=None, interruptor=None, sentencias=None):
+        self.ruta = ruta
+        self.pool = pool
+        self.vigencia = vigencia
+        self.tamano_lote = tamano_lote
+        self.politica_reintentos = politica_reintentos
+        self.interruptor = interruptor
+        self.sentencias = sentencias or RegistroSentencias()
+
+        # Una sola conexión SQLite compartida; el candado serializa su uso entre hilos
+        self._candado = threading.RLock()
+        self._conexion = sqlite3.connect(ruta, check_same_thread=False)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute("PRAGMA synchronous=NORMAL")
+        self._conexion.executescript(ESQUEMA_REPLICA)
+        self._desactualizada = False
+        self._estadisticas = {'sincronizaciones': 0, 'lecturas_locales': 0,
+                              'filas_actualizadas': 0, 'filas_eliminadas': 0}
+
+    # ==================== ESTADO ====================
+    def _leer_estado(self, clave, defecto=None):
+        fila = self._conexion.execute(
+            "SELECT valor FROM replica_estado WHERE clave = ?", (clave,)).fetchone()
+        return fila[0] if fila is not None else defecto
+
+    def _guardar_estado(self, clave, valor):
+        self._conexion.execute(
+            "INSERT OR REPLACE INTO replica_estado (clave, valor) VALUES (?, ?)", (clave, valor))
+
+    def antiguedad(self):
+        """
+        Segundos desde la última sincronización completa (infinito si nunca se sincronizó).
+        """
+        with self._candado:
+            sincronizada_en = self._leer_estado('sincronizada_en')
+        return float('inf') if sincronizada_en is None else max(0.0, time.time() - sincronizada_en)
+
+    def vigente(self):
+        """
+        Indica si la réplica puede responder sin sincronizar antes.
+        """
+        return not self._desactualizada and self.antiguedad() <= self.vigencia
+
+    def marcar_desactualizada(self):
+        """
+        Obliga a sincronizar en la próxima lectura (tras una escritura propia,
+        para que el usuario vea sus cambios de inmediato).
+        """
+        self._desactualizada = True
+
+    # ==================== SINCRONIZACIÓN ====================
+    def _pedir_cambios(self, marca):
+        """
+        Ejecuta sp_ObtenerCambiosAlumnos y devuelve (nueva_marca, hay_mas, alumnos, ids_eliminados).
+        """
+        def ejecutar():
+            return pedir_cambios(self.pool, self.sentencias, marca, self.tamano_lote)
+
+        if self.politica_reintentos is None:
+            return ejecutar()
+        return ejecutar_con_reintentos(ejecutar, self.politica_reintentos, self.interruptor)
+
+    def sincronizar(self):
+        """
+        Aplica los cambios del servidor desde la última marca de agua. Cada llamada
+        al servidor se aplica en su propia transacción SQLite junto con la nueva
+        marca, por lo que una sincronización interrumpida continúa donde quedó.
+        Devuelve el resumen: actualizados, eliminados, llamadas y segundos.
+        """
+        resultado = {'actualizados': 0, 'eliminados': 0, 'llamadas': 0, 'segundos': 0.0}
+        inicio = time.perf_counter()
+
+        with self._candado:
+            marca = self._leer_estado('marca_agua', MARCA_INICIAL)
+            while True:
+                nueva_marca, hay_mas, alumnos, eliminados = self._pedir_cambios(marca)
+                resultado['llamadas'] += 1
+
+                with self._conexion:
+                    # Primero las bajas: un ID reutilizado después de eliminarse llega como alta
+                    self._conexion.executemany(
+                        "DELETE FROM alumno WHERE id_alumno = ?", [(id_alumno,) for id_alumno in eliminados])
+                    self._conexion.executemany(
+                        f"INSERT OR REPLACE INTO alumno ({COLUMNAS_ALUMNO}, nombre_normalizado, apellido_normalizado) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        [(fila[0], fila[1], fila[2], fila[3].isoformat() if fila[3] else None,
+                          fila[4], fila[5], fila[6], fila[7], fila[8], bytes(fila[9]),
+                          normalizar_texto(fila[1]), normalizar_texto(fila[2]))
+                         for fila in alumnos])
+                    self._guardar_estado('marca_agua', nueva_marca)
+
+                resultado['actualizados'] += len(alumnos)
+                resultado['eliminados'] += len(eliminados)
+                marca = nueva_marca
+                if not hay_mas:
+                    break
+
+            with self._conexion:
+                self._guardar_estado('sincronizada_en', time.time())
+            self._desactualizada = False
+            self._estadisticas['sincronizaciones'] += 1
+            self._estadisticas['filas_actualizadas'] += resultado['actualizados']
+            self._estadisticas['filas_eliminadas'] += resultado['eliminados']
+
+        resultado['segundos'] = time.perf_counter() - inicio
+        return resultado
+
+    def reiniciar(self):
+        """
+        Vacía la réplica y su marca de agua: la próxima sincronización copia la tabla completa.
+        """
+        with self._candado, self._conexion:
+            self._conexion.execute("DELETE FROM alumno")
+            self._conexion.execute("DELETE FROM replica_estado")
+
+    def _asegurar_vigencia(self):
+        if not self.vigente():
+            self.sincronizar()
+        self._estadisticas['lecturas_locales'] += 1
+
+    # ==================== LECTURAS ====================
+    def obtener(self, id_alumno):
+        """
+        Devuelve el alumno con las columnas de sp_ObtenerAlumnoPorID o None.
+        """
+        with self._candado:
+            self._asegurar_vigencia()
+            fila = self._conexion.execute(
+                f"SELECT {COLUMNAS_ALUMNO} FROM alumno WHERE id_alumno = ?", (id_alumno,)).fetchone()
+        return _fila_servidor(fila) if fila is not None else None
+
+    def iterar(self, tamano_pagina=500, desde_id=0):
+        """
+        Generador con todos los alumnos en orden de id_alumno (columnas de
+        sp_ObtenerAlumnosPaginado), leídos por páginas keyset.
+        """
+        with self._candado:
+            self._asegurar_vigencia()
+        ultimo_id = desde_id
+        while True:
+            with self._candado:
+                filas = self._conexion.execute(
+                    f"SELECT {COLUMNAS_ALUMNO} FROM alumno WHERE id_alumno > ? ORDER BY id_alumno LIMIT ?",
+                    (ultimo_id, tamano_pagina)).fetchall()
+            for fila in filas:
+                yield _fila_servidor(fila)[:9]
+            if len(filas) < tamano_pagina:
+                return
+            ultimo_id = filas[-1][0]
+
+    def buscar(self, termino):
+        """
+        Alumnos cuyo nombre o apellido contienen el término, sin distinguir
+        mayúsculas ni tildes, ordenados por nombre y apellido.
+        """
+        termino = normalizar_texto(termino)
+        if not termino:
+            return []
+        with self._candado:
+            self._asegurar_vigencia()
+            filas = self._conexion.execute(
+                f"SELECT {COLUMNAS_ALUMNO} FROM alumno "
+                "WHERE instr(nombre_normalizado, ?) > 0 OR instr(apellido_normalizado, ?) > 0 "
+                "ORDER BY nombre_normalizado, apellido_normalizado",
+                (termino, termino)).fetchall()
+        return [_fila_servidor(fila)[:9] for fila in filas]
+
+    def estadisticas_alumnos(self):
+        """
+        Devuelve la fila de estadísticas con las columnas de sp_EstadisticasAlumnos.
+        """
+        with self._candado:
+            self._asegurar_vigencia()
+            fila = self._conexion.execute("""
+                SELECT COUNT(*),
+                       COUNT(DISTINCT substr(fecha_nacimiento, 1, 4)),
+                       MIN(fecha_nacimiento),
+                       MAX(fecha_nacimiento),
+                       COUNT(DISTINCT lugar_nacimiento),
+                       COUNT(telefono_alumno),
+                       COUNT(info_escolar),
+                       COUNT(info_salud)
+                FROM alumno""").fetchone()
+        fechas = tuple(date.fromisoformat(valor) if valor else None for valor in fila[2:4])
+        return fila[:2] + fechas + fila[4:]
+
+    def estadisticas(self):
+        """
+        Devuelve los contadores de uso, el número de alumnos y la antigüedad de la réplica.
+        """
+        with self._candado:
+            datos = dict(self._estadisticas)
+            datos['alumnos'] = self._conexion.execute("SELECT COUNT(*) FROM alumno").fetchone()[0]
+            marca = self._leer_estado('marca_agua')
+        datos['marca_agua'] = marca.hex() if marca else None
+        datos['antiguedad'] = self.antiguedad()
+        datos['vigencia'] = self.vigencia
+        datos['vigente'] = self.vigente()
+        return datos
+
+    def cerrar(self):
+        with self._candado:
+            self._conexion.close()
+
+
+def mostrar_resumen_sincronizacion(resultado):
+    """
+    Imprime el resumen de una sincronización.
+    """
+    print("\n--- RESUMEN DE SINCRONIZACIÓN ---")
+    print(f"Alumnos actualizados: {resultado['actualizados']}")
+    print(f"Alumnos eliminados:   {resultado['eliminados']}")
+    print(f"Llamadas al servidor: {resultado['llamadas']}")
+    print(f"Tiempo total:         {resultado['segundos']:.2f} s\n")
+
+
+# ==================== PROGRAMA PRINCIPAL ====================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sincronización de la réplica local de alumnos")
+    parser.add_argument('--archivo', help=f"Archivo SQLite (por defecto replica_archivo de config.json o {ARCHIVO_REPLICA_DEFECTO})")
+    parser.add_argument('--tamano-lote', type=int, default=TAMANO_LOTE_REPLICA,
+                        help=f"Cambios por llamada al servidor (por defecto {TAMANO_LOTE_REPLICA})")
+    parser.add_argument('--reiniciar', action='store_true', help="Descartar la réplica y copiar la tabla completa")
+    argumentos = parser.parse_args()
+
+    try:
+        config = cargar_configuracion()
+        politica, interruptor = crear_reintentos(config)
+        sentencias = RegistroSentencias()
+        pool = PoolConexiones(construir_connection_string(config), tamano_minimo=1, tamano_maximo=1,
+                              **sentencias.opciones_pool())
+        replica = ReplicaLocal(argumentos.archivo or config.get('replica_archivo') or ARCHIVO_REPLICA_DEFECTO,
+                               pool, tamano_lote=argumentos.tamano_lote,
+                               politica_reintentos=politica, interruptor=interruptor,
+                               sentencias=sentencias)
+
+        try:
+            if argumentos.reiniciar:
+                replica.reiniciar()
+            resultado = replica.sincronizar()
+        finally:
+            replica.cerrar()
+            pool.cerrar()
+
+        mostrar_resumen_sincronizacion(resultado)
+
+    except KeyboardInterrupt:
+        print("\n✗ Sincronización interrumpida; la próxima continuará desde la última marca guardada")
+        sys.exit(130)
+    except FileNotFoundError as e:
+        print(f"✗ Error: No se encontró el archivo {e.filename}")
+        sys.exit(1)
+    except pyodbc.DatabaseError as e:
+        print(f"✗ Error de conexión a SQL Server: {e}")
+        sys.exit(1)
+    except sqlite3.Error as e:
+        print(f"✗ Error en la réplica local: {e}")
+        sys.exit(1)
@@ -0,0 +1,66 @@
+"""
+CONFIGURACIÓN COMÚN DE LAS PRUEBAS UNITARIAS
+
+@author Arias Javier, Andrade Eduardo, Guevara Galo
+@date 2025
+
+Descripción:
+Las pruebas no necesitan SQL Server: usan conexiones y cursores falsos.
+Si pyodbc no está instalado (por ejemplo, sin el controlador ODBC), se
+registra un módulo mínimo con las excepciones y constantes que los módulos
+del proyecto usan al importarse. pyodbc.connect falla siempre en ese caso.
+"""
+
+import os
+import sys
+import types
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+try:
+    import pyodbc  # noqa: F401
+except ImportError:
+    pyodbc = types.ModuleType('pyodbc')
+
+    class Error(Exception):
+        pass
+
+    class DatabaseError(Error):
+        pass
+
+    class IntegrityError(DatabaseError):
+        pass
+
+    class ProgrammingError(DatabaseError):
+        pass
+
+    class OperationalError(DatabaseError):
+        pass
+
+    class Connection:
+        pass
+
+    class Row(tuple):
+        pass
+
+    def connect(*argumentos, **opciones):
+        raise OperationalError('08001', 'pyodbc no está instalado')
+
+    pyodbc.Error = Error
+    pyodbc.DatabaseError = DatabaseError
+    pyodbc.IntegrityError = IntegrityError
+    pyodbc.ProgrammingError = ProgrammingError
+    pyodbc.OperationalError = OperationalError
+    pyodbc.Connection = Connection
+    pyodbc.Row = Row
+    pyodbc.connect = connect
+    pyodbc.pooling = True
+    pyodbc.SQL_INTEGER = 4
+    pyodbc.SQL_WVARCHAR = -9
+    pyodbc.SQL_WLONGVARCHAR = -10
+    pyodbc.SQL_TYPE_DATE = 91
+    pyodbc.SQL_BINARY = -2
+    pyodbc.SQL_GUID = -11
+    sys.modules['pyodbc'] = pyodbc
@@ -0,0 +1,139 @@
+"""
+CONEXIONES Y CURSORES FALSOS PARA LAS PRUEBAS
+Registran las sentencias ejecutadas en lugar de enviarlas a SQL Server
+"""
+
+import pyodbc
+
+
+class CursorFalso:
+    """
+    Cursor que anota cada sentencia en la conexión. Los resultados se toman,
+    en orden, de conexion.resultados (una lista de filas por sentencia).
+    """
+
+    def __init__(self, conexion):
+        self.conexion = conexion
+        self.rowcount = -1
+        self.cerrado = False
+        self.filas = []
+        self.conjuntos = []
+
+    def pendiente(self):
+        return not self.cerrado and bool(self.filas or self.conjuntos)
+
+    def execute(self, sql, *parametros):
+        if self.conexion.cerrada:
+            raise pyodbc.Error('08003', 'La conexión está cerrada')
+        # Sin MARS: otro cursor con resultados sin leer deja la conexión ocupada
+        activo = self.conexion.cursor_activo
+        if activo is not None and activo is not self and activo.pendiente():
+            raise pyodbc.Error('HY000', "Connection is busy with results for another hstmt (0) (SQLExecDirectW)")
+        self.conexion.cursor_activo = self
+        if parametros and len(parametros) == 1 and isinstance(parametros[0], (tuple, list)):
+            parametros = tuple(parametros[0])
+        self.conexion.sentencias.append((sql, tuple(parametros)))
+        for fragmento, error in list(self.conexion.errores.items()):
+            if fragmento in sql:
+                raise error
+        self.rowcount = self.conexion.filas_afectadas
+        conjuntos = self.conexion.resultados.pop(0) if self.conexion.resultados else [[]]
+        self.filas, self.conjuntos = list(conjuntos[0]), [list(conjunto) for conjunto in conjuntos[1:]]
+        return self
+
+    def setinputsizes(self, tamanos):
+        self.conexion.tamanos.append(tamanos)
+
+    def fetchone(self):
+        return self.filas.pop(0) if self.filas else None
+
+    def fetchmany(self, cantidad):
+        lote, self.filas = self.filas[:cantidad], self.filas[cantidad:]
+        return lote
+
+    def fetchall(self):
+        lote, self.filas = self.filas, []
+        return lote
+
+    def nextset(self):
+        self.filas = []
+        if not self.conjuntos:
+            return False
+        self.filas = self.conjuntos.pop(0)
+        return True
+
+    def close(self):
+        self.cerrado = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+class ConexionFalsa:
+    """
+    Conexión que cuenta confirmaciones y reversiones.
+
+    Atributos:
+        sentencias: Lista de (sql, parametros) en el orden en que se ejecutaron
+        errores: Fragmento de SQL -> excepción que se lanza al ejecutarlo
+        resultados: Conjuntos de resultados que devuelven las sentencias siguientes
+        filas_afectadas: rowcount de cada sentencia
+    """
+
+    def __init__(self, filas_afectadas=1):
+        self.sentencias = []
+        self.errores = {}
+        self.resultados = []
+        self.tamanos = []
+        self.filas_afectadas = filas_afectadas
+        self.confirmaciones = 0
+        self.reversiones = 0
+        self.cerrada = False
+        self.cursores = []
+        self.cursor_activo = None
+
+    def cursor(self):
+        micursor = CursorFalso(self)
+        self.cursores.append(micursor)
+        return micursor
+
+    def commit(self):
+        self.confirmaciones += 1
+
+    def rollback(self):
+        self.reversiones += 1
+
+    def close(self):
+        self.cerrada = True
+
+    def sql(self):
+        return [sql for sql, _ in self.sentencias]
+
+
+def error_odbc(sqlstate, mensaje, clase=None):
+    """
+    Error de pyodbc con el formato de args del controlador: (sqlstate, mensaje).
+    """
+    return (clase or pyodbc.Error)(sqlstate, mensaje)
+
+
+def crear_pool_falso(monkeypatch, **opciones):
+    """
+    PoolConexiones real cuyas conexiones son ConexionFalsa.
+    Devuelve el pool y la lista de conexiones que fue abriendo.
+    """
+    import pool_conexiones
+
+    creadas = []
+
+    def conectar(connection_string):
+        conexion = ConexionFalsa()
+        creadas.append(conexion)
+        return conexion
+
+    monkeypatch.setattr(pool_conexiones.pyodbc, 'connect', conectar)
+    opciones.setdefault('tamano_minimo', 0)
+    return pool_conexiones.PoolConexiones('DRIVER=falso', **opciones), creadas
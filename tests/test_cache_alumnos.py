@@ -0,0 +1,96 @@
+"""
+Pruebas de CacheLRU: desalojo del menos usado, expiración por TTL,
+invalidación y contadores.
+"""
+
+import pytest
+
+import cache_alumnos
+from cache_alumnos import CacheLRU
+
+
+class Reloj:
+    """
+    Reemplazo de time.monotonic que avanza solo cuando la prueba lo pide.
+    """
+
+    def __init__(self):
+        self.ahora = 100.0
+
+    def __call__(self):
+        return self.ahora
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    reloj = Reloj()
+    monkeypatch.setattr(cache_alumnos.time, 'monotonic', reloj)
+    return reloj
+
+
+def test_capacidad_invalida():
+    with pytest.raises(ValueError):
+        CacheLRU(capacidad=0)
+
+
+def test_desaloja_el_usado_hace_mas_tiempo():
+    cache = CacheLRU(capacidad=2, ttl=None)
+    cache.guardar(1, 'uno')
+    cache.guardar(2, 'dos')
+    # Leer 1 lo deja como el más reciente: el desalojado es 2
+    assert cache.obtener(1) == 'uno'
+    cache.guardar(3, 'tres')
+
+    assert cache.obtener(2) is None
+    assert (cache.obtener(1), cache.obtener(3)) == ('uno', 'tres')
+    assert cache.estadisticas()['desalojos'] == 1
+
+
+def test_expira_por_ttl(reloj):
+    cache = CacheLRU(capacidad=10, ttl=5.0)
+    cache.guardar(1, 'uno')
+
+    reloj.ahora += 4.9
+    assert cache.obtener(1) == 'uno'
+    reloj.ahora += 0.1
+    assert cache.obtener(1, defecto='vencido') == 'vencido'
+
+    estadisticas = cache.estadisticas()
+    assert (estadisticas['expirados'], estadisticas['tamano']) == (1, 0)
+
+
+def test_guardar_de_nuevo_renueva_el_ttl(reloj):
+    cache = CacheLRU(capacidad=10, ttl=5.0)
+    cache.guardar(1, 'uno')
+    reloj.ahora += 4.0
+    cache.guardar(1, 'uno actualizado')
+    reloj.ahora += 4.0
+
+    assert cache.obtener(1) == 'uno actualizado'
+
+
+def test_invalidar_y_limpiar():
+    cache = CacheLRU(capacidad=10, ttl=None)
+    for clave in range(3):
+        cache.guardar(clave, clave)
+
+    cache.invalidar(0)
+    cache.invalidar(99)
+    assert cache.obtener(0) is None
+    cache.limpiar()
+
+    estadisticas = cache.estadisticas()
+    assert (estadisticas['invalidaciones'], estadisticas['tamano']) == (3, 0)
+
+
+def test_tasa_de_aciertos():
+    cache = CacheLRU(capacidad=10, ttl=None)
+    assert cache.estadisticas()['tasa_aciertos'] == 0.0
+    cache.guardar(1, 'uno')
+    cache.obtener(1)
+    cache.obtener(1)
+    cache.obtener(2)
+
+    estadisticas = cache.estadisticas()
+    assert (estadisticas['aciertos'], estadisticas['fallos']) == (2, 1)
+    assert estadisticas['tasa_aciertos'] == pytest.approx(2 / 3)
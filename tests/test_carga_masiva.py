@@ -0,0 +1,137 @@
+"""
+Pruebas de carga_masiva: validación de registros, división del archivo en
+particiones, cierre de la conexión de los procesos y medición de escalabilidad.
+"""
+
+from datetime import date
+
+import pytest
+
+import carga_masiva
+import pool_conexiones
+from carga_masiva import (ErrorRegistroInvalido, contar_lineas, dividir_en_particiones, leer_particion,
+                          normalizar_cambio, normalizar_estudiante, normalizar_registro)
+from falsos import ConexionFalsa
+
+
+@pytest.mark.parametrize('normalizar', [normalizar_registro, normalizar_estudiante, normalizar_cambio])
+@pytest.mark.parametrize('registro', [[1, 2], 'Ana', 7, None])
+def test_linea_json_que_no_es_objeto(normalizar, registro):
+    with pytest.raises(ErrorRegistroInvalido, match="objeto JSON"):
+        normalizar(3, registro)
+
+
+def test_error_de_lectura_se_propaga():
+    with pytest.raises(ErrorRegistroInvalido, match="JSON inválido"):
+        normalizar_registro(1, ErrorRegistroInvalido("JSON inválido: línea 1"))
+
+
+def test_normalizar_registro():
+    fila = normalizar_registro(2, {'nombre': ' Ana ', 'apellido': 'Paz', 'fecha_nacimiento': '2010-05-04',
+                                   'direccion': '  '})
+    assert fila[:4] == (2, 'Ana', 'Paz', date(2010, 5, 4))
+    assert fila[5] is None
+
+    with pytest.raises(ErrorRegistroInvalido):
+        normalizar_registro(2, {'nombre': 'Ana'})
+    with pytest.raises(ErrorRegistroInvalido):
+        normalizar_registro(2, {'nombre': 'Ana', 'apellido': 'Paz', 'fecha_nacimiento': '04/05/2010'})
+
+
+def test_normalizar_cambio():
+    fila = normalizar_cambio(5, {'id_alumno': '7', 'telefono_alumno': '0999', 'version_esperada': '0x00000000000007D1'})
+    assert fila[:2] == (5, 7)
+    assert fila[-1] == bytes.fromhex('00000000000007D1')
+
+    with pytest.raises(ErrorRegistroInvalido, match="desconocidas"):
+        normalizar_cambio(5, {'id_alumno': 7, 'edad': 9})
+    with pytest.raises(ErrorRegistroInvalido, match="8 bytes"):
+        normalizar_cambio(5, {'id_alumno': 7, 'nombre': 'Ana', 'version_esperada': 2001})
+
+
+# ==================== PARTICIONES ====================
+def _particiones(monkeypatch, tmp_path, nombre, contenido, partes, tamano_minimo=1):
+    monkeypatch.setattr(carga_masiva, 'TAMANO_MINIMO_PARTICION', tamano_minimo)
+    ruta = tmp_path / nombre
+    ruta.write_bytes(contenido)
+    return str(ruta), *dividir_en_particiones(str(ruta), partes)
+
+
+def test_particiones_cubren_el_archivo_y_empiezan_en_una_linea(monkeypatch, tmp_path):
+    lineas = [f'{{"nombre": "N{numero}", "apellido": "{"x" * (numero % 7)}"}}\n'.encode() for numero in range(50)]
+    contenido = b''.join(lineas)
+    ruta, encabezado, rangos = _particiones(monkeypatch, tmp_path, 'a.jsonl', contenido, 8)
+
+    assert encabezado is None
+    assert 1 < len(rangos) <= 8
+    assert rangos[0][0] == 0 and rangos[-1][1] == len(contenido)
+    assert all(fin == inicio for (_, fin), (inicio, _) in zip(rangos, rangos[1:]))
+    assert all(inicio == 0 or contenido[inicio - 1:inicio] == b'\n' for inicio, _ in rangos)
+
+    leidos = [registro['nombre'] for desde, hasta in rangos for _, registro in leer_particion(ruta, desde, hasta)]
+    assert leidos == [f'N{numero}' for numero in range(50)]
+    assert sum(contar_lineas(ruta, desde, hasta) for desde, hasta in rangos) == 50
+
+
+def test_particiones_csv_dejan_fuera_el_encabezado(monkeypatch, tmp_path):
+    contenido = 'nombre,apellido\n'.encode('utf-8-sig') + b''.join(f'A{n},B{n}\n'.encode() for n in range(20))
+    ruta, encabezado, rangos = _particiones(monkeypatch, tmp_path, 'a.csv', contenido, 4)
+
+    assert encabezado == ['nombre', 'apellido']
+    registros = [registro for desde, hasta in rangos for _, registro in leer_particion(ruta, desde, hasta, encabezado)]
+    assert registros[0] == {'nombre': 'A0', 'apellido': 'B0'}
+    assert len(registros) == 20
+
+
+def test_archivo_pequeno_queda_en_una_particion(monkeypatch, tmp_path):
+    _, _, rangos = _particiones(monkeypatch, tmp_path, 'a.jsonl', b'{}\n{}\n', 16, tamano_minimo=1024)
+    assert rangos == [(0, 6)]
+
+
+def test_linea_larga_no_genera_particiones_vacias(monkeypatch, tmp_path):
+    contenido = b'{"nombre": "' + b'x' * 100 + b'"}\n{}\n'
+    _, _, rangos = _particiones(monkeypatch, tmp_path, 'a.jsonl', contenido, 10)
+    assert all(inicio < fin for inicio, fin in rangos)
+    assert rangos[-1][1] == len(contenido)
+
+
+# ==================== PROCESOS ====================
+def test_el_proceso_trabajador_cierra_su_conexion(monkeypatch):
+    creadas, finalizadores = [], []
+    monkeypatch.setattr(pool_conexiones.pyodbc, 'connect', lambda _: creadas.append(ConexionFalsa()) or creadas[-1])
+    monkeypatch.setattr(carga_masiva.multiprocessing.util, 'Finalize',
+                        lambda objeto, funcion, exitpriority=None: finalizadores.append((funcion, exitpriority)))
+
+    carga_masiva._inicializar_proceso('DRIVER=falso')
+    assert [prioridad for _, prioridad in finalizadores] == [10]
+
+    finalizadores[0][0]()
+    assert creadas[0].cerrada
+    assert carga_masiva._pool_proceso is None
+
+
+def test_medir_escalabilidad_purga_entre_mediciones(monkeypatch):
+    velocidades = {1: 100.0, 4: 350.0}
+    creadas = []
+
+    def cargar(ruta, connection_string, procesos, tamano_lote, mostrar_progreso):
+        inicio = 10 * procesos
+        return {'insertados': 2, 'errores': [], 'ids': [(1, inicio), (2, inicio + 1)],
+                'segundos': 2 / velocidades[procesos], 'filas_por_segundo': velocidades[procesos]}
+
+    def conectar(_):
+        conexion = ConexionFalsa()
+        conexion.resultados = [[[(2, 11)]], [[(2, 41)]]]
+        creadas.append(conexion)
+        return conexion
+
+    monkeypatch.setattr(carga_masiva, 'cargar_en_paralelo', cargar)
+    monkeypatch.setattr(pool_conexiones.pyodbc, 'connect', conectar)
+
+    mediciones = carga_masiva.medir_escalabilidad('a.jsonl', 'DRIVER=falso', procesos=(1, 4), mostrar_progreso=False)
+
+    assert [medicion['procesos'] for medicion in mediciones] == [1, 4]
+    assert mediciones[1]['aceleracion'] == pytest.approx(3.5)
+    purgas = [parametros for sql, parametros in creadas[0].sentencias if 'sp_PurgarAlumnosLote' in sql]
+    assert [parametros[2] for parametros in purgas] == ['[10, 11]', '[40, 41]']
+    assert creadas[0].cerrada
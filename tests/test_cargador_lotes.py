@@ -0,0 +1,85 @@
+"""
+Pruebas de CargadorPorLotes: claves repetidas, lotes llenos, pedidos
+concurrentes agrupados en un round trip y propagación de errores.
+"""
+
+import threading
+
+import pytest
+
+from cargador_lotes import CargadorPorLotes
+
+
+class FuncionLote:
+    """
+    Función de carga que anota cada lote recibido y devuelve clave * 10.
+    """
+
+    def __init__(self, ausentes=()):
+        self.lotes = []
+        self.ausentes = set(ausentes)
+
+    def __call__(self, claves):
+        self.lotes.append(list(claves))
+        return {clave: clave * 10 for clave in claves if clave not in self.ausentes}
+
+
+def test_claves_repetidas_se_piden_una_vez():
+    funcion = FuncionLote(ausentes={3})
+    cargador = CargadorPorLotes(funcion, ventana=0)
+
+    assert cargador.obtener_varios([1, 2, 2, 3]) == {1: 10, 2: 20, 3: None}
+    assert funcion.lotes == [[1, 2, 3]]
+    estadisticas = cargador.estadisticas()
+    assert (estadisticas['pedidos'], estadisticas['repetidos'], estadisticas['lotes']) == (4, 1, 1)
+
+
+def test_lote_lleno_se_divide():
+    funcion = FuncionLote()
+    cargador = CargadorPorLotes(funcion, ventana=0, tamano_maximo=2)
+
+    assert cargador.obtener_varios([1, 2, 3, 4, 5]) == {clave: clave * 10 for clave in range(1, 6)}
+    assert funcion.lotes == [[1, 2], [3, 4], [5]]
+    assert cargador.estadisticas()['claves_por_lote'] == pytest.approx(5 / 3)
+
+
+def test_pedidos_concurrentes_comparten_el_lote():
+    funcion = FuncionLote()
+    # Ventana larga: el lote solo se despacha a tiempo si los tres hilos lo llenan
+    cargador = CargadorPorLotes(funcion, ventana=5, tamano_maximo=3)
+    resultados = {}
+    listos = threading.Barrier(3)
+
+    def pedir(clave):
+        listos.wait()
+        resultados[clave] = cargador.obtener(clave)
+
+    hilos = [threading.Thread(target=pedir, args=(clave,)) for clave in (1, 2, 3)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join(10)
+
+    assert resultados == {1: 10, 2: 20, 3: 30}
+    assert len(funcion.lotes) == 1
+    assert sorted(funcion.lotes[0]) == [1, 2, 3]
+
+
+def test_error_de_la_funcion_llega_a_todos_los_pedidos():
+    def fallar(claves):
+        raise RuntimeError("servidor caído")
+
+    cargador = CargadorPorLotes(fallar, ventana=0)
+
+    with pytest.raises(RuntimeError):
+        cargador.obtener_varios([1, 2])
+    assert cargador.estadisticas()['errores'] == 1
+    # El lote fallido quedó cerrado: el siguiente pedido abre otro
+    with pytest.raises(RuntimeError):
+        cargador.obtener(3)
+    assert cargador.estadisticas()['lotes'] == 2
+
+
+def test_tamano_maximo_invalido():
+    with pytest.raises(ValueError):
+        CargadorPorLotes(FuncionLote(), tamano_maximo=0)
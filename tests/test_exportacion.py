@@ -0,0 +1,40 @@
+"""
+Pruebas de exportacion: formato y compresión deducidos de la extensión y
+archivos CSV/JSONL escritos en flujo.
+"""
+
+import gzip
+import json
+
+import pytest
+
+from exportacion import detectar_compresion, detectar_formato, exportar_lotes
+
+FILAS = [(1, 'Ana', 'Paz'), (2, 'Luis', 'Vera')]
+
+
+def test_detectar_formato_y_compresion():
+    assert detectar_formato('Alumnos.CSV.GZ') == ('csv', 'gzip')
+    assert detectar_formato('alumnos.ndjson.zst') == ('jsonl', 'zstd')
+    assert detectar_formato('alumnos.parquet') == ('parquet', None)
+    assert detectar_compresion('salida.dat')[0] is None
+    with pytest.raises(ValueError):
+        detectar_formato('alumnos.txt')
+
+
+@pytest.mark.parametrize('formato', [None, 'csv'])
+def test_compresion_deducida_aunque_se_indique_el_formato(tmp_path, formato):
+    ruta = str(tmp_path / 'alumnos.csv.gz')
+    resultado = exportar_lotes([FILAS], ruta, formato=formato, mostrar_progreso=False)
+
+    with gzip.open(ruta, 'rt', encoding='utf-8') as archivo:
+        lineas = archivo.read().splitlines()
+    assert lineas[-1] == '2,Luis,Vera'
+    assert resultado['filas'] == 2
+
+
+def test_formato_indicado_con_extension_desconocida(tmp_path):
+    ruta = tmp_path / 'alumnos.dat'
+    exportar_lotes([FILAS], str(ruta), formato='jsonl', mostrar_progreso=False)
+    assert len(ruta.read_text(encoding='utf-8').splitlines()) == 2
+    json.loads(ruta.read_text(encoding='utf-8').splitlines()[0])
@@ -0,0 +1,64 @@
+"""
+Pruebas del listado de GestorEstudiantes: el paginador lee del servidor solo
+las páginas que se visitan, con paginación keyset sobre IDEstudiante.
+"""
+
+import importlib.util
+import io
+import os
+
+from conftest import RAIZ
+from falsos import crear_pool_falso
+from presentacion import Paginador
+from reintentos import InterruptorCircuito, PoliticaReintentos
+
+
+def _cargar_modulo():
+    # El nombre del script empieza con un número: se importa desde su ruta
+    ruta = os.path.join(RAIZ, '01-EjercicioEnClase_OOP.py')
+    especificacion = importlib.util.spec_from_file_location('ejercicio_estudiantes', ruta)
+    modulo = importlib.util.module_from_spec(especificacion)
+    especificacion.loader.exec_module(modulo)
+    return modulo
+
+
+def _crear_gestor(monkeypatch):
+    modulo = _cargar_modulo()
+    pool, creadas = crear_pool_falso(monkeypatch, tamano_maximo=1)
+    gestor = object.__new__(modulo.GestorEstudiantes)
+    gestor.pool = pool
+    gestor.politica_reintentos = PoliticaReintentos()
+    gestor.interruptor = InterruptorCircuito()
+    return gestor, pool
+
+
+def _paginas(desde, cantidad, tamano):
+    return [[[(numero, f'N{numero}', 'A', None, None) for numero in range(inicio, min(inicio + tamano, cantidad + 1))]]
+            for inicio in range(desde, cantidad + 1, tamano)]
+
+
+def test_navegar_pide_solo_las_paginas_visitadas(monkeypatch):
+    gestor, pool = _crear_gestor(monkeypatch)
+    with pool.conexion() as conexion:
+        conexion.resultados = _paginas(1, 100, 3)
+    respuestas = iter(['', 'q'])
+    paginador = Paginador([], tamano_pagina=3, salida=io.StringIO(), interactivo=True)
+
+    total = paginador.navegar(gestor.iterar_estudiantes(3), entrada=lambda _: next(respuestas))
+
+    # Página 2 visible y la 3 leída para saber si hay siguiente
+    assert total == 9
+    assert [parametros for _, parametros in conexion.sentencias] == [(3, -2147483648), (3, 3), (3, 6)]
+    assert 'WHERE IDEstudiante > ?' in conexion.sentencias[0][0]
+
+
+def test_lote_columnar_lee_la_tabla_completa(monkeypatch):
+    gestor, pool = _crear_gestor(monkeypatch)
+    gestor.TAMANO_LOTE_FETCH = 2
+    with pool.conexion() as conexion:
+        conexion.resultados = _paginas(1, 5, 2)
+
+    lote = gestor.leer_estudiantes_columnar()
+
+    assert [estudiante.id_estudiante for estudiante in lote] == [1, 2, 3, 4, 5]
+    assert len(conexion.sentencias) == 3
@@ -0,0 +1,35 @@
+"""
+Pruebas de HuellaEsquema: la verificación en segundo plano no imprime y deja
+el resultado en estado y problemas para que lo informe quien la lanzó.
+"""
+
+from falsos import crear_pool_falso
+from huella_esquema import HuellaEsquema
+
+
+def test_verificacion_en_segundo_plano_no_imprime(monkeypatch, capsys):
+    pool, creadas = crear_pool_falso(monkeypatch, tamano_maximo=1)
+    with pool.conexion() as conexion:
+        # Marca de sys.objects y metadatos vacíos: faltan la tabla y los resultados
+        conexion.resultados = [[[('2025-01-01', 10)]], [[]], [[]], [[]]]
+    huella = HuellaEsquema(archivo=None)
+
+    hilo = huella.verificar_en_segundo_plano(pool)
+    hilo.join(5)
+
+    assert huella.estado == 'actualizada'
+    assert 'No existe la tabla dbo.Alumno' in huella.problemas
+    assert capsys.readouterr().out == ''
+
+
+def test_error_de_verificacion_queda_registrado(monkeypatch, capsys):
+    pool, creadas = crear_pool_falso(monkeypatch, tamano_maximo=1)
+    with pool.conexion() as conexion:
+        conexion.errores['sys.objects'] = RuntimeError('sin permiso')
+    huella = HuellaEsquema(archivo=None)
+
+    huella.verificar_en_segundo_plano(pool).join(5)
+
+    assert huella.estado == 'error'
+    assert str(huella.error) == 'sin permiso'
+    assert capsys.readouterr().out == ''
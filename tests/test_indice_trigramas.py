@@ -0,0 +1,70 @@
+"""
+Pruebas de IndiceTrigramas: normalización, búsqueda por subcadena y
+mantenimiento con los bloques de sp_ObtenerCambiosAlumnos.
+"""
+
+from indice_trigramas import MARCA_INICIAL, IndiceTrigramas, normalizar_texto, obtener_trigramas
+
+
+def _marca(numero):
+    return numero.to_bytes(8, 'big')
+
+
+def _indice(*alumnos):
+    indice = IndiceTrigramas()
+    indice.reconstruir([(_marca(len(alumnos)), list(alumnos), [])])
+    return indice
+
+
+def test_normalizar_texto_sin_tildes_ni_mayusculas():
+    assert normalizar_texto("  José   MUÑOZ ") == "jose munoz"
+    assert normalizar_texto(None) == ''
+    assert obtener_trigramas("ana") == {"ana"}
+    assert obtener_trigramas("an") == set()
+
+
+def test_buscar_por_subcadena_en_nombre_o_apellido():
+    indice = _indice((1, 'José', 'Muñoz'), (2, 'Josefina', 'Paz'), (3, 'Ana', 'Jose'))
+
+    assert sorted(indice.buscar('jose')) == [1, 2, 3]
+    assert indice.buscar('munoz') == [1]
+    assert indice.buscar('xyz') == []
+    assert indice.buscar('') == []
+    assert indice.construido and len(indice) == 3
+
+
+def test_termino_corto_revisa_los_textos():
+    indice = _indice((1, 'Ana', 'Paz'), (2, 'Luis', 'Vera'))
+    assert indice.buscar('pa') == [1]
+
+
+def test_trigramas_en_otro_orden_no_coinciden():
+    # "abcab" contiene los trigramas de "cabc" pero no la subcadena
+    indice = _indice((1, 'abcab', 'x'))
+    assert indice.buscar('bcabc') == []
+    assert indice.buscar('bca') == [1]
+
+
+def test_aplicar_cambios_reindexa_renombrados_y_quita_eliminados():
+    indice = _indice((1, 'Pedro', 'Ríos'), (2, 'Marta', 'Gil'))
+
+    indice.aplicar_cambios(_marca(5), [(1, 'Pablo', 'Ríos')], [2])
+
+    assert indice.buscar('pedro') == []
+    assert indice.buscar('pablo') == [1]
+    assert indice.buscar('marta') == []
+    assert indice.marca == _marca(5)
+    assert len(indice) == 1
+
+
+def test_reconstruir_desde_la_marca_inicial_aplica_bloques_en_orden():
+    indice = IndiceTrigramas()
+    assert indice.marca == MARCA_INICIAL
+
+    indice.reconstruir([
+        (_marca(2), [(1, 'Rosa', 'Lema'), (2, 'Iván', 'Soto')], []),
+        (_marca(4), [(3, 'Rosa', 'Vaca')], [1]),
+    ])
+
+    assert sorted(indice.buscar('rosa')) == [3]
+    assert indice.marca == _marca(4)
@@ -0,0 +1,129 @@
+"""
+Pruebas de HistogramaLatencia (buckets, percentiles interpolados y bucket
++Inf), de su exportación acumulativa en formato Prometheus y de los
+contadores por método del gestor.
+"""
+
+import pytest
+
+from falsos import ConexionFalsa
+from metricas import (ConexionInstrumentada, HistogramaLatencia, RegistroMetricas, medir_operacion,
+                      nombre_procedimiento)
+
+
+def test_valor_en_el_limite_cae_en_su_bucket():
+    histograma = HistogramaLatencia(limites=(1.0, 2.0, 3.0))
+    for segundos in (1.0, 2.5, 7.0):
+        histograma.observar(segundos)
+
+    # le=1.0 incluye el 1.0; lo que supera el último límite va al bucket +Inf
+    assert histograma.conteos == [1, 0, 1, 1]
+    assert (histograma.cantidad, histograma.suma, histograma.maximo) == (3, 10.5, 7.0)
+
+
+def test_percentiles_interpolados():
+    histograma = HistogramaLatencia(limites=(1.0, 2.0, 3.0))
+    for segundos in (0.5, 0.5, 1.5, 1.5):
+        histograma.observar(segundos)
+
+    assert histograma.percentil(25) == pytest.approx(0.5)
+    assert histograma.percentil(50) == pytest.approx(1.0)
+    assert histograma.percentil(75) == pytest.approx(1.5)
+    # Nunca supera el máximo observado aunque el bucket llegue a 2.0
+    assert histograma.percentil(100) == pytest.approx(1.5)
+
+
+def test_percentil_en_el_bucket_infinito_usa_el_maximo():
+    histograma = HistogramaLatencia(limites=(1.0, 2.0, 3.0))
+    histograma.observar(10.0)
+
+    assert histograma.percentil(50) == pytest.approx(6.5)
+    assert histograma.percentil(99) <= 10.0
+
+
+def test_histograma_vacio():
+    assert HistogramaLatencia().percentil(95) == 0.0
+
+
+def test_exportacion_prometheus_acumula_los_buckets():
+    metricas = RegistroMetricas()
+    metricas.registrar_llamada('sp_ObtenerAlumnoPorID', 0.0007)
+    metricas.registrar_llamada('sp_ObtenerAlumnoPorID', 60.0, error=True)
+
+    texto = metricas.exportar_prometheus()
+
+    assert 'catequesis_sp_latencia_segundos_bucket{procedimiento="sp_ObtenerAlumnoPorID",le="0.0005"} 0' in texto
+    assert 'catequesis_sp_latencia_segundos_bucket{procedimiento="sp_ObtenerAlumnoPorID",le="0.001"} 1' in texto
+    assert 'catequesis_sp_latencia_segundos_bucket{procedimiento="sp_ObtenerAlumnoPorID",le="30.0"} 1' in texto
+    assert 'catequesis_sp_latencia_segundos_bucket{procedimiento="sp_ObtenerAlumnoPorID",le="+Inf"} 2' in texto
+    assert 'catequesis_sp_errores_total{procedimiento="sp_ObtenerAlumnoPorID"} 1' in texto
+
+
+def test_nombre_procedimiento():
+    assert nombre_procedimiento("{CALL dbo.sp_ObtenerAlumnoPorID (?)}") == 'sp_ObtenerAlumnoPorID'
+    assert nombre_procedimiento("EXEC [dbo].[sp_EstadisticasAlumnos]") == 'sp_EstadisticasAlumnos'
+    assert nombre_procedimiento("SELECT 1") == 'sql_directo'
+
+
+class GestorFalso:
+    """
+    Gestor mínimo con métodos instrumentados sobre una conexión falsa.
+    """
+
+    def __init__(self, metricas):
+        self.metricas = metricas
+        self.fisica = ConexionFalsa()
+        self.conexion = ConexionInstrumentada(self.fisica, metricas)
+
+    @medir_operacion
+    def listar(self):
+        self.fisica.resultados = [[[(1, 'Ana'), (2, 'Luis')]]]
+        with self.conexion.cursor() as micursor:
+            micursor.execute("{CALL dbo.sp_ObtenerAlumnosPaginado (?, ?)}", (0, 10))
+            filas = micursor.fetchall()
+        return filas + self.contar()
+
+    @medir_operacion
+    def contar(self):
+        self.fisica.resultados = [[[(2,)]]]
+        with self.conexion.cursor() as micursor:
+            return [micursor.execute("{CALL dbo.sp_EstadisticasAlumnos}").fetchone()]
+
+    @medir_operacion
+    def fallar(self):
+        self.fisica.errores['sp_Roto'] = RuntimeError('falla')
+        self.conexion.cursor().execute("EXEC dbo.sp_Roto")
+
+
+def test_round_trips_filas_y_bytes_por_metodo():
+    metricas = RegistroMetricas()
+    gestor = GestorFalso(metricas)
+
+    gestor.listar()
+
+    operaciones = metricas.instantanea()['operaciones']
+    # El método que llama a otro suma también la actividad del llamado
+    assert (operaciones['listar']['round_trips'], operaciones['listar']['filas']) == (2, 3)
+    assert (operaciones['contar']['round_trips'], operaciones['contar']['filas']) == (1, 1)
+    assert operaciones['listar']['bytes'] == 3 * 8 + len('Ana') + len('Luis')
+    texto = metricas.exportar_prometheus()
+    assert 'catequesis_operacion_round_trips_total{metodo="listar"} 2' in texto
+    assert 'catequesis_operacion_filas_total{metodo="contar"} 1' in texto
+
+
+def test_actividad_fuera_de_un_metodo_no_se_atribuye():
+    metricas = RegistroMetricas()
+    gestor = GestorFalso(metricas)
+    gestor.contar()
+
+    with gestor.conexion.cursor() as micursor:
+        micursor.execute("SELECT 1")
+
+    assert metricas.instantanea()['operaciones']['contar']['round_trips'] == 1
+    with pytest.raises(RuntimeError):
+        gestor.fallar()
+    fallar = metricas.instantanea()['operaciones']['fallar']
+    assert (fallar['round_trips'], fallar['errores']) == (1, 1)
+    # Aunque el método falle deja de estar en curso
+    gestor.contar()
+    assert metricas.instantanea()['operaciones']['fallar']['round_trips'] == 1
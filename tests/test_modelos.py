@@ -0,0 +1,81 @@
+"""
+Pruebas de LoteColumnar: registros armados al leer, columnas enteras en
+array, internado de valores repetidos, columnas ausentes y mapa de posiciones.
+"""
+
+from array import array
+
+import pytest
+
+from huella_esquema import mapa_posiciones
+from modelos import Alumno, Estudiante, LoteColumnar, crear_lote_alumnos, crear_lote_estudiantes, filas_sinteticas
+
+
+def _nuevo(texto):
+    # Un objeto str distinto con el mismo valor, como los que entrega el controlador
+    return texto.encode('utf-8').decode('utf-8')
+
+
+def test_el_lote_devuelve_los_mismos_registros_que_la_lista():
+    filas = list(filas_sinteticas(50))
+    lote = crear_lote_alumnos().extender(filas)
+
+    assert len(lote) == 50
+    assert list(lote) == list(Alumno.desde_filas(filas))
+    assert lote[3] == Alumno(*filas[3])
+    assert lote[-1].id_alumno == 50
+    assert [alumno.id_alumno for alumno in lote[10:13]] == [11, 12, 13]
+    # sp_ObtenerAlumnosPaginado no devuelve version_fila
+    assert set(lote.columna('version_fila')) == {None}
+
+
+def test_columnas_enteras_en_array():
+    lote = crear_lote_alumnos().extender(filas_sinteticas(3))
+    columna = lote.columna('id_alumno')
+
+    assert isinstance(columna, array) and columna.typecode == 'q'
+    assert list(columna) == [1, 2, 3]
+
+
+def test_valores_repetidos_se_guardan_una_vez():
+    lote = LoteColumnar(Estudiante, internar=('nombre',), enteros=('id_estudiante',))
+    for id_estudiante in range(4):
+        lote.agregar((id_estudiante, _nuevo('María'), _nuevo('Paz')))
+
+    nombres = lote.columna('nombre')
+    apellidos = lote.columna('apellido')
+    assert all(nombre is nombres[0] for nombre in nombres)
+    assert apellidos[0] is not apellidos[1]
+    assert lote.estadisticas() == {'filas': 4, 'valores_internados': {'nombre': 1}}
+    # Las columnas que la fila no trae quedan en None
+    assert lote[0] == Estudiante(0, 'María', 'Paz', None, None)
+
+
+def test_compactar_deja_de_internar():
+    lote = crear_lote_estudiantes()
+    lote.agregar((1, _nuevo('Ana'), 'Paz', None, None))
+    lote.compactar()
+    lote.agregar((2, _nuevo('Ana'), 'Paz', None, None))
+
+    nombres = lote.columna('nombre')
+    assert nombres[0] == nombres[1] and nombres[0] is not nombres[1]
+    assert lote.estadisticas()['valores_internados'] == {}
+
+
+def test_extender_con_mapa_de_posiciones():
+    # El resultado trae las columnas en otro orden y sin teléfono ni email
+    posiciones = mapa_posiciones(('apellido', 'id_estudiante', 'nombre'))
+    lote = crear_lote_estudiantes().extender([('Paz', 7, 'Ana')], posiciones)
+
+    assert lote[0] == Estudiante(7, 'Ana', 'Paz')
+
+
+def test_entero_nulo_no_cabe_en_array():
+    with pytest.raises(TypeError):
+        crear_lote_estudiantes().agregar((None, 'Ana', 'Paz', None, None))
+
+
+def test_lote_vacio():
+    lote = crear_lote_alumnos()
+    assert len(lote) == 0
+    assert list(lote) == []
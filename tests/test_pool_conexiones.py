@@ -0,0 +1,118 @@
+"""
+Pruebas de PoolConexiones con pyodbc.connect reemplazado por ConexionFalsa:
+reutilización, límite y tiempo de espera, confirmación y reversión,
+descarte tras un error de conexión, validación y desalojo de ociosas.
+"""
+
+import pyodbc
+import pytest
+
+from falsos import crear_pool_falso, error_odbc
+from pool_conexiones import ErrorPoolAgotado, PoolConexiones
+
+
+def test_tamanos_invalidos():
+    with pytest.raises(ValueError):
+        PoolConexiones('DRIVER=falso', tamano_minimo=3, tamano_maximo=2, abrir_minimo=False)
+
+
+def test_precalentar_abre_el_minimo(monkeypatch):
+    pool, creadas = crear_pool_falso(monkeypatch, tamano_minimo=2, tamano_maximo=4)
+    assert len(creadas) == 2
+    assert pool.estadisticas()['libres'] == 2
+    assert pool.precalentar() == 0
+
+
+def test_reutiliza_la_conexion_devuelta(monkeypatch):
+    pool, creadas = crear_pool_falso(monkeypatch, tamano_maximo=2)
+
+    for _ in range(3):
+        with pool.conexion() as conexion:
+            conexion.cursor().execute("SELECT 1")
+
+    assert len(creadas) == 1
+    assert creadas[0].confirmaciones == 3
+    estadisticas = pool.estadisticas()
+    assert (estadisticas['prestamos'], estadisticas['devoluciones'], estadisticas['abiertas']) == (3, 3, 1)
+
+
+def test_pool_agotado_tras_el_tiempo_de_espera(monkeypatch):
+    pool, creadas = crear_pool_falso(monkeypatch, tamano_maximo=1)
+    prestada = pool.obtener()
+
+    with pytest.raises(ErrorPoolAgotado):
+        pool.obtener(tiempo_espera=0.01)
+
+    pool.devolver(prestada)
+    assert pool.obtener(tiempo_espera=0.01) is prestada
+    assert pool.estadisticas()['tiempos_agotados'] == 1
+
+
+def test_error_del_bloque_revierte_y_conserva_la_conexion(monkeypatch):
+    pool, creadas = crear_pool_falso(monkeypatch, tamano_maximo=1)
+
+    with pytest.raises(ValueError):
+        with pool.conexion():
+            raise ValueError("dato inválido")
+
+    assert (creadas[0].confirmaciones, creadas[0].reversiones) == (0, 1)
+    assert not creadas[0].cerrada
+    assert pool.estadisticas()['libres'] == 1
+
+
+def test_error_de_conexion_descarta_tambien_las_libres(monkeypatch):
+    pool, creadas = crear_pool_falso(monkeypatch, tamano_maximo=2)
+    libre = pool.obtener()
+    pool.devolver(pool.obtener())
+    pool.devolver(libre)
+
+    with pytest.raises(pyodbc.OperationalError):
+        with pool.conexion():
+            raise error_odbc('08S01', 'Communication link failure', clase=pyodbc.OperationalError)
+
+    assert all(conexion.cerrada for conexion in creadas)
+    assert pool.estadisticas()['abiertas'] == 0
+    # La siguiente operación abre una conexión nueva
+    with pool.conexion():
+        pass
+    assert len(creadas) == 3
+
+
+def test_conexion_invalida_se_reemplaza(monkeypatch):
+    pool, creadas = crear_pool_falso(monkeypatch, tamano_maximo=1, intervalo_validacion=0)
+    pool.devolver(pool.obtener())
+    creadas[0].errores[PoolConexiones.CONSULTA_VALIDACION] = error_odbc('08S01', 'Communication link failure')
+
+    conexion = pool.obtener()
+
+    assert conexion is creadas[1]
+    assert creadas[0].cerrada
+    assert pool.estadisticas()['desalojos_invalidas'] == 1
+
+
+def test_desalojo_de_ociosas_respeta_el_minimo(monkeypatch):
+    pool, creadas = crear_pool_falso(monkeypatch, tamano_minimo=1, tamano_maximo=3, tiempo_ocioso=0)
+    prestadas = [pool.obtener() for _ in range(3)]
+    for conexion in prestadas:
+        pool.devolver(conexion)
+
+    pool.devolver(pool.obtener())
+
+    estadisticas = pool.estadisticas()
+    assert estadisticas['abiertas'] == 1
+    assert estadisticas['desalojos_ociosas'] == 2
+
+
+def test_al_cerrar_y_al_devolver(monkeypatch):
+    cerradas, devueltas = [], []
+    pool, creadas = crear_pool_falso(monkeypatch, tamano_maximo=1,
+                                     al_cerrar=cerradas.append, al_devolver=devueltas.append)
+
+    with pool.conexion():
+        pass
+    pool.cerrar()
+
+    assert devueltas == creadas
+    assert cerradas == creadas
+    with pytest.raises(ErrorPoolAgotado):
+        pool.obtener()
@@ -0,0 +1,102 @@
+"""
+Pruebas del Paginador: una escritura por página, anchos automáticos y
+truncados, lectura perezosa del iterador y navegación interactiva.
+"""
+
+import io
+
+from presentacion import Columna, Paginador
+
+
+COLUMNAS = [Columna('ID', 0, 4), Columna('Nombre', 1, 10)]
+
+
+class SalidaContada(io.StringIO):
+    """
+    StringIO que cuenta las llamadas a write.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.escrituras = 0
+
+    def write(self, texto):
+        self.escrituras += 1
+        return super().write(texto)
+
+
+def filas_contadas(cantidad, leidas):
+    for numero in range(1, cantidad + 1):
+        leidas.append(numero)
+        yield (numero, f'Alumno{numero}')
+
+
+def test_mostrar_todo_escribe_un_bloque_por_pagina():
+    salida = SalidaContada()
+    paginador = Paginador(COLUMNAS, titulo='ALUMNOS', tamano_pagina=2, salida=salida)
+
+    assert paginador.ejecutar((numero, f'A{numero}') for numero in range(5)) == 5
+    assert paginador.completo
+    assert salida.escrituras == 3
+    # Un solo encabezado, con anchos tomados del primer bloque
+    assert salida.getvalue().count('ALUMNOS') == 1
+
+
+def test_ancho_automatico_y_truncado():
+    paginador = Paginador(COLUMNAS, tamano_pagina=10, salida=io.StringIO(), ancho_maximo=5)
+    texto, anchos = paginador.formatear([(1, 'Maximiliano'), (22, None)])
+
+    assert anchos == [2, 5]
+    lineas = texto.splitlines()
+    assert lineas[0] == 'ID Nombr'
+    assert lineas[2:] == ['1  Maxim', '22 N/A  ']
+
+
+def test_ancho_fijo():
+    paginador = Paginador(COLUMNAS, tamano_pagina=10, salida=io.StringIO(), ancho_automatico=False)
+    _, anchos = paginador.formatear([(1, 'Ana')])
+    assert anchos == [4, 10]
+
+
+def test_navegar_solo_lee_las_paginas_visitadas():
+    leidas = []
+    salida = io.StringIO()
+    paginador = Paginador(COLUMNAS, tamano_pagina=3, salida=salida, interactivo=True)
+    respuestas = iter(['', 'q'])
+
+    total = paginador.navegar(filas_contadas(100, leidas), entrada=lambda _: next(respuestas))
+
+    # Página 2 visible y la 3 leída por adelantado para saber si hay siguiente
+    assert total == 9
+    assert leidas == list(range(1, 10))
+    assert not paginador.completo
+    assert 'Página 2 de 3+ (filas 4-6)' in salida.getvalue()
+
+
+def test_navegar_salta_retrocede_y_termina():
+    salida = io.StringIO()
+    paginador = Paginador(COLUMNAS, tamano_pagina=2, salida=salida, interactivo=True)
+    respuestas = iter(['3', 'a', '9', ''])
+
+    total = paginador.navegar(((numero, 'x') for numero in range(1, 6)), entrada=lambda _: next(respuestas))
+
+    assert total == 5
+    assert paginador.completo
+    paginas = [linea for linea in salida.getvalue().splitlines() if linea.startswith('Página')]
+    assert paginas == [
+        'Página 1 de 2+ (filas 1-2)',
+        'Página 3 de 3 (filas 5-5)',
+        'Página 2 de 3 (filas 3-4)',
+        'Página 3 de 3 (filas 5-5)',
+    ]
+
+
+def test_navegar_una_sola_pagina_no_pregunta():
+    paginador = Paginador(COLUMNAS, tamano_pagina=5, salida=io.StringIO(), interactivo=True)
+
+    def entrada(_):
+        raise AssertionError("No debería preguntar")
+
+    assert paginador.navegar([(1, 'Ana')], entrada=entrada) == 1
+    assert paginador.completo
+    assert paginador.navegar([], entrada=entrada) == 0
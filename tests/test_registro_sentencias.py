@@ -0,0 +1,123 @@
+"""
+Pruebas de RegistroSentencias: formas {CALL}/EXEC, validación de parámetros,
+descarte de resultados sin leer entre llamadas en la misma conexión y
+cursores reutilizados a través de los envoltorios de métricas y perfil.
+"""
+
+import pytest
+
+from carga_masiva import CargadorMasivoAlumnos
+from falsos import ConexionFalsa, crear_pool_falso
+from metricas import ConexionInstrumentada, RegistroMetricas
+from perfil_servidor import PREFIJO_ESTADISTICAS, ConexionPerfilada, PerfiladorServidor
+from registro_sentencias import RegistroSentencias, Sentencia, conexion_fisica
+
+
+def test_formas_de_la_sentencia():
+    sentencia = RegistroSentencias().sentencias['sp_ObtenerAlumnosPaginado']
+    assert sentencia.llamada == "{CALL dbo.sp_ObtenerAlumnosPaginado (?, ?)}"
+    assert sentencia.texto == "EXEC dbo.sp_ObtenerAlumnosPaginado ?, ?"
+    assert Sentencia('sp_Sin').llamada == "{CALL dbo.sp_Sin}"
+
+
+def test_cantidad_de_parametros_incorrecta():
+    with pytest.raises(ValueError):
+        RegistroSentencias().ejecutar(ConexionFalsa(), 'sp_ObtenerAlumnoPorID', ())
+
+
+def test_dos_procedimientos_seguidos_en_la_misma_conexion():
+    # verificar_estadisticas: fetchone deja filas sin leer en el primer cursor
+    conexion = ConexionFalsa()
+    conexion.resultados = [[[(1,), (2,)], [('mensaje',)]], [[(3,)]]]
+    registro = RegistroSentencias()
+
+    assert registro.ejecutar(conexion, 'sp_EstadisticasAlumnos').fetchone() == (1,)
+    assert registro.ejecutar(conexion, 'sp_EstadisticasAlumnosCompleto').fetchone() == (3,)
+
+
+def test_el_pool_descarta_resultados_antes_de_devolver(monkeypatch):
+    registro = RegistroSentencias()
+    pool, creadas = crear_pool_falso(monkeypatch, tamano_maximo=1, al_devolver=registro.liberar)
+
+    with pool.conexion() as conexion:
+        conexion.resultados = [[[(1,), (2,)]]]
+        micursor = registro.ejecutar(conexion, 'sp_EstadisticasAlumnos')
+        micursor.fetchone()
+
+    assert not micursor.pendiente()
+    # La siguiente operación usa la conexión con otro cursor sin error
+    with pool.conexion() as conexion, conexion.cursor() as otro:
+        otro.execute("SELECT 1")
+    assert creadas[0].confirmaciones == 2
+
+
+def test_conexion_fisica_debajo_de_envoltorios():
+    conexion = ConexionFalsa()
+    envuelta = ConexionInstrumentada(ConexionInstrumentada(conexion, RegistroMetricas()), RegistroMetricas())
+    assert conexion_fisica(envuelta) is conexion
+    assert conexion_fisica(conexion) is conexion
+
+
+def test_conexion_envuelta_reutiliza_el_cursor_de_la_conexion_fisica():
+    conexion = ConexionFalsa()
+    metricas = RegistroMetricas()
+    registro = RegistroSentencias()
+
+    for _ in range(3):
+        # El pool entrega un envoltorio nuevo en cada préstamo
+        envuelta = ConexionInstrumentada(conexion, metricas)
+        registro.ejecutar(envuelta, 'sp_ObtenerAlumnoPorID', (1,)).fetchall()
+        registro.liberar(envuelta)
+
+    assert len(conexion.cursores) == 1
+    assert conexion.sql() == ["{CALL dbo.sp_ObtenerAlumnoPorID (?)}"] * 3
+    assert metricas.instantanea()['procedimientos']['sp_ObtenerAlumnoPorID']['llamadas'] == 3
+    estadisticas = registro.estadisticas()
+    assert (estadisticas['cursores_creados'], estadisticas['cursores_reutilizados']) == (1, 2)
+
+
+def test_conexion_con_perfil_usa_la_forma_exec():
+    conexion = ConexionFalsa()
+    perfilador = PerfiladorServidor(archivo_lentas=None)
+    envuelta = ConexionInstrumentada(ConexionPerfilada(conexion, perfilador), RegistroMetricas())
+    registro = RegistroSentencias()
+
+    registro.ejecutar(envuelta, 'sp_ObtenerAlumnoPorID', (1,))
+    registro.liberar(envuelta)
+
+    assert conexion.sql() == [PREFIJO_ESTADISTICAS + "EXEC dbo.sp_ObtenerAlumnoPorID ?"]
+    assert perfilador.resumen()['sp_ObtenerAlumnoPorID']['llamadas'] == 1
+
+
+def test_cursores_de_un_solo_uso_se_cierran_al_liberar():
+    conexion = ConexionFalsa()
+    registro = RegistroSentencias(habilitado=False)
+
+    registro.ejecutar(conexion, 'sp_EstadisticasAlumnos')
+    registro.liberar(conexion)
+
+    assert [micursor.cerrado for micursor in conexion.cursores] == [True]
+
+
+def test_procedimientos_de_lote_registrados():
+    sentencias = RegistroSentencias().sentencias
+    assert sentencias['sp_InsertarAlumnosLote'].tamanos == [None]
+    assert sentencias['sp_ActualizarAlumnosLote'].llamada == "{CALL dbo.sp_ActualizarAlumnosLote (?)}"
+    assert len(sentencias['sp_PurgarAlumnosLote'].parametros) == 7
+    assert len(sentencias['sp_ObtenerCambiosAlumnos'].parametros) == 2
+
+
+def test_cargador_masivo_llama_al_procedimiento_registrado(monkeypatch):
+    registro = RegistroSentencias()
+    pool, creadas = crear_pool_falso(monkeypatch, tamano_maximo=1, **registro.opciones_pool())
+    cargador = CargadorMasivoAlumnos(pool, tamano_lote=2, mostrar_progreso=False, sentencias=registro)
+    registros = [(fila, {'nombre': f'Ana{fila}', 'apellido': 'Paz'}) for fila in (2, 3, 4)]
+
+    with pool.conexion() as conexion:
+        conexion.resultados = [[[(2, 10), (3, 11)]], [[(4, 12)]]]
+    resultado = cargador.cargar_registros(registros)
+
+    assert resultado['ids'] == [(2, 10), (3, 11), (4, 12)]
+    assert len(creadas) == 1
+    assert creadas[0].sql() == ["{CALL dbo.sp_InsertarAlumnosLote (?)}"] * 2
+    assert len(creadas[0].cursores) == 1
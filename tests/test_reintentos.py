@@ -0,0 +1,123 @@
+"""
+Pruebas de la clasificación de errores de pyodbc, de los reintentos con
+backoff y del interruptor de circuito.
+"""
+
+import pytest
+
+import reintentos
+from falsos import error_odbc
+from reintentos import (ErrorCircuitoAbierto, InterruptorCircuito, PoliticaReintentos,
+                        ejecutar_con_reintentos, es_error_conexion, es_error_transitorio)
+
+DUPLICADO = ("[23000] [Microsoft][ODBC Driver 17 for SQL Server][SQL Server]Violation of PRIMARY KEY "
+             "constraint 'PK_Alumno'. Cannot insert duplicate key in object 'dbo.Alumno'. "
+             "The duplicate key value is (64). (2627) (SQLExecDirectW); [01000] [Microsoft]"
+             "[ODBC Driver 17 for SQL Server][SQL Server]The statement has been terminated. (3621)")
+RED_CAIDA = ("[08S01] [Microsoft][ODBC Driver 17 for SQL Server]TCP Provider: An existing connection "
+             "was forcibly closed by the remote host.\r\n (10054) (SQLExecDirectW)")
+DEADLOCK = ("[40001] [Microsoft][ODBC Driver 17 for SQL Server][SQL Server]Transaction (Process ID 57) "
+            "was deadlocked on lock resources with another process. (1205) (SQLExecDirectW)")
+
+
+def test_valor_entre_parentesis_no_es_codigo_nativo():
+    # (64) es el valor de la clave duplicada, no el error nativo 64 de red
+    error = error_odbc('23000', DUPLICADO)
+    assert reintentos._errores_nativos(error) == {2627, 3621}
+    assert not es_error_conexion(error)
+    assert not es_error_transitorio(error)
+
+
+def test_codigo_nativo_al_final_del_mensaje():
+    assert reintentos._errores_nativos(error_odbc('HY000', "Login failed (4060)")) == {4060}
+    assert es_error_conexion(error_odbc('HY000', "Cannot open database (4060) (SQLDriverConnect)"))
+
+
+def test_perdida_de_conexion_por_sqlstate_y_por_codigo():
+    assert es_error_conexion(error_odbc('08S01', RED_CAIDA))
+    assert es_error_conexion(error_odbc('42000', "Database is not currently available (40613)"))
+    assert es_error_transitorio(error_odbc('08S01', RED_CAIDA))
+
+
+def test_deadlock_y_tiempo_agotado_son_transitorios_pero_no_de_conexion():
+    deadlock = error_odbc('40001', DEADLOCK)
+    assert es_error_transitorio(deadlock)
+    assert not es_error_conexion(deadlock)
+    assert es_error_transitorio(error_odbc('HYT00', "Query timeout expired (0) (SQLExecDirectW)"))
+
+
+def test_errores_ajenos_a_pyodbc():
+    assert not es_error_conexion(ValueError('08S01'))
+    assert not es_error_transitorio(RuntimeError("(10054)"))
+
+
+def _sin_espera(monkeypatch):
+    monkeypatch.setattr(reintentos.time, 'sleep', lambda segundos: None)
+
+
+def test_reintenta_fallas_transitorias(monkeypatch):
+    _sin_espera(monkeypatch)
+    intentos = []
+
+    def operacion():
+        intentos.append(1)
+        if len(intentos) < 3:
+            raise error_odbc('40001', DEADLOCK)
+        return 'ok'
+
+    assert ejecutar_con_reintentos(operacion, PoliticaReintentos(intentos=3)) == 'ok'
+    assert len(intentos) == 3
+
+
+def test_no_reintenta_errores_de_datos(monkeypatch):
+    _sin_espera(monkeypatch)
+    intentos = []
+
+    def operacion():
+        intentos.append(1)
+        raise error_odbc('23000', DUPLICADO)
+
+    with pytest.raises(Exception):
+        ejecutar_con_reintentos(operacion, PoliticaReintentos(intentos=3))
+    assert len(intentos) == 1
+
+
+def test_no_idempotente_no_se_reintenta(monkeypatch):
+    _sin_espera(monkeypatch)
+    intentos = []
+
+    def operacion():
+        intentos.append(1)
+        raise error_odbc('08S01', RED_CAIDA)
+
+    with pytest.raises(Exception):
+        ejecutar_con_reintentos(operacion, PoliticaReintentos(intentos=3), reintentar=False)
+    assert len(intentos) == 1
+
+
+def test_interruptor_se_abre_y_rechaza(monkeypatch):
+    _sin_espera(monkeypatch)
+    interruptor = InterruptorCircuito(umbral_fallos=2, tiempo_apertura=60.0)
+
+    def caida():
+        raise error_odbc('08S01', RED_CAIDA)
+
+    for _ in range(2):
+        with pytest.raises(Exception):
+            ejecutar_con_reintentos(caida, PoliticaReintentos(intentos=0), interruptor)
+    assert interruptor.estado == InterruptorCircuito.ABIERTO
+    with pytest.raises(ErrorCircuitoAbierto):
+        ejecutar_con_reintentos(lambda: 'ok', PoliticaReintentos(), interruptor)
+
+
+def test_interruptor_semiabierto_se_cierra_con_exito(monkeypatch):
+    interruptor = InterruptorCircuito(umbral_fallos=1, tiempo_apertura=0.0)
+    interruptor.registrar_fallo()
+    assert interruptor.estado == InterruptorCircuito.ABIERTO
+    assert ejecutar_con_reintentos(lambda: 'ok', PoliticaReintentos(), interruptor) == 'ok'
+    assert interruptor.estado == InterruptorCircuito.CERRADO
+
+
+def test_espera_acotada():
+    politica = PoliticaReintentos(espera_base=1.0, espera_maxima=2.0)
+    assert all(0 <= politica.espera(intento) <= 2.0 for intento in range(10))
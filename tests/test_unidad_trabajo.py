@@ -0,0 +1,81 @@
+"""
+Pruebas de UnidadTrabajo con un cursor falso: orden de las sentencias,
+puntos de guardado, confirmación automática y conteo de filas.
+"""
+
+import pytest
+
+from falsos import crear_pool_falso, error_odbc
+from unidad_trabajo import UnidadTrabajo
+
+ABRIR = "IF @@TRANCOUNT = 0 BEGIN TRANSACTION"
+INSERTAR = "INSERT INTO Estudiantes VALUES (?)"
+
+
+def test_abre_transaccion_antes_del_primer_punto_de_guardado(monkeypatch):
+    pool, creadas = crear_pool_falso(monkeypatch)
+    with UnidadTrabajo(pool) as unidad:
+        with unidad.punto_guardado('registro_1'):
+            unidad.ejecutar(INSERTAR, (1,))
+
+    assert creadas[0].sql() == [ABRIR, "SAVE TRANSACTION registro_1", INSERTAR]
+    assert creadas[0].confirmaciones == 1
+
+
+def test_reabre_transaccion_tras_confirmacion_automatica(monkeypatch):
+    pool, creadas = crear_pool_falso(monkeypatch)
+    with UnidadTrabajo(pool, filas_maximas=2) as unidad:
+        for numero in range(1, 4):
+            with unidad.punto_guardado(f"registro_{numero}"):
+                unidad.ejecutar(INSERTAR, (numero,))
+
+    assert creadas[0].sql() == [
+        ABRIR, "SAVE TRANSACTION registro_1", INSERTAR,
+        "SAVE TRANSACTION registro_2", INSERTAR,
+        ABRIR, "SAVE TRANSACTION registro_3", INSERTAR,
+    ]
+    # Una confirmación automática y la del final del bloque
+    assert unidad.confirmaciones == 2
+    assert unidad.filas == 3
+
+
+def test_error_en_punto_de_guardado_revierte_solo_ese_bloque(monkeypatch):
+    pool, creadas = crear_pool_falso(monkeypatch)
+    duplicado = error_odbc('23000', "Violation of PRIMARY KEY constraint. (2627) (SQLExecDirectW)")
+
+    with UnidadTrabajo(pool) as unidad:
+        unidad.ejecutar(INSERTAR, (1,))
+        unidad.conexion.errores["VALUES (?) -- repetido"] = duplicado
+        with pytest.raises(type(duplicado)):
+            with unidad.punto_guardado('registro_2'):
+                unidad.ejecutar(INSERTAR + " -- repetido", (1,))
+
+    assert creadas[0].sql()[-1] == "ROLLBACK TRANSACTION registro_2"
+    assert unidad.filas == 1
+    assert unidad.confirmaciones == 1
+
+
+def test_error_fuera_de_punto_de_guardado_revierte_todo(monkeypatch):
+    pool, creadas = crear_pool_falso(monkeypatch)
+    with pytest.raises(ValueError):
+        with UnidadTrabajo(pool) as unidad:
+            unidad.ejecutar(INSERTAR, (1,))
+            raise ValueError("falla del llamador")
+
+    assert creadas[0].reversiones == 1
+    assert creadas[0].confirmaciones == 0
+    assert unidad.filas == 0
+
+
+def test_revertir_a_punto_inexistente(monkeypatch):
+    pool, _ = crear_pool_falso(monkeypatch)
+    with UnidadTrabajo(pool) as unidad:
+        with pytest.raises(ValueError):
+            unidad.revertir_a('no_existe')
+        with pytest.raises(ValueError):
+            unidad.guardar_punto('nombre inválido; DROP TABLE x')
+
+
+def test_fuera_del_bloque_with_falla():
+    with pytest.raises(RuntimeError):
+        UnidadTrabajo(pool=None).ejecutar(INSERTAR, (1,))
@@ -0,0 +1,255 @@
+"""
+UNIDAD DE TRABAJO CON PUNTOS DE GUARDADO
+Varias operaciones CRUD en una sola transacción
+
+@author Arias Javier, Andrade Eduardo, Guevara Galo
+@date 2025
+
+Descripción:
+Clase UnidadTrabajo, un context manager que toma una conexión del pool y
+agrupa todas las sentencias ejecutadas dentro del bloque en una transacción,
+confirmada al salir (un solo vaciado del log) o revertida si hay un error.
+Admite puntos de guardado con nombre (SAVE TRANSACTION) para revertir solo
+una parte, y confirmación automática al acumular cierta cantidad de filas o
+de milisegundos para acotar el tamaño de la transacción. Incluye un
+benchmark de confirmaciones por segundo frente a filas por segundo.
+"""
+
+import argparse
+import re
+import time
+from contextlib import contextmanager
+
+import pyodbc
+
+from configuracion import cargar_configuracion, construir_connection_string
+from pool_conexiones import PoolConexiones
+from reintentos import es_error_conexion
+
+
+# SAVE TRANSACTION admite identificadores de hasta 32 caracteres
+PATRON_PUNTO_GUARDADO = re.compile(r'^[A-Za-z_][A-Za-z0-9_]{0,31}$')
+
+
+class UnidadTrabajo:
+    """
+    Transacción que agrupa varias operaciones sobre una conexión del pool.
+
+    Atributos:
+        pool: Pool del que se toma la conexión al entrar al bloque
+        filas_maximas: Filas afectadas tras las cuales se confirma automáticamente (None = sin límite)
+        milisegundos_maximos: Duración de la transacción tras la cual se confirma
+                              automáticamente en la siguiente operación (None = sin límite)
+        confirmaciones: Transacciones confirmadas (automáticas y al salir)
+        filas: Filas afectadas en total (sin las revertidas)
+        operaciones: Sentencias ejecutadas en total
+    """
+
+    def __init__(self, pool, filas_maximas=None, milisegundos_maximos=None):
+        self.pool = pool
+        self.filas_maximas = filas_maximas
+        self.milisegundos_maximos = milisegundos_maximos
+        self.confirmaciones = 0
+        self.filas = 0
+        self.operaciones = 0
+        self.conexion = None
+        self._contexto = None
+        self._cursor = None
+        self._puntos = []
+        self._filas_pendientes = 0
+        self._inicio_transaccion = None
+
+    # ==================== CICLO DE VIDA ====================
+    def __enter__(self):
+        # pool.conexion() confirma al salir bien, revierte si hay error y descarta
+        # la conexión si se perdió
+        self._contexto = self.pool.conexion()
+        self.conexion = self._contexto.__enter__()
+        self._cursor = self.conexion.cursor()
+        self._iniciar_transaccion()
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        try:
+            self._cursor.close()
+        except pyodbc.Error:
+            pass
+        if tipo is None:
+            if self._filas_pendientes:
+                self.confirmaciones += 1
+        else:
+            # Lo pendiente se revierte: filas cuenta solo lo confirmado
+            self.filas -= self._filas_pendientes
+        self._filas_pendientes = 0
+        contexto, self._contexto, self.conexion, self._cursor = self._contexto, None, None, None
+        return contexto.__exit__(tipo, valor, traza)
+
+    def _iniciar_transaccion(self):
+        # SAVE TRANSACTION no abre una transacción (error 628 si no hay una activa):
+        # con autocommit desactivado la abriría recién la primera sentencia de
+        # datos, y un punto de guardado puede ir antes que ella
+        self._cursor.execute("IF @@TRANCOUNT = 0 BEGIN TRANSACTION")
+        self._puntos = []
+        self._filas_pendientes = 0
+        self._inicio_transaccion = time.monotonic()
+
+    def _verificar_activa(self):
+        if self.conexion is None:
+            raise RuntimeError("La unidad de trabajo solo se usa dentro de un bloque with")
+
+    # ==================== OPERACIONES ====================
+    def ejecutar(self, sql, parametros=()):
+        """
+        Ejecuta una sentencia dentro de la transacción y devuelve las filas afectadas.
+        Si se alcanzó algún umbral, confirma lo acumulado antes de volver.
+        """
+        self._verificar_activa()
+        if parametros:
+            self._cursor.execute(sql, parametros)
+        else:
+            self._cursor.execute(sql)
+        afectadas = max(self._cursor.rowcount, 0)
+        self.operaciones += 1
+        self.filas += afectadas
+        self._filas_pendientes += afectadas
+        self._confirmar_si_corresponde()
+        return afectadas
+
+    def ejecutar_varios(self, sql, secuencia):
+        """
+        Ejecuta la sentencia con cada juego de parámetros. Devuelve el total de
+        filas afectadas. Los umbrales se revisan después de cada fila.
+        """
+        return sum(self.ejecutar(sql, parametros) for parametros in secuencia)
+
+    def _confirmar_si_corresponde(self):
+        if self.filas_maximas is not None and self._filas_pendientes >= self.filas_maximas:
+            self.confirmar()
+        elif (self.milisegundos_maximos is not None and self._filas_pendientes
+              and (time.monotonic() - self._inicio_transaccion) * 1000.0 >= self.milisegundos_maximos):
+            self.confirmar()
+
+    def confirmar(self):
+        """
+        Confirma lo acumulado y comienza una transacción nueva en la misma conexión.
+        Los puntos de guardado anteriores dejan de existir.
+        """
+        self._verificar_activa()
+        self.conexion.commit()
+        if self._filas_pendientes:
+            self.confirmaciones += 1
+        self._iniciar_transaccion()
+
+    # ==================== PUNTOS DE GUARDADO ====================
+    def guardar_punto(self, nombre):
+        """
+        Crea un punto de guardado con nombre (SAVE TRANSACTION).
+        """
+        self._verificar_activa()
+        if not PATRON_PUNTO_GUARDADO.match(nombre):
+            raise ValueError(f"Nombre de punto de guardado inválido: {nombre!r}")
+        self._cursor.execute(f"SAVE TRANSACTION {nombre}")
+        self._puntos.append((nombre, self._filas_pendientes))
+
+    def revertir_a(self, nombre):
+        """
+        Revierte lo hecho desde el punto de guardado, que sigue disponible.
+        La transacción continúa abierta.
+        """
+        self._verificar_activa()
+        for indice in range(len(self._puntos) - 1, -1, -1):
+            if self._puntos[indice][0] == nombre:
+                break
+        else:
+            raise ValueError(f"No existe el punto de guardado {nombre!r} "
+                             "(¿hubo una confirmación automática desde que se creó?)")
+        self._cursor.execute(f"ROLLBACK TRANSACTION {nombre}")
+        filas_en_punto = self._puntos[indice][1]
+        self.filas -= self._filas_pendientes - filas_en_punto
+        self._filas_pendientes = filas_en_punto
+        # Los puntos creados después del revertido ya no existen
+        del self._puntos[indice + 1:]
+
+    @contextmanager
+    def punto_guardado(self, nombre):
+        """
+        Bloque con punto de guardado: si el bloque falla, se revierte solo lo
+        hecho dentro de él y la excepción se propaga para que el llamador
+        decida si continúa con la unidad de trabajo.
+        """
+        self.guardar_punto(nombre)
+        try:
+            yield self
+        except Exception as e:
+            # Un error de conexión ya deshizo toda la transacción, y una
+            # confirmación automática dentro del bloque ya eliminó el punto
+            if not es_error_conexion(e) and any(punto == nombre for punto, _ in self._puntos):
+                self.revertir_a(nombre)
+            raise
+
+    def estadisticas(self):
+        """
+        Devuelve los contadores de la unidad de trabajo.
+        """
+        return {
+            'operaciones': self.operaciones,
+            'filas': self.filas,
+            'confirmaciones': self.confirmaciones,
+            'filas_pendientes': self._filas_pendientes,
+        }
+
+
+# ==================== BENCHMARK ====================
+def ejecutar_benchmark(connection_string, filas=5000, umbrales=(1, 10, 100, 1000)):
+    """
+    Inserta la misma cantidad de filas en una tabla temporal confirmando cada
+    'umbral' filas y muestra confirmaciones/s frente a filas/s. La tabla
+    temporal vive en la única conexión del pool, por lo que no toca datos reales.
+    """
+    pool = PoolConexiones(connection_string, tamano_minimo=1, tamano_maximo=1)
+    sql = "INSERT INTO #BenchmarkUnidadTrabajo (id, nombre, email) VALUES (?, ?, ?)"
+
+    try:
+        with pool.conexion() as conexion, conexion.cursor() as micursor:
+            micursor.execute("""
+            IF OBJECT_ID('tempdb..#BenchmarkUnidadTrabajo') IS NOT NULL
+                DROP TABLE #BenchmarkUnidadTrabajo;
+            CREATE TABLE #BenchmarkUnidadTrabajo (
+                id INT NOT NULL,
+                nombre NVARCHAR(50) NOT NULL,
+                email NVARCHAR(100) NOT NULL
+            );""")
+
+        print(f"\n--- BENCHMARK DE UNIDAD DE TRABAJO ({filas} filas por caso) ---")
+        print(f"{'Filas por commit':<18} {'Segundos':>9} {'Commits':>9} {'Commits/s':>11} {'Filas/s':>11}")
+        print("-" * 62)
+        for umbral in umbrales:
+            with pool.conexion() as conexion, conexion.cursor() as micursor:
+                micursor.execute("TRUNCATE TABLE #BenchmarkUnidadTrabajo")
+
+            inicio = time.perf_counter()
+            with UnidadTrabajo(pool, filas_maximas=umbral) as unidad:
+                unidad.ejecutar_varios(sql, ((numero, f"Estudiante {numero}", f"e{numero}@ejemplo.com")
+                                             for numero in range(filas)))
+            segundos = time.perf_counter() - inicio
+
+            print(f"{umbral:<18} {segundos:>9.3f} {unidad.confirmaciones:>9} "
+                  f"{unidad.confirmaciones / segundos:>11.1f} {filas / segundos:>11.1f}")
+        print()
+    finally:
+        pool.cerrar()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark de confirmaciones por segundo frente a filas por segundo (tabla temporal)")
+    parser.add_argument('--filas', type=int, default=5000, help="Filas insertadas por caso")
+    parser.add_argument('--umbrales', type=int, nargs='+', default=[1, 10, 100, 1000],
+                        help="Filas por confirmación a comparar")
+    argumentos = parser.parse_args()
+
+    try:
+        ejecutar_benchmark(construir_connection_string(cargar_configuracion()),
+                           argumentos.filas, argumentos.umbrales)
+    except pyodbc.Error as e:
+        print(f"✗ Error de conexión: {e}")